@@ -0,0 +1,335 @@
+"""Deterministic local allergen screening for ingredient lists.
+
+Ingredients are matched against a multilingual term dictionary compiled into an
+Aho-Corasick automaton and classified per user allergen profile:
+- HIT: an ingredient term definitely contains a profile allergen.
+- CLEAR: a single-substance ingredient that cannot contain a profile allergen.
+- AMBIGUOUS: everything else; only these need a model judgment.
+"""
+
+import re
+import unicodedata
+from collections import deque
+from dataclasses import dataclass
+from enum import StrEnum
+from functools import lru_cache
+from typing import Any, Final, Iterator
+
+from .constants import ALLERGEN_FREE_INGREDIENTS, INGREDIENT_ALLERGEN_TERMS, STANDARD_ALLERGENS
+
+SAFETY_STATUS_RANK: Final[dict[str, int]] = {"SAFE": 0, "CAUTION": 1, "DANGER": 2}
+# Phrases that flip or weaken a term match ("gluten free", cross-contact notices).
+UNCERTAIN_CONTEXT_MARKERS: Final[tuple[str, ...]] = (
+    "free",
+    "without",
+    "non-",
+    "may contain",
+    "traces",
+    "무첨가",
+    "미함유",
+    "불포함",
+    "제조시설",
+    "혼입",
+)
+PERCENT_PATTERN: Final[re.Pattern[str]] = re.compile(r"\(?\s*\d+(?:\.\d+)?\s*%\s*\)?")
+ORIGIN_PATTERN: Final[re.Pattern[str]] = re.compile(r"\((?:국산|국내산|외국산|수입산)\)")
+WHITESPACE_PATTERN: Final[re.Pattern[str]] = re.compile(r"\s+")
+LOCAL_SAFE_COACH_MESSAGE: Final[str] = "등록된 알러지 성분이 감지되지 않았습니다. 안심하고 드세요."
+
+
+class AllergenVerdict(StrEnum):
+    HIT = "hit"
+    CLEAR = "clear"
+    AMBIGUOUS = "ambiguous"
+
+
+@dataclass(frozen=True)
+class TermMatch:
+    start: int
+    end: int
+    term: str
+    allergens: tuple[str, ...]
+    uncertain: bool = False
+
+
+@dataclass(frozen=True)
+class IngredientScreening:
+    name: str
+    verdict: AllergenVerdict
+    allergens: tuple[str, ...] = ()
+
+
+def _is_hangul(char: str) -> bool:
+    return "가" <= char <= "힣"
+
+
+def _is_ascii_word(char: str) -> bool:
+    return char.isascii() and char.isalnum()
+
+
+def allergen_family(allergen: str) -> str:
+    """"Tree Nut (Almond)" -> "Tree Nut"."""
+    return allergen.split(" (", 1)[0]
+
+
+def normalize_ingredient_text(text: str) -> str:
+    normalized = unicodedata.normalize("NFKC", text).lower()
+    normalized = PERCENT_PATTERN.sub(" ", normalized)
+    normalized = ORIGIN_PATTERN.sub(" ", normalized)
+    return WHITESPACE_PATTERN.sub(" ", normalized).strip()
+
+
+class AhoCorasickAutomaton:
+    """Multi-pattern substring matcher; one pass over the text finds every term."""
+
+    def __init__(self, terms: list[str]) -> None:
+        self._goto: list[dict[str, int]] = [{}]
+        self._fail: list[int] = [0]
+        self._output: list[list[str]] = [[]]
+        for term in terms:
+            self._add(term)
+        self._build_failure_links()
+
+    def _add(self, term: str) -> None:
+        state = 0
+        for char in term:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+            state = next_state
+        self._output[state].append(term)
+
+    def _build_failure_links(self) -> None:
+        queue: deque[int] = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                candidate = self._goto[fallback].get(char, 0)
+                self._fail[next_state] = candidate if candidate != next_state else 0
+                self._output[next_state].extend(self._output[self._fail[next_state]])
+
+    def iter_matches(self, text: str) -> Iterator[tuple[int, int, str]]:
+        state = 0
+        for index, char in enumerate(text):
+            while state and char not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(char, 0)
+            for term in self._output[state]:
+                yield index + 1 - len(term), index + 1, term
+
+
+class AllergenMatcher:
+    def __init__(self, terms: dict[str, tuple[str, ...]], allergen_free: frozenset[str]) -> None:
+        self._terms = terms
+        self._allergen_free = allergen_free
+        self._automaton = AhoCorasickAutomaton(list(terms))
+        self.known_allergens = frozenset(
+            name for allergens in terms.values() for allergen in allergens for name in (allergen, allergen_family(allergen))
+        )
+
+    @classmethod
+    def from_constants(cls) -> "AllergenMatcher":
+        terms: dict[str, tuple[str, ...]] = {
+            normalize_ingredient_text(term): (allergen,) for term, allergen in STANDARD_ALLERGENS.items()
+        }
+        for term, allergens in INGREDIENT_ALLERGEN_TERMS.items():
+            terms[normalize_ingredient_text(term)] = allergens
+        return cls(terms, frozenset(normalize_ingredient_text(item) for item in ALLERGEN_FREE_INGREDIENTS))
+
+    def _accept(self, text: str, start: int, end: int, term: str) -> TermMatch | None:
+        before = text[start - 1] if start > 0 else ""
+        after = text[end] if end < len(text) else ""
+        # ASCII terms must sit on word boundaries: "egg" must not match "eggplant".
+        if _is_ascii_word(term[0]) and before and _is_ascii_word(before):
+            return None
+        if _is_ascii_word(term[-1]) and after and _is_ascii_word(after):
+            return None
+        # Single-syllable Korean terms ("밀", "게", "콩") are only trusted at a word edge.
+        uncertain = len(term) == 1 and _is_hangul(term) and _is_hangul(before) and _is_hangul(after)
+        return TermMatch(start=start, end=end, term=term, allergens=self._terms[term], uncertain=uncertain)
+
+    def find(self, text: str) -> list[TermMatch]:
+        """Return non-overlapping matches, preferring the longest term at each position."""
+        candidates = []
+        for start, end, term in self._automaton.iter_matches(text):
+            match = self._accept(text, start, end, term)
+            if match is not None:
+                candidates.append(match)
+        candidates.sort(key=lambda item: (item.start, item.start - item.end))
+
+        selected: list[TermMatch] = []
+        covered_until = 0
+        for match in candidates:
+            if match.start < covered_until:
+                continue
+            selected.append(match)
+            covered_until = match.end
+        return selected
+
+    def is_single_substance(self, text: str) -> bool:
+        compact = text.replace(" ", "")
+        return any(key in self._allergen_free or key in self._terms for key in (text, compact))
+
+    def classify(self, ingredient: str, profile: list[str]) -> IngredientScreening:
+        text = normalize_ingredient_text(ingredient)
+        matches = self.find(text)
+        if matches and any(marker in text for marker in UNCERTAIN_CONTEXT_MARKERS):
+            return IngredientScreening(name=ingredient, verdict=AllergenVerdict.AMBIGUOUS)
+
+        hits: list[str] = []
+        related = False
+        for match in matches:
+            for allergen in match.allergens:
+                for profile_allergen in profile:
+                    relation = _relate(allergen, profile_allergen)
+                    if relation is AllergenVerdict.HIT and not match.uncertain:
+                        if profile_allergen not in hits:
+                            hits.append(profile_allergen)
+                    elif relation is not None:
+                        related = True
+
+        if hits:
+            return IngredientScreening(name=ingredient, verdict=AllergenVerdict.HIT, allergens=tuple(hits))
+        if related or any(match.uncertain for match in matches):
+            return IngredientScreening(name=ingredient, verdict=AllergenVerdict.AMBIGUOUS)
+        if all(item in self.known_allergens for item in profile) and self.is_single_substance(text):
+            return IngredientScreening(name=ingredient, verdict=AllergenVerdict.CLEAR)
+        return IngredientScreening(name=ingredient, verdict=AllergenVerdict.AMBIGUOUS)
+
+
+def _relate(ingredient_allergen: str, profile_allergen: str) -> AllergenVerdict | None:
+    if ingredient_allergen == profile_allergen:
+        return AllergenVerdict.HIT
+    family = allergen_family(profile_allergen)
+    if allergen_family(ingredient_allergen) != family:
+        return None
+    # A broad profile entry ("Tree Nut") covers every member; a narrow one only itself.
+    if profile_allergen == family:
+        return AllergenVerdict.HIT
+    return AllergenVerdict.AMBIGUOUS
+
+
+@lru_cache(maxsize=1)
+def get_allergen_matcher() -> AllergenMatcher:
+    return AllergenMatcher.from_constants()
+
+
+def _hit_reason(allergens: tuple[str, ...]) -> str:
+    return f"Contains {', '.join(allergens)}"
+
+
+def _build_hit_coach_message(hits: list[IngredientScreening]) -> str:
+    names = ", ".join(item.name for item in hits)
+    allergens: list[str] = []
+    for item in hits:
+        allergens.extend(allergen for allergen in item.allergens if allergen not in allergens)
+    return f"이 제품에는 {names} 성분이 포함되어 있어 {', '.join(allergens)} 알러지가 있으신 분은 섭취를 피해주세요."
+
+
+@dataclass(frozen=True)
+class AllergenScreeningResult:
+    items: tuple[IngredientScreening, ...]
+
+    @property
+    def hits(self) -> list[IngredientScreening]:
+        return [item for item in self.items if item.verdict is AllergenVerdict.HIT]
+
+    @property
+    def ambiguous_names(self) -> list[str]:
+        return [item.name for item in self.items if item.verdict is AllergenVerdict.AMBIGUOUS]
+
+    def _local_ingredient(self, item: IngredientScreening) -> dict[str, Any]:
+        if item.verdict is AllergenVerdict.HIT:
+            return {"name": item.name, "isAllergen": True, "riskReason": _hit_reason(item.allergens)}
+        return {"name": item.name, "isAllergen": False, "riskReason": ""}
+
+    def to_assessment(self) -> dict[str, Any]:
+        """Build a full assessment without a model call (no ambiguous ingredients)."""
+        hits = self.hits
+        return {
+            "safetyStatus": "DANGER" if hits else "SAFE",
+            "coachMessage": _build_hit_coach_message(hits) if hits else LOCAL_SAFE_COACH_MESSAGE,
+            "ingredients": [self._local_ingredient(item) for item in self.items],
+        }
+
+    def to_fallback_assessment(self, coach_message: str) -> dict[str, Any]:
+        """Fail-safe assessment when the model call for ambiguous ingredients fails."""
+        return {
+            "safetyStatus": "DANGER" if self.hits else "CAUTION",
+            "coachMessage": coach_message,
+            "ingredients": [self._local_ingredient(item) for item in self.items],
+        }
+
+    def merge_model_assessment(self, model_result: dict[str, Any]) -> dict[str, Any]:
+        """Combine local verdicts with a model assessment of the ambiguous remainder."""
+        model_items: dict[str, dict[str, Any]] = {}
+        for model_item in model_result.get("ingredients", []):
+            if not isinstance(model_item, dict):
+                continue
+            key = str(model_item.get("name", "")).strip().lower()
+            if key and key not in model_items:
+                model_items[key] = model_item
+
+        ingredients = []
+        for item in self.items:
+            if item.verdict is not AllergenVerdict.AMBIGUOUS:
+                ingredients.append(self._local_ingredient(item))
+                continue
+            model_item = model_items.get(item.name.strip().lower())
+            if model_item is None:
+                ingredients.append({"name": item.name, "isAllergen": False, "riskReason": ""})
+                continue
+            merged = dict(model_item)
+            merged["name"] = item.name
+            merged["isAllergen"] = bool(model_item.get("isAllergen", False))
+            ingredients.append(merged)
+
+        model_status = model_result.get("safetyStatus")
+        if model_status not in SAFETY_STATUS_RANK:
+            model_status = "CAUTION"
+        hits = self.hits
+        local_status = "DANGER" if hits else "SAFE"
+        status = max(local_status, model_status, key=SAFETY_STATUS_RANK.__getitem__)
+
+        model_message = str(model_result.get("coachMessage") or "").strip()
+        if hits:
+            messages = [_build_hit_coach_message(hits)]
+            if model_message and model_status != "SAFE":
+                messages.append(model_message)
+            coach_message = " ".join(messages)
+        else:
+            coach_message = model_message or LOCAL_SAFE_COACH_MESSAGE
+
+        return {
+            "safetyStatus": status,
+            "coachMessage": coach_message,
+            "ingredients": ingredients,
+        }
+
+
+def screen_ingredients(ingredients: list[str], profile: list[str]) -> AllergenScreeningResult:
+    """
+    Classify ingredients against normalized profile allergens (see normalize_allergens).
+
+    Example:
+    ["밀가루", "설탕", "혼합제제"] vs ["Wheat/Gluten"] -> HIT, CLEAR, AMBIGUOUS
+    """
+    matcher = get_allergen_matcher()
+    items: list[IngredientScreening] = []
+    seen: set[str] = set()
+    for ingredient in ingredients:
+        name = str(ingredient).strip()
+        key = name.lower()
+        if not name or key in seen:
+            continue
+        seen.add(key)
+        items.append(matcher.classify(name, profile))
+    return AllergenScreeningResult(items=tuple(items))
@@ -50,3 +50,16 @@ def format_allergens_for_prompt(raw_input: str) -> str:
     if not normalized:
         return PROMPT_NONE_TEXT
     return ", ".join(normalized)
+
+
+def to_allergen_input_token(allergen: str) -> str:
+    """
+    Return a raw input token that normalize_allergens maps back to `allergen`.
+
+    Example:
+    "Tree Nut (Almond)" -> "almond", "Kiwi" -> "kiwi"
+    """
+    for token, standard in STANDARD_ALLERGENS.items():
+        if standard == allergen and not TOKEN_SPLIT_PATTERN.search(token):
+            return token
+    return allergen.lower()
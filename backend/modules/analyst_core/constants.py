@@ -106,3 +106,210 @@ STANDARD_ALLERGENS: Final[dict[str, str]] = {
     "sulfites": "Sulfite",
     "아황산염": "Sulfite",
 }
+
+# Ingredient term -> allergens it definitely contains, used by the local allergen matcher.
+# Every STANDARD_ALLERGENS key is also matched; entries here add ingredient-level vocabulary.
+# Terms mapped to an empty tuple mask look-alike substrings (e.g. "메밀" hides "밀").
+INGREDIENT_ALLERGEN_TERMS: Final[dict[str, tuple[str, ...]]] = {
+    # Peanut
+    "땅콩버터": ("Peanut",),
+    "groundnut": ("Peanut",),
+    "peanut butter": ("Peanut",),
+    "peanut oil": ("Peanut",),
+    # Tree nuts
+    "캐슈넛": ("Tree Nut (Cashew)",),
+    "피스타치오": ("Tree Nut (Pistachio)",),
+    "헤이즐넛": ("Tree Nut (Hazelnut)",),
+    "마카다미아": ("Tree Nut (Macadamia)",),
+    "피칸": ("Tree Nut (Pecan)",),
+    "잣": ("Tree Nut (Pine Nut)",),
+    "almonds": ("Tree Nut (Almond)",),
+    "walnuts": ("Tree Nut (Walnut)",),
+    "cashews": ("Tree Nut (Cashew)",),
+    "hazelnut": ("Tree Nut (Hazelnut)",),
+    "hazelnuts": ("Tree Nut (Hazelnut)",),
+    "macadamia": ("Tree Nut (Macadamia)",),
+    "pecan": ("Tree Nut (Pecan)",),
+    "pecans": ("Tree Nut (Pecan)",),
+    "pine nut": ("Tree Nut (Pine Nut)",),
+    "pine nuts": ("Tree Nut (Pine Nut)",),
+    "almond milk": ("Tree Nut (Almond)",),
+    # Milk/Dairy
+    "원유": ("Milk/Dairy",),
+    "분유": ("Milk/Dairy",),
+    "탈지분유": ("Milk/Dairy",),
+    "전지분유": ("Milk/Dairy",),
+    "유청": ("Milk/Dairy",),
+    "유청분말": ("Milk/Dairy",),
+    "유당": ("Milk/Dairy",),
+    "유크림": ("Milk/Dairy",),
+    "버터": ("Milk/Dairy",),
+    "치즈": ("Milk/Dairy",),
+    "크림": ("Milk/Dairy",),
+    "생크림": ("Milk/Dairy",),
+    "연유": ("Milk/Dairy",),
+    "요거트": ("Milk/Dairy",),
+    "요구르트": ("Milk/Dairy",),
+    "발효유": ("Milk/Dairy",),
+    "카제인": ("Milk/Dairy",),
+    "카제인나트륨": ("Milk/Dairy",),
+    "밀크": ("Milk/Dairy",),
+    "butter": ("Milk/Dairy",),
+    "cheese": ("Milk/Dairy",),
+    "cream": ("Milk/Dairy",),
+    "whey": ("Milk/Dairy",),
+    "casein": ("Milk/Dairy",),
+    "yogurt": ("Milk/Dairy",),
+    "milk powder": ("Milk/Dairy",),
+    "skim milk": ("Milk/Dairy",),
+    "ice cream": ("Milk/Dairy",),
+    # Egg
+    "난백": ("Egg",),
+    "난황": ("Egg",),
+    "전란": ("Egg",),
+    "전란액": ("Egg",),
+    "난백분": ("Egg",),
+    "계란흰자": ("Egg",),
+    "마요네즈": ("Egg",),
+    "egg white": ("Egg",),
+    "egg yolk": ("Egg",),
+    "albumin": ("Egg",),
+    "mayonnaise": ("Egg",),
+    # Wheat/Gluten
+    "밀가루": ("Wheat/Gluten",),
+    "소맥": ("Wheat/Gluten",),
+    "소맥분": ("Wheat/Gluten",),
+    "강력분": ("Wheat/Gluten",),
+    "중력분": ("Wheat/Gluten",),
+    "박력분": ("Wheat/Gluten",),
+    "통밀": ("Wheat/Gluten",),
+    "밀전분": ("Wheat/Gluten",),
+    "빵가루": ("Wheat/Gluten",),
+    "부침가루": ("Wheat/Gluten",),
+    "튀김가루": ("Wheat/Gluten",),
+    "wheat flour": ("Wheat/Gluten",),
+    "semolina": ("Wheat/Gluten",),
+    # Soy
+    "두유": ("Soy",),
+    "두부": ("Soy",),
+    "된장": ("Soy",),
+    "대두유": ("Soy",),
+    "콩기름": ("Soy",),
+    "대두단백": ("Soy",),
+    "분리대두단백": ("Soy",),
+    "대두레시틴": ("Soy",),
+    "검은콩": ("Soy",),
+    "간장": ("Soy", "Wheat/Gluten"),
+    "soya": ("Soy",),
+    "soy lecithin": ("Soy",),
+    "soy milk": ("Soy",),
+    "tofu": ("Soy",),
+    "edamame": ("Soy",),
+    "soy sauce": ("Soy", "Wheat/Gluten"),
+    # Fish
+    "멸치": ("Fish",),
+    "참치": ("Fish",),
+    "연어": ("Fish",),
+    "고등어": ("Fish",),
+    "명태": ("Fish",),
+    "가다랑어": ("Fish",),
+    "액젓": ("Fish",),
+    "anchovy": ("Fish",),
+    "anchovies": ("Fish",),
+    "tuna": ("Fish",),
+    "salmon": ("Fish",),
+    "mackerel": ("Fish",),
+    "fish sauce": ("Fish",),
+    # Shellfish
+    "꽃게": ("Shellfish (Crab)",),
+    "대게": ("Shellfish (Crab)",),
+    "가재": ("Shellfish (Lobster)",),
+    "랍스터": ("Shellfish (Lobster)",),
+    "prawn": ("Shellfish (Shrimp)",),
+    "prawns": ("Shellfish (Shrimp)",),
+    "crabs": ("Shellfish (Crab)",),
+    # Sesame
+    "깨": ("Sesame",),
+    "참기름": ("Sesame",),
+    "흑임자": ("Sesame",),
+    "tahini": ("Sesame",),
+    "sesame oil": ("Sesame",),
+    # Sulfite
+    "아황산나트륨": ("Sulfite",),
+    "메타중아황산나트륨": ("Sulfite",),
+    "메타중아황산칼륨": ("Sulfite",),
+    "무수아황산": ("Sulfite",),
+    "sulphite": ("Sulfite",),
+    "sulphites": ("Sulfite",),
+    "sodium metabisulfite": ("Sulfite",),
+    "sulfur dioxide": ("Sulfite",),
+    # Look-alikes that contain an allergen term but not the allergen.
+    "메밀": (),
+    "밀랍": (),
+    "들깨": (),
+    "강낭콩": (),
+    "완두콩": (),
+    "병아리콩": (),
+    "렌틸콩": (),
+    "커피콩": (),
+    "코코아버터": (),
+    "카카오버터": (),
+    "코코넛밀크": (),
+    "코코넛크림": (),
+    "cocoa butter": (),
+    "shea butter": (),
+    "coconut milk": (),
+    "coconut cream": (),
+    "cream of tartar": (),
+    "buckwheat": (),
+}
+
+# Single-substance ingredients that carry none of the standard allergens.
+ALLERGEN_FREE_INGREDIENTS: Final[frozenset[str]] = frozenset(
+    {
+        "정제수",
+        "물",
+        "설탕",
+        "백설탕",
+        "황설탕",
+        "흑설탕",
+        "소금",
+        "정제소금",
+        "천일염",
+        "포도당",
+        "과당",
+        "올리고당",
+        "물엿",
+        "쌀",
+        "백미",
+        "현미",
+        "찹쌀",
+        "감자",
+        "고구마",
+        "양파",
+        "마늘",
+        "생강",
+        "대파",
+        "당근",
+        "고춧가루",
+        "후추",
+        "식초",
+        "구연산",
+        "비타민c",
+        "water",
+        "sugar",
+        "cane sugar",
+        "salt",
+        "sea salt",
+        "glucose",
+        "fructose",
+        "rice",
+        "potato",
+        "onion",
+        "garlic",
+        "black pepper",
+        "vinegar",
+        "citric acid",
+        "ascorbic acid",
+    }
+)
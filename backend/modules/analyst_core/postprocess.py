@@ -1,7 +1,9 @@
 """Post-processing helpers for analyst responses."""
-from typing import Any, Generator
+import threading
+from typing import Any, Callable, Generator, Optional
 
 from backend.modules.nutrition import lookup_nutrition
+from backend.modules.request_deadline import has_budget
 
 NUTRIENT_KEYS = ("calories", "protein", "carbs", "fat", "fiber", "sodium", "sugar")
 ERROR_NAMES = {"Error Analyzing Food", "Not Food", "분석 오류"}
@@ -9,6 +11,48 @@ DEFAULT_SERVING_SIZE = "100g (total)"
 DEFAULT_MULTI_SOURCE = "Multiple Sources"
 UNKNOWN_SOURCE = "Unknown"
 DEFAULT_ORIGIN = "unknown"
+# Enrichment is optional: past this point of the request deadline the result ships without it.
+NUTRITION_MIN_BUDGET_SECONDS = 1.0
+
+NutritionLookup = Callable[[str, str], Optional[dict[str, Any]]]
+
+
+class SharedNutritionLookup:
+    """
+    Memoized lookup_nutrition shared by the results of one batch, so an ingredient
+    that appears in several images (rice, kimchi, ...) is looked up once.
+    Concurrent callers asking for the same key wait for the first lookup.
+    """
+
+    def __init__(self, lookup: NutritionLookup | None = None) -> None:
+        self._lookup = lookup or lookup_nutrition
+        self._lock = threading.Lock()
+        self._entries: dict[tuple[str, str], tuple[threading.Event, list]] = {}
+        self.lookups = 0
+        self.hits = 0
+
+    def __call__(self, food_name: str, food_origin: str = DEFAULT_ORIGIN) -> Optional[dict[str, Any]]:
+        key = (food_name.strip().lower(), food_origin)
+        with self._lock:
+            entry = self._entries.get(key)
+            owner = entry is None
+            if owner:
+                entry = (threading.Event(), [])
+                self._entries[key] = entry
+                self.lookups += 1
+            else:
+                self.hits += 1
+        done, slot = entry
+        if owner:
+            try:
+                slot.append(self._lookup(food_name, food_origin))
+            finally:
+                done.set()
+        else:
+            done.wait()
+        value = slot[0] if slot else None
+        # Callers mutate/attach the returned dict, so hand each one its own copy.
+        return dict(value) if isinstance(value, dict) else value
 
 
 def _build_total_nutrition() -> dict[str, Any]:
@@ -56,8 +100,13 @@ def _build_fallback_name_variants(result: dict[str, Any]) -> list[str]:
     ]
 
 
-def enrich_with_nutrition(result: dict[str, Any]) -> dict[str, Any]:
-    """Enrich analysis result with per-ingredient and total nutrition."""
+def enrich_with_nutrition(result: dict[str, Any], lookup: NutritionLookup | None = None) -> dict[str, Any]:
+    """
+    Enrich analysis result with per-ingredient and total nutrition.
+    Lookups stop once the request deadline is too close; the remaining
+    ingredients are kept without nutrition.
+    """
+    lookup = lookup or lookup_nutrition
     food_origin = result.get("foodOrigin", DEFAULT_ORIGIN)
 
     if result.get("foodName", "") in ERROR_NAMES:
@@ -70,8 +119,16 @@ def enrich_with_nutrition(result: dict[str, Any]) -> dict[str, Any]:
     ingredients = result.get("ingredients", [])
     unique_ingredients = []
 
+    out_of_time = False
     for ingredient, ing_name in _iter_unique_ingredients(ingredients):
-        nutrition_data = lookup_nutrition(ing_name, food_origin)
+        if not out_of_time and not has_budget(NUTRITION_MIN_BUDGET_SECONDS):
+            out_of_time = True
+            print("  ↳ Skipping remaining nutrition lookups: request deadline too close")
+        if out_of_time:
+            unique_ingredients.append(ingredient)
+            continue
+
+        nutrition_data = lookup(ing_name, food_origin)
 
         if nutrition_data and nutrition_data.get("calories") is not None:
             ingredient["nutrition"] = nutrition_data
@@ -92,11 +149,11 @@ def enrich_with_nutrition(result: dict[str, Any]) -> dict[str, Any]:
         total_nutrition["dataSource"] = " + ".join(sources) if sources else UNKNOWN_SOURCE
         result["nutrition"] = total_nutrition
         print(f"Total Nutrition: {total_nutrition['calories']:.1f} kcal from {len(sources)} source(s)")
-    else:
+    elif not out_of_time:
         for name in _build_fallback_name_variants(result):
             if not name:
                 continue
-            nutrition_data = lookup_nutrition(name, food_origin)
+            nutrition_data = lookup(name, food_origin)
             if nutrition_data and nutrition_data.get("calories") is not None:
                 result["nutrition"] = nutrition_data
                 print(f"Nutrition Data ({nutrition_data.get('dataSource')}): fallback to '{name}'")
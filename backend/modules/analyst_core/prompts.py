@@ -168,6 +168,49 @@ BARCODE_PROMPT_TEMPLATE: Final[str] = """
         Return JSON only.
         """
 
+# Products per combined allergen request; keeps the structured output well under max_output_tokens.
+BARCODE_BATCH_PRODUCTS_PER_REQUEST: Final[int] = 10
+
+BARCODE_BATCH_PROMPT_TEMPLATE: Final[str] = """
+        You are a food allergen analyst. Analyze the ingredient lists of several packaged food products
+        and determine, per product, if any ingredient matches or contains the user's allergens.
+
+        **User Allergy Profile**: {normalized_allergens}
+        **Products** (one per line, `id: [ingredients]`):
+{products_str}
+
+        **Rules**:
+        1. Return exactly one entry in `products` per product id above, echoing the id.
+        2. For each ingredient, determine if it IS or CONTAINS any of the user's allergens.
+           Korean ingredient names are common. You must understand Korean food terminology.
+        3. Vague categories like "복합조미식품", "곡류가공품" are CAUTION if they could relate to an allergen.
+        4. Set each product's safetyStatus:
+           - "DANGER" if any ingredient clearly matches an allergen.
+           - "CAUTION" if any ingredient is ambiguous but could contain an allergen.
+           - "SAFE" if no allergens detected.
+        5. coachMessage: a concise Korean coaching message (1 sentence) for that product only.
+
+        Return JSON only.
+        """
+
+ANALYSIS_COMPACT_SUFFIX_TEMPLATE: Final[str] = """
+        **COMPACT OUTPUT (OVERRIDES THE OUTPUT FORMAT ABOVE)**
+        Use these short keys instead of the field names above; content rules are unchanged.
+        - top level: n=foodName, ne=foodName_en, nk=foodName_ko, o=foodOrigin, c=canonicalFoodId,
+          s=safetyStatus, cf=confidence, i=ingredients, r=raw_result, re=raw_result_en, rk=raw_result_ko,
+          t=translationCard (l=language, x=text)
+        - each ingredient: n=name, ne=name_en, nk=name_ko, a=isAllergen{bbox_rule}
+        {ingredient_rule}
+        """
+
+ANALYSIS_BATCH_SUFFIX_TEMPLATE: Final[str] = """
+        **BATCH MODE**
+        You are given {image_count} separate food images, each preceded by its label "Image <n>:" (n = 0..{last_index}).
+        Apply every rule above to each image independently; never mix ingredients between images.
+        Return JSON only: {{"results": [...]}} with exactly one entry per image, `imageIndex` set to <n>,
+        and all other fields exactly as in the single-image output format.
+        """
+
 LABEL_ASSESS_PROMPT_TEMPLATE: Final[str] = """
         You are a strict allergen risk assessor for nutrition-label OCR output.
 
@@ -207,6 +250,33 @@ def build_analysis_prompt(allergy_info: str, iso_current_country: str) -> str:
     )
 
 
+def build_compact_analysis_prompt(
+    allergy_info: str,
+    iso_current_country: str,
+    include_bbox: bool = True,
+    max_ingredients: int = 0,
+) -> str:
+    bbox_rule = ", b=bbox" if include_bbox else " (omit bbox; the COORDINATES rule does not apply)"
+    ingredient_rule = (
+        f"- List at most {max_ingredients} ingredients, most prominent first."
+        if max_ingredients > 0
+        else ""
+    )
+    return build_analysis_prompt(allergy_info, iso_current_country) + _render_prompt(
+        ANALYSIS_COMPACT_SUFFIX_TEMPLATE,
+        bbox_rule=bbox_rule,
+        ingredient_rule=ingredient_rule,
+    )
+
+
+def build_batch_analysis_prompt(allergy_info: str, iso_current_country: str, image_count: int) -> str:
+    return build_analysis_prompt(allergy_info, iso_current_country) + _render_prompt(
+        ANALYSIS_BATCH_SUFFIX_TEMPLATE,
+        image_count=image_count,
+        last_index=image_count - 1,
+    )
+
+
 def build_label_prompt(allergy_info: str, locale: str, iso_current_country: str) -> str:
     return _render_prompt(
         LABEL_PROMPT_TEMPLATE,
@@ -224,6 +294,18 @@ def build_barcode_ingredients_prompt(normalized_allergens: str, ingredients: lis
     )
 
 
+def build_barcode_batch_ingredients_prompt(normalized_allergens: str, products: dict[str, list[str]]) -> str:
+    products_str = "\n".join(
+        f"        {product_id}: [{_format_ingredients_for_prompt(ingredients)}]"
+        for product_id, ingredients in products.items()
+    )
+    return _render_prompt(
+        BARCODE_BATCH_PROMPT_TEMPLATE,
+        normalized_allergens=normalized_allergens,
+        products_str=products_str,
+    )
+
+
 def build_label_assess_prompt(
     normalized_allergens: str,
     ingredients: list[str],
@@ -3,7 +3,13 @@
 import json
 import os
 import re
-from typing import Any, Final
+from typing import Any, Final, NamedTuple
+
+from backend.modules.analyst_core.schemas import (
+    COMPACT_FOOD_KEYS,
+    COMPACT_INGREDIENT_KEYS,
+    COMPACT_TRANSLATION_CARD_KEYS,
+)
 
 DANGEROUS_PATTERNS: Final[list[str]] = [
     r"https?://\S+",
@@ -24,6 +30,8 @@ MARKDOWN_PREFIX: Final[str] = "```"
 DANGEROUS_REPLACEMENT: Final[str] = "[링크 제거됨]"
 BLOCKLIST_REPLACEMENT: Final[str] = "[내용 필터링됨]"
 FALLBACK_PARSE_ERROR_MESSAGE: Final[str] = "AI 응답을 처리할 수 없습니다. 다시 시도해주세요."
+TRUNCATED_KEY: Final[str] = "_truncated"
+SALVAGE_REQUIRED_KEYS: Final[tuple[str, ...]] = ("foodName", "safetyStatus", "ingredients", "raw_result")
 PARSE_DEBUG_ENV_KEY: Final[str] = "FOODLENS_PARSE_DEBUG"
 DANGEROUS_REGEX = re.compile("|".join(DANGEROUS_PATTERNS), re.IGNORECASE | re.DOTALL)
 BLOCKLIST_REGEX = re.compile("|".join(BLOCKLIST_PATTERNS), re.IGNORECASE)
@@ -86,6 +94,188 @@ def _try_brace_recovery(text: str) -> dict[str, Any] | None:
     return None
 
 
+class StreamEvent(NamedTuple):
+    kind: str  # "field" (top-level field complete) or "item" (element of a top-level array complete)
+    key: str
+    value: Any
+    index: int | None = None
+
+
+class IncrementalJsonParser:
+    """
+    Chunk-fed parser for a model's top-level JSON object (Gemini structured output).
+
+    feed() scans only the new characters and returns StreamEvents for top-level
+    fields and top-level array elements that completed in that chunk. Anything
+    before the first "{" (e.g. a markdown fence) is skipped. If the stream stops
+    early (max_output_tokens), salvage() still returns every completed field plus
+    the completed elements of an unfinished array.
+    """
+
+    _WHITESPACE = " \t\r\n"
+
+    def __init__(self) -> None:
+        self.text = ""
+        self.fields: dict[str, Any] = {}
+        self.complete = False
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._state = "start"  # start -> key -> colon -> value -> in_value -> after_value -> ... -> done
+        self._key: str | None = None
+        self._value_start = -1
+        self._array_key: str | None = None
+        self._array_items: list[Any] = []
+        self._element_start = -1
+
+    def feed(self, chunk: str) -> list[StreamEvent]:
+        self.text += chunk
+        events: list[StreamEvent] = []
+        text = self.text
+        for index in range(self._pos, len(text)):
+            self._step(text, index, events)
+        self._pos = len(text)
+        return events
+
+    def salvage(self) -> dict[str, Any]:
+        """Completed fields, plus the completed elements of an array cut off mid-way."""
+        result = dict(self.fields)
+        if self._array_key is not None and self._array_key not in result:
+            result[self._array_key] = list(self._array_items)
+        return result
+
+    def _step(self, text: str, index: int, events: list[StreamEvent]) -> None:
+        char = text[index]
+        if self._in_string:
+            if self._escape:
+                self._escape = False
+            elif char == "\\":
+                self._escape = True
+            elif char == '"':
+                self._in_string = False
+                self._on_string_end(text, index, events)
+            return
+        if self._state == "done":
+            return
+        if self._state == "start":
+            if char == "{":
+                self._depth = 1
+                self._state = "key"
+            return
+        if char in self._WHITESPACE:
+            return
+        if char == '"':
+            self._on_string_start(index)
+            return
+        if self._depth == 1:
+            self._step_top_level(text, index, char, events)
+            return
+
+        in_array = self._array_key is not None and self._depth == 2
+        if char in "{[":
+            if in_array and self._element_start < 0:
+                self._element_start = index
+            self._depth += 1
+        elif char in "}]":
+            if in_array and self._element_start >= 0:
+                # Scalar element terminated by the closing bracket.
+                self._complete_element(text[self._element_start:index], events)
+            self._depth -= 1
+            if self._depth == 1:
+                self._complete_field(text[self._value_start:index + 1], events)
+                self._array_key = None
+                self._state = "after_value"
+            elif self._depth == 2 and self._array_key is not None:
+                self._complete_element(text[self._element_start:index + 1], events)
+        elif char == ",":
+            if in_array and self._element_start >= 0:
+                self._complete_element(text[self._element_start:index], events)
+        elif in_array and self._element_start < 0:
+            self._element_start = index
+
+    def _step_top_level(self, text: str, index: int, char: str, events: list[StreamEvent]) -> None:
+        if self._state == "colon":
+            if char == ":":
+                self._state = "value"
+        elif self._state == "value":
+            self._value_start = index
+            self._state = "in_value"
+            if char in "{[":
+                self._depth = 2
+                if char == "[":
+                    self._array_key = self._key
+                    self._array_items = []
+                    self._element_start = -1
+        elif self._state == "in_value":
+            # Scalar (number / true / false / null) ends at the next separator.
+            if char in ",}":
+                self._complete_field(text[self._value_start:index], events)
+                self._state = "key"
+                if char == "}":
+                    self._finish()
+        elif char == "}":
+            self._finish()
+        elif char == ",":
+            self._state = "key"
+
+    def _on_string_start(self, index: int) -> None:
+        self._in_string = True
+        if self._depth == 1 and self._state in ("key", "value"):
+            self._value_start = index
+            if self._state == "value":
+                self._state = "in_value"
+        elif self._depth == 2 and self._array_key is not None and self._element_start < 0:
+            self._element_start = index
+
+    def _on_string_end(self, text: str, index: int, events: list[StreamEvent]) -> None:
+        if self._depth == 1 and self._state == "key":
+            self._key = json.loads(text[self._value_start:index + 1])
+            self._state = "colon"
+        elif self._depth == 1 and self._state == "in_value":
+            self._complete_field(text[self._value_start:index + 1], events)
+            self._state = "after_value"
+        elif self._depth == 2 and self._array_key is not None and self._element_start >= 0 and text[self._element_start] == '"':
+            self._complete_element(text[self._element_start:index + 1], events)
+
+    def _complete_field(self, raw: str, events: list[StreamEvent]) -> None:
+        try:
+            value = json.loads(raw)
+        except json.JSONDecodeError:
+            return
+        if self._key is not None and self._key not in self.fields:
+            self.fields[self._key] = value
+            events.append(StreamEvent("field", self._key, value))
+
+    def _complete_element(self, raw: str, events: list[StreamEvent]) -> None:
+        self._element_start = -1
+        try:
+            value = json.loads(raw)
+        except json.JSONDecodeError:
+            return
+        self._array_items.append(value)
+        events.append(StreamEvent("item", self._array_key, value, len(self._array_items) - 1))
+
+    def _finish(self) -> None:
+        self.complete = True
+        self._state = "done"
+
+
+def _try_truncation_salvage(text: str) -> dict[str, Any] | None:
+    parser = IncrementalJsonParser()
+    parser.feed(text)
+    salvaged = parser.salvage()
+    if parser.complete or not salvaged:
+        return None
+    _debug_log(f"[PARSE DEBUG] ✓ Truncation salvage recovered fields: {sorted(salvaged)}")
+    # Required fields the model never reached take their conservative fallback values.
+    fallback = get_safe_fallback_response(FALLBACK_PARSE_ERROR_MESSAGE)
+    for key in SALVAGE_REQUIRED_KEYS:
+        salvaged.setdefault(key, fallback[key])
+    salvaged[TRUNCATED_KEY] = True
+    return salvaged
+
+
 def _sanitize_text(text: str, max_length: int = MAX_TEXT_LENGTH) -> str:
     if not text or not isinstance(text, str):
         return text
@@ -141,12 +331,39 @@ def parse_ai_response(response_text: str) -> dict[str, Any]:
     if result is not None:
         return result
 
+    result = _try_truncation_salvage(text)
+    if result is not None:
+        return result
+
     _debug_log("[PARSE DEBUG] ✗✗ ALL PARSING ATTEMPTS FAILED")
     _debug_log(f"[PARSE DEBUG] Full raw response:\n{response_text}")
     _debug_log(f"{PARSE_DEBUG_DIVIDER}\n")
     return get_safe_fallback_response(FALLBACK_PARSE_ERROR_MESSAGE)
 
 
+def _expand_keys(data: dict[str, Any], mapping: dict[str, str]) -> dict[str, Any]:
+    # Unknown keys pass through; a short key wins over a long-name fallback default
+    # (truncation salvage fills foodName/safetyStatus/... when the model never reached them).
+    expanded = {key: value for key, value in data.items() if key not in mapping}
+    expanded.update({mapping[key]: value for key, value in data.items() if key in mapping})
+    return expanded
+
+
+def expand_compact_food_response(result: dict[str, Any]) -> dict[str, Any]:
+    """Map a compact-mode food response (short keys) back to the contract field names."""
+    expanded = _expand_keys(result, COMPACT_FOOD_KEYS)
+    ingredients = expanded.get("ingredients")
+    if isinstance(ingredients, list):
+        expanded["ingredients"] = [
+            _expand_keys(item, COMPACT_INGREDIENT_KEYS) if isinstance(item, dict) else item
+            for item in ingredients
+        ]
+    card = expanded.get("translationCard")
+    if isinstance(card, dict):
+        expanded["translationCard"] = _expand_keys(card, COMPACT_TRANSLATION_CARD_KEYS)
+    return expanded
+
+
 def strip_box2d(result: dict[str, Any]) -> dict[str, Any]:
     if "ingredients" in result and isinstance(result["ingredients"], list):
         for ingredient in result["ingredients"]:
@@ -104,6 +104,108 @@ def build_food_response_schema() -> SchemaDict:
     )
 
 
+# Streamed /analyze output: what the user sees first (name, verdict) is generated first,
+# the ingredient list next, long free-text fields last.
+FOOD_STREAM_PROPERTY_ORDER: Final[list[str]] = [
+    "foodName",
+    "foodName_en",
+    "foodName_ko",
+    "foodOrigin",
+    "canonicalFoodId",
+    "safetyStatus",
+    "confidence",
+    "ingredients",
+    "raw_result",
+    "raw_result_en",
+    "raw_result_ko",
+    "translationCard",
+]
+
+
+def build_food_stream_response_schema() -> SchemaDict:
+    schema = build_food_response_schema()
+    schema["property_ordering"] = list(FOOD_STREAM_PROPERTY_ORDER)
+    return schema
+
+
+# Compact wire format for food analysis: short key -> contract key.
+COMPACT_FOOD_KEYS: Final[dict[str, str]] = {
+    "n": "foodName",
+    "ne": "foodName_en",
+    "nk": "foodName_ko",
+    "o": "foodOrigin",
+    "c": "canonicalFoodId",
+    "s": "safetyStatus",
+    "cf": "confidence",
+    "i": "ingredients",
+    "r": "raw_result",
+    "re": "raw_result_en",
+    "rk": "raw_result_ko",
+    "t": "translationCard",
+}
+COMPACT_INGREDIENT_KEYS: Final[dict[str, str]] = {
+    "n": "name",
+    "ne": "name_en",
+    "nk": "name_ko",
+    "b": "bbox",
+    "a": "isAllergen",
+}
+COMPACT_TRANSLATION_CARD_KEYS: Final[dict[str, str]] = {
+    "l": "language",
+    "x": "text",
+    "q": "audio_query",
+}
+
+
+def build_compact_food_response_schema(include_bbox: bool = True, max_ingredients: int = 0) -> SchemaDict:
+    ingredient_properties: SchemaDict = {
+        "n": {"type": "STRING"},
+        "ne": {"type": "STRING"},
+        "nk": {"type": "STRING"},
+        "a": {"type": "BOOLEAN"},
+    }
+    ingredient_required = ["n", "a"]
+    if include_bbox:
+        ingredient_properties["b"] = {"type": "ARRAY", "items": {"type": "INTEGER"}}
+        ingredient_required.append("b")
+    ingredients = _build_array_schema(_build_object_schema(ingredient_properties, ingredient_required))
+    if max_ingredients > 0:
+        ingredients["max_items"] = max_ingredients
+    return _build_object_schema(
+        properties={
+            "n": {"type": "STRING"},
+            "ne": {"type": "STRING"},
+            "nk": {"type": "STRING"},
+            "o": {"type": "STRING"},
+            "c": {"type": "STRING"},
+            "s": {"type": "STRING", "enum": SAFETY_STATUS_ENUM},
+            "cf": {"type": "INTEGER"},
+            "i": ingredients,
+            "t": _build_object_schema(
+                properties={
+                    "l": {"type": "STRING"},
+                    "x": {"type": "STRING"},
+                    "q": {"type": "STRING"},
+                },
+            ),
+            "r": {"type": "STRING"},
+            "re": {"type": "STRING"},
+            "rk": {"type": "STRING"},
+        },
+        required=["n", "i", "s"],
+    )
+
+
+def build_food_batch_response_schema() -> SchemaDict:
+    item_schema = build_food_response_schema()
+    item_schema["properties"] = {"imageIndex": {"type": "INTEGER"}, **item_schema["properties"]}
+    item_schema["required"] = ["imageIndex", *item_schema["required"]]
+    return _build_object_schema(
+        properties={"results": _build_array_schema(item_schema)},
+        required=["results"],
+    )
+
+
 def build_barcode_allergen_schema() -> SchemaDict:
     return _build_object_schema(
         properties={
@@ -113,3 +215,22 @@ def build_barcode_allergen_schema() -> SchemaDict:
         },
         required=["safetyStatus", "ingredients", "coachMessage"],
     )
+
+
+def build_barcode_batch_allergen_schema() -> SchemaDict:
+    return _build_object_schema(
+        properties={
+            "products": _build_array_schema(
+                _build_object_schema(
+                    properties={
+                        "id": {"type": "STRING"},
+                        "safetyStatus": {"type": "STRING", "enum": SAFETY_STATUS_ENUM},
+                        "coachMessage": {"type": "STRING"},
+                        "ingredients": _build_array_schema(_build_allergen_ingredient_item_schema()),
+                    },
+                    required=["id", "safetyStatus", "ingredients", "coachMessage"],
+                )
+            ),
+        },
+        required=["products"],
+    )
@@ -1,5 +1,6 @@
 import os
 import atexit
+import contextvars
 import threading
 import time
 from google.api_core.exceptions import ResourceExhausted
@@ -9,19 +10,29 @@ from PIL import Image
 import json
 import io
 import tempfile
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Iterator
+from backend.modules.analyst_core.allergen_matcher import AllergenScreeningResult, screen_ingredients
 from backend.modules.analyst_core.allergen_utils import (
     format_allergens_for_prompt,
+    normalize_allergens,
 )
-from backend.modules.analyst_core.postprocess import enrich_with_nutrition
+from backend.modules.analyst_core.postprocess import NutritionLookup, SharedNutritionLookup, enrich_with_nutrition
 from backend.modules.analyst_core.prompts import (
+    BARCODE_BATCH_PRODUCTS_PER_REQUEST,
     LABEL_2PASS_PROMPT_VERSION,
     LABEL_PROMPT_VERSION,
     build_analysis_prompt,
+    build_barcode_batch_ingredients_prompt,
+    build_batch_analysis_prompt,
+    build_compact_analysis_prompt,
     build_barcode_ingredients_prompt,
     build_label_assess_prompt,
     build_label_prompt,
 )
 from backend.modules.analyst_core.response_utils import (
+    IncrementalJsonParser,
+    expand_compact_food_response,
     get_safe_fallback_response,
     parse_ai_response,
     sanitize_response,
@@ -29,15 +40,27 @@ from backend.modules.analyst_core.response_utils import (
 )
 from backend.modules.analyst_core.schemas import (
     build_barcode_allergen_schema,
+    build_barcode_batch_allergen_schema,
+    build_compact_food_response_schema,
+    build_food_batch_response_schema,
     build_food_response_schema,
+    build_food_stream_response_schema,
     build_label_response_schema,
 )
 from backend.modules.analyst_runtime.generation import (
+    MIN_GENERATION_BUDGET_SECONDS,
     generate_with_429_backoff,
     generate_with_retry_and_fallback,
     generate_with_semaphore,
+    is_max_tokens_truncated,
+    output_token_count,
+    stream_with_semaphore,
 )
+from backend.modules.analyst_runtime.token_budget import DEFAULT_CEILING_TOKENS, AdaptiveTokenBudget
 from backend.modules.analyst_runtime.safety import build_default_safety_settings
+from backend.modules.barcode.allergen_cache import ANALYSIS_FAILED_KEY
+from backend.modules.quality.label_region import crop_to_label_region
+from backend.modules.request_deadline import DeadlineExceeded, has_budget
 import traceback
 
 class FoodAnalyst:
@@ -47,6 +70,9 @@ class FoodAnalyst:
     # Concurrency control: limit simultaneous Vertex AI requests
     # Prevents thundering herd on 429 recovery
     _request_semaphore = threading.Semaphore(3)  # Max 3 concurrent requests
+
+    # Shared by every /analyze/stream request for per-ingredient nutrition lookups
+    _nutrition_lookup_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix="nutrition")
     
     # Retry tracking for operational monitoring
     _retry_stats = {"total_retries": 0, "last_429_time": None}
@@ -79,10 +105,25 @@ class FoodAnalyst:
             import traceback
             traceback.print_exc()
 
+    # Food analysis output settings (overridden from env in __init__).
+    food_compact_response_enabled = False
+    food_compact_include_bbox = True
+    food_max_ingredients = 0
+    food_token_budget: AdaptiveTokenBudget | None = None
+
     def __init__(self):
         self._configure_vertex_ai()
         self.model_name = os.getenv("GEMINI_MODEL_NAME", "gemini-2.0-flash")
         self.label_model_name = os.getenv("GEMINI_LABEL_MODEL_NAME") or "gemini-2.5-pro"
+        self.label_autocrop_enabled = os.getenv("LABEL_AUTOCROP_ENABLED", "0").strip() == "1"
+        self.food_compact_response_enabled = os.getenv("FOOD_COMPACT_RESPONSE_ENABLED", "0").strip() == "1"
+        self.food_compact_include_bbox = os.getenv("FOOD_COMPACT_INCLUDE_BBOX", "1").strip() == "1"
+        try:
+            self.food_max_ingredients = max(0, int(os.getenv("FOOD_MAX_INGREDIENTS", "0")))
+        except ValueError:
+            self.food_max_ingredients = 0
+        if os.getenv("FOOD_ADAPTIVE_TOKEN_BUDGET_ENABLED", "0").strip() == "1":
+            self.food_token_budget = AdaptiveTokenBudget.from_env()
         
         # [DEBUG] Log model initialization details
         print(f"[Model Debug] GEMINI_MODEL_NAME env: {os.getenv('GEMINI_MODEL_NAME')}")
@@ -190,8 +231,26 @@ class FoodAnalyst:
     def _strip_box2d(self, result: dict) -> dict:
         return strip_box2d(result)
 
-    def _enrich_with_nutrition(self, result: dict) -> dict:
-        return enrich_with_nutrition(result)
+    def _enrich_with_nutrition(self, result: dict, lookup: NutritionLookup | None = None) -> dict:
+        return enrich_with_nutrition(result, lookup)
+
+    def finalize_food_result(self, result: dict, nutrition_lookup: NutritionLookup | None = None) -> dict:
+        """Nutrition enrichment + app-level content filter + model tag for one parsed food result."""
+        result = self._enrich_with_nutrition(result, nutrition_lookup)
+        result = self._sanitize_response(result)  # P2: App-level content filter
+        # Attach model info for debugging/verification
+        result["used_model"] = self.model_name
+        return result
+
+    @staticmethod
+    def _food_error_user_message(error_msg: str) -> str:
+        # Determine user-friendly message (hide internal details)
+        if "429" in error_msg or "Resource exhausted" in error_msg or "Quota" in error_msg:
+            # UX: Include specific retry time guidance
+            return "서버가 바쁩니다. 15~30초 후 다시 시도해주세요."
+        if "timeout" in error_msg.lower():
+            return "분석 시간이 초과되었습니다. 다시 시도해주세요."
+        return "이미지 분석 중 오류가 발생했습니다. 다시 시도해주세요."
 
     def _sanitize_response(self, result: dict) -> dict:
         return sanitize_response(result)
@@ -216,9 +275,11 @@ class FoodAnalyst:
         iso_current_country: str = "US",
         locale: str | None = None,
         assess_enabled: bool = True,
+        autocrop: bool = True,
     ):
         """
         Analyzes a nutrition label image using OCR and extracts nutritional info.
+        Pass autocrop=False when the caller already cropped to the label region.
         """
         normalized_allergens = format_allergens_for_prompt(allergy_info)
         normalized_locale = (locale or "en-US").strip() or "en-US"
@@ -242,6 +303,18 @@ class FoodAnalyst:
         safety_settings = build_default_safety_settings()
 
         try:
+            crop_elapsed_ms = 0
+            if self.label_autocrop_enabled and autocrop:
+                # Ship only the detected label region; falls back to the full frame when unsure.
+                crop_started_at = time.perf_counter()
+                original_size = label_image.size
+                label_image, label_region = crop_to_label_region(label_image)
+                crop_elapsed_ms = int((time.perf_counter() - crop_started_at) * 1000)
+                print(
+                    f"[Label Crop] region={label_region.box if label_region else None} "
+                    f"size={original_size}->{label_image.size} elapsed_ms={crop_elapsed_ms}"
+                )
+
             vertex_image = self._prepare_vertex_image(label_image)
 
             # Label analysis model is configurable via GEMINI_LABEL_MODEL_NAME.
@@ -269,25 +342,37 @@ class FoodAnalyst:
                 if isinstance(item, dict) and str(item.get("name", "")).strip()
             ]
 
+            if ingredient_names and assess_enabled and not has_budget(MIN_GENERATION_BUDGET_SECONDS):
+                # Same degraded result as a disabled assess pass, rather than a late one.
+                print("[Label Assess] Skipped: request deadline too close.")
+                assess_enabled = False
+
             if ingredient_names and assess_enabled:
                 assess_started_at = time.perf_counter()
                 try:
-                    assess_prompt = self._build_label_assess_prompt(
-                        normalized_allergens,
-                        ingredient_names,
-                        normalized_locale,
-                        iso_current_country,
-                    )
-                    assess_response = generate_with_429_backoff(
-                        model=model,
-                        contents=[assess_prompt],
-                        generation_config=assess_generation_config,
-                        safety_settings=safety_settings,
-                        semaphore=FoodAnalyst._request_semaphore,
-                        max_attempts=3,
-                    )
-                    assess_result = self._parse_ai_response(assess_response.text)
-                    assess_result = self._sanitize_response(assess_result)
+                    screening = screen_ingredients(ingredient_names, normalize_allergens(allergy_info))
+                    ambiguous_names = screening.ambiguous_names
+                    if ambiguous_names:
+                        assess_prompt = self._build_label_assess_prompt(
+                            normalized_allergens,
+                            ambiguous_names,
+                            normalized_locale,
+                            iso_current_country,
+                        )
+                        assess_response = generate_with_429_backoff(
+                            model=model,
+                            contents=[assess_prompt],
+                            generation_config=assess_generation_config,
+                            safety_settings=safety_settings,
+                            semaphore=FoodAnalyst._request_semaphore,
+                            max_attempts=3,
+                        )
+                        model_assess_result = self._parse_ai_response(assess_response.text)
+                        model_assess_result = self._sanitize_response(model_assess_result)
+                        assess_result = screening.merge_model_assessment(model_assess_result)
+                    else:
+                        print(f"[Label Assess] Local screening resolved {len(ingredient_names)} ingredients, skipping Gemini.")
+                        assess_result = screening.to_assessment()
 
                     assess_ingredients = assess_result.get("ingredients", [])
                     assess_map = {}
@@ -344,6 +429,7 @@ class FoodAnalyst:
             result["used_model"] = self.label_model_name
             result["prompt_version"] = LABEL_2PASS_PROMPT_VERSION
             result["_label_timings"] = {
+                "crop_ms": crop_elapsed_ms,
                 "extract_ms": extract_elapsed_ms,
                 "assess_ms": assess_elapsed_ms,
             }
@@ -353,6 +439,8 @@ class FoodAnalyst:
             
             return result
             
+        except DeadlineExceeded:
+            raise
         except ResourceExhausted as e:
             print(f"[Label OCR Error] {e}")
             traceback.print_exc()
@@ -387,17 +475,34 @@ class FoodAnalyst:
         """
         # Normalize allergen input for consistent AI judgment
         normalized_allergens = format_allergens_for_prompt(allergy_info)
-        prompt = self._build_analysis_prompt(normalized_allergens, iso_current_country)
-        
-        # Define Schema for Structured Output (Strict Mode)
-        response_schema = build_food_response_schema()
+        compact = self.food_compact_response_enabled
+        if compact:
+            # Short keys on the wire; expanded back to contract names after parsing.
+            prompt = build_compact_analysis_prompt(
+                normalized_allergens,
+                iso_current_country,
+                include_bbox=self.food_compact_include_bbox,
+                max_ingredients=self.food_max_ingredients,
+            )
+            response_schema = build_compact_food_response_schema(
+                include_bbox=self.food_compact_include_bbox,
+                max_ingredients=self.food_max_ingredients,
+            )
+        else:
+            prompt = self._build_analysis_prompt(normalized_allergens, iso_current_country)
+            # Define Schema for Structured Output (Strict Mode)
+            response_schema = build_food_response_schema()
+
+        budget = self.food_token_budget
+        ceiling = budget.ceiling if budget is not None else DEFAULT_CEILING_TOKENS
+        max_output_tokens = budget.current() if budget is not None else ceiling
 
         # Configure generation and safety
         generation_config = {
             "temperature": 0.2,
             "top_p": 0.95,
             "top_k": 40,
-            "max_output_tokens": 4096,
+            "max_output_tokens": max_output_tokens,
             "response_mime_type": "application/json",
             "response_schema": response_schema,
         }
@@ -409,6 +514,7 @@ class FoodAnalyst:
 
         try:
             vertex_image = self._prepare_vertex_image(food_image)
+            started_at = time.perf_counter()
             response = generate_with_retry_and_fallback(
                 primary_model=self.model,
                 primary_model_name=self.model_name,
@@ -419,43 +525,218 @@ class FoodAnalyst:
                 semaphore=FoodAnalyst._request_semaphore,
                 retry_stats=FoodAnalyst._retry_stats,
             )
-            
-
+            truncated = is_max_tokens_truncated(response)
+            retried = False
+            if truncated and max_output_tokens < ceiling and has_budget(MIN_GENERATION_BUDGET_SECONDS):
+                # Only a cut-off response pays for a second call, at the full budget.
+                print(f"[Internal Log] Output truncated at {max_output_tokens} tokens, retrying at {ceiling}.")
+                retried = True
+                response = generate_with_retry_and_fallback(
+                    primary_model=self.model,
+                    primary_model_name=self.model_name,
+                    fallback_model_name="gemini-2.0-flash",
+                    contents=[prompt, vertex_image],
+                    generation_config={**generation_config, "max_output_tokens": ceiling},
+                    safety_settings=safety_settings,
+                    semaphore=FoodAnalyst._request_semaphore,
+                    retry_stats=FoodAnalyst._retry_stats,
+                )
+                truncated = is_max_tokens_truncated(response)
+            output_tokens = output_token_count(response)
+            if budget is not None and not truncated:
+                budget.observe(output_tokens)
+            generation_stats = {
+                "compact": compact,
+                "max_output_tokens": ceiling if retried else max_output_tokens,
+                "output_tokens": output_tokens,
+                "latency_ms": int((time.perf_counter() - started_at) * 1000),
+                "retried": retried,
+                "truncated": truncated,
+            }
             print(f"[Internal Log] Finish Reason: {response.candidates[0].finish_reason}")
+            print(f"[Internal Log] Generation stats: {generation_stats}")
             result = self._parse_ai_response(response.text)
+            if compact:
+                result = expand_compact_food_response(result)
             # result = self._strip_box2d(result)  # ENABLED: Keep bbox data from v3.0 prompt
             print(f"AI Response JSON: {json.dumps(result, indent=2)}")  # Debug log
             
-            result = self._enrich_with_nutrition(result)
-            result = self._sanitize_response(result)  # P2: App-level content filter
-            
-            # Attach model info for debugging/verification
-            result["used_model"] = self.model_name
-            
+            result = self.finalize_food_result(result)
+            result["_generation_stats"] = generation_stats
             return result
             
+        except DeadlineExceeded:
+            raise
         except Exception as e:
             # Log internal error (NOT exposed to user)
             error_msg = str(e)
             print(f"[Internal Log] Analysis error: {error_msg}")
             print(f"[Internal Log] Retry stats: {FoodAnalyst._retry_stats}")
             
-            # Determine user-friendly message (hide internal details)
-            if "429" in error_msg or "Resource exhausted" in error_msg or "Quota" in error_msg:
-                # UX: Include specific retry time guidance
-                user_msg = "서버가 바쁩니다. 15~30초 후 다시 시도해주세요."
-            elif "timeout" in error_msg.lower():
-                user_msg = "분석 시간이 초과되었습니다. 다시 시도해주세요."
-            else:
-                user_msg = "이미지 분석 중 오류가 발생했습니다. 다시 시도해주세요."
-            
             # Return unified fallback schema (reuse existing method)
-            return self._get_safe_fallback_response(user_msg)
+            return self._get_safe_fallback_response(self._food_error_user_message(error_msg))
+
+    def analyze_food_stream(
+        self,
+        food_image: Image.Image,
+        allergy_info: str = "None",
+        iso_current_country: str = "US",
+    ) -> Iterator[dict]:
+        """
+        Streaming variant of analyze_food_json. Yields {"event", "data"} dicts:
+
+        - summary: foodName / safetyStatus (+ names, origin) as soon as they are parsed
+        - ingredient: each ingredient ({"index", ...}) as soon as it is complete
+        - nutrition: per-ingredient nutrition ({"index", "name", "nutrition"}) as lookups resolve
+        - totals: the dish-level nutrition block
+        - final: the same result analyze_food_json would return
+
+        Lookups start while the model is still streaming, and the final enrichment
+        reuses them, so the model call and its cost are unchanged.
+        """
+        normalized_allergens = format_allergens_for_prompt(allergy_info)
+        prompt = self._build_analysis_prompt(normalized_allergens, iso_current_country)
+        generation_config = {
+            "temperature": 0.2,
+            "top_p": 0.95,
+            "top_k": 40,
+            "max_output_tokens": 4096,
+            "response_mime_type": "application/json",
+            "response_schema": build_food_stream_response_schema(),
+        }
+        parser = IncrementalJsonParser()
+        nutrition_lookup = SharedNutritionLookup()
+        pending: dict = {}
+        summary_sent = False
+        streamed_anything = False
+
+        lookups = FoodAnalyst._nutrition_lookup_pool
+        try:
+            try:
+                vertex_image = self._prepare_vertex_image(food_image)
+                for chunk in stream_with_semaphore(
+                    model=self.model,
+                    contents=[prompt, vertex_image],
+                    generation_config=generation_config,
+                    safety_settings=build_default_safety_settings(),
+                    semaphore=FoodAnalyst._request_semaphore,
+                ):
+                    for event in parser.feed(chunk):
+                        if event.kind == "item" and event.key == "ingredients":
+                            index, ingredient = event.index, event.value
+                            if not isinstance(ingredient, dict):
+                                continue
+                            streamed_anything = True
+                            yield {"event": "ingredient", "data": {"index": index, **ingredient}}
+                            name = str(ingredient.get("name", "")).strip()
+                            if name:
+                                origin = parser.fields.get("foodOrigin", "unknown")
+                                # copy_context: lookups see this request's deadline.
+                                future = lookups.submit(contextvars.copy_context().run, nutrition_lookup, name, origin)
+                                pending[future] = (index, name)
+                    if not summary_sent and {"foodName", "safetyStatus"} <= parser.fields.keys():
+                        summary_sent = streamed_anything = True
+                        yield {
+                            "event": "summary",
+                            "data": {
+                                key: parser.fields[key]
+                                for key in ("foodName", "foodName_en", "foodName_ko", "foodOrigin", "safetyStatus", "confidence")
+                                if key in parser.fields
+                            },
+                        }
+                result = self._parse_ai_response(parser.text)
+            except Exception as e:
+                error_msg = str(e)
+                print(f"[Internal Log] Streaming analysis error: {error_msg}")
+                if not streamed_anything:
+                    # Nothing reached the client yet: take the regular path (retry + model fallback).
+                    yield {"event": "final", "data": self.analyze_food_json(food_image, allergy_info, iso_current_country)}
+                    return
+                yield {"event": "final", "data": self._get_safe_fallback_response(self._food_error_user_message(error_msg))}
+                return
+
+            for future in as_completed(pending):
+                index, name = pending[future]
+                try:
+                    nutrition = future.result()
+                except Exception as e:
+                    print(f"  ↳ {name}: nutrition lookup failed ({e})")
+                    continue
+                if nutrition and nutrition.get("calories") is not None:
+                    yield {"event": "nutrition", "data": {"index": index, "name": name, "nutrition": nutrition}}
+        finally:
+            # Client disconnects close this generator; don't keep queued lookups running.
+            for future in pending:
+                future.cancel()
+
+        result = self.finalize_food_result(result, nutrition_lookup)
+        if result.get("nutrition"):
+            yield {"event": "totals", "data": result["nutrition"]}
+        yield {"event": "final", "data": result}
+
+    def generate_food_batch_json(
+        self,
+        jpeg_images: list[bytes],
+        allergy_info: str = "None",
+        iso_current_country: str = "US",
+        max_output_tokens: int = 8192,
+    ) -> list[dict]:
+        """
+        Analyze several food photos in ONE Gemini request (shared prompt, per-image
+        result array). Returns parsed results in input order, NOT yet enriched; pass
+        each through finalize_food_result. Images missing from the response (or every
+        image, if the call fails) get the usual safe fallback.
+        """
+        normalized_allergens = format_allergens_for_prompt(allergy_info)
+        prompt = build_batch_analysis_prompt(normalized_allergens, iso_current_country, len(jpeg_images))
+        contents: list = [prompt]
+        for index, jpeg in enumerate(jpeg_images):
+            contents.extend([f"Image {index}:", VertexImage.from_bytes(jpeg)])
+
+        generation_config = {
+            "temperature": 0.2,
+            "top_p": 0.95,
+            "top_k": 40,
+            "max_output_tokens": max_output_tokens,
+            "response_mime_type": "application/json",
+            "response_schema": build_food_batch_response_schema(),
+        }
+        try:
+            response = generate_with_retry_and_fallback(
+                primary_model=self.model,
+                primary_model_name=self.model_name,
+                fallback_model_name="gemini-2.0-flash",
+                contents=contents,
+                generation_config=generation_config,
+                safety_settings=build_default_safety_settings(),
+                semaphore=FoodAnalyst._request_semaphore,
+                retry_stats=FoodAnalyst._retry_stats,
+            )
+            print(f"[Internal Log] Batch of {len(jpeg_images)} finish reason: {response.candidates[0].finish_reason}")
+            parsed = self._parse_ai_response(response.text)
+            by_index = {}
+            for item in parsed.get("results", []):
+                if isinstance(item, dict) and isinstance(item.get("imageIndex"), int):
+                    by_index.setdefault(item.pop("imageIndex"), item)
+            user_msg = self._food_error_user_message("")
+        except Exception as e:
+            error_msg = str(e)
+            print(f"[Internal Log] Batch analysis error: {error_msg}")
+            print(f"[Internal Log] Retry stats: {FoodAnalyst._retry_stats}")
+            by_index = {}
+            user_msg = self._food_error_user_message(error_msg)
+
+        return [
+            by_index[index] if index in by_index else self._get_safe_fallback_response(user_msg)
+            for index in range(len(jpeg_images))
+        ]
 
     def analyze_barcode_ingredients(self, ingredients: list, allergy_info: str = "None") -> dict:
         """
         Analyzes a list of ingredient names (from barcode API) against the user's
-        allergy profile using Gemini. Text-only call (no image).
+        allergy profile. Trivially decidable ingredients are screened locally;
+        Gemini (text-only call) judges only the ambiguous remainder and is skipped
+        entirely when nothing is ambiguous.
         
         Returns:
             {
@@ -479,7 +760,18 @@ class FoodAnalyst:
                 ]
             }
         
-        prompt = build_barcode_ingredients_prompt(normalized_allergens, ingredients)
+        # Decide trivially matchable ingredients locally; only the ambiguous remainder goes to Gemini.
+        screening = screen_ingredients(ingredients, normalize_allergens(allergy_info))
+        ambiguous_names = screening.ambiguous_names
+        if not ambiguous_names:
+            result = screening.to_assessment()
+            print(
+                f"[Allergen Analysis] Local screening resolved {len(screening.items)} ingredients "
+                f"(hits={len(screening.hits)}), skipping Gemini."
+            )
+            return result
+
+        prompt = build_barcode_ingredients_prompt(normalized_allergens, ambiguous_names)
 
         response_schema = build_barcode_allergen_schema()
 
@@ -492,7 +784,10 @@ class FoodAnalyst:
         safety_settings = build_default_safety_settings()
 
         try:
-            print(f"\n[Allergen Analysis] Analyzing {len(ingredients)} ingredients against: {normalized_allergens}")
+            print(
+                f"\n[Allergen Analysis] Analyzing {len(ambiguous_names)}/{len(screening.items)} ambiguous ingredients "
+                f"against: {normalized_allergens}"
+            )
             
             response = generate_with_semaphore(
                 model=self.model,
@@ -518,6 +813,7 @@ class FoodAnalyst:
                     seen_names.add(normalized)
                     unique_ingredients.append(ing)
             result["ingredients"] = unique_ingredients
+            result = screening.merge_model_assessment(result)
 
             print(f"[Allergen Analysis] Result: safetyStatus={result.get('safetyStatus')}")
             
@@ -533,21 +829,158 @@ class FoodAnalyst:
         except Exception as e:
             print(f"[Allergen Analysis] Error: {e}")
             traceback.print_exc()
-            # Fail-safe: return CAUTION if analysis fails (don't risk saying SAFE)
-            # Apply deduplication to input ingredients as well
-            unique_input = []
-            seen_input_names = set()
-            for ing in ingredients:
-                normalized = ing.strip().lower()
-                if normalized and normalized not in seen_input_names:
-                    seen_input_names.add(normalized)
-                    unique_input.append(ing.strip())
+            # Fail-safe: return CAUTION if analysis fails (don't risk saying SAFE).
+            # Local hits are still reported, which escalates the status to DANGER.
+            fallback = screening.to_fallback_assessment(
+                "알러지 분석 중 오류가 발생했습니다. 성분표를 직접 확인해주세요."
+            )
+            # Marks the fallback so verdict caches never persist it.
+            fallback[ANALYSIS_FAILED_KEY] = True
+            return fallback
+
+    def analyze_barcode_ingredients_batch(self, products: dict[str, list], allergy_info: str = "None") -> dict[str, dict]:
+        """
+        Batch form of analyze_barcode_ingredients for several products and one profile.
 
+        Each product is screened locally, then assessed by analyze_barcode_screenings_batch.
+        Returns {product_id: assessment} with the same per-product shape (and failure
+        marker) as analyze_barcode_ingredients.
+        """
+        if format_allergens_for_prompt(allergy_info) == "None":
             return {
-                "safetyStatus": "CAUTION",
-                "coachMessage": "알러지 분석 중 오류가 발생했습니다. 성분표를 직접 확인해주세요.",
-                "ingredients": [
-                    {"name": ing, "isAllergen": False, "riskReason": ""} 
-                    for ing in unique_input
-                ]
+                product_id: self.analyze_barcode_ingredients(ingredients, allergy_info)
+                for product_id, ingredients in products.items()
+            }
+
+        profile = normalize_allergens(allergy_info)
+        results: dict[str, dict] = {}
+        screenings: dict[str, AllergenScreeningResult] = {}
+        for product_id, ingredients in products.items():
+            if not ingredients:
+                results[product_id] = self.analyze_barcode_ingredients(ingredients, allergy_info)
+            else:
+                screenings[product_id] = screen_ingredients(ingredients, profile)
+        results.update(self.analyze_barcode_screenings_batch(screenings, allergy_info))
+        return results
+
+    def analyze_barcode_screenings_batch(
+        self, screenings: dict[str, AllergenScreeningResult], allergy_info: str
+    ) -> dict[str, dict]:
+        """
+        Assess products that were already screened against `allergy_info`.
+
+        Products without ambiguous ingredients are decided locally; the ambiguous
+        remainders go to Gemini, BARCODE_BATCH_PRODUCTS_PER_REQUEST products per request.
+        """
+        normalized_allergens = format_allergens_for_prompt(allergy_info)
+        results: dict[str, dict] = {}
+        ambiguous: dict[str, AllergenScreeningResult] = {}
+        for product_id, screening in screenings.items():
+            if screening.ambiguous_names:
+                ambiguous[product_id] = screening
+            else:
+                results[product_id] = screening.to_assessment()
+
+        if not ambiguous:
+            print(f"[Allergen Analysis] Batch of {len(screenings)} resolved locally, skipping Gemini.")
+            return results
+
+        product_ids = list(ambiguous)
+        for start in range(0, len(product_ids), BARCODE_BATCH_PRODUCTS_PER_REQUEST):
+            chunk_ids = product_ids[start:start + BARCODE_BATCH_PRODUCTS_PER_REQUEST]
+            chunk = {product_id: ambiguous[product_id] for product_id in chunk_ids}
+            results.update(self._assess_barcode_screenings(chunk, normalized_allergens))
+        return results
+
+    def _assess_barcode_screenings(
+        self, screenings: dict[str, AllergenScreeningResult], normalized_allergens: str
+    ) -> dict[str, dict]:
+        generation_config = {
+            "temperature": 0.1,
+            "response_mime_type": "application/json",
+            "response_schema": build_barcode_batch_allergen_schema(),
+        }
+        try:
+            print(
+                f"\n[Allergen Analysis] Batch: {len(screenings)} products with ambiguous "
+                f"ingredients in one request against: {normalized_allergens}"
+            )
+            response = generate_with_semaphore(
+                model=self.model,
+                contents=[build_barcode_batch_ingredients_prompt(
+                    normalized_allergens,
+                    {product_id: screening.ambiguous_names for product_id, screening in screenings.items()},
+                )],
+                generation_config=generation_config,
+                safety_settings=build_default_safety_settings(),
+                semaphore=FoodAnalyst._request_semaphore,
+            )
+            # A response cut off mid-array still yields every product it completed.
+            parser = IncrementalJsonParser()
+            parser.feed(response.text)
+            if not parser.complete:
+                print("[Allergen Analysis] Batch response incomplete, keeping the finished products.")
+            model_products = {
+                str(item.get("id", "")).strip(): item
+                for item in parser.salvage().get("products", [])
+                if isinstance(item, dict)
             }
+        except Exception as e:
+            print(f"[Allergen Analysis] Batch Error: {e}")
+            traceback.print_exc()
+            model_products = {}
+
+        results: dict[str, dict] = {}
+        for product_id, screening in screenings.items():
+            model_result = model_products.get(product_id)
+            if model_result is None:
+                # Missing from the response (or the call failed): same fail-safe as the single-product path.
+                fallback = screening.to_fallback_assessment(
+                    "알러지 분석 중 오류가 발생했습니다. 성분표를 직접 확인해주세요."
+                )
+                fallback[ANALYSIS_FAILED_KEY] = True
+                results[product_id] = fallback
+            else:
+                results[product_id] = screening.merge_model_assessment(model_result)
+        return results
+
+        generation_config = {
+            "temperature": 0.1,
+            "response_mime_type": "application/json",
+            "response_schema": build_barcode_batch_allergen_schema(),
+        }
+        try:
+            print(
+                f"\n[Allergen Analysis] Batch: {len(ambiguous_products)}/{len(products)} products with ambiguous "
+                f"ingredients in one request against: {normalized_allergens}"
+            )
+            response = generate_with_semaphore(
+                model=self.model,
+                contents=[build_barcode_batch_ingredients_prompt(normalized_allergens, ambiguous_products)],
+                generation_config=generation_config,
+                safety_settings=build_default_safety_settings(),
+                semaphore=FoodAnalyst._request_semaphore,
+            )
+            parsed = self._parse_ai_response(response.text)
+            model_products = {
+                str(item.get("id", "")).strip(): item
+                for item in parsed.get("products", [])
+                if isinstance(item, dict)
+            }
+        except Exception as e:
+            print(f"[Allergen Analysis] Batch Error: {e}")
+            traceback.print_exc()
+            model_products = None
+
+        for product_id, screening in screenings.items():
+            model_result = model_products.get(product_id) if model_products is not None else None
+            if model_result is None:
+                # Missing from the response (or the call failed): same fail-safe as the single-product path.
+                fallback = screening.to_fallback_assessment(
+                    "알러지 분석 중 오류가 발생했습니다. 성분표를 직접 확인해주세요."
+                )
+                fallback[ANALYSIS_FAILED_KEY] = True
+                results[product_id] = fallback
+            else:
+                results[product_id] = screening.merge_model_assessment(model_result)
+        return results
@@ -0,0 +1,94 @@
+"""Packing + streaming orchestration for multi-image food analysis (/analyze/batch)."""
+import asyncio
+import logging
+import math
+from typing import Any, AsyncIterator, Callable, Final
+
+from backend.modules.runtime_guardrails import ErrorCode
+
+logger = logging.getLogger("foodlens.analyze")
+
+JSONDict = dict[str, Any]
+GenerateBatch = Callable[[list[bytes], int], list[JSONDict]]
+FinalizeResult = Callable[[JSONDict], JSONDict]
+
+DEFAULT_MAX_IMAGES: Final[int] = 10
+# Output budget is the binding limit (image input tokens are small next to the context
+# window): gemini-2.0-flash, also the fallback model, caps output at 8192 tokens, and a
+# single-image result with bboxes stays well under 2048.
+FOOD_BATCH_MAX_OUTPUT_TOKENS: Final[int] = 8192
+FOOD_BATCH_OUTPUT_TOKENS_PER_IMAGE: Final[int] = 2048
+DEFAULT_IMAGES_PER_CALL: Final[int] = FOOD_BATCH_MAX_OUTPUT_TOKENS // FOOD_BATCH_OUTPUT_TOKENS_PER_IMAGE
+
+
+def plan_batch_calls(indices: list[int], images_per_call: int = DEFAULT_IMAGES_PER_CALL) -> list[list[int]]:
+    """Fewest calls that respect `images_per_call`, sized evenly (5 images / 4 per call -> 3 + 2, not 4 + 1)."""
+    if not indices:
+        return []
+    per_call = max(1, images_per_call)
+    calls = math.ceil(len(indices) / per_call)
+    base, extra = divmod(len(indices), calls)
+    plan, start = [], 0
+    for call in range(calls):
+        size = base + (1 if call < extra else 0)
+        plan.append(indices[start:start + size])
+        start += size
+    return plan
+
+
+def output_tokens_for(image_count: int) -> int:
+    return min(FOOD_BATCH_MAX_OUTPUT_TOKENS, FOOD_BATCH_OUTPUT_TOKENS_PER_IMAGE * image_count)
+
+
+async def stream_food_batch(
+    images: dict[int, bytes],
+    *,
+    generate: GenerateBatch,
+    finalize: FinalizeResult,
+    images_per_call: int = DEFAULT_IMAGES_PER_CALL,
+) -> AsyncIterator[JSONDict]:
+    """
+    Analyze `images` (input index -> prepared JPEG) and yield {"index", "result"} per
+    image as soon as that image is final, in completion order.
+
+    Images are packed into as few `generate` calls as `plan_batch_calls` allows; the
+    calls run concurrently (still bounded by the analyst's request semaphore). Each
+    image is finalized (nutrition enrichment, sanitizing) on its own thread once its
+    call returns, so one slow enrichment does not hold back its batch-mates.
+    """
+    queue: asyncio.Queue[JSONDict] = asyncio.Queue()
+    reported: set[int] = set()
+
+    async def _report(index: int, item: JSONDict) -> None:
+        reported.add(index)
+        await queue.put(item)
+
+    async def _finalize(index: int, result: JSONDict) -> None:
+        try:
+            final = await asyncio.to_thread(finalize, result)
+        except Exception as e:
+            logger.warning("[FoodBatch] finalize failed index=%d error=%s", index, e)
+            await _report(index, {"index": index, "error": ErrorCode.ANALYZE_FAILED})
+            return
+        await _report(index, {"index": index, "result": final})
+
+    async def _run_call(indices: list[int]) -> None:
+        try:
+            results = await asyncio.to_thread(generate, [images[index] for index in indices], output_tokens_for(len(indices)))
+            await asyncio.gather(*(_finalize(index, result) for index, result in zip(indices, results)))
+        except Exception as e:
+            logger.warning("[FoodBatch] call failed images=%d error=%s", len(indices), e)
+        finally:
+            for index in indices:
+                if index not in reported:
+                    await _report(index, {"index": index, "error": ErrorCode.ANALYZE_FAILED})
+
+    plan = plan_batch_calls(sorted(images), images_per_call)
+    logger.info("[FoodBatch] images=%d calls=%s", len(images), [len(call) for call in plan])
+    tasks = [asyncio.create_task(_run_call(indices)) for indices in plan]
+    try:
+        for _ in range(len(images)):
+            yield await queue.get()
+    finally:
+        for task in tasks:
+            task.cancel()
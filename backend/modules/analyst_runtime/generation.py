@@ -1,11 +1,13 @@
 import random
 import time
-from typing import Any, Callable
+from typing import Any, Callable, Iterator
 
 from google.api_core import retry
 from google.api_core.exceptions import ResourceExhausted, ServiceUnavailable
 from vertexai.generative_models import GenerativeModel
 
+from backend.modules.request_deadline import check_deadline, current_deadline, has_budget, time_budget
+
 JITTER_MAX_MS = 500
 JITTER_DIVISOR = 1000
 MAX_CONCURRENT_SLOTS = 3
@@ -16,6 +18,9 @@ RETRY_TIMEOUT_SECONDS = 60.0
 FALLBACK_MODEL_DISPLAY = "gemini-2.0-flash"
 LABEL_429_BACKOFF_INITIAL_SECONDS = 0.5
 LABEL_429_BACKOFF_MULTIPLIER = 2.0
+# Least request budget worth spending on another model call (fallback model,
+# truncation retry, 429 retry); below this the caller gets the failure now.
+MIN_GENERATION_BUDGET_SECONDS = 3.0
 
 
 def _build_retry_error_handler(retry_stats: dict[str, Any]) -> Callable[[Exception], None]:
@@ -49,6 +54,7 @@ def generate_with_semaphore(
     safety_settings: dict[str, Any],
     semaphore: Any,
 ) -> Any:
+    check_deadline("generation")
     with semaphore:
         return model.generate_content(
             contents,
@@ -69,12 +75,15 @@ def generate_with_429_backoff(
 ) -> Any:
     """
     Retry only for 429(ResourceExhausted) with exponential backoff.
+    A retry whose backoff would not leave MIN_GENERATION_BUDGET_SECONDS of the
+    request deadline is skipped and the 429 is raised instead.
     """
     delay = max(0.0, initial_delay_s)
     attempts = max(1, max_attempts)
     last_error: Exception | None = None
 
     for attempt in range(1, attempts + 1):
+        check_deadline("generation")
         try:
             with semaphore:
                 return model.generate_content(
@@ -87,8 +96,11 @@ def generate_with_429_backoff(
             if attempt >= attempts:
                 break
             sleep_s = delay + random.uniform(0, JITTER_MAX_MS) / JITTER_DIVISOR
+            if not has_budget(sleep_s + MIN_GENERATION_BUDGET_SECONDS):
+                print(f"[Label Retry] 429 backoff attempt={attempt} skipped: request deadline too close")
+                break
             print(f"[Label Retry] 429 backoff attempt={attempt} sleep_s={sleep_s:.2f}")
-            time.sleep(sleep_s)
+            _sleep(sleep_s)
             delay = max(delay * LABEL_429_BACKOFF_MULTIPLIER, LABEL_429_BACKOFF_INITIAL_SECONDS)
         except Exception:
             raise
@@ -98,13 +110,63 @@ def generate_with_429_backoff(
     raise RuntimeError("Label generation failed without explicit error")
 
 
-def build_retry_policy(retry_stats: dict[str, Any]) -> retry.Retry:
+def _sleep(seconds: float) -> None:
+    deadline = current_deadline()
+    if deadline is None:
+        time.sleep(seconds)
+    elif not deadline.sleep(seconds):
+        deadline.check("generation")
+
+
+def is_max_tokens_truncated(response: Any) -> bool:
+    """True when the first candidate stopped because it hit max_output_tokens."""
+    try:
+        finish_reason = response.candidates[0].finish_reason
+    except (AttributeError, IndexError):
+        return False
+    return getattr(finish_reason, "name", str(finish_reason)) == "MAX_TOKENS"
+
+
+def output_token_count(response: Any) -> int | None:
+    usage = getattr(response, "usage_metadata", None)
+    count = getattr(usage, "candidates_token_count", None)
+    return int(count) if count is not None else None
+
+
+def stream_with_semaphore(
+    model: GenerativeModel,
+    contents: Any,
+    generation_config: dict[str, Any],
+    safety_settings: dict[str, Any],
+    semaphore: Any,
+) -> Iterator[str]:
+    """
+    Yield response text chunks from a streamed generation. The semaphore slot is held
+    until the stream is exhausted or the generator is closed (client went away).
+    """
+    with semaphore:
+        for chunk in model.generate_content(
+            contents,
+            generation_config=generation_config,
+            safety_settings=safety_settings,
+            stream=True,
+        ):
+            try:
+                text = chunk.text
+            except (ValueError, IndexError):
+                # Chunks without text parts (e.g. a trailing finish_reason/usage chunk).
+                continue
+            if text:
+                yield text
+
+
+def build_retry_policy(retry_stats: dict[str, Any], timeout_seconds: float = RETRY_TIMEOUT_SECONDS) -> retry.Retry:
     return retry.Retry(
         predicate=retry.if_exception_type(ResourceExhausted, ServiceUnavailable),
         initial=RETRY_INITIAL_SECONDS,
         maximum=RETRY_MAX_SECONDS,
         multiplier=RETRY_MULTIPLIER,
-        timeout=RETRY_TIMEOUT_SECONDS,
+        timeout=timeout_seconds,
         on_error=_build_retry_error_handler(retry_stats),
     )
 
@@ -119,10 +181,16 @@ def generate_with_retry_and_fallback(
     semaphore: Any,
     retry_stats: dict[str, Any],
 ) -> Any:
+    """
+    Primary model with retries, then the fallback model. Retries are bounded by
+    what is left of the request deadline rather than RETRY_TIMEOUT_SECONDS
+    alone, and the fallback is only tried while a call still fits.
+    """
     jitter_s = random.uniform(0, JITTER_MAX_MS) / JITTER_DIVISOR
-    time.sleep(jitter_s)
+    _sleep(jitter_s)
 
-    retry_policy = build_retry_policy(retry_stats)
+    check_deadline("generation")
+    retry_policy = build_retry_policy(retry_stats, time_budget(RETRY_TIMEOUT_SECONDS))
     print(
         f"Vertex AI: Sending request (jitter={jitter_s:.3f}s, concurrent slots={semaphore._value}/{MAX_CONCURRENT_SLOTS})..."
     )
@@ -144,11 +212,14 @@ def generate_with_retry_and_fallback(
         except Exception as primary_error:
             print(f"[Model Fallback] Primary model ({primary_model_name}) failed: {primary_error}")
             print(f"[Model Fallback] Error type: {type(primary_error).__name__}")
+            if not has_budget(MIN_GENERATION_BUDGET_SECONDS):
+                print("[Model Fallback] Skipped: request deadline too close for the backup model")
+                raise
             print(f"[Model Fallback] Switching to backup model: {FALLBACK_MODEL_DISPLAY}")
 
             backup_model = GenerativeModel(fallback_model_name)
             return _invoke_generation_with_retry(
-                retry_policy,
+                build_retry_policy(retry_stats, time_budget(RETRY_TIMEOUT_SECONDS)),
                 backup_model,
                 contents,
                 generation_config,
@@ -0,0 +1,88 @@
+import math
+import os
+import threading
+from collections import deque
+from typing import Any, Final
+
+DEFAULT_CEILING_TOKENS: Final[int] = 4096
+DEFAULT_FLOOR_TOKENS: Final[int] = 512
+DEFAULT_PERCENTILE: Final[float] = 0.99
+DEFAULT_HEADROOM: Final[float] = 1.25
+DEFAULT_WINDOW: Final[int] = 200
+DEFAULT_MIN_SAMPLES: Final[int] = 20
+
+
+def _percentile(sorted_values: list[int], percentile: float) -> int:
+    index = max(0, math.ceil(percentile * len(sorted_values)) - 1)
+    return sorted_values[min(index, len(sorted_values) - 1)]
+
+
+class AdaptiveTokenBudget:
+    """
+    max_output_tokens tuned from the output sizes actually observed.
+
+    Budget = percentile(recent output tokens) * headroom, clamped to [floor, ceiling].
+    Until min_samples responses have been seen the ceiling is used, so a cold
+    process behaves exactly like the fixed budget. Callers retry at the ceiling
+    when a response is cut off (finish_reason MAX_TOKENS) and observe() the
+    completed response, so truncations do not bias the window downwards.
+    """
+
+    def __init__(
+        self,
+        *,
+        floor: int = DEFAULT_FLOOR_TOKENS,
+        ceiling: int = DEFAULT_CEILING_TOKENS,
+        percentile: float = DEFAULT_PERCENTILE,
+        headroom: float = DEFAULT_HEADROOM,
+        window: int = DEFAULT_WINDOW,
+        min_samples: int = DEFAULT_MIN_SAMPLES,
+    ) -> None:
+        self.floor = max(1, min(floor, ceiling))
+        self.ceiling = ceiling
+        self.percentile = percentile
+        self.headroom = headroom
+        self.min_samples = max(1, min_samples)
+        self._samples: deque[int] = deque(maxlen=max(window, self.min_samples))
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls, env_getter=os.environ.get) -> "AdaptiveTokenBudget":
+        def _number(name: str, default: float, cast=float):
+            raw = env_getter(name)
+            try:
+                return cast(raw) if raw not in (None, "") else default
+            except ValueError:
+                return default
+
+        return cls(
+            floor=_number("FOOD_TOKEN_BUDGET_FLOOR", DEFAULT_FLOOR_TOKENS, int),
+            ceiling=_number("FOOD_TOKEN_BUDGET_CEILING", DEFAULT_CEILING_TOKENS, int),
+            percentile=_number("FOOD_TOKEN_BUDGET_PERCENTILE", DEFAULT_PERCENTILE),
+            headroom=_number("FOOD_TOKEN_BUDGET_HEADROOM", DEFAULT_HEADROOM),
+            window=_number("FOOD_TOKEN_BUDGET_WINDOW", DEFAULT_WINDOW, int),
+            min_samples=_number("FOOD_TOKEN_BUDGET_MIN_SAMPLES", DEFAULT_MIN_SAMPLES, int),
+        )
+
+    def current(self) -> int:
+        with self._lock:
+            if len(self._samples) < self.min_samples:
+                return self.ceiling
+            observed = _percentile(sorted(self._samples), self.percentile)
+        return max(self.floor, min(self.ceiling, math.ceil(observed * self.headroom)))
+
+    def observe(self, output_tokens: int | None) -> None:
+        if output_tokens is None or output_tokens <= 0:
+            return
+        with self._lock:
+            self._samples.append(int(output_tokens))
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            samples = sorted(self._samples)
+        return {
+            "samples": len(samples),
+            "p50": _percentile(samples, 0.5) if samples else None,
+            "p99": _percentile(samples, 0.99) if samples else None,
+            "budget": self.current(),
+        }
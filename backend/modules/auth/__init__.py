@@ -1,3 +1,13 @@
+from .access_tokens import SignedAccessTokenCodec
+from .password_hashing import PasswordHashPolicy
+from .password_kdf import KdfWorkerPool, PerKeyConcurrencyLimiter
 from .service import AuthServiceError, InMemoryAuthSessionService
 
-__all__ = ["AuthServiceError", "InMemoryAuthSessionService"]
+__all__ = [
+    "AuthServiceError",
+    "InMemoryAuthSessionService",
+    "KdfWorkerPool",
+    "PasswordHashPolicy",
+    "PerKeyConcurrencyLimiter",
+    "SignedAccessTokenCodec",
+]
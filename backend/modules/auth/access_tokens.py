@@ -0,0 +1,181 @@
+from __future__ import annotations
+
+import base64
+import hashlib
+import hmac
+import json
+import os
+import secrets
+import threading
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
+from datetime import datetime, timezone
+
+ACCESS_TOKEN_FORMAT_OPAQUE = "opaque"
+ACCESS_TOKEN_FORMAT_SIGNED = "signed"
+SIGNED_TOKEN_ALGORITHM = "HS256"
+MIN_SIGNING_KEY_BYTES = 32
+
+
+class AccessTokenError(ValueError):
+    pass
+
+
+class AccessTokenExpiredError(AccessTokenError):
+    def __init__(self, claims: "AccessTokenClaims"):
+        super().__init__("Access token has expired.")
+        self.claims = claims
+
+
+@dataclass(frozen=True, slots=True)
+class AccessTokenClaims:
+    user_id: str
+    session_id: str
+    issued_at: datetime
+    expires_at: datetime
+    token_id: str
+
+
+def _b64encode(raw: bytes) -> str:
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def _b64decode(value: str) -> bytes:
+    return base64.urlsafe_b64decode(value + "=" * (-len(value) % 4))
+
+
+def _json_segment(payload: dict[str, object]) -> str:
+    return _b64encode(json.dumps(payload, separators=(",", ":"), sort_keys=True).encode("utf-8"))
+
+
+class SignedAccessTokenCodec:
+    """
+    JWT-compatible HS256 access tokens ("<header>.<claims>.<signature>").
+
+    The header carries a key id so keys can rotate: tokens are signed with
+    active_kid and verified against any key still in the ring. Verification is
+    pure CPU work, so protected requests never touch the auth state store.
+    """
+
+    def __init__(self, keys: dict[str, bytes], *, active_kid: str | None = None):
+        if not keys:
+            raise ValueError("At least one access token signing key is required.")
+        for kid, secret in keys.items():
+            if len(secret) < MIN_SIGNING_KEY_BYTES:
+                raise ValueError(f"Access token signing key {kid!r} must be at least {MIN_SIGNING_KEY_BYTES} bytes.")
+        self._keys = dict(keys)
+        self.active_kid = active_kid or next(iter(keys))
+        if self.active_kid not in self._keys:
+            raise ValueError(f"Unknown active signing key id: {self.active_kid}")
+
+    @classmethod
+    def from_env(cls, get_env: Callable[[str, str | None], str | None] = os.environ.get) -> "SignedAccessTokenCodec":
+        # "kid:base64url-secret,kid:base64url-secret"; the first entry signs, the rest only verify.
+        raw = (get_env("AUTH_ACCESS_TOKEN_SIGNING_KEYS", None) or "").strip()
+        keys: dict[str, bytes] = {}
+        for part in raw.split(","):
+            if not part.strip():
+                continue
+            kid, _, secret = part.strip().partition(":")
+            if not kid or not secret:
+                raise ValueError("AUTH_ACCESS_TOKEN_SIGNING_KEYS entries must look like kid:base64secret.")
+            keys[kid] = _b64decode(secret)
+        return cls(keys)
+
+    @staticmethod
+    def generate_key() -> str:
+        return _b64encode(secrets.token_bytes(MIN_SIGNING_KEY_BYTES))
+
+    @staticmethod
+    def looks_signed(token: str) -> bool:
+        return token.count(".") == 2
+
+    def issue(self, *, user_id: str, session_id: str, issued_at: datetime, expires_at: datetime) -> tuple[str, AccessTokenClaims]:
+        claims = AccessTokenClaims(
+            user_id=user_id,
+            session_id=session_id,
+            issued_at=issued_at.replace(microsecond=0),
+            expires_at=expires_at.replace(microsecond=0),
+            token_id=secrets.token_urlsafe(12),
+        )
+        header = _json_segment({"alg": SIGNED_TOKEN_ALGORITHM, "kid": self.active_kid, "typ": "JWT"})
+        body = _json_segment(
+            {
+                "sub": claims.user_id,
+                "sid": claims.session_id,
+                "iat": int(claims.issued_at.timestamp()),
+                "exp": int(claims.expires_at.timestamp()),
+                "jti": claims.token_id,
+            }
+        )
+        signing_input = f"{header}.{body}"
+        return f"{signing_input}.{self._sign(self.active_kid, signing_input)}", claims
+
+    def decode(self, token: str, *, now: datetime | None = None, verify_expiry: bool = True) -> AccessTokenClaims:
+        try:
+            header_segment, body_segment, signature = token.split(".")
+            header = json.loads(_b64decode(header_segment))
+            kid = header.get("kid")
+            if header.get("alg") != SIGNED_TOKEN_ALGORITHM or kid not in self._keys:
+                raise AccessTokenError("Unsupported access token header.")
+            expected = self._sign(kid, f"{header_segment}.{body_segment}")
+            if not hmac.compare_digest(signature, expected):
+                raise AccessTokenError("Invalid access token signature.")
+            body = json.loads(_b64decode(body_segment))
+            claims = AccessTokenClaims(
+                user_id=str(body["sub"]),
+                session_id=str(body["sid"]),
+                issued_at=datetime.fromtimestamp(int(body["iat"]), timezone.utc),
+                expires_at=datetime.fromtimestamp(int(body["exp"]), timezone.utc),
+                token_id=str(body["jti"]),
+            )
+        except AccessTokenError:
+            raise
+        except (ValueError, KeyError, TypeError, AttributeError) as error:
+            raise AccessTokenError("Malformed access token.") from error
+
+        if verify_expiry and claims.expires_at <= (now or datetime.now(timezone.utc)):
+            raise AccessTokenExpiredError(claims)
+        return claims
+
+    def _sign(self, kid: str, signing_input: str) -> str:
+        return _b64encode(hmac.new(self._keys[kid], signing_input.encode("ascii"), hashlib.sha256).digest())
+
+
+class SessionDenylist:
+    """
+    Revoked session ids, each kept until the last access token it could have issued expires.
+
+    Signed tokens cannot be recalled, so verification checks their session id
+    here. The owning service merges revocations from other workers periodically;
+    entries stay small because they age out after one access-token lifetime.
+    """
+
+    def __init__(self) -> None:
+        self._entries: dict[str, datetime] = {}
+        self._lock = threading.Lock()
+
+    def add(self, session_id: str, until: datetime) -> None:
+        with self._lock:
+            current = self._entries.get(session_id)
+            if current is None or current < until:
+                self._entries[session_id] = until
+
+    def merge(self, entries: Iterable[tuple[str, datetime]]) -> None:
+        for session_id, until in entries:
+            self.add(session_id, until)
+
+    def contains(self, session_id: str, now: datetime) -> bool:
+        # Lock-free read, like ShardedTokenStore.get().
+        until = self._entries.get(session_id)
+        return until is not None and until > now
+
+    def prune(self, now: datetime) -> int:
+        with self._lock:
+            expired = [session_id for session_id, until in self._entries.items() if until <= now]
+            for session_id in expired:
+                del self._entries[session_id]
+        return len(expired)
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+import math
+import threading
+import time
+from collections.abc import Callable, Mapping
+from datetime import datetime, timezone
+from typing import Any
+
+from .storage import AuthStateStore
+
+DEFAULT_CODE_ATTEMPTS_PER_IP = 30
+DEFAULT_CODE_ATTEMPTS_PER_EMAIL = 10
+DEFAULT_CODE_ATTEMPT_WINDOW_SECONDS = 60
+
+
+class AttemptRateLimitedError(RuntimeError):
+    def __init__(self, scope: str, retry_after_seconds: int):
+        super().__init__(f"Too many attempts for scope {scope}.")
+        self.scope = scope
+        self.retry_after_seconds = retry_after_seconds
+
+
+class SlidingWindowAttemptLimiter:
+    """
+    Attempt budgets per (scope, key), counted in the auth state store.
+
+    Each fixed window is one store counter; the current rate adds the previous
+    window weighted by how much of it the sliding window still covers, so a
+    burst straddling a window edge cannot double the budget. Counters live in
+    the shared store, so every worker enforces the same budget, and a rejected
+    attempt costs two counter operations -- no code hashing, no service lock.
+    """
+
+    def __init__(
+        self,
+        store: AuthStateStore,
+        *,
+        limits: Mapping[str, int],
+        window_seconds: int = DEFAULT_CODE_ATTEMPT_WINDOW_SECONDS,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.store = store
+        # A limit <= 0 disables that scope.
+        self.limits = {scope: limit for scope, limit in limits.items() if limit > 0}
+        self.window_seconds = max(1, window_seconds)
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._allowed = 0
+        self._rejected: dict[str, int] = {scope: 0 for scope in self.limits}
+
+    def hit(self, scope: str, key: str) -> None:
+        """Count one attempt; raises AttemptRateLimitedError once the sliding window is over budget."""
+        limit = self.limits.get(scope)
+        if limit is None:
+            return
+        now = self._clock()
+        window = int(now // self.window_seconds)
+        elapsed = now - window * self.window_seconds
+        # Each counter must outlive the window after it, which reads it as "previous".
+        purge_at = datetime.fromtimestamp((window + 2) * self.window_seconds, timezone.utc)
+
+        current = self.store.increment(f"attempts:{scope}:{key}:{window}", purge_at=purge_at)
+        previous = self.store.counter(f"attempts:{scope}:{key}:{window - 1}") if current <= limit else 0
+        weight = 1.0 - elapsed / self.window_seconds
+        if current + previous * weight <= limit:
+            with self._lock:
+                self._allowed += 1
+            return
+
+        with self._lock:
+            self._rejected[scope] += 1
+        retry_after_seconds = max(1, math.ceil(self.window_seconds - elapsed))
+        raise AttemptRateLimitedError(scope, retry_after_seconds)
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "allowed": self._allowed,
+                "rejected": sum(self._rejected.values()),
+                "rejected_by_scope": dict(self._rejected),
+            }
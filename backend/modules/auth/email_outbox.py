@@ -0,0 +1,494 @@
+from __future__ import annotations
+
+import email
+import email.policy
+import logging
+import os
+import smtplib
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+from email.message import EmailMessage
+from typing import Callable, Protocol
+from uuid import uuid4
+
+logger = logging.getLogger("foodlens.auth.email.outbox")
+
+DEFAULT_OUTBOX_MAX_ATTEMPTS = 8
+DEFAULT_OUTBOX_MAX_PENDING = 10_000
+DEFAULT_OUTBOX_BATCH_SIZE = 50
+# A claimed message is invisible to other claimers this long; a crashed worker's batch is retried after it.
+DEFAULT_OUTBOX_LEASE_SECONDS = 120.0
+
+
+class EmailOutboxFullError(RuntimeError):
+    pass
+
+
+@dataclass(frozen=True, slots=True)
+class OutboxMessage:
+    message_id: str
+    event_name: str
+    user_id: str
+    to_email: str
+    raw_message: str
+    # Codes are useless after they expire, so undelivered mail is dropped then.
+    expires_at: float
+    created_at: float
+    next_attempt_at: float
+    attempts: int = 0
+    last_error: str | None = None
+
+    def to_email_message(self) -> EmailMessage:
+        return email.message_from_string(self.raw_message, policy=email.policy.default)  # type: ignore[return-value]
+
+
+class EmailOutboxStorage(Protocol):
+    def enqueue(self, item: OutboxMessage) -> None:
+        ...
+
+    def claim_due(self, now: float, limit: int, lease_seconds: float) -> list[OutboxMessage]:
+        ...
+
+    def mark_sent(self, message_id: str) -> None:
+        ...
+
+    def mark_retry(self, message_id: str, *, attempts: int, next_attempt_at: float, error: str) -> None:
+        ...
+
+    def mark_failed(self, message_id: str, *, attempts: int, error: str) -> None:
+        """Drop a message given up on; its body holds a plaintext code, so nothing is kept."""
+        ...
+
+    def pending_count(self) -> int:
+        ...
+
+    def next_due_at(self) -> float | None:
+        ...
+
+
+class InMemoryEmailOutboxStorage:
+    def __init__(self) -> None:
+        self._pending: OrderedDict[str, OutboxMessage] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def enqueue(self, item: OutboxMessage) -> None:
+        with self._lock:
+            self._pending[item.message_id] = item
+
+    def claim_due(self, now: float, limit: int, lease_seconds: float) -> list[OutboxMessage]:
+        with self._lock:
+            due = sorted(
+                (item for item in self._pending.values() if item.next_attempt_at <= now),
+                key=lambda item: item.next_attempt_at,
+            )[:limit]
+            for item in due:
+                self._pending[item.message_id] = replace(item, next_attempt_at=now + lease_seconds)
+        return due
+
+    def mark_sent(self, message_id: str) -> None:
+        with self._lock:
+            self._pending.pop(message_id, None)
+
+    def mark_retry(self, message_id: str, *, attempts: int, next_attempt_at: float, error: str) -> None:
+        with self._lock:
+            item = self._pending.get(message_id)
+            if item is not None:
+                self._pending[message_id] = replace(
+                    item,
+                    attempts=attempts,
+                    next_attempt_at=next_attempt_at,
+                    last_error=error,
+                )
+
+    def mark_failed(self, message_id: str, *, attempts: int, error: str) -> None:
+        with self._lock:
+            self._pending.pop(message_id, None)
+
+    def pending_count(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    def next_due_at(self) -> float | None:
+        with self._lock:
+            return min((item.next_attempt_at for item in self._pending.values()), default=None)
+
+
+class SqliteEmailOutboxStorage:
+    """Durable outbox: mail enqueued before a restart is still delivered after it."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS email_outbox (
+                    message_id TEXT PRIMARY KEY,
+                    event_name TEXT NOT NULL,
+                    user_id TEXT NOT NULL,
+                    to_email TEXT NOT NULL,
+                    raw_message TEXT NOT NULL,
+                    expires_at REAL NOT NULL,
+                    created_at REAL NOT NULL,
+                    next_attempt_at REAL NOT NULL,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    last_error TEXT,
+                    status TEXT NOT NULL DEFAULT 'pending'
+                )
+                """
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS email_outbox_due ON email_outbox (status, next_attempt_at)"
+            )
+            # Rows kept by earlier versions after giving up still hold plaintext codes.
+            self._conn.execute("DELETE FROM email_outbox WHERE status = 'failed'")
+
+    def enqueue(self, item: OutboxMessage) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                """
+                INSERT INTO email_outbox
+                    (message_id, event_name, user_id, to_email, raw_message, expires_at, created_at, next_attempt_at,
+                     attempts)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    item.message_id,
+                    item.event_name,
+                    item.user_id,
+                    item.to_email,
+                    item.raw_message,
+                    item.expires_at,
+                    item.created_at,
+                    item.next_attempt_at,
+                    item.attempts,
+                ),
+            )
+
+    def claim_due(self, now: float, limit: int, lease_seconds: float) -> list[OutboxMessage]:
+        with self._lock, self._conn:
+            # Take the write lock before reading, so two processes sharing the file never claim the same rows.
+            self._conn.execute("BEGIN IMMEDIATE")
+            rows = self._conn.execute(
+                """
+                SELECT message_id, event_name, user_id, to_email, raw_message, expires_at, created_at,
+                       next_attempt_at, attempts, last_error
+                FROM email_outbox
+                WHERE status = 'pending' AND next_attempt_at <= ?
+                ORDER BY next_attempt_at
+                LIMIT ?
+                """,
+                (now, limit),
+            ).fetchall()
+            self._conn.executemany(
+                "UPDATE email_outbox SET next_attempt_at = ? WHERE message_id = ?",
+                [(now + lease_seconds, row[0]) for row in rows],
+            )
+        return [OutboxMessage(*row) for row in rows]
+
+    def mark_sent(self, message_id: str) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM email_outbox WHERE message_id = ?", (message_id,))
+
+    def mark_retry(self, message_id: str, *, attempts: int, next_attempt_at: float, error: str) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE email_outbox SET attempts = ?, next_attempt_at = ?, last_error = ? WHERE message_id = ?",
+                (attempts, next_attempt_at, error, message_id),
+            )
+
+    def mark_failed(self, message_id: str, *, attempts: int, error: str) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM email_outbox WHERE message_id = ?", (message_id,))
+
+    def pending_count(self) -> int:
+        with self._lock:
+            row = self._conn.execute("SELECT COUNT(*) FROM email_outbox WHERE status = 'pending'").fetchone()
+        return int(row[0])
+
+    def next_due_at(self) -> float | None:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT MIN(next_attempt_at) FROM email_outbox WHERE status = 'pending'"
+            ).fetchone()
+        return float(row[0]) if row and row[0] is not None else None
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class SmtpConnection:
+    """
+    One authenticated SMTP session kept open between messages.
+
+    The TCP/TLS handshake and AUTH happen once; later messages reuse the
+    session. A NOOP probes connections that sat idle, and idle_timeout_seconds
+    closes them before the server would.
+    """
+
+    def __init__(self, connect: Callable[[], smtplib.SMTP], *, idle_timeout_seconds: float = 60.0) -> None:
+        self.connect = connect
+        self.idle_timeout_seconds = idle_timeout_seconds
+        self._smtp: smtplib.SMTP | None = None
+        self._last_used_at = 0.0
+        self.connections_opened = 0
+
+    def send(self, message: EmailMessage) -> None:
+        smtp = self._ensure()
+        try:
+            smtp.send_message(message)
+        except smtplib.SMTPServerDisconnected:
+            # The server dropped a connection we believed warm: reconnect once and resend.
+            self.close()
+            smtp = self._ensure()
+            smtp.send_message(message)
+        self._last_used_at = time.monotonic()
+
+    def close_if_idle(self) -> None:
+        if self._smtp is not None and time.monotonic() - self._last_used_at >= self.idle_timeout_seconds:
+            self.close()
+
+    def close(self) -> None:
+        smtp, self._smtp = self._smtp, None
+        if smtp is None:
+            return
+        try:
+            smtp.quit()
+        except (smtplib.SMTPException, OSError):
+            smtp.close()
+
+    def _ensure(self) -> smtplib.SMTP:
+        if self._smtp is not None and time.monotonic() - self._last_used_at > 5.0:
+            try:
+                if self._smtp.noop()[0] != 250:
+                    self.close()
+            except (smtplib.SMTPException, OSError):
+                self.close()
+        if self._smtp is None:
+            self._smtp = self.connect()
+            self.connections_opened += 1
+            self._last_used_at = time.monotonic()
+        return self._smtp
+
+
+class EmailOutbox:
+    """
+    Enqueue-and-return email delivery with a single background worker.
+
+    The worker drains due messages in batches over a warm SmtpConnection,
+    reconnects on failure, and retries transient (4xx / network) errors with
+    exponential backoff. Permanent 5xx rejections and expired codes are
+    dropped and counted, and reported to on_undeliverable: the request that
+    queued them has long returned, so that is the only place to react.
+    """
+
+    def __init__(
+        self,
+        storage: EmailOutboxStorage,
+        connection: SmtpConnection,
+        *,
+        max_attempts: int = DEFAULT_OUTBOX_MAX_ATTEMPTS,
+        max_pending: int = DEFAULT_OUTBOX_MAX_PENDING,
+        batch_size: int = DEFAULT_OUTBOX_BATCH_SIZE,
+        base_backoff_seconds: float = 2.0,
+        max_backoff_seconds: float = 300.0,
+        lease_seconds: float = DEFAULT_OUTBOX_LEASE_SECONDS,
+        on_undeliverable: Callable[[OutboxMessage], None] | None = None,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.storage = storage
+        self.connection = connection
+        self.max_attempts = max(1, max_attempts)
+        self.max_pending = max(1, max_pending)
+        self.batch_size = max(1, batch_size)
+        self.base_backoff_seconds = max(0.0, base_backoff_seconds)
+        self.max_backoff_seconds = max(self.base_backoff_seconds, max_backoff_seconds)
+        self.lease_seconds = lease_seconds
+        self.on_undeliverable = on_undeliverable
+        self._clock = clock
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._thread_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._enqueued = 0
+        self._sent = 0
+        self._retried = 0
+        self._failed = 0
+        self._expired = 0
+        self._send_ms_total = 0.0
+        self._queue_delay_ms_max = 0.0
+
+    def enqueue(
+        self,
+        *,
+        event_name: str,
+        user_id: str,
+        to_email: str,
+        message: EmailMessage,
+        expires_in_seconds: int,
+    ) -> str:
+        if self.storage.pending_count() >= self.max_pending:
+            raise EmailOutboxFullError("Email outbox is full.")
+        now = self._clock()
+        item = OutboxMessage(
+            message_id=uuid4().hex,
+            event_name=event_name,
+            user_id=user_id,
+            to_email=to_email,
+            raw_message=message.as_string(),
+            expires_at=now + max(1, expires_in_seconds),
+            created_at=now,
+            next_attempt_at=now,
+        )
+        self.storage.enqueue(item)
+        with self._stats_lock:
+            self._enqueued += 1
+        self.start()
+        self._wakeup.set()
+        return item.message_id
+
+    def start(self) -> None:
+        with self._thread_lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stopping.clear()
+            self._thread = threading.Thread(target=self._run, name="auth-email-outbox", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stopping.set()
+        self._wakeup.set()
+        thread = self._thread
+        if thread is not None:
+            thread.join(timeout=timeout)
+        self.connection.close()
+
+    def run_once(self) -> int:
+        """Deliver one batch of due messages; returns how many were processed."""
+        now = self._clock()
+        batch = self.storage.claim_due(now, self.batch_size, self.lease_seconds)
+        for item in batch:
+            self._deliver(item)
+        return len(batch)
+
+    def snapshot(self) -> dict[str, float | int]:
+        with self._stats_lock:
+            return {
+                "pending": self.storage.pending_count(),
+                "enqueued": self._enqueued,
+                "sent": self._sent,
+                "retried": self._retried,
+                "failed": self._failed,
+                "expired": self._expired,
+                "connections_opened": self.connection.connections_opened,
+                "send_ms_avg": round(self._send_ms_total / self._sent, 2) if self._sent else 0.0,
+                "queue_delay_ms_max": round(self._queue_delay_ms_max, 2),
+            }
+
+    def _run(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                processed = self.run_once()
+            except Exception:  # pragma: no cover - keep the worker alive on storage errors
+                logger.exception("[AuthEmail] outbox batch failed")
+                processed = 0
+            if processed >= self.batch_size:
+                continue
+            self.connection.close_if_idle()
+            next_due = self.storage.next_due_at()
+            wait_seconds = 30.0 if next_due is None else min(30.0, max(0.0, next_due - self._clock()))
+            self._wakeup.wait(timeout=wait_seconds)
+            self._wakeup.clear()
+
+    def _deliver(self, item: OutboxMessage) -> None:
+        now = self._clock()
+        attempts = item.attempts + 1
+        if item.expires_at <= now:
+            self.storage.mark_failed(item.message_id, attempts=item.attempts, error="expired")
+            with self._stats_lock:
+                self._expired += 1
+            logger.warning(
+                "[AuthEmail] %s expired undelivered user_id=%s attempts=%s",
+                item.event_name,
+                item.user_id,
+                item.attempts,
+            )
+            self._report_undeliverable(item)
+            return
+
+        started_at = time.perf_counter()
+        try:
+            self.connection.send(item.to_email_message())
+        except (smtplib.SMTPException, OSError, TimeoutError) as error:
+            self.connection.close()
+            self._handle_failure(item, attempts=attempts, error=error)
+            return
+
+        send_ms = (time.perf_counter() - started_at) * 1000
+        self.storage.mark_sent(item.message_id)
+        with self._stats_lock:
+            self._sent += 1
+            self._send_ms_total += send_ms
+            # Measured from enqueue, so retries show up as delay.
+            self._queue_delay_ms_max = max(self._queue_delay_ms_max, max(0.0, now - item.created_at) * 1000)
+        logger.info(
+            "[AuthEmail] %s delivered mode=smtp-outbox user_id=%s attempt=%s send_ms=%.1f",
+            item.event_name,
+            item.user_id,
+            attempts,
+            send_ms,
+        )
+
+    def _handle_failure(self, item: OutboxMessage, *, attempts: int, error: BaseException) -> None:
+        permanent = isinstance(error, smtplib.SMTPRecipientsRefused) or (
+            isinstance(error, smtplib.SMTPResponseException) and error.smtp_code >= 500
+        )
+        if permanent or attempts >= self.max_attempts:
+            self.storage.mark_failed(item.message_id, attempts=attempts, error=repr(error))
+            with self._stats_lock:
+                self._failed += 1
+            logger.error(
+                "[AuthEmail] %s delivery failed user_id=%s attempts=%s permanent=%s error=%r",
+                item.event_name,
+                item.user_id,
+                attempts,
+                permanent,
+                error,
+            )
+            self._report_undeliverable(item)
+            return
+
+        backoff = min(self.max_backoff_seconds, self.base_backoff_seconds * (2 ** (attempts - 1)))
+        self.storage.mark_retry(
+            item.message_id,
+            attempts=attempts,
+            next_attempt_at=self._clock() + backoff,
+            error=repr(error),
+        )
+        with self._stats_lock:
+            self._retried += 1
+        logger.warning(
+            "[AuthEmail] %s delivery retry user_id=%s attempt=%s backoff=%.1fs error=%r",
+            item.event_name,
+            item.user_id,
+            attempts,
+            backoff,
+            error,
+        )
+
+    def _report_undeliverable(self, item: OutboxMessage) -> None:
+        if self.on_undeliverable is None:
+            return
+        try:
+            self.on_undeliverable(item)
+        except Exception:
+            logger.exception("[AuthEmail] undeliverable handler failed user_id=%s", item.user_id)
@@ -3,6 +3,7 @@ from __future__ import annotations
 import logging
 import os
 import smtplib
+import sqlite3
 import ssl
 import time
 from concurrent.futures import ThreadPoolExecutor
@@ -11,12 +12,25 @@ from dataclasses import dataclass
 from email.message import EmailMessage
 from typing import Callable, Literal
 
+from .email_outbox import (
+    DEFAULT_OUTBOX_MAX_ATTEMPTS,
+    DEFAULT_OUTBOX_MAX_PENDING,
+    EmailOutbox,
+    EmailOutboxFullError,
+    EmailOutboxStorage,
+    InMemoryEmailOutboxStorage,
+    SmtpConnection,
+    SqliteEmailOutboxStorage,
+)
+
 logger = logging.getLogger("foodlens.auth.email")
 
 EmailDeliveryMode = Literal["disabled", "log", "smtp"]
 
 DEFAULT_EMAIL_TIMEOUT_SECONDS = 15.0
 MAX_EMAIL_SEND_ATTEMPTS = 3
+VERIFICATION_EMAIL_EVENT = "verification email"
+PASSWORD_RESET_EMAIL_EVENT = "password reset email"
 
 
 class EmailVerificationDeliveryError(Exception):
@@ -26,6 +40,18 @@ class EmailVerificationDeliveryError(Exception):
 class EmailVerificationSender:
     mode: EmailDeliveryMode = "disabled"
 
+    def start(self) -> None:
+        """Start background delivery, if the sender has any."""
+
+    def close(self) -> None:
+        """Stop background delivery and release connections."""
+
+    def set_undeliverable_handler(self, handler: Callable[[str, str], None]) -> None:
+        """
+        handler(event_name, user_id) for mail given up on after the request
+        returned. Synchronous senders fail the request instead, so never call it.
+        """
+
     def send_verification_code(
         self,
         *,
@@ -152,14 +178,7 @@ class SmtpEmailVerificationSender(EmailVerificationSender):
         expires_in_seconds: int,
         user_id: str,
     ) -> None:
-        message = self._build_message(
-            email=email,
-            code=code,
-            expires_in_seconds=expires_in_seconds,
-            subject=self.subject,
-            purpose_line="Your FoodLens verification code is:",
-            fallback_line="If you did not request this code, you can ignore this email.",
-        )
+        message = self.build_verification_message(email=email, code=code, expires_in_seconds=expires_in_seconds)
         self._deliver_message(message=message, user_id=user_id, email=email, event_name="verification email")
 
     def send_password_reset_code(
@@ -170,7 +189,21 @@ class SmtpEmailVerificationSender(EmailVerificationSender):
         expires_in_seconds: int,
         user_id: str,
     ) -> None:
-        message = self._build_message(
+        message = self.build_password_reset_message(email=email, code=code, expires_in_seconds=expires_in_seconds)
+        self._deliver_message(message=message, user_id=user_id, email=email, event_name="password reset email")
+
+    def build_verification_message(self, *, email: str, code: str, expires_in_seconds: int) -> EmailMessage:
+        return self._build_message(
+            email=email,
+            code=code,
+            expires_in_seconds=expires_in_seconds,
+            subject=self.subject,
+            purpose_line="Your FoodLens verification code is:",
+            fallback_line="If you did not request this code, you can ignore this email.",
+        )
+
+    def build_password_reset_message(self, *, email: str, code: str, expires_in_seconds: int) -> EmailMessage:
+        return self._build_message(
             email=email,
             code=code,
             expires_in_seconds=expires_in_seconds,
@@ -178,7 +211,6 @@ class SmtpEmailVerificationSender(EmailVerificationSender):
             purpose_line="Your FoodLens password reset code is:",
             fallback_line="If you did not request this reset, you can ignore this email.",
         )
-        self._deliver_message(message=message, user_id=user_id, email=email, event_name="password reset email")
 
     def _deliver_message(
         self,
@@ -246,21 +278,27 @@ class SmtpEmailVerificationSender(EmailVerificationSender):
         return f"{from_name} <{from_email}>"
 
     def _send_message(self, message: EmailMessage) -> None:
+        with self.open_connection() as smtp:
+            smtp.send_message(message)
+
+    def open_connection(self) -> smtplib.SMTP:
+        """Connected, TLS-wrapped and authenticated session; the caller owns closing it."""
         if self.use_ssl:
             context = ssl.create_default_context()
-            with smtplib.SMTP_SSL(self.host, self.port, timeout=self.timeout_seconds, context=context) as smtp:
-                self._authenticate(smtp)
-                smtp.send_message(message)
-            return
-
-        with smtplib.SMTP(self.host, self.port, timeout=self.timeout_seconds) as smtp:
+            smtp: smtplib.SMTP = smtplib.SMTP_SSL(self.host, self.port, timeout=self.timeout_seconds, context=context)
+        else:
+            smtp = smtplib.SMTP(self.host, self.port, timeout=self.timeout_seconds)
+        try:
             smtp.ehlo()
-            if self.use_starttls:
+            if self.use_starttls and not self.use_ssl:
                 context = ssl.create_default_context()
                 smtp.starttls(context=context)
                 smtp.ehlo()
             self._authenticate(smtp)
-            smtp.send_message(message)
+        except BaseException:
+            smtp.close()
+            raise
+        return smtp
 
     def _send_message_with_timeout(self, message: EmailMessage) -> None:
         # Guard against DNS/connect stalls that can exceed smtplib socket timeout.
@@ -280,6 +318,90 @@ class SmtpEmailVerificationSender(EmailVerificationSender):
         smtp.login(self.username, self.password or "")
 
 
+@dataclass(slots=True)
+class SmtpOutboxEmailSender(EmailVerificationSender):
+    """
+    SMTP delivery off the request path: send_* only enqueue into the outbox.
+
+    Signup and reset requests return as soon as the message is stored; the
+    outbox worker delivers it over a warm connection and retries transient
+    failures. Only a full or unwritable outbox fails the request.
+    """
+
+    smtp: SmtpEmailVerificationSender
+    outbox: EmailOutbox
+    mode: EmailDeliveryMode = "smtp"
+
+    def send_verification_code(
+        self,
+        *,
+        email: str,
+        code: str,
+        expires_in_seconds: int,
+        user_id: str,
+    ) -> None:
+        message = self.smtp.build_verification_message(email=email, code=code, expires_in_seconds=expires_in_seconds)
+        self._enqueue(
+            message=message,
+            email=email,
+            user_id=user_id,
+            expires_in_seconds=expires_in_seconds,
+            event_name=VERIFICATION_EMAIL_EVENT,
+        )
+
+    def send_password_reset_code(
+        self,
+        *,
+        email: str,
+        code: str,
+        expires_in_seconds: int,
+        user_id: str,
+    ) -> None:
+        message = self.smtp.build_password_reset_message(email=email, code=code, expires_in_seconds=expires_in_seconds)
+        self._enqueue(
+            message=message,
+            email=email,
+            user_id=user_id,
+            expires_in_seconds=expires_in_seconds,
+            event_name=PASSWORD_RESET_EMAIL_EVENT,
+        )
+
+    def start(self) -> None:
+        self.outbox.start()
+
+    def close(self) -> None:
+        self.outbox.stop()
+
+    def set_undeliverable_handler(self, handler: Callable[[str, str], None]) -> None:
+        self.outbox.on_undeliverable = lambda item: handler(item.event_name, item.user_id)
+
+    def _enqueue(
+        self,
+        *,
+        message: EmailMessage,
+        email: str,
+        user_id: str,
+        expires_in_seconds: int,
+        event_name: str,
+    ) -> None:
+        try:
+            self.outbox.enqueue(
+                event_name=event_name,
+                user_id=user_id,
+                to_email=email,
+                message=message,
+                expires_in_seconds=expires_in_seconds,
+            )
+        except (EmailOutboxFullError, OSError, sqlite3.Error) as error:
+            raise EmailVerificationDeliveryError("Failed to queue verification email.") from error
+        logger.info(
+            "[AuthEmail] %s queued mode=smtp-outbox user_id=%s email=%s",
+            event_name,
+            user_id,
+            _mask_email(email),
+        )
+
+
 def build_email_verification_sender_from_env(
     get_env: Callable[[str, str | None], str | None] = os.environ.get,
 ) -> tuple[EmailVerificationSender, EmailDeliveryMode]:
@@ -341,7 +463,31 @@ def build_email_verification_sender_from_env(
         subject=subject,
         password_reset_subject=password_reset_subject,
     )
-    return sender, mode
+    # Opt-in: the default memory storage loses queued codes on restart.
+    if (get_env("AUTH_EMAIL_OUTBOX_ENABLED", "0") or "0").strip() != "1":
+        return sender, mode
+
+    outbox_backend = (get_env("AUTH_EMAIL_OUTBOX_BACKEND", "memory") or "memory").strip().lower()
+    outbox_storage: EmailOutboxStorage
+    if outbox_backend == "sqlite":
+        outbox_storage = SqliteEmailOutboxStorage(
+            (get_env("AUTH_EMAIL_OUTBOX_PATH", None) or "/tmp/foodlens_email_outbox.sqlite3").strip()
+        )
+    else:
+        outbox_storage = InMemoryEmailOutboxStorage()
+    outbox = EmailOutbox(
+        outbox_storage,
+        SmtpConnection(sender.open_connection),
+        max_attempts=_safe_int(
+            get_env("AUTH_EMAIL_OUTBOX_MAX_ATTEMPTS", str(DEFAULT_OUTBOX_MAX_ATTEMPTS)),
+            DEFAULT_OUTBOX_MAX_ATTEMPTS,
+        ),
+        max_pending=_safe_int(
+            get_env("AUTH_EMAIL_OUTBOX_MAX_PENDING", str(DEFAULT_OUTBOX_MAX_PENDING)),
+            DEFAULT_OUTBOX_MAX_PENDING,
+        ),
+    )
+    return SmtpOutboxEmailSender(smtp=sender, outbox=outbox), mode
 
 
 def _safe_int(raw_value: str | None, fallback: int) -> int:
@@ -0,0 +1,258 @@
+from __future__ import annotations
+
+import asyncio
+import base64
+import json
+import os
+import re
+import time
+from collections.abc import Callable, Mapping
+from typing import Any, NamedTuple
+
+import aiohttp
+from cryptography.exceptions import InvalidSignature
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.asymmetric import padding
+from cryptography.hazmat.primitives.asymmetric.rsa import RSAPublicKey, RSAPublicNumbers
+
+from .service import AuthServiceError
+
+GOOGLE_JWKS_URL = "https://www.googleapis.com/oauth2/v3/certs"
+GOOGLE_ISSUERS = frozenset({"accounts.google.com", "https://accounts.google.com"})
+
+_MAX_AGE_PATTERN = re.compile(r"max-age=(\d+)")
+
+
+def _provider_rejected() -> AuthServiceError:
+    return AuthServiceError(
+        code="AUTH_PROVIDER_REJECTED",
+        message="Provider login failed.",
+        status_code=400,
+    )
+
+
+def _b64decode(value: str) -> bytes:
+    return base64.urlsafe_b64decode(value + "=" * (-len(value) % 4))
+
+
+class ProviderResponse(NamedTuple):
+    status_code: int
+    payload: dict[str, Any]
+    headers: Mapping[str, str]
+
+
+class OAuthProviderClient:
+    """
+    One pooled aiohttp session for OAuth provider calls (token exchange, profile, JWKS).
+
+    Every call takes an absolute deadline (time.monotonic()) shared by all calls
+    of one login, so a slow first hop leaves less time for the next instead of
+    each hop getting the full timeout. The session is created lazily on the
+    serving event loop and closed on app shutdown.
+    """
+
+    def __init__(self, *, pool_limit: int = 20, keepalive_timeout_seconds: float = 30.0, dns_cache_ttl_seconds: int = 300):
+        self.pool_limit = max(1, pool_limit)
+        self.keepalive_timeout_seconds = keepalive_timeout_seconds
+        self.dns_cache_ttl_seconds = max(0, dns_cache_ttl_seconds)
+        self._session: aiohttp.ClientSession | None = None
+
+    @classmethod
+    def from_env(cls, get_env: Callable[[str, str | None], str | None] = os.environ.get) -> "OAuthProviderClient":
+        pool_limit = int((get_env("AUTH_PROVIDER_POOL_LIMIT", "20") or "20").strip())
+        keepalive_timeout_seconds = float((get_env("AUTH_PROVIDER_KEEPALIVE_SECONDS", "30") or "30").strip())
+        return cls(pool_limit=pool_limit, keepalive_timeout_seconds=keepalive_timeout_seconds)
+
+    def _client_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit=self.pool_limit,
+                    ttl_dns_cache=self.dns_cache_ttl_seconds,
+                    keepalive_timeout=self.keepalive_timeout_seconds,
+                ),
+            )
+        return self._session
+
+    async def close(self) -> None:
+        session, self._session = self._session, None
+        if session is not None and not session.closed:
+            await session.close()
+
+    async def post_form(self, url: str, *, data: dict[str, str], deadline: float) -> ProviderResponse:
+        return await self._request("POST", url, deadline=deadline, data=data)
+
+    async def get_json(self, url: str, *, deadline: float, headers: dict[str, str] | None = None) -> ProviderResponse:
+        return await self._request("GET", url, deadline=deadline, headers=headers)
+
+    async def _request(self, method: str, url: str, *, deadline: float, **kwargs: Any) -> ProviderResponse:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise AuthServiceError(
+                code="AUTH_PROVIDER_TIMEOUT",
+                message="Provider request timed out.",
+                status_code=504,
+            )
+        try:
+            async with self._client_session().request(
+                method,
+                url,
+                timeout=aiohttp.ClientTimeout(total=remaining),
+                **kwargs,
+            ) as response:
+                body = await response.read()
+                status_code = response.status
+                headers = dict(response.headers)
+        except asyncio.TimeoutError as error:
+            raise AuthServiceError(
+                code="AUTH_PROVIDER_TIMEOUT",
+                message="Provider request timed out.",
+                status_code=504,
+            ) from error
+        except aiohttp.ClientError as error:
+            raise AuthServiceError(
+                code="AUTH_PROVIDER_UNAVAILABLE",
+                message="Provider request failed.",
+                status_code=502,
+            ) from error
+
+        try:
+            payload = json.loads(body)
+        except ValueError as error:
+            raise _provider_rejected() from error
+        if not isinstance(payload, dict):
+            raise _provider_rejected()
+        return ProviderResponse(status_code, payload, headers)
+
+
+class JwksCache:
+    """
+    Signing keys by key id, fetched from a JWKS endpoint.
+
+    Keys are reused until the endpoint's Cache-Control max-age runs out. An
+    unknown kid (key rotation) triggers a refresh, at most once per
+    min_refresh_interval_seconds so forged kids cannot hammer the endpoint.
+    """
+
+    def __init__(
+        self,
+        client: OAuthProviderClient,
+        url: str,
+        *,
+        default_ttl_seconds: float = 3600.0,
+        min_refresh_interval_seconds: float = 60.0,
+    ):
+        self.client = client
+        self.url = url
+        self.default_ttl_seconds = default_ttl_seconds
+        self.min_refresh_interval_seconds = min_refresh_interval_seconds
+        self._keys: dict[str, RSAPublicKey] = {}
+        self._expires_at = 0.0
+        self._fetched_at: float | None = None
+        self._lock = asyncio.Lock()
+        self.fetch_count = 0
+
+    async def get_key(self, kid: str, *, deadline: float) -> RSAPublicKey:
+        key = self._keys.get(kid)
+        if key is not None and time.monotonic() < self._expires_at:
+            return key
+
+        async with self._lock:
+            now = time.monotonic()
+            stale = now >= self._expires_at
+            recently_fetched = self._fetched_at is not None and now - self._fetched_at < self.min_refresh_interval_seconds
+            if stale or (kid not in self._keys and not recently_fetched):
+                await self._refresh(deadline)
+
+        key = self._keys.get(kid)
+        if key is None:
+            raise _provider_rejected()
+        return key
+
+    async def _refresh(self, deadline: float) -> None:
+        response = await self.client.get_json(self.url, deadline=deadline)
+        if response.status_code >= 400:
+            raise AuthServiceError(
+                code="AUTH_PROVIDER_UNAVAILABLE",
+                message="Provider request failed.",
+                status_code=502,
+            )
+
+        keys: dict[str, RSAPublicKey] = {}
+        for entry in response.payload.get("keys") or []:
+            if not isinstance(entry, dict) or entry.get("kty") != "RSA" or not entry.get("kid"):
+                continue
+            try:
+                numbers = RSAPublicNumbers(
+                    e=int.from_bytes(_b64decode(str(entry["e"])), "big"),
+                    n=int.from_bytes(_b64decode(str(entry["n"])), "big"),
+                )
+                keys[str(entry["kid"])] = numbers.public_key()
+            except (KeyError, ValueError):
+                continue
+
+        ttl_seconds = self.default_ttl_seconds
+        cache_control = next((value for name, value in response.headers.items() if name.lower() == "cache-control"), "")
+        match = _MAX_AGE_PATTERN.search(cache_control)
+        if match:
+            ttl_seconds = float(match.group(1))
+
+        now = time.monotonic()
+        self._keys = keys
+        self._fetched_at = now
+        self._expires_at = now + ttl_seconds
+        self.fetch_count += 1
+
+
+class GoogleIdTokenVerifier:
+    """Verifies Google id_tokens locally (RS256 against the cached JWKS) instead of calling userinfo."""
+
+    def __init__(
+        self,
+        client: OAuthProviderClient,
+        *,
+        jwks_url: str = GOOGLE_JWKS_URL,
+        issuers: frozenset[str] = GOOGLE_ISSUERS,
+        leeway_seconds: int = 60,
+    ):
+        self.jwks = JwksCache(client, jwks_url)
+        self.issuers = issuers
+        self.leeway_seconds = leeway_seconds
+
+    async def verify(self, id_token: str, *, audience: str, deadline: float) -> dict[str, Any]:
+        try:
+            header_segment, claims_segment, signature_segment = id_token.split(".")
+            header = json.loads(_b64decode(header_segment))
+            claims = json.loads(_b64decode(claims_segment))
+            signature = _b64decode(signature_segment)
+        except ValueError as error:
+            raise _provider_rejected() from error
+        if not isinstance(header, dict) or not isinstance(claims, dict) or header.get("alg") != "RS256":
+            raise _provider_rejected()
+
+        key = await self.jwks.get_key(str(header.get("kid") or ""), deadline=deadline)
+        try:
+            key.verify(
+                signature,
+                f"{header_segment}.{claims_segment}".encode("ascii"),
+                padding.PKCS1v15(),
+                hashes.SHA256(),
+            )
+        except InvalidSignature as error:
+            raise _provider_rejected() from error
+
+        audiences = claims.get("aud")
+        audiences = audiences if isinstance(audiences, list) else [audiences]
+        now = time.time()
+        try:
+            expires_at = float(claims["exp"])
+        except (KeyError, TypeError, ValueError) as error:
+            raise _provider_rejected() from error
+        if (
+            claims.get("iss") not in self.issuers
+            or audience not in audiences
+            or expires_at + self.leeway_seconds < now
+            or not str(claims.get("sub") or "").strip()
+        ):
+            raise _provider_rejected()
+        return claims
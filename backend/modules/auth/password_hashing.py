@@ -0,0 +1,298 @@
+from __future__ import annotations
+
+import base64
+import hashlib
+import hmac
+import logging
+import os
+import secrets
+import time
+from collections.abc import Callable
+from typing import Any
+
+try:  # Optional: argon2-cffi is not part of the runtime requirements.
+    import argon2 as _argon2
+    from argon2.exceptions import InvalidHashError as _Argon2InvalidHashError
+    from argon2.exceptions import VerificationError as _Argon2VerificationError
+except ImportError:  # pragma: no cover - exercised only when argon2-cffi is installed
+    _argon2 = None
+
+logger = logging.getLogger("foodlens.auth.password")
+
+SCHEME_PBKDF2 = "pbkdf2-sha256"
+SCHEME_SCRYPT = "scrypt"
+SCHEME_ARGON2 = "argon2id"
+
+DEFAULT_PBKDF2_ITERATIONS = 390_000
+DEFAULT_SCRYPT_N = 2**14
+DEFAULT_SCRYPT_R = 8
+DEFAULT_SCRYPT_P = 1
+DEFAULT_ARGON2_TIME_COST = 3
+DEFAULT_ARGON2_MEMORY_KIB = 64 * 1024
+DEFAULT_ARGON2_PARALLELISM = 1
+
+_SALT_BYTES = 16
+_DIGEST_BYTES = 32
+
+
+def _b64encode(raw: bytes) -> str:
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def _b64decode(value: str) -> bytes:
+    return base64.urlsafe_b64decode(value + "=" * (-len(value) % 4))
+
+
+def _parse_params(raw: str) -> dict[str, int]:
+    params: dict[str, int] = {}
+    for part in raw.split(","):
+        key, _, value = part.partition("=")
+        params[key] = int(value)
+    return params
+
+
+def is_argon2_available() -> bool:
+    return _argon2 is not None
+
+
+class Pbkdf2Hasher:
+    scheme = SCHEME_PBKDF2
+
+    def __init__(self, *, iterations: int = DEFAULT_PBKDF2_ITERATIONS):
+        self.iterations = max(120_000, iterations)
+
+    def hash(self, password: str) -> str:
+        salt = secrets.token_bytes(_SALT_BYTES)
+        digest = hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), salt, self.iterations)
+        return f"{self.scheme}$i={self.iterations}${_b64encode(salt)}${_b64encode(digest)}"
+
+    def verify(self, password: str, encoded: str) -> bool:
+        _, params, salt, expected = encoded.split("$")
+        digest = hashlib.pbkdf2_hmac(
+            "sha256",
+            password.encode("utf-8"),
+            _b64decode(salt),
+            _parse_params(params)["i"],
+        )
+        return hmac.compare_digest(_b64encode(digest), expected)
+
+    def needs_rehash(self, encoded: str) -> bool:
+        scheme, params, _, _ = encoded.split("$")
+        return scheme != self.scheme or _parse_params(params) != {"i": self.iterations}
+
+    def describe(self) -> dict[str, Any]:
+        return {"scheme": self.scheme, "iterations": self.iterations}
+
+
+class ScryptHasher:
+    scheme = SCHEME_SCRYPT
+
+    def __init__(self, *, n: int = DEFAULT_SCRYPT_N, r: int = DEFAULT_SCRYPT_R, p: int = DEFAULT_SCRYPT_P):
+        if n < 2 or n & (n - 1):
+            raise ValueError("scrypt n must be a power of two greater than 1.")
+        self.n = n
+        self.r = max(1, r)
+        self.p = max(1, p)
+
+    @staticmethod
+    def _derive(password: str, salt: bytes, n: int, r: int, p: int) -> bytes:
+        # OpenSSL's default 32 MiB maxmem rejects n=2**15,r=8; allow twice the working set.
+        maxmem = 2 * 128 * r * (n + p + 2)
+        return hashlib.scrypt(password.encode("utf-8"), salt=salt, n=n, r=r, p=p, maxmem=maxmem, dklen=_DIGEST_BYTES)
+
+    def hash(self, password: str) -> str:
+        salt = secrets.token_bytes(_SALT_BYTES)
+        digest = self._derive(password, salt, self.n, self.r, self.p)
+        return f"{self.scheme}$n={self.n},r={self.r},p={self.p}${_b64encode(salt)}${_b64encode(digest)}"
+
+    def verify(self, password: str, encoded: str) -> bool:
+        _, params, salt, expected = encoded.split("$")
+        parsed = _parse_params(params)
+        digest = self._derive(password, _b64decode(salt), parsed["n"], parsed["r"], parsed["p"])
+        return hmac.compare_digest(_b64encode(digest), expected)
+
+    def needs_rehash(self, encoded: str) -> bool:
+        scheme, params, _, _ = encoded.split("$")
+        return scheme != self.scheme or _parse_params(params) != {"n": self.n, "r": self.r, "p": self.p}
+
+    def describe(self) -> dict[str, Any]:
+        return {"scheme": self.scheme, "n": self.n, "r": self.r, "p": self.p}
+
+
+class Argon2Hasher:
+    """Adapter over argon2-cffi; its PHC string ("$argon2id$v=19$m=...") is stored as-is."""
+
+    scheme = SCHEME_ARGON2
+
+    def __init__(
+        self,
+        *,
+        time_cost: int = DEFAULT_ARGON2_TIME_COST,
+        memory_cost_kib: int = DEFAULT_ARGON2_MEMORY_KIB,
+        parallelism: int = DEFAULT_ARGON2_PARALLELISM,
+    ):
+        if _argon2 is None:
+            raise RuntimeError("argon2-cffi is not installed.")
+        self.time_cost = max(1, time_cost)
+        self.memory_cost_kib = max(8 * parallelism, memory_cost_kib)
+        self.parallelism = max(1, parallelism)
+        self._hasher = _argon2.PasswordHasher(
+            time_cost=self.time_cost,
+            memory_cost=self.memory_cost_kib,
+            parallelism=self.parallelism,
+            hash_len=_DIGEST_BYTES,
+            salt_len=_SALT_BYTES,
+            type=_argon2.Type.ID,
+        )
+
+    def hash(self, password: str) -> str:
+        return self._hasher.hash(password)
+
+    def verify(self, password: str, encoded: str) -> bool:
+        try:
+            return self._hasher.verify(encoded, password)
+        except (_Argon2VerificationError, _Argon2InvalidHashError):
+            return False
+
+    def needs_rehash(self, encoded: str) -> bool:
+        return not encoded.startswith(f"${self.scheme}$") or self._hasher.check_needs_rehash(encoded)
+
+    def describe(self) -> dict[str, Any]:
+        return {
+            "scheme": self.scheme,
+            "time_cost": self.time_cost,
+            "memory_cost_kib": self.memory_cost_kib,
+            "parallelism": self.parallelism,
+        }
+
+
+PasswordHasher = Pbkdf2Hasher | ScryptHasher | Argon2Hasher
+
+
+def _scheme_of(encoded: str) -> str:
+    if encoded.startswith("$argon2"):
+        return SCHEME_ARGON2
+    return encoded.split("$", 1)[0]
+
+
+class PasswordHashPolicy:
+    """
+    Versioned password hashes: "<scheme>$<params>$<salt>$<digest>" (argon2 keeps its PHC string).
+
+    New hashes use the current hasher; stored hashes are verified with the scheme
+    and parameters they were written with, and verify() reports when the caller
+    should rehash to the current policy. Hashes written before versioning
+    (bare PBKDF2 digest plus a separate salt column) are still accepted.
+    """
+
+    def __init__(self, current: PasswordHasher, *, legacy_pbkdf2_iterations: int = DEFAULT_PBKDF2_ITERATIONS):
+        self.current = current
+        self.legacy_pbkdf2_iterations = legacy_pbkdf2_iterations
+        # Verification reads cost parameters from the stored hash, so default instances suffice.
+        self._verifiers: dict[str, Callable[[str, str], bool]] = {
+            SCHEME_PBKDF2: Pbkdf2Hasher().verify,
+            SCHEME_SCRYPT: ScryptHasher().verify,
+        }
+        if _argon2 is not None:
+            self._verifiers[SCHEME_ARGON2] = Argon2Hasher().verify
+        self._verifiers[current.scheme] = current.verify
+
+    @classmethod
+    def from_env(cls, get_env: Callable[[str, str | None], str | None] = os.environ.get) -> "PasswordHashPolicy":
+        def _int(name: str, default: int) -> int:
+            return int((get_env(name, str(default)) or str(default)).strip())
+
+        legacy_iterations = _int("AUTH_PASSWORD_ITERATIONS", DEFAULT_PBKDF2_ITERATIONS)
+        scheme = (get_env("AUTH_PASSWORD_SCHEME", SCHEME_SCRYPT) or SCHEME_SCRYPT).strip().lower()
+        if scheme in {"argon2", SCHEME_ARGON2} and not is_argon2_available():
+            logger.warning("[AuthPassword] AUTH_PASSWORD_SCHEME=%s but argon2-cffi is missing; using scrypt.", scheme)
+            scheme = SCHEME_SCRYPT
+
+        current: PasswordHasher
+        if scheme in {"argon2", SCHEME_ARGON2}:
+            current = Argon2Hasher(
+                time_cost=_int("AUTH_ARGON2_TIME_COST", DEFAULT_ARGON2_TIME_COST),
+                memory_cost_kib=_int("AUTH_ARGON2_MEMORY_KIB", DEFAULT_ARGON2_MEMORY_KIB),
+                parallelism=_int("AUTH_ARGON2_PARALLELISM", DEFAULT_ARGON2_PARALLELISM),
+            )
+        elif scheme in {"pbkdf2", SCHEME_PBKDF2}:
+            current = Pbkdf2Hasher(iterations=legacy_iterations)
+        else:
+            current = ScryptHasher(
+                n=_int("AUTH_SCRYPT_N", DEFAULT_SCRYPT_N),
+                r=_int("AUTH_SCRYPT_R", DEFAULT_SCRYPT_R),
+                p=_int("AUTH_SCRYPT_P", DEFAULT_SCRYPT_P),
+            )
+        return cls(current, legacy_pbkdf2_iterations=legacy_iterations)
+
+    def hash(self, password: str) -> str:
+        return self.current.hash(password)
+
+    def verify(self, password: str, stored_hash: str, legacy_salt: str | None = None) -> tuple[bool, bool]:
+        """Return (matches, needs_rehash)."""
+        if "$" not in stored_hash:
+            if not legacy_salt:
+                return False, False
+            digest = hashlib.pbkdf2_hmac(
+                "sha256",
+                password.encode("utf-8"),
+                legacy_salt.encode("utf-8"),
+                self.legacy_pbkdf2_iterations,
+            )
+            matches = hmac.compare_digest(_b64encode(digest), stored_hash)
+            return matches, matches
+
+        verifier = self._verifiers.get(_scheme_of(stored_hash))
+        if verifier is None:
+            logger.warning("[AuthPassword] unsupported stored hash scheme=%s", _scheme_of(stored_hash))
+            return False, False
+        try:
+            matches = verifier(password, stored_hash)
+        except (ValueError, KeyError):
+            return False, False
+        return matches, matches and self.current.needs_rehash(stored_hash)
+
+
+def _time_hash_ms(hasher: PasswordHasher, samples: int) -> float:
+    timings = []
+    for _ in range(max(1, samples)):
+        started_at = time.perf_counter()
+        hasher.hash("calibration-password")
+        timings.append((time.perf_counter() - started_at) * 1000)
+    timings.sort()
+    return timings[len(timings) // 2]
+
+
+def calibrate(
+    scheme: str,
+    *,
+    target_ms: float,
+    samples: int = 3,
+    max_memory_mib: int = 256,
+) -> tuple[PasswordHasher, float]:
+    """Pick the cheapest parameters whose median hash time reaches target_ms."""
+    if scheme in {"pbkdf2", SCHEME_PBKDF2}:
+        probe = Pbkdf2Hasher(iterations=120_000)
+        measured = _time_hash_ms(probe, samples)
+        iterations = max(120_000, int(probe.iterations * target_ms / max(measured, 1e-3)))
+        hasher: PasswordHasher = Pbkdf2Hasher(iterations=iterations)
+        return hasher, _time_hash_ms(hasher, samples)
+
+    if scheme in {"argon2", SCHEME_ARGON2}:
+        memory_cost_kib = min(DEFAULT_ARGON2_MEMORY_KIB, max_memory_mib * 1024)
+        time_cost = 1
+        while True:
+            hasher = Argon2Hasher(time_cost=time_cost, memory_cost_kib=memory_cost_kib)
+            measured = _time_hash_ms(hasher, samples)
+            if measured >= target_ms or time_cost >= 64:
+                return hasher, measured
+            time_cost += 1
+
+    n = 2**12
+    while True:
+        hasher = ScryptHasher(n=n)
+        measured = _time_hash_ms(hasher, samples)
+        next_memory_mib = 128 * hasher.r * n * 2 / (1024 * 1024)
+        if measured >= target_ms or next_memory_mib > max_memory_mib:
+            return hasher, measured
+        n *= 2
@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+import os
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, TypeVar
+
+T = TypeVar("T")
+
+DEFAULT_KDF_WORKERS = 2
+DEFAULT_KDF_MAX_PENDING = 32
+DEFAULT_LOGIN_MAX_CONCURRENT_PER_IP = 2
+
+
+class KdfPoolSaturatedError(RuntimeError):
+    pass
+
+
+class KdfWorkerPool:
+    """
+    Bounded pool for password KDF work.
+
+    The default scrypt (n=2**14, r=8) takes ~50-100 ms of CPU and 128*n*r =
+    16 MiB of memory per hash, so max_workers also caps peak KDF memory.
+    hashlib.scrypt releases the GIL while OpenSSL runs, so worker threads hash
+    in parallel without blocking the event loop; legacy PBKDF2 hashes verified
+    here (hashlib.pbkdf2_hmac) do the same. Submissions beyond max_pending are
+    rejected instead of queueing unbounded login latency.
+    """
+
+    def __init__(self, *, max_workers: int = DEFAULT_KDF_WORKERS, max_pending: int = DEFAULT_KDF_MAX_PENDING):
+        self.max_workers = max(1, max_workers)
+        self.max_pending = max(self.max_workers, max_pending)
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="auth-kdf")
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._running = 0
+        self._completed = 0
+        self._rejected = 0
+        self._wait_ms_total = 0.0
+        self._wait_ms_max = 0.0
+        self._run_ms_total = 0.0
+
+    @classmethod
+    def from_env(cls, get_env: Callable[[str, str | None], str | None] = os.environ.get) -> "KdfWorkerPool":
+        max_workers = int((get_env("AUTH_KDF_WORKERS", str(DEFAULT_KDF_WORKERS)) or str(DEFAULT_KDF_WORKERS)).strip())
+        max_pending = int(
+            (get_env("AUTH_KDF_MAX_PENDING", str(DEFAULT_KDF_MAX_PENDING)) or str(DEFAULT_KDF_MAX_PENDING)).strip()
+        )
+        return cls(max_workers=max_workers, max_pending=max_pending)
+
+    def run(self, fn: Callable[..., T], *args: Any) -> T:
+        """Run fn(*args) on a KDF worker and block the calling thread until it finishes."""
+        with self._lock:
+            if self._queued + self._running >= self.max_pending:
+                self._rejected += 1
+                raise KdfPoolSaturatedError("KDF worker pool is saturated.")
+            self._queued += 1
+        submitted_at = time.perf_counter()
+
+        def _job() -> T:
+            started_at = time.perf_counter()
+            with self._lock:
+                self._queued -= 1
+                self._running += 1
+                wait_ms = (started_at - submitted_at) * 1000
+                self._wait_ms_total += wait_ms
+                self._wait_ms_max = max(self._wait_ms_max, wait_ms)
+            try:
+                return fn(*args)
+            finally:
+                with self._lock:
+                    self._running -= 1
+                    self._completed += 1
+                    self._run_ms_total += (time.perf_counter() - started_at) * 1000
+
+        try:
+            future = self._executor.submit(_job)
+        except RuntimeError:
+            with self._lock:
+                self._queued -= 1
+            raise
+        return future.result()
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            completed = self._completed
+            return {
+                "workers": self.max_workers,
+                "queued": self._queued,
+                "running": self._running,
+                "completed": completed,
+                "rejected": self._rejected,
+                "wait_ms_avg": round(self._wait_ms_total / completed, 2) if completed else 0.0,
+                "wait_ms_max": round(self._wait_ms_max, 2),
+                "run_ms_avg": round(self._run_ms_total / completed, 2) if completed else 0.0,
+            }
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+class PerKeyConcurrencyLimiter:
+    """Caps concurrent in-flight operations per key (e.g. client IP for logins)."""
+
+    def __init__(self, max_per_key: int = DEFAULT_LOGIN_MAX_CONCURRENT_PER_IP):
+        self.max_per_key = max(1, max_per_key)
+        self._in_flight: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def try_acquire(self, key: str) -> bool:
+        with self._lock:
+            current = self._in_flight.get(key, 0)
+            if current >= self.max_per_key:
+                return False
+            self._in_flight[key] = current + 1
+            return True
+
+    def release(self, key: str) -> None:
+        with self._lock:
+            remaining = self._in_flight.get(key, 0) - 1
+            if remaining > 0:
+                self._in_flight[key] = remaining
+            else:
+                self._in_flight.pop(key, None)
+
+    def in_flight(self, key: str) -> int:
+        with self._lock:
+            return self._in_flight.get(key, 0)
@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field, fields
+from datetime import datetime, timezone
+from typing import Any, Literal
+
+RefreshStatus = Literal["active", "used", "revoked", "expired"]
+
+# Single index bucket so every worker can list the (short-lived) revocations.
+REVOCATION_SCOPE = "signed_access"
+
+
+def _utc_now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+@dataclass(slots=True)
+class AuthUser:
+    user_id: str
+    email: str
+    display_name: str | None
+    provider: str
+    provider_subject: str | None
+    locale: str
+    created_at: datetime = field(default_factory=_utc_now)
+    updated_at: datetime = field(default_factory=_utc_now)
+    password_salt: str | None = None
+    password_hash: str | None = None
+    email_verified_at: datetime | None = None
+
+
+@dataclass(slots=True)
+class UserProfile:
+    user_id: str
+    email: str
+    display_name: str | None
+    locale: str
+    timezone: str
+    created_at: datetime = field(default_factory=_utc_now)
+    updated_at: datetime = field(default_factory=_utc_now)
+
+
+@dataclass(slots=True)
+class ProviderLink:
+    provider_key: str
+    user_id: str
+
+
+@dataclass(slots=True)
+class SessionRecord:
+    session_id: str
+    family_id: str
+    user_id: str
+    provider: str
+    device_id: str | None
+    created_at: datetime = field(default_factory=_utc_now)
+    revoked_at: datetime | None = None
+    revoked_reason: str | None = None
+    # Expiry of the session's newest refresh token.
+    expires_at: datetime | None = None
+
+
+@dataclass(slots=True)
+class AccessTokenRecord:
+    # token holds the token digest: raw bearer tokens are never stored.
+    token: str
+    user_id: str
+    session_id: str
+    expires_at: datetime
+    created_at: datetime = field(default_factory=_utc_now)
+    revoked: bool = False
+
+
+@dataclass(slots=True)
+class RefreshTokenRecord:
+    token: str
+    user_id: str
+    session_id: str
+    family_id: str
+    expires_at: datetime
+    created_at: datetime = field(default_factory=_utc_now)
+    status: RefreshStatus = "active"
+    used_at: datetime | None = None
+    replaced_by: str | None = None
+
+
+@dataclass(slots=True)
+class EmailVerificationRecord:
+    verification_id: str
+    user_id: str
+    email: str
+    code_hash: str
+    expires_at: datetime
+    created_at: datetime = field(default_factory=_utc_now)
+    consumed_at: datetime | None = None
+    failed_attempts: int = 0
+
+
+@dataclass(slots=True)
+class PasswordResetRecord:
+    reset_id: str
+    user_id: str
+    email: str
+    code_hash: str
+    expires_at: datetime
+    created_at: datetime = field(default_factory=_utc_now)
+    consumed_at: datetime | None = None
+    failed_attempts: int = 0
+
+
+@dataclass(slots=True)
+class SessionRevocationRecord:
+    # Published for signed access tokens; expires_at is when the session's last one expires.
+    session_id: str
+    expires_at: datetime
+    scope: str = REVOCATION_SCOPE
+
+
+def record_to_payload(record: Any) -> dict[str, Any]:
+    payload: dict[str, Any] = {}
+    for item in fields(record):
+        value = getattr(record, item.name)
+        payload[item.name] = value.isoformat() if isinstance(value, datetime) else value
+    return payload
+
+
+def record_from_payload(record_type: type, payload: dict[str, Any]) -> Any:
+    values = dict(payload)
+    for item in fields(record_type):
+        # Every datetime field on these records is named *_at.
+        if item.name.endswith("_at") and isinstance(values.get(item.name), str):
+            values[item.name] = datetime.fromisoformat(values[item.name])
+    return record_type(**values)
@@ -5,24 +5,64 @@ import hashlib
 import hmac
 import os
 import secrets
+import time
 from collections.abc import Callable
-from dataclasses import dataclass, field
 from datetime import datetime, timedelta, timezone
-from threading import RLock
-from typing import Literal
+from threading import Lock, RLock
 from uuid import uuid4
+from .access_tokens import (
+    ACCESS_TOKEN_FORMAT_OPAQUE,
+    ACCESS_TOKEN_FORMAT_SIGNED,
+    AccessTokenClaims,
+    AccessTokenError,
+    AccessTokenExpiredError,
+    SessionDenylist,
+    SignedAccessTokenCodec,
+)
+from .attempt_limiter import (
+    DEFAULT_CODE_ATTEMPT_WINDOW_SECONDS,
+    DEFAULT_CODE_ATTEMPTS_PER_EMAIL,
+    DEFAULT_CODE_ATTEMPTS_PER_IP,
+    AttemptRateLimitedError,
+    SlidingWindowAttemptLimiter,
+)
 from .email_sender import (
     EmailVerificationDeliveryError,
     EmailVerificationSender,
     LoggingEmailVerificationSender,
+    VERIFICATION_EMAIL_EVENT,
     build_email_verification_sender_from_env,
 )
-
-RefreshStatus = Literal["active", "used", "revoked", "expired"]
-
-
-def _utc_now() -> datetime:
-    return datetime.now(timezone.utc)
+from .password_hashing import PasswordHashPolicy, ScryptHasher
+from .password_kdf import KdfPoolSaturatedError, KdfWorkerPool
+from .records import (
+    REVOCATION_SCOPE,
+    AccessTokenRecord,
+    AuthUser,
+    EmailVerificationRecord,
+    PasswordResetRecord,
+    ProviderLink,
+    RefreshTokenRecord,
+    SessionRecord,
+    SessionRevocationRecord,
+    UserProfile,
+    _utc_now,
+)
+from .storage import (
+    NS_ACCESS_TOKENS,
+    NS_EMAIL_VERIFICATIONS,
+    NS_PASSWORD_RESETS,
+    NS_PROFILES,
+    NS_PROVIDER_LINKS,
+    NS_REFRESH_TOKENS,
+    NS_SESSION_REVOCATIONS,
+    NS_SESSIONS,
+    NS_USERS,
+    AuthStateStore,
+    CachedAuthStateStore,
+    InMemoryAuthStateStore,
+    build_auth_state_store_from_env,
+)
 
 
 def _to_iso8601(value: datetime) -> str:
@@ -37,6 +77,11 @@ def _random_token(prefix: str) -> str:
     return f"{prefix}_{secrets.token_urlsafe(32)}"
 
 
+def _token_key(token: str) -> str:
+    # Stores are keyed by digest so a leaked store never exposes usable bearer tokens.
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
 def _parse_csv(raw: str | None) -> set[str]:
     if not raw:
         return set()
@@ -44,97 +89,21 @@ def _parse_csv(raw: str | None) -> set[str]:
 
 
 class AuthServiceError(Exception):
-    def __init__(self, *, code: str, message: str, status_code: int, user_id: str | None = None):
+    def __init__(
+        self,
+        *,
+        code: str,
+        message: str,
+        status_code: int,
+        user_id: str | None = None,
+        retry_after_seconds: int | None = None,
+    ):
         super().__init__(message)
         self.code = code
         self.message = message
         self.status_code = status_code
         self.user_id = user_id
-
-
-@dataclass(slots=True)
-class AuthUser:
-    user_id: str
-    email: str
-    display_name: str | None
-    provider: str
-    provider_subject: str | None
-    locale: str
-    created_at: datetime = field(default_factory=_utc_now)
-    updated_at: datetime = field(default_factory=_utc_now)
-    password_salt: str | None = None
-    password_hash: str | None = None
-    email_verified_at: datetime | None = None
-
-
-@dataclass(slots=True)
-class UserProfile:
-    user_id: str
-    email: str
-    display_name: str | None
-    locale: str
-    timezone: str
-    created_at: datetime = field(default_factory=_utc_now)
-    updated_at: datetime = field(default_factory=_utc_now)
-
-
-@dataclass(slots=True)
-class SessionRecord:
-    session_id: str
-    family_id: str
-    user_id: str
-    provider: str
-    device_id: str | None
-    created_at: datetime = field(default_factory=_utc_now)
-    revoked_at: datetime | None = None
-    revoked_reason: str | None = None
-
-
-@dataclass(slots=True)
-class AccessTokenRecord:
-    token: str
-    user_id: str
-    session_id: str
-    expires_at: datetime
-    created_at: datetime = field(default_factory=_utc_now)
-    revoked: bool = False
-
-
-@dataclass(slots=True)
-class RefreshTokenRecord:
-    token: str
-    user_id: str
-    session_id: str
-    family_id: str
-    expires_at: datetime
-    created_at: datetime = field(default_factory=_utc_now)
-    status: RefreshStatus = "active"
-    used_at: datetime | None = None
-    replaced_by: str | None = None
-
-
-@dataclass(slots=True)
-class EmailVerificationRecord:
-    verification_id: str
-    user_id: str
-    email: str
-    code_hash: str
-    expires_at: datetime
-    created_at: datetime = field(default_factory=_utc_now)
-    consumed_at: datetime | None = None
-    failed_attempts: int = 0
-
-
-@dataclass(slots=True)
-class PasswordResetRecord:
-    reset_id: str
-    user_id: str
-    email: str
-    code_hash: str
-    expires_at: datetime
-    created_at: datetime = field(default_factory=_utc_now)
-    consumed_at: datetime | None = None
-    failed_attempts: int = 0
+        self.retry_after_seconds = retry_after_seconds
 
 
 class InMemoryAuthSessionService:
@@ -153,10 +122,22 @@ class InMemoryAuthSessionService:
         password_reset_debug_code_enabled: bool = False,
         email_verification_sender: EmailVerificationSender | None = None,
         allowed_redirects_by_provider: dict[str, set[str]] | None = None,
+        kdf_pool: KdfWorkerPool | None = None,
+        password_hash_policy: PasswordHashPolicy | None = None,
+        state_store: AuthStateStore | None = None,
+        expired_token_retention_seconds: int = 3600,
+        access_token_codec: SignedAccessTokenCodec | None = None,
+        revocation_sync_interval_seconds: float = 5.0,
+        code_digest_key: bytes | None = None,
+        code_attempts_per_ip: int = DEFAULT_CODE_ATTEMPTS_PER_IP,
+        code_attempts_per_email: int = DEFAULT_CODE_ATTEMPTS_PER_EMAIL,
+        code_attempt_window_seconds: int = DEFAULT_CODE_ATTEMPT_WINDOW_SECONDS,
     ):
         self.access_ttl_seconds = max(60, access_ttl_seconds)
         self.refresh_ttl_seconds = max(24 * 60 * 60, refresh_ttl_days * 24 * 60 * 60)
         self.password_iterations = max(120_000, password_iterations)
+        # Expired tokens stay resolvable this long so clients still get *_EXPIRED, not *_INVALID.
+        self.expired_token_retention_seconds = max(0, expired_token_retention_seconds)
         self.email_verification_required = email_verification_required
         self.email_verification_code_ttl_seconds = max(60, email_verification_code_ttl_seconds)
         self.email_verification_max_attempts = max(1, email_verification_max_attempts)
@@ -165,32 +146,54 @@ class InMemoryAuthSessionService:
         self.password_reset_max_attempts = max(1, password_reset_max_attempts)
         self.password_reset_debug_code_enabled = password_reset_debug_code_enabled
         self._email_verification_sender = email_verification_sender or LoggingEmailVerificationSender()
+        # Senders predating the hook deliver synchronously and need none.
+        set_undeliverable_handler = getattr(self._email_verification_sender, "set_undeliverable_handler", None)
+        if set_undeliverable_handler is not None:
+            set_undeliverable_handler(self._on_email_undeliverable)
         self.allowed_redirects_by_provider = {
             key: set(value)
             for key, value in (allowed_redirects_by_provider or {}).items()
         }
+        # Password hashing runs here, never while holding _lock.
+        self.kdf_pool = kdf_pool or KdfWorkerPool()
+        # password_iterations only applies to legacy (pre-versioning) PBKDF2 hashes.
+        self.password_hash_policy = password_hash_policy or PasswordHashPolicy(
+            ScryptHasher(),
+            legacy_pbkdf2_iterations=self.password_iterations,
+        )
 
-        self._users_by_id: dict[str, AuthUser] = {}
-        self._user_id_by_email: dict[str, str] = {}
-        self._provider_subject_to_user_id: dict[str, str] = {}
-        self._profiles_by_user_id: dict[str, UserProfile] = {}
-
-        self._sessions: dict[str, SessionRecord] = {}
-        self._session_ids_by_family: dict[str, set[str]] = {}
-        self._access_tokens: dict[str, AccessTokenRecord] = {}
-        self._refresh_tokens: dict[str, RefreshTokenRecord] = {}
-        self._access_tokens_by_session: dict[str, set[str]] = {}
-        self._refresh_tokens_by_session: dict[str, set[str]] = {}
-        self._email_verifications_by_user_id: dict[str, EmailVerificationRecord] = {}
-        self._password_resets_by_user_id: dict[str, PasswordResetRecord] = {}
-
+        # Users, sessions, tokens and codes; memory by default, SQLite/Redis to share across workers.
+        self._store: AuthStateStore = state_store or InMemoryAuthStateStore()
+        # Serializes read-modify-write within this process; cross-worker invariants use store claims.
         self._lock = RLock()
 
+        # With a codec, access tokens are signed and verified locally; revoked sessions go
+        # through the denylist, refreshed from the store at most every sync interval.
+        self.access_token_codec = access_token_codec
+        self.revocation_sync_interval_seconds = max(0.0, revocation_sync_interval_seconds)
+        self._denylist = SessionDenylist()
+        self._denylist_synced_at: float | None = None
+        self._denylist_sync_lock = Lock()
+
+        # Codes are 6 digits, so a bare SHA-256 of them is trivially reversible from a leaked
+        # store; digests are keyed. The keyed state is built once and copied per digest.
+        self._code_digest = hmac.new(code_digest_key or secrets.token_bytes(32), digestmod=hashlib.sha256)
+        # Verification/reset attempts are admitted per client IP and per email digest before
+        # any code hashing or _lock, so a guessing flood is turned away cheaply.
+        self.attempt_limiter = SlidingWindowAttemptLimiter(
+            self._store,
+            limits={"ip": code_attempts_per_ip, "email": code_attempts_per_email},
+            window_seconds=code_attempt_window_seconds,
+        )
+
     @classmethod
     def from_env(cls, get_env: Callable[[str, str | None], str | None] = os.environ.get) -> "InMemoryAuthSessionService":
         access_ttl_seconds = int((get_env("AUTH_ACCESS_TOKEN_TTL_SECONDS", "900") or "900").strip())
         refresh_ttl_days = int((get_env("AUTH_REFRESH_TOKEN_TTL_DAYS", "30") or "30").strip())
         password_iterations = int((get_env("AUTH_PASSWORD_ITERATIONS", "390000") or "390000").strip())
+        expired_token_retention_seconds = int(
+            (get_env("AUTH_EXPIRED_TOKEN_RETENTION_SECONDS", "3600") or "3600").strip()
+        )
         email_verification_required = (get_env("AUTH_EMAIL_VERIFICATION_REQUIRED", "1") or "1").strip() != "0"
         email_verification_code_ttl_seconds = int(
             (get_env("AUTH_EMAIL_VERIFICATION_CODE_TTL_SECONDS", "600") or "600").strip()
@@ -215,6 +218,45 @@ class InMemoryAuthSessionService:
             email_verification_debug_code_enabled = False
         if email_delivery_mode == "smtp" and password_reset_debug_code_enabled:
             password_reset_debug_code_enabled = False
+        access_token_format = (
+            get_env("AUTH_ACCESS_TOKEN_FORMAT", ACCESS_TOKEN_FORMAT_OPAQUE) or ACCESS_TOKEN_FORMAT_OPAQUE
+        ).strip().lower()
+        if access_token_format not in {ACCESS_TOKEN_FORMAT_OPAQUE, ACCESS_TOKEN_FORMAT_SIGNED}:
+            raise ValueError(f"Unsupported AUTH_ACCESS_TOKEN_FORMAT: {access_token_format}")
+        access_token_codec = (
+            SignedAccessTokenCodec.from_env(get_env) if access_token_format == ACCESS_TOKEN_FORMAT_SIGNED else None
+        )
+        revocation_sync_interval_seconds = float(
+            (get_env("AUTH_REVOCATION_SYNC_INTERVAL_SECONDS", "5") or "5").strip()
+        )
+        state_store = build_auth_state_store_from_env(get_env)
+        raw_code_digest_key = (get_env("AUTH_CODE_DIGEST_KEY", None) or "").strip()
+        if not raw_code_digest_key and state_store.backend != "memory":
+            # Workers sharing a store must agree on the key, or codes fail on the other worker.
+            raise ValueError("AUTH_CODE_DIGEST_KEY is required with a shared AUTH_STATE_BACKEND.")
+        code_digest_key = (
+            base64.urlsafe_b64decode(raw_code_digest_key + "=" * (-len(raw_code_digest_key) % 4))
+            if raw_code_digest_key
+            else None
+        )
+        code_attempts_per_ip = int(
+            (
+                get_env("AUTH_CODE_ATTEMPTS_PER_IP", str(DEFAULT_CODE_ATTEMPTS_PER_IP))
+                or str(DEFAULT_CODE_ATTEMPTS_PER_IP)
+            ).strip()
+        )
+        code_attempts_per_email = int(
+            (
+                get_env("AUTH_CODE_ATTEMPTS_PER_EMAIL", str(DEFAULT_CODE_ATTEMPTS_PER_EMAIL))
+                or str(DEFAULT_CODE_ATTEMPTS_PER_EMAIL)
+            ).strip()
+        )
+        code_attempt_window_seconds = int(
+            (
+                get_env("AUTH_CODE_ATTEMPT_WINDOW_SECONDS", str(DEFAULT_CODE_ATTEMPT_WINDOW_SECONDS))
+                or str(DEFAULT_CODE_ATTEMPT_WINDOW_SECONDS)
+            ).strip()
+        )
         allowed_redirects_by_provider = {
             "google": _parse_csv(get_env("AUTH_GOOGLE_ALLOWED_REDIRECT_URIS", None)),
             "kakao": _parse_csv(get_env("AUTH_KAKAO_ALLOWED_REDIRECT_URIS", None)),
@@ -232,6 +274,16 @@ class InMemoryAuthSessionService:
             password_reset_debug_code_enabled=password_reset_debug_code_enabled,
             email_verification_sender=email_verification_sender,
             allowed_redirects_by_provider=allowed_redirects_by_provider,
+            kdf_pool=KdfWorkerPool.from_env(get_env),
+            password_hash_policy=PasswordHashPolicy.from_env(get_env),
+            state_store=state_store,
+            expired_token_retention_seconds=expired_token_retention_seconds,
+            access_token_codec=access_token_codec,
+            revocation_sync_interval_seconds=revocation_sync_interval_seconds,
+            code_digest_key=code_digest_key,
+            code_attempts_per_ip=code_attempts_per_ip,
+            code_attempts_per_email=code_attempts_per_email,
+            code_attempt_window_seconds=code_attempt_window_seconds,
         )
 
     def signup_email(
@@ -248,20 +300,19 @@ class InMemoryAuthSessionService:
         self._validate_password(password)
 
         with self._lock:
-            if normalized_email in self._user_id_by_email:
-                raise AuthServiceError(
-                    code="AUTH_EMAIL_ALREADY_EXISTS",
-                    message="Email is already registered.",
-                    status_code=409,
-                )
+            self._ensure_email_available(normalized_email)
+        password_credentials = self._create_password_credentials(password)
 
+        with self._lock:
+            # Re-check: a concurrent signup may have claimed the email while hashing.
+            self._ensure_email_available(normalized_email)
             user = self._create_user(
                 email=normalized_email,
                 display_name=display_name,
                 provider="email",
                 provider_subject=None,
                 locale=locale,
-                password=password,
+                password_credentials=password_credentials,
                 email_verified_at=None if self.email_verification_required else _utc_now(),
             )
             if not self.email_verification_required:
@@ -283,10 +334,7 @@ class InMemoryAuthSessionService:
                 user_id=user.user_id,
             )
         except EmailVerificationDeliveryError as error:
-            with self._lock:
-                pending_user = self._users_by_id.get(user.user_id)
-                if pending_user and pending_user.email_verified_at is None:
-                    self._rollback_unverified_user(pending_user)
+            self._rollback_pending_signup(user.user_id)
             raise AuthServiceError(
                 code="AUTH_EMAIL_VERIFICATION_DELIVERY_FAILED",
                 message="Failed to deliver verification email.",
@@ -299,29 +347,46 @@ class InMemoryAuthSessionService:
     def login_email(self, *, email: str, password: str, device_id: str | None) -> dict[str, object]:
         normalized_email = self._normalize_email(email)
         with self._lock:
-            user_id = self._user_id_by_email.get(normalized_email)
-            if not user_id:
+            user = self._find_user_by_email(normalized_email)
+            if user is None:
                 raise AuthServiceError(
                     code="AUTH_INVALID_CREDENTIALS",
                     message="Invalid email or password.",
                     status_code=401,
                 )
 
-            user = self._users_by_id[user_id]
-            if not user.password_hash or not user.password_salt:
+            if not user.password_hash:
                 raise AuthServiceError(
                     code="AUTH_INVALID_CREDENTIALS",
                     message="Invalid email or password.",
                     status_code=401,
                     user_id=user.user_id,
                 )
-            if not self._verify_password(password, user.password_salt, user.password_hash):
+            password_salt, password_hash = user.password_salt, user.password_hash
+
+        password_valid, needs_rehash = self._verify_password(password, password_salt, password_hash)
+        rehashed_credentials = None
+        if password_valid and needs_rehash:
+            try:
+                rehashed_credentials = self._create_password_credentials(password)
+            except AuthServiceError:
+                # KDF pool busy: keep the old hash and upgrade on a later login.
+                rehashed_credentials = None
+
+        with self._lock:
+            # A password reset that landed while hashing invalidates this check.
+            current = self._get_for_write(NS_USERS, user.user_id)
+            if not password_valid or current is None or current.password_hash != password_hash:
                 raise AuthServiceError(
                     code="AUTH_INVALID_CREDENTIALS",
                     message="Invalid email or password.",
                     status_code=401,
                     user_id=user.user_id,
                 )
+            user = current
+            if rehashed_credentials is not None:
+                user.password_salt, user.password_hash = rehashed_credentials
+                self._store.put(NS_USERS, user.user_id, user)
             if self.email_verification_required and user.email_verified_at is None:
                 raise AuthServiceError(
                     code="AUTH_EMAIL_NOT_VERIFIED",
@@ -330,7 +395,8 @@ class InMemoryAuthSessionService:
                     user_id=user.user_id,
                 )
 
-            return self._create_session_bundle(user=user, provider="email", device_id=device_id)
+        # A new session shares no records with other requests; issue it unlocked.
+        return self._create_session_bundle(user=user, provider="email", device_id=device_id)
 
     def verify_email(
         self,
@@ -338,6 +404,7 @@ class InMemoryAuthSessionService:
         email: str,
         code: str,
         device_id: str | None,
+        client_ip: str | None = None,
     ) -> dict[str, object]:
         normalized_email = self._normalize_email(email)
         normalized_code = code.strip()
@@ -347,18 +414,18 @@ class InMemoryAuthSessionService:
                 message="Invalid verification code.",
                 status_code=400,
             )
+        self._admit_code_attempt(normalized_email, client_ip)
 
         now = _utc_now()
         with self._lock:
-            user_id = self._user_id_by_email.get(normalized_email)
-            if not user_id:
+            user = self._find_user_by_email(normalized_email)
+            if user is None:
                 raise AuthServiceError(
                     code="AUTH_EMAIL_VERIFICATION_NOT_FOUND",
                     message="Verification request not found.",
                     status_code=404,
                 )
 
-            user = self._users_by_id[user_id]
             if user.provider != "email":
                 raise AuthServiceError(
                     code="AUTH_PROVIDER_UNSUPPORTED",
@@ -375,7 +442,7 @@ class InMemoryAuthSessionService:
                     user_id=user.user_id,
                 )
 
-            record = self._email_verifications_by_user_id.get(user.user_id)
+            record = self._store.get(NS_EMAIL_VERIFICATIONS, user.user_id)
             if record is None or record.consumed_at is not None or record.expires_at <= now:
                 raise AuthServiceError(
                     code="AUTH_EMAIL_VERIFICATION_EXPIRED",
@@ -392,12 +459,14 @@ class InMemoryAuthSessionService:
                 record.failed_attempts += 1
                 if record.failed_attempts >= self.email_verification_max_attempts:
                     record.consumed_at = now
+                    self._store.put(NS_EMAIL_VERIFICATIONS, user.user_id, record, purge_at=record.expires_at)
                     raise AuthServiceError(
                         code="AUTH_EMAIL_VERIFICATION_LOCKED",
                         message="Too many invalid verification attempts.",
                         status_code=429,
                         user_id=user.user_id,
                     )
+                self._store.put(NS_EMAIL_VERIFICATIONS, user.user_id, record, purge_at=record.expires_at)
                 raise AuthServiceError(
                     code="AUTH_EMAIL_VERIFICATION_INVALID",
                     message="Invalid verification code.",
@@ -405,22 +474,32 @@ class InMemoryAuthSessionService:
                     user_id=user.user_id,
                 )
 
+            # Single use across workers: only the first verifier gets a session.
+            if not self._store.claim(f"consume:{record.verification_id}", purge_at=record.expires_at):
+                raise AuthServiceError(
+                    code="AUTH_EMAIL_VERIFICATION_EXPIRED",
+                    message="Verification code expired. Please sign up again.",
+                    status_code=400,
+                    user_id=user.user_id,
+                )
             record.consumed_at = now
+            self._store.put(NS_EMAIL_VERIFICATIONS, user.user_id, record, purge_at=record.expires_at)
             user.email_verified_at = now
             user.updated_at = now
-            return self._create_session_bundle(user=user, provider="email", device_id=device_id)
+            self._store.put(NS_USERS, user.user_id, user)
+
+        return self._create_session_bundle(user=user, provider="email", device_id=device_id)
 
     def request_password_reset(self, *, email: str) -> dict[str, object]:
         normalized_email = self._normalize_email(email)
         self._validate_email(normalized_email)
 
         with self._lock:
-            user_id = self._user_id_by_email.get(normalized_email)
-            if not user_id:
+            user = self._find_user_by_email(normalized_email)
+            if user is None:
                 return self._serialize_password_reset_challenge(record=None)
 
-            user = self._users_by_id[user_id]
-            if user.provider != "email" or not user.password_hash or not user.password_salt:
+            if user.provider != "email" or not user.password_hash:
                 return self._serialize_password_reset_challenge(record=None)
 
             record, reset_code = self._issue_password_reset(user=user)
@@ -437,9 +516,9 @@ class InMemoryAuthSessionService:
             )
         except EmailVerificationDeliveryError as error:
             with self._lock:
-                pending_reset = self._password_resets_by_user_id.get(user.user_id)
+                pending_reset = self._store.get(NS_PASSWORD_RESETS, user.user_id)
                 if pending_reset and pending_reset.reset_id == record.reset_id and pending_reset.consumed_at is None:
-                    self._password_resets_by_user_id.pop(user.user_id, None)
+                    self._store.delete(NS_PASSWORD_RESETS, user.user_id)
             raise AuthServiceError(
                 code="AUTH_PASSWORD_RESET_DELIVERY_FAILED",
                 message="Failed to deliver password reset email.",
@@ -455,6 +534,7 @@ class InMemoryAuthSessionService:
         email: str,
         code: str,
         new_password: str,
+        client_ip: str | None = None,
     ) -> dict[str, object]:
         normalized_email = self._normalize_email(email)
         normalized_code = code.strip()
@@ -466,19 +546,19 @@ class InMemoryAuthSessionService:
                 message="Invalid password reset code.",
                 status_code=400,
             )
+        self._admit_code_attempt(normalized_email, client_ip)
 
         now = _utc_now()
         with self._lock:
-            user_id = self._user_id_by_email.get(normalized_email)
-            if not user_id:
+            user = self._find_user_by_email(normalized_email)
+            if user is None:
                 raise AuthServiceError(
                     code="AUTH_PASSWORD_RESET_INVALID",
                     message="Invalid password reset code.",
                     status_code=400,
                 )
 
-            user = self._users_by_id[user_id]
-            if user.provider != "email" or not user.password_hash or not user.password_salt:
+            if user.provider != "email" or not user.password_hash:
                 raise AuthServiceError(
                     code="AUTH_PASSWORD_RESET_INVALID",
                     message="Invalid password reset code.",
@@ -486,7 +566,7 @@ class InMemoryAuthSessionService:
                     user_id=user.user_id,
                 )
 
-            record = self._password_resets_by_user_id.get(user.user_id)
+            record = self._store.get(NS_PASSWORD_RESETS, user.user_id)
             if record is None or record.consumed_at is not None or record.expires_at <= now:
                 raise AuthServiceError(
                     code="AUTH_PASSWORD_RESET_EXPIRED",
@@ -503,12 +583,14 @@ class InMemoryAuthSessionService:
                 record.failed_attempts += 1
                 if record.failed_attempts >= self.password_reset_max_attempts:
                     record.consumed_at = now
+                    self._store.put(NS_PASSWORD_RESETS, user.user_id, record, purge_at=record.expires_at)
                     raise AuthServiceError(
                         code="AUTH_PASSWORD_RESET_LOCKED",
                         message="Too many invalid password reset attempts.",
                         status_code=429,
                         user_id=user.user_id,
                     )
+                self._store.put(NS_PASSWORD_RESETS, user.user_id, record, purge_at=record.expires_at)
                 raise AuthServiceError(
                     code="AUTH_PASSWORD_RESET_INVALID",
                     message="Invalid password reset code.",
@@ -516,9 +598,32 @@ class InMemoryAuthSessionService:
                     user_id=user.user_id,
                 )
 
+            consume_key = f"consume:{record.reset_id}"
+            if not self._store.claim(consume_key, purge_at=record.expires_at):
+                raise AuthServiceError(
+                    code="AUTH_PASSWORD_RESET_EXPIRED",
+                    message="Password reset code expired.",
+                    status_code=400,
+                    user_id=user.user_id,
+                )
             record.consumed_at = now
-            user.password_salt, user.password_hash = self._create_password_credentials(new_password)
-            user.updated_at = now
+            self._store.put(NS_PASSWORD_RESETS, user.user_id, record, purge_at=record.expires_at)
+
+        try:
+            password_credentials = self._create_password_credentials(new_password)
+        except AuthServiceError:
+            # KDF pool saturated: keep the code usable for a retry.
+            with self._lock:
+                record.consumed_at = None
+                self._store.put(NS_PASSWORD_RESETS, user.user_id, record, purge_at=record.expires_at)
+                self._store.release(consume_key)
+            raise
+
+        with self._lock:
+            user = self._get_for_write(NS_USERS, user.user_id) or user
+            user.password_salt, user.password_hash = password_credentials
+            user.updated_at = _utc_now()
+            self._store.put(NS_USERS, user.user_id, user)
             revoked_sessions = self._revoke_sessions_for_user(user.user_id, reason="password_reset")
 
             return {
@@ -583,18 +688,17 @@ class InMemoryAuthSessionService:
         provider_key = f"{provider_normalized}:{subject}"
 
         with self._lock:
-            user_id = self._provider_subject_to_user_id.get(provider_key)
-            user: AuthUser
-            if user_id:
-                user = self._users_by_id[user_id]
-            else:
+            link = self._store.get(NS_PROVIDER_LINKS, provider_key)
+            user: AuthUser | None = self._get_for_write(NS_USERS, link.user_id) if link else None
+            if user is None:
                 normalized_email = self._normalize_email(email or f"{provider_normalized}_{subject}@foodlens.local")
-                existing_by_email = self._user_id_by_email.get(normalized_email)
+                existing_by_email = self._find_user_by_email(normalized_email)
                 if existing_by_email:
-                    user = self._users_by_id[existing_by_email]
+                    user = existing_by_email
                     user.provider = provider_normalized
                     user.provider_subject = subject
                     user.updated_at = _utc_now()
+                    self._store.put(NS_USERS, user.user_id, user)
                 else:
                     user = self._create_user(
                         email=normalized_email,
@@ -602,20 +706,22 @@ class InMemoryAuthSessionService:
                         provider=provider_normalized,
                         provider_subject=subject,
                         locale="ko-KR",
-                        password=None,
+                        password_credentials=None,
                         email_verified_at=_utc_now(),
                     )
-                self._provider_subject_to_user_id[provider_key] = user.user_id
+                self._store.put(NS_PROVIDER_LINKS, provider_key, ProviderLink(provider_key=provider_key, user_id=user.user_id))
 
             if user.email_verified_at is None:
                 user.email_verified_at = _utc_now()
+                self._store.put(NS_USERS, user.user_id, user)
 
-            return self._create_session_bundle(user=user, provider=provider_normalized, device_id=device_id)
+        return self._create_session_bundle(user=user, provider=provider_normalized, device_id=device_id)
 
     def refresh(self, *, refresh_token: str) -> dict[str, object]:
         now = _utc_now()
+        refresh_key = _token_key(refresh_token)
         with self._lock:
-            record = self._refresh_tokens.get(refresh_token)
+            record = self._store.get(NS_REFRESH_TOKENS, refresh_key)
             if record is None:
                 raise AuthServiceError(
                     code="AUTH_REFRESH_INVALID",
@@ -623,7 +729,7 @@ class InMemoryAuthSessionService:
                     status_code=401,
                 )
 
-            session = self._sessions.get(record.session_id)
+            session = self._store.get(NS_SESSIONS, record.session_id)
             if session is None or session.revoked_at is not None:
                 raise AuthServiceError(
                     code="AUTH_SESSION_REVOKED",
@@ -634,6 +740,7 @@ class InMemoryAuthSessionService:
 
             if record.expires_at <= now:
                 record.status = "expired"
+                self._save_token(NS_REFRESH_TOKENS, record)
                 raise AuthServiceError(
                     code="AUTH_REFRESH_EXPIRED",
                     message="Refresh token has expired.",
@@ -641,7 +748,11 @@ class InMemoryAuthSessionService:
                     user_id=record.user_id,
                 )
 
-            if record.status != "active":
+            # The claim makes rotation single-use across workers, not just within this process.
+            if record.status != "active" or not self._store.claim(
+                f"rotate:{refresh_key}",
+                purge_at=self._token_purge_at(record.expires_at),
+            ):
                 self._revoke_family(record.family_id, reason="refresh_reuse_detected")
                 raise AuthServiceError(
                     code="AUTH_REFRESH_REUSED",
@@ -652,97 +763,131 @@ class InMemoryAuthSessionService:
 
             record.status = "used"
             record.used_at = now
-            user = self._users_by_id.get(record.user_id)
+            user = self._store.get(NS_USERS, record.user_id)
             if user is None:
+                self._save_token(NS_REFRESH_TOKENS, record)
                 raise AuthServiceError(
                     code="AUTH_USER_NOT_FOUND",
                     message="User not found.",
                     status_code=404,
                 )
 
+            # Still locked: _issue_tokens re-saves this existing session, which must not
+            # overwrite a revocation (logout, reuse detection) landing meanwhile.
             bundle = self._issue_tokens(user=user, session=session)
-            record.replaced_by = bundle["refresh_token"]
+            record.replaced_by = _token_key(bundle["refresh_token"])
+            self._save_token(NS_REFRESH_TOKENS, record)
             return bundle
 
     def logout(self, *, access_token: str | None, refresh_token: str | None) -> int:
-        with self._lock:
-            session_ids: set[str] = set()
-            if access_token:
-                access_record = self._access_tokens.get(access_token)
-                if access_record is not None:
-                    session_ids.add(access_record.session_id)
-            if refresh_token:
-                refresh_record = self._refresh_tokens.get(refresh_token)
-                if refresh_record is not None:
-                    session_ids.add(refresh_record.session_id)
-
-            if not session_ids:
-                raise AuthServiceError(
-                    code="AUTH_SESSION_NOT_FOUND",
-                    message="Session not found.",
-                    status_code=401,
-                )
+        session_ids: set[str] = set()
+        if access_token:
+            session_id = self._session_id_for_access_token(access_token)
+            if session_id is not None:
+                session_ids.add(session_id)
+        if refresh_token:
+            refresh_record = self._store.get(NS_REFRESH_TOKENS, _token_key(refresh_token))
+            if refresh_record is not None:
+                session_ids.add(refresh_record.session_id)
+
+        if not session_ids:
+            raise AuthServiceError(
+                code="AUTH_SESSION_NOT_FOUND",
+                message="Session not found.",
+                status_code=401,
+            )
 
+        with self._lock:
             revoked_count = 0
             for session_id in session_ids:
-                session = self._sessions.get(session_id)
+                session = self._store.get(NS_SESSIONS, session_id)
                 if session and session.revoked_at is None:
                     session.revoked_at = _utc_now()
                     session.revoked_reason = "logout"
+                    self._save_session(session)
                     revoked_count += 1
                 self._revoke_tokens_for_session(session_id)
 
             return revoked_count
 
-    def authenticate_access_token(self, *, access_token: str) -> AuthUser:
+    def verify_access_token(self, *, access_token: str) -> AccessTokenClaims:
+        """Validate an access token without loading the user; signed tokens never touch the store."""
         now = _utc_now()
-        with self._lock:
-            record = self._access_tokens.get(access_token)
-            if record is None or record.revoked:
-                raise AuthServiceError(
-                    code="AUTH_TOKEN_INVALID",
-                    message="Invalid access token.",
-                    status_code=401,
-                )
+        if self.access_token_codec is not None and SignedAccessTokenCodec.looks_signed(access_token):
+            return self._verify_signed_access_token(access_token, now)
 
-            if record.expires_at <= now:
-                raise AuthServiceError(
-                    code="AUTH_TOKEN_EXPIRED",
-                    message="Access token has expired.",
-                    status_code=401,
-                    user_id=record.user_id,
-                )
+        # No service lock: these are single-key store reads (lock-free in memory,
+        # read-through cached for shared backends).
+        record = self._store.get(NS_ACCESS_TOKENS, _token_key(access_token))
+        if record is None or record.revoked:
+            raise AuthServiceError(
+                code="AUTH_TOKEN_INVALID",
+                message="Invalid access token.",
+                status_code=401,
+            )
 
-            session = self._sessions.get(record.session_id)
-            if session is None or session.revoked_at is not None:
-                raise AuthServiceError(
-                    code="AUTH_SESSION_REVOKED",
-                    message="Session has been revoked.",
-                    status_code=401,
-                    user_id=record.user_id,
-                )
+        if record.expires_at <= now:
+            raise AuthServiceError(
+                code="AUTH_TOKEN_EXPIRED",
+                message="Access token has expired.",
+                status_code=401,
+                user_id=record.user_id,
+            )
 
-            user = self._users_by_id.get(record.user_id)
-            if user is None:
-                raise AuthServiceError(
-                    code="AUTH_USER_NOT_FOUND",
-                    message="User not found.",
-                    status_code=404,
-                    user_id=record.user_id,
-                )
-            return user
+        session = self._store.get(NS_SESSIONS, record.session_id)
+        if session is None or session.revoked_at is not None:
+            raise AuthServiceError(
+                code="AUTH_SESSION_REVOKED",
+                message="Session has been revoked.",
+                status_code=401,
+                user_id=record.user_id,
+            )
+
+        return AccessTokenClaims(
+            user_id=record.user_id,
+            session_id=record.session_id,
+            issued_at=record.created_at,
+            expires_at=record.expires_at,
+            token_id=record.token,
+        )
+
+    def authenticate_access_token(self, *, access_token: str) -> AuthUser:
+        claims = self.verify_access_token(access_token=access_token)
+        user = self._store.get(NS_USERS, claims.user_id)
+        if user is None:
+            raise AuthServiceError(
+                code="AUTH_USER_NOT_FOUND",
+                message="User not found.",
+                status_code=404,
+                user_id=claims.user_id,
+            )
+        return user
+
+    def purge_expired(self, *, now: datetime | None = None, limit: int = 1000) -> int:
+        """Evict up to `limit` expired tokens, sessions and codes; returns how many records were removed."""
+        now = now or _utc_now()
+        self._denylist.prune(now)
+        return self._store.purge_expired(now, limit)
+
+    def start(self) -> None:
+        # Resume delivery of mail queued before a restart.
+        self._email_verification_sender.start()
+
+    def close(self) -> None:
+        self._email_verification_sender.close()
+        self.kdf_pool.shutdown()
+        self._store.close()
 
     def get_profile(self, *, user_id: str) -> dict[str, object]:
-        with self._lock:
-            profile = self._profiles_by_user_id.get(user_id)
-            if profile is None:
-                raise AuthServiceError(
-                    code="AUTH_PROFILE_NOT_FOUND",
-                    message="Profile not found.",
-                    status_code=404,
-                    user_id=user_id,
-                )
-            return self._serialize_profile(profile)
+        profile = self._store.get(NS_PROFILES, user_id)
+        if profile is None:
+            raise AuthServiceError(
+                code="AUTH_PROFILE_NOT_FOUND",
+                message="Profile not found.",
+                status_code=404,
+                user_id=user_id,
+            )
+        return self._serialize_profile(profile)
 
     def update_profile(
         self,
@@ -753,7 +898,7 @@ class InMemoryAuthSessionService:
         timezone_name: str | None,
     ) -> dict[str, object]:
         with self._lock:
-            profile = self._profiles_by_user_id.get(user_id)
+            profile = self._store.get(NS_PROFILES, user_id)
             if profile is None:
                 raise AuthServiceError(
                     code="AUTH_PROFILE_NOT_FOUND",
@@ -769,14 +914,27 @@ class InMemoryAuthSessionService:
             if timezone_name is not None:
                 profile.timezone = timezone_name.strip() or profile.timezone
             profile.updated_at = _utc_now()
+            self._store.put(NS_PROFILES, user_id, profile)
 
-            user = self._users_by_id[user_id]
-            user.display_name = profile.display_name
-            user.locale = profile.locale
-            user.updated_at = profile.updated_at
+            user = self._get_for_write(NS_USERS, user_id)
+            if user is not None:
+                user.display_name = profile.display_name
+                user.locale = profile.locale
+                user.updated_at = profile.updated_at
+                self._store.put(NS_USERS, user_id, user)
 
             return self._serialize_profile(profile)
 
+    def _get_for_write(self, namespace: str, key: str) -> object | None:
+        """Read that a write will be based on: skip the read-through cache, which may be stale."""
+        if isinstance(self._store, CachedAuthStateStore):
+            return self._store.get_uncached(namespace, key)
+        return self._store.get(namespace, key)
+
+    def _find_user_by_email(self, email: str) -> AuthUser | None:
+        users = self._store.find(NS_USERS, "email", email)
+        return users[0] if users else None
+
     def _create_user(
         self,
         *,
@@ -785,14 +943,17 @@ class InMemoryAuthSessionService:
         provider: str,
         provider_subject: str | None,
         locale: str,
-        password: str | None,
+        password_credentials: tuple[str | None, str] | None,
         email_verified_at: datetime | None,
     ) -> AuthUser:
-        password_salt: str | None = None
-        password_hash: str | None = None
-        if password is not None:
-            password_salt, password_hash = self._create_password_credentials(password)
-
+        # The claim keeps emails unique across workers sharing the store.
+        if not self._store.claim(f"email:{email}"):
+            raise AuthServiceError(
+                code="AUTH_EMAIL_ALREADY_EXISTS",
+                message="Email is already registered.",
+                status_code=409,
+            )
+        password_salt, password_hash = password_credentials or (None, None)
         user = AuthUser(
             user_id=_random_id("usr"),
             email=email,
@@ -804,62 +965,92 @@ class InMemoryAuthSessionService:
             password_hash=password_hash,
             email_verified_at=email_verified_at,
         )
-        self._users_by_id[user.user_id] = user
-        self._user_id_by_email[email] = user.user_id
-
-        self._profiles_by_user_id[user.user_id] = UserProfile(
-            user_id=user.user_id,
-            email=user.email,
-            display_name=user.display_name,
-            locale=user.locale,
-            timezone="UTC",
+        self._store.put(NS_USERS, user.user_id, user)
+        self._store.put(
+            NS_PROFILES,
+            user.user_id,
+            UserProfile(
+                user_id=user.user_id,
+                email=user.email,
+                display_name=user.display_name,
+                locale=user.locale,
+                timezone="UTC",
+            ),
         )
         return user
 
     def _create_session_bundle(self, *, user: AuthUser, provider: str, device_id: str | None) -> dict[str, object]:
-        family_id = _random_id("family")
         session = SessionRecord(
             session_id=_random_id("sess"),
-            family_id=family_id,
+            family_id=_random_id("family"),
             user_id=user.user_id,
             provider=provider,
             device_id=device_id,
         )
-        self._sessions[session.session_id] = session
-        self._session_ids_by_family.setdefault(family_id, set()).add(session.session_id)
         return self._issue_tokens(user=user, session=session)
 
+    def _on_email_undeliverable(self, event_name: str, user_id: str) -> None:
+        # The queued code never arrived; free the email so the user can sign up again.
+        if event_name == VERIFICATION_EMAIL_EVENT:
+            self._rollback_pending_signup(user_id)
+
+    def _rollback_pending_signup(self, user_id: str) -> None:
+        with self._lock:
+            user = self._get_for_write(NS_USERS, user_id)
+            if user and user.email_verified_at is None:
+                self._rollback_unverified_user(user)
+
     def _rollback_unverified_user(self, user: AuthUser) -> None:
-        self._email_verifications_by_user_id.pop(user.user_id, None)
-        self._password_resets_by_user_id.pop(user.user_id, None)
-        self._profiles_by_user_id.pop(user.user_id, None)
-        self._users_by_id.pop(user.user_id, None)
-        if self._user_id_by_email.get(user.email) == user.user_id:
-            self._user_id_by_email.pop(user.email, None)
+        self._store.delete(NS_EMAIL_VERIFICATIONS, user.user_id)
+        self._store.delete(NS_PASSWORD_RESETS, user.user_id)
+        self._store.delete(NS_PROFILES, user.user_id)
+        self._store.delete(NS_USERS, user.user_id)
+        self._store.release(f"email:{user.email}")
+
+    def _token_purge_at(self, expires_at: datetime) -> datetime:
+        # Expired tokens stay resolvable for the retention window so clients get *_EXPIRED, not *_INVALID.
+        return expires_at + timedelta(seconds=self.expired_token_retention_seconds)
+
+    def _save_token(self, namespace: str, record: AccessTokenRecord | RefreshTokenRecord) -> None:
+        self._store.put(namespace, record.token, record, purge_at=self._token_purge_at(record.expires_at))
+
+    def _save_session(self, session: SessionRecord) -> None:
+        # A session lives as long as its newest refresh token.
+        purge_at = self._token_purge_at(session.expires_at) if session.expires_at else None
+        self._store.put(NS_SESSIONS, session.session_id, session, purge_at=purge_at)
 
     def _issue_tokens(self, *, user: AuthUser, session: SessionRecord) -> dict[str, object]:
         now = _utc_now()
 
-        access_token = _random_token("atk")
-        access_record = AccessTokenRecord(
-            token=access_token,
-            user_id=user.user_id,
-            session_id=session.session_id,
-            expires_at=now + timedelta(seconds=self.access_ttl_seconds),
-        )
-        self._access_tokens[access_token] = access_record
-        self._access_tokens_by_session.setdefault(session.session_id, set()).add(access_token)
+        access_expires_at = now + timedelta(seconds=self.access_ttl_seconds)
+        if self.access_token_codec is not None:
+            access_token, _ = self.access_token_codec.issue(
+                user_id=user.user_id,
+                session_id=session.session_id,
+                issued_at=now,
+                expires_at=access_expires_at,
+            )
+        else:
+            access_token = _random_token("atk")
+            access_record = AccessTokenRecord(
+                token=_token_key(access_token),
+                user_id=user.user_id,
+                session_id=session.session_id,
+                expires_at=access_expires_at,
+            )
+            self._save_token(NS_ACCESS_TOKENS, access_record)
 
         refresh_token = _random_token("rtk")
         refresh_record = RefreshTokenRecord(
-            token=refresh_token,
+            token=_token_key(refresh_token),
             user_id=user.user_id,
             session_id=session.session_id,
             family_id=session.family_id,
             expires_at=now + timedelta(seconds=self.refresh_ttl_seconds),
         )
-        self._refresh_tokens[refresh_token] = refresh_record
-        self._refresh_tokens_by_session.setdefault(session.session_id, set()).add(refresh_token)
+        self._save_token(NS_REFRESH_TOKENS, refresh_record)
+        session.expires_at = refresh_record.expires_at
+        self._save_session(session)
 
         return {
             "access_token": access_token,
@@ -870,37 +1061,102 @@ class InMemoryAuthSessionService:
 
     def _revoke_family(self, family_id: str, *, reason: str) -> None:
         now = _utc_now()
-        for session_id in self._session_ids_by_family.get(family_id, set()):
-            session = self._sessions.get(session_id)
-            if session and session.revoked_at is None:
+        for session in self._store.find(NS_SESSIONS, "family_id", family_id):
+            if session.revoked_at is None:
                 session.revoked_at = now
                 session.revoked_reason = reason
-            self._revoke_tokens_for_session(session_id)
+                self._save_session(session)
+            self._revoke_tokens_for_session(session.session_id)
 
     def _revoke_tokens_for_session(self, session_id: str) -> None:
-        for access_token in self._access_tokens_by_session.get(session_id, set()):
-            access_record = self._access_tokens.get(access_token)
-            if access_record:
+        if self.access_token_codec is not None:
+            self._publish_session_revocation(session_id)
+
+        for access_record in self._store.find(NS_ACCESS_TOKENS, "session_id", session_id):
+            if not access_record.revoked:
                 access_record.revoked = True
+                self._save_token(NS_ACCESS_TOKENS, access_record)
 
-        for refresh_token in self._refresh_tokens_by_session.get(session_id, set()):
-            refresh_record = self._refresh_tokens.get(refresh_token)
-            if refresh_record and refresh_record.status == "active":
+        for refresh_record in self._store.find(NS_REFRESH_TOKENS, "session_id", session_id):
+            if refresh_record.status == "active":
                 refresh_record.status = "revoked"
+                self._save_token(NS_REFRESH_TOKENS, refresh_record)
 
     def _revoke_sessions_for_user(self, user_id: str, *, reason: str) -> int:
         now = _utc_now()
         revoked_count = 0
-        for session in self._sessions.values():
-            if session.user_id != user_id:
-                continue
+        for session in self._store.find(NS_SESSIONS, "user_id", user_id):
             if session.revoked_at is None:
                 session.revoked_at = now
                 session.revoked_reason = reason
+                self._save_session(session)
                 revoked_count += 1
             self._revoke_tokens_for_session(session.session_id)
         return revoked_count
 
+    def _session_id_for_access_token(self, access_token: str) -> str | None:
+        if self.access_token_codec is not None and SignedAccessTokenCodec.looks_signed(access_token):
+            try:
+                return self.access_token_codec.decode(access_token, verify_expiry=False).session_id
+            except AccessTokenError:
+                return None
+        access_record = self._store.get(NS_ACCESS_TOKENS, _token_key(access_token))
+        return access_record.session_id if access_record is not None else None
+
+    def _verify_signed_access_token(self, access_token: str, now: datetime) -> AccessTokenClaims:
+        assert self.access_token_codec is not None
+        try:
+            claims = self.access_token_codec.decode(access_token, now=now)
+        except AccessTokenExpiredError as error:
+            raise AuthServiceError(
+                code="AUTH_TOKEN_EXPIRED",
+                message="Access token has expired.",
+                status_code=401,
+                user_id=error.claims.user_id,
+            ) from error
+        except AccessTokenError as error:
+            raise AuthServiceError(
+                code="AUTH_TOKEN_INVALID",
+                message="Invalid access token.",
+                status_code=401,
+            ) from error
+
+        self._sync_denylist(now)
+        if self._denylist.contains(claims.session_id, now):
+            raise AuthServiceError(
+                code="AUTH_SESSION_REVOKED",
+                message="Session has been revoked.",
+                status_code=401,
+                user_id=claims.user_id,
+            )
+        return claims
+
+    def _publish_session_revocation(self, session_id: str) -> None:
+        # Any signed token for this session expires within one access TTL of now.
+        expires_at = _utc_now() + timedelta(seconds=self.access_ttl_seconds + 1)
+        self._denylist.add(session_id, expires_at)
+        self._store.put(
+            NS_SESSION_REVOCATIONS,
+            session_id,
+            SessionRevocationRecord(session_id=session_id, expires_at=expires_at),
+            purge_at=expires_at,
+        )
+
+    def _sync_denylist(self, now: datetime) -> None:
+        """Pull revocations published by other workers; at most one store read per sync interval."""
+        synced_at = self._denylist_synced_at
+        if synced_at is not None and time.monotonic() - synced_at < self.revocation_sync_interval_seconds:
+            return
+        if not self._denylist_sync_lock.acquire(blocking=False):
+            return
+        try:
+            records = self._store.find(NS_SESSION_REVOCATIONS, "scope", REVOCATION_SCOPE)
+            self._denylist.merge((record.session_id, record.expires_at) for record in records)
+            self._denylist.prune(now)
+            self._denylist_synced_at = time.monotonic()
+        finally:
+            self._denylist_sync_lock.release()
+
     def _serialize_user(self, user: AuthUser) -> dict[str, object]:
         return {
             "id": user.user_id,
@@ -922,7 +1178,7 @@ class InMemoryAuthSessionService:
             code_hash=self._hash_email_verification_code(user_id=user.user_id, code=verification_code),
             expires_at=now + timedelta(seconds=self.email_verification_code_ttl_seconds),
         )
-        self._email_verifications_by_user_id[user.user_id] = record
+        self._store.put(NS_EMAIL_VERIFICATIONS, user.user_id, record, purge_at=record.expires_at)
         return record, verification_code
 
     def _issue_password_reset(self, *, user: AuthUser) -> tuple[PasswordResetRecord, str]:
@@ -935,7 +1191,7 @@ class InMemoryAuthSessionService:
             code_hash=self._hash_password_reset_code(user_id=user.user_id, code=reset_code),
             expires_at=now + timedelta(seconds=self.password_reset_code_ttl_seconds),
         )
-        self._password_resets_by_user_id[user.user_id] = record
+        self._store.put(NS_PASSWORD_RESETS, user.user_id, record, purge_at=record.expires_at)
         return record, reset_code
 
     def _serialize_email_verification_challenge(
@@ -983,6 +1239,14 @@ class InMemoryAuthSessionService:
             "updated_at": _to_iso8601(profile.updated_at),
         }
 
+    def _ensure_email_available(self, email: str) -> None:
+        if self._find_user_by_email(email) is not None:
+            raise AuthServiceError(
+                code="AUTH_EMAIL_ALREADY_EXISTS",
+                message="Email is already registered.",
+                status_code=409,
+            )
+
     def _validate_password(self, password: str) -> None:
         if len(password) < 8:
             raise AuthServiceError(
@@ -1002,31 +1266,47 @@ class InMemoryAuthSessionService:
     def _normalize_email(self, email: str) -> str:
         return email.strip().lower()
 
+    def _keyed_digest(self, payload: str) -> str:
+        digest = self._code_digest.copy()
+        digest.update(payload.encode("utf-8"))
+        return digest.hexdigest()
+
     def _hash_email_verification_code(self, *, user_id: str, code: str) -> str:
-        payload = f"{user_id}:{code}".encode("utf-8")
-        return hashlib.sha256(payload).hexdigest()
+        return self._keyed_digest(f"email_verification:{user_id}:{code}")
 
     def _hash_password_reset_code(self, *, user_id: str, code: str) -> str:
-        payload = f"{user_id}:{code}".encode("utf-8")
-        return hashlib.sha256(payload).hexdigest()
-
-    def _create_password_credentials(self, password: str) -> tuple[str, str]:
-        salt = base64.urlsafe_b64encode(secrets.token_bytes(16)).decode("ascii").rstrip("=")
-        password_hash = self._hash_password(password, salt)
-        return salt, password_hash
-
-    def _hash_password(self, password: str, salt: str) -> str:
-        digest = hashlib.pbkdf2_hmac(
-            "sha256",
-            password.encode("utf-8"),
-            salt.encode("utf-8"),
-            self.password_iterations,
-        )
-        return base64.urlsafe_b64encode(digest).decode("ascii").rstrip("=")
+        return self._keyed_digest(f"password_reset:{user_id}:{code}")
+
+    def _admit_code_attempt(self, normalized_email: str, client_ip: str | None) -> None:
+        try:
+            if client_ip:
+                self.attempt_limiter.hit("ip", client_ip)
+            # Keyed so the shared store never holds raw addresses.
+            self.attempt_limiter.hit("email", self._keyed_digest(f"attempts:{normalized_email}"))
+        except AttemptRateLimitedError as error:
+            raise AuthServiceError(
+                code="AUTH_RATE_LIMITED",
+                message="Too many attempts. Please retry later.",
+                status_code=429,
+                retry_after_seconds=error.retry_after_seconds,
+            ) from error
+
+    def _create_password_credentials(self, password: str) -> tuple[str | None, str]:
+        # Versioned hashes embed their salt; password_salt is only set on legacy records.
+        return None, self._run_kdf(self.password_hash_policy.hash, password)
+
+    def _run_kdf(self, fn, *args):
+        try:
+            return self.kdf_pool.run(fn, *args)
+        except KdfPoolSaturatedError as error:
+            raise AuthServiceError(
+                code="AUTH_BUSY",
+                message="Authentication is temporarily busy. Please retry.",
+                status_code=503,
+            ) from error
 
-    def _verify_password(self, password: str, salt: str, stored_hash: str) -> bool:
-        candidate = self._hash_password(password, salt)
-        return hmac.compare_digest(candidate, stored_hash)
+    def _verify_password(self, password: str, salt: str | None, stored_hash: str) -> tuple[bool, bool]:
+        return self._run_kdf(self.password_hash_policy.verify, password, stored_hash, salt)
 
     def _derive_provider_subject(self, provider: str, code: str, state: str) -> str:
         seed = f"{provider}:{code}:{state}".encode("utf-8")
@@ -0,0 +1,720 @@
+from __future__ import annotations
+
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from datetime import datetime, timezone
+from typing import Any, Protocol
+from urllib.parse import urlparse
+
+from .records import (
+    AccessTokenRecord,
+    AuthUser,
+    EmailVerificationRecord,
+    PasswordResetRecord,
+    ProviderLink,
+    RefreshTokenRecord,
+    SessionRecord,
+    SessionRevocationRecord,
+    UserProfile,
+    record_from_payload,
+    record_to_payload,
+)
+from .token_store import DEFAULT_SHARDS, ExpiryIndex, ShardedTokenStore
+
+NS_USERS = "users"
+NS_PROFILES = "profiles"
+NS_PROVIDER_LINKS = "provider_links"
+NS_SESSIONS = "sessions"
+NS_ACCESS_TOKENS = "access_tokens"
+NS_REFRESH_TOKENS = "refresh_tokens"
+NS_EMAIL_VERIFICATIONS = "email_verifications"
+NS_PASSWORD_RESETS = "password_resets"
+NS_SESSION_REVOCATIONS = "session_revocations"
+
+RECORD_TYPES: dict[str, type] = {
+    NS_USERS: AuthUser,
+    NS_PROFILES: UserProfile,
+    NS_PROVIDER_LINKS: ProviderLink,
+    NS_SESSIONS: SessionRecord,
+    NS_ACCESS_TOKENS: AccessTokenRecord,
+    NS_REFRESH_TOKENS: RefreshTokenRecord,
+    NS_EMAIL_VERIFICATIONS: EmailVerificationRecord,
+    NS_PASSWORD_RESETS: PasswordResetRecord,
+    NS_SESSION_REVOCATIONS: SessionRevocationRecord,
+}
+
+# Secondary indexes per namespace. Indexed fields never change once a record is written.
+INDEXED_FIELDS: dict[str, tuple[str, ...]] = {
+    NS_USERS: ("email",),
+    NS_SESSIONS: ("family_id", "user_id"),
+    NS_ACCESS_TOKENS: ("session_id",),
+    NS_REFRESH_TOKENS: ("session_id",),
+    NS_SESSION_REVOCATIONS: ("scope",),
+}
+
+
+class AuthStateStore(Protocol):
+    """
+    Storage under InMemoryAuthSessionService.
+
+    Records are the dataclasses from records.py, addressed by (namespace, key).
+    Tokens are keyed by their digest. A record whose purge_at has passed is
+    treated as absent and removed by purge_expired() (or native TTL). claim() is
+    an atomic first-writer-wins marker used for cross-worker invariants (unique
+    email, single-use refresh tokens and codes); increment() is an atomic
+    counter for attempt limits.
+    """
+
+    backend: str
+
+    def get(self, namespace: str, key: str) -> Any | None:
+        ...
+
+    def put(self, namespace: str, key: str, record: Any, *, purge_at: datetime | None = None) -> None:
+        ...
+
+    def delete(self, namespace: str, key: str) -> None:
+        ...
+
+    def find(self, namespace: str, field: str, value: str) -> list[Any]:
+        ...
+
+    def claim(self, key: str, *, purge_at: datetime | None = None) -> bool:
+        ...
+
+    def release(self, key: str) -> None:
+        ...
+
+    def increment(self, key: str, *, purge_at: datetime) -> int:
+        ...
+
+    def counter(self, key: str) -> int:
+        ...
+
+    def count(self, namespace: str) -> int:
+        ...
+
+    def purge_expired(self, now: datetime, limit: int) -> int:
+        ...
+
+    def close(self) -> None:
+        ...
+
+
+def _index_values(namespace: str, record: Any) -> list[tuple[str, str]]:
+    return [
+        (field, str(getattr(record, field)))
+        for field in INDEXED_FIELDS.get(namespace, ())
+        if getattr(record, field) is not None
+    ]
+
+
+def _encode(record: Any) -> str:
+    return json.dumps(record_to_payload(record), ensure_ascii=False, separators=(",", ":"))
+
+
+def _decode(namespace: str, payload: str | bytes) -> Any:
+    return record_from_payload(RECORD_TYPES[namespace], json.loads(payload))
+
+
+class InMemoryAuthStateStore:
+    """Process-local store (the original behaviour): records are kept and returned as live objects."""
+
+    backend = "memory"
+
+    def __init__(self, shards: int = DEFAULT_SHARDS) -> None:
+        self._records: dict[str, ShardedTokenStore[Any]] = {
+            namespace: ShardedTokenStore(shards) for namespace in RECORD_TYPES
+        }
+        self._indexes: dict[tuple[str, str, str], set[str]] = {}
+        self._index_keys: dict[tuple[str, str], list[tuple[str, str]]] = {}
+        self._purge_at: dict[tuple[str, str], datetime] = {}
+        self._claims: dict[str, datetime | None] = {}
+        self._counters: dict[str, tuple[int, datetime]] = {}
+        self._expiry = ExpiryIndex()
+        self._lock = threading.Lock()
+
+    def get(self, namespace: str, key: str) -> Any | None:
+        # Lock-free: a single sharded dict lookup.
+        return self._records[namespace].get(key)
+
+    def put(self, namespace: str, key: str, record: Any, *, purge_at: datetime | None = None) -> None:
+        with self._lock:
+            self._unindex(namespace, key)
+            values = _index_values(namespace, record)
+            for field, value in values:
+                self._indexes.setdefault((namespace, field, value), set()).add(key)
+            if values:
+                self._index_keys[(namespace, key)] = values
+            if purge_at is not None:
+                self._purge_at[(namespace, key)] = purge_at
+                self._expiry.add(purge_at, namespace, key)
+            else:
+                self._purge_at.pop((namespace, key), None)
+        self._records[namespace].put(key, record)
+
+    def delete(self, namespace: str, key: str) -> None:
+        with self._lock:
+            self._unindex(namespace, key)
+            self._purge_at.pop((namespace, key), None)
+        self._records[namespace].pop(key)
+
+    def find(self, namespace: str, field: str, value: str) -> list[Any]:
+        with self._lock:
+            keys = list(self._indexes.get((namespace, field, value), ()))
+        records = (self._records[namespace].get(key) for key in keys)
+        return [record for record in records if record is not None]
+
+    def claim(self, key: str, *, purge_at: datetime | None = None) -> bool:
+        with self._lock:
+            if key in self._claims:
+                existing = self._claims[key]
+                if existing is None or existing > datetime.now(timezone.utc):
+                    return False
+            self._claims[key] = purge_at
+            return True
+
+    def release(self, key: str) -> None:
+        with self._lock:
+            self._claims.pop(key, None)
+
+    def increment(self, key: str, *, purge_at: datetime) -> int:
+        with self._lock:
+            entry = self._counters.get(key)
+            value = entry[0] + 1 if entry is not None and entry[1] > datetime.now(timezone.utc) else 1
+            self._counters[key] = (value, purge_at)
+            return value
+
+    def counter(self, key: str) -> int:
+        # Lock-free read, like get().
+        entry = self._counters.get(key)
+        return entry[0] if entry is not None and entry[1] > datetime.now(timezone.utc) else 0
+
+    def count(self, namespace: str) -> int:
+        return len(self._records[namespace])
+
+    def purge_expired(self, now: datetime, limit: int) -> int:
+        purged = 0
+        for entry in self._expiry.pop_due(now, limit):
+            with self._lock:
+                # A later put() may have pushed purge_at out; only the current deadline counts.
+                current = self._purge_at.get((entry.kind, entry.key))
+                if current is None or current > now:
+                    continue
+                self._unindex(entry.kind, entry.key)
+                del self._purge_at[(entry.kind, entry.key)]
+            if self._records[entry.kind].pop(entry.key) is not None:
+                purged += 1
+        with self._lock:
+            for key in [key for key, deadline in self._claims.items() if deadline is not None and deadline <= now]:
+                del self._claims[key]
+            for key in [key for key, (_, deadline) in self._counters.items() if deadline <= now]:
+                del self._counters[key]
+        return purged
+
+    def close(self) -> None:
+        return None
+
+    def _unindex(self, namespace: str, key: str) -> None:
+        for field, value in self._index_keys.pop((namespace, key), ()):
+            keys = self._indexes.get((namespace, field, value))
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._indexes[(namespace, field, value)]
+
+
+def _timestamp(value: datetime | None) -> float | None:
+    return value.timestamp() if value is not None else None
+
+
+class SqliteAuthStateStore:
+    """
+    SQLite (WAL) store shareable by every worker on one host.
+
+    One row per record keyed by (namespace, key) -- token digests for tokens --
+    plus an index table for user_id / session_id / family_id / email lookups.
+    Statements are fixed strings, so sqlite3's statement cache keeps them prepared.
+    """
+
+    backend = "sqlite"
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, cached_statements=256, timeout=5.0)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS auth_records (
+                    namespace TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    purge_at REAL,
+                    PRIMARY KEY (namespace, key)
+                ) WITHOUT ROWID
+                """
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS auth_records_purge_at ON auth_records (purge_at) WHERE purge_at IS NOT NULL"
+            )
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS auth_record_index (
+                    namespace TEXT NOT NULL,
+                    field TEXT NOT NULL,
+                    value TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    PRIMARY KEY (namespace, field, value, key)
+                ) WITHOUT ROWID
+                """
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS auth_record_index_key ON auth_record_index (namespace, key)")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS auth_claims (key TEXT PRIMARY KEY, purge_at REAL) WITHOUT ROWID"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS auth_counters "
+                "(key TEXT PRIMARY KEY, value INTEGER NOT NULL, purge_at REAL NOT NULL) WITHOUT ROWID"
+            )
+
+    def get(self, namespace: str, key: str) -> Any | None:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT payload FROM auth_records WHERE namespace = ? AND key = ? AND (purge_at IS NULL OR purge_at > ?)",
+                (namespace, key, time.time()),
+            ).fetchone()
+        return _decode(namespace, row[0]) if row else None
+
+    def put(self, namespace: str, key: str, record: Any, *, purge_at: datetime | None = None) -> None:
+        payload = _encode(record)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO auth_records (namespace, key, payload, purge_at) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (namespace, key) DO UPDATE SET payload = excluded.payload, purge_at = excluded.purge_at",
+                (namespace, key, payload, _timestamp(purge_at)),
+            )
+            values = _index_values(namespace, record)
+            if values:
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO auth_record_index (namespace, field, value, key) VALUES (?, ?, ?, ?)",
+                    [(namespace, field, value, key) for field, value in values],
+                )
+
+    def delete(self, namespace: str, key: str) -> None:
+        with self._lock, self._conn:
+            self._delete_locked(namespace, key)
+
+    def find(self, namespace: str, field: str, value: str) -> list[Any]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT r.payload FROM auth_record_index i "
+                "JOIN auth_records r ON r.namespace = i.namespace AND r.key = i.key "
+                "WHERE i.namespace = ? AND i.field = ? AND i.value = ? AND (r.purge_at IS NULL OR r.purge_at > ?)",
+                (namespace, field, value, time.time()),
+            ).fetchall()
+        return [_decode(namespace, row[0]) for row in rows]
+
+    def claim(self, key: str, *, purge_at: datetime | None = None) -> bool:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "DELETE FROM auth_claims WHERE key = ? AND purge_at IS NOT NULL AND purge_at <= ?",
+                (key, time.time()),
+            )
+            cursor = self._conn.execute(
+                "INSERT OR IGNORE INTO auth_claims (key, purge_at) VALUES (?, ?)",
+                (key, _timestamp(purge_at)),
+            )
+            return cursor.rowcount == 1
+
+    def release(self, key: str) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM auth_claims WHERE key = ?", (key,))
+
+    def increment(self, key: str, *, purge_at: datetime) -> int:
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "INSERT INTO auth_counters (key, value, purge_at) VALUES (?, 1, ?) "
+                "ON CONFLICT (key) DO UPDATE SET "
+                "value = CASE WHEN auth_counters.purge_at > ? THEN auth_counters.value + 1 ELSE 1 END, "
+                "purge_at = excluded.purge_at "
+                "RETURNING value",
+                (key, purge_at.timestamp(), time.time()),
+            ).fetchone()
+        return int(row[0])
+
+    def counter(self, key: str) -> int:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM auth_counters WHERE key = ? AND purge_at > ?",
+                (key, time.time()),
+            ).fetchone()
+        return int(row[0]) if row else 0
+
+    def count(self, namespace: str) -> int:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT COUNT(*) FROM auth_records WHERE namespace = ? AND (purge_at IS NULL OR purge_at > ?)",
+                (namespace, time.time()),
+            ).fetchone()
+        return int(row[0])
+
+    def purge_expired(self, now: datetime, limit: int) -> int:
+        cutoff = now.timestamp()
+        with self._lock, self._conn:
+            due = self._conn.execute(
+                "SELECT namespace, key FROM auth_records WHERE purge_at IS NOT NULL AND purge_at <= ? "
+                "ORDER BY purge_at LIMIT ?",
+                (cutoff, limit),
+            ).fetchall()
+            for namespace, key in due:
+                self._delete_locked(namespace, key)
+            self._conn.execute("DELETE FROM auth_claims WHERE purge_at IS NOT NULL AND purge_at <= ?", (cutoff,))
+            self._conn.execute("DELETE FROM auth_counters WHERE purge_at <= ?", (cutoff,))
+        return len(due)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def _delete_locked(self, namespace: str, key: str) -> None:
+        self._conn.execute("DELETE FROM auth_records WHERE namespace = ? AND key = ?", (namespace, key))
+        self._conn.execute("DELETE FROM auth_record_index WHERE namespace = ? AND key = ?", (namespace, key))
+
+
+class RespError(RuntimeError):
+    pass
+
+
+class RespClient:
+    """Minimal RESP2 client (one connection, pipelined commands) for Redis-protocol servers."""
+
+    def __init__(self, host: str, port: int, *, password: str | None = None, db: int = 0, timeout: float = 2.0):
+        self.host = host
+        self.port = port
+        self.password = password
+        self.db = db
+        self.timeout = timeout
+        self._sock: socket.socket | None = None
+        self._reader: Any = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_url(cls, url: str) -> "RespClient":
+        parsed = urlparse(url)
+        db = int(parsed.path.lstrip("/") or 0)
+        return cls(parsed.hostname or "127.0.0.1", parsed.port or 6379, password=parsed.password, db=db)
+
+    def execute(self, *args: Any) -> Any:
+        return self.pipeline([args])[0]
+
+    def pipeline(self, commands: list[tuple[Any, ...]]) -> list[Any]:
+        with self._lock:
+            try:
+                return self._round_trip(commands)
+            except (OSError, ConnectionError):
+                # One reconnect: the server may have closed an idle connection.
+                self._disconnect()
+                return self._round_trip(commands)
+
+    def close(self) -> None:
+        with self._lock:
+            self._disconnect()
+
+    def _round_trip(self, commands: list[tuple[Any, ...]]) -> list[Any]:
+        if self._sock is None:
+            self._connect()
+        assert self._sock is not None
+        self._sock.sendall(b"".join(self._pack(command) for command in commands))
+        replies = [self._read_reply() for _ in commands]
+        for reply in replies:
+            if isinstance(reply, RespError):
+                raise reply
+        return replies
+
+    def _connect(self) -> None:
+        self._sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        self._sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._reader = self._sock.makefile("rb")
+        setup: list[tuple[Any, ...]] = []
+        if self.password:
+            setup.append(("AUTH", self.password))
+        if self.db:
+            setup.append(("SELECT", self.db))
+        if setup:
+            self._round_trip(setup)
+
+    def _disconnect(self) -> None:
+        if self._sock is not None:
+            try:
+                self._sock.close()
+            except OSError:
+                pass
+        self._sock = None
+        self._reader = None
+
+    @staticmethod
+    def _pack(command: tuple[Any, ...]) -> bytes:
+        parts = [f"*{len(command)}\r\n".encode("ascii")]
+        for arg in command:
+            raw = arg if isinstance(arg, bytes) else str(arg).encode("utf-8")
+            parts.append(f"${len(raw)}\r\n".encode("ascii") + raw + b"\r\n")
+        return b"".join(parts)
+
+    def _read_reply(self) -> Any:
+        line = self._reader.readline()
+        if not line:
+            raise ConnectionError("Redis connection closed.")
+        prefix, body = line[:1], line[1:-2]
+        if prefix == b"+":
+            return body.decode("utf-8")
+        if prefix == b"-":
+            return RespError(body.decode("utf-8"))
+        if prefix == b":":
+            return int(body)
+        if prefix == b"$":
+            length = int(body)
+            if length < 0:
+                return None
+            data = self._reader.read(length + 2)
+            return data[:-2]
+        if prefix == b"*":
+            length = int(body)
+            return None if length < 0 else [self._read_reply() for _ in range(length)]
+        raise RespError(f"Unexpected RESP reply: {line!r}")
+
+
+def _ttl_ms(purge_at: datetime | None) -> int | None:
+    if purge_at is None:
+        return None
+    return int((purge_at - datetime.now(timezone.utc)).total_seconds() * 1000)
+
+
+class RedisAuthStateStore:
+    """
+    Store on any Redis-protocol server (Redis, Valkey, KeyDB, ...), shareable across hosts.
+
+    Records are JSON strings with native TTL (PX) from purge_at; indexes are sets
+    whose TTL only ever grows to cover the longest-lived member, and find() drops
+    members whose record has expired. Claims are SET NX.
+    """
+
+    backend = "redis"
+
+    def __init__(self, client: RespClient, *, prefix: str = "foodlens:auth:") -> None:
+        self.client = client
+        self.prefix = prefix
+
+    def _key(self, namespace: str, key: str) -> str:
+        return f"{self.prefix}{namespace}:{key}"
+
+    def _index_key(self, namespace: str, field: str, value: str) -> str:
+        return f"{self.prefix}idx:{namespace}:{field}:{value}"
+
+    def get(self, namespace: str, key: str) -> Any | None:
+        raw = self.client.execute("GET", self._key(namespace, key))
+        return _decode(namespace, raw) if raw is not None else None
+
+    def put(self, namespace: str, key: str, record: Any, *, purge_at: datetime | None = None) -> None:
+        ttl_ms = _ttl_ms(purge_at)
+        if ttl_ms is not None and ttl_ms <= 0:
+            self.delete(namespace, key)
+            return
+        record_key = self._key(namespace, key)
+        set_command: tuple[Any, ...] = ("SET", record_key, _encode(record))
+        commands: list[tuple[Any, ...]] = [set_command + (("PX", ttl_ms) if ttl_ms is not None else ())]
+        index_keys = [self._index_key(namespace, field, value) for field, value in _index_values(namespace, record)]
+        # Re-writing an older record (e.g. revoking a session) must not cut the set's
+        # TTL below a newer member's, so only ever extend it. PTTL -2: no set yet, -1: no TTL.
+        index_ttls: list[Any] = []
+        if ttl_ms is not None and index_keys:
+            index_ttls = self.client.pipeline([("PTTL", index_key) for index_key in index_keys])
+        for position, index_key in enumerate(index_keys):
+            commands.append(("SADD", index_key, key))
+            if ttl_ms is None:
+                commands.append(("PERSIST", index_key))
+            elif index_ttls[position] == -2 or 0 <= index_ttls[position] < ttl_ms:
+                commands.append(("PEXPIRE", index_key, ttl_ms))
+        self.client.pipeline(commands)
+
+    def delete(self, namespace: str, key: str) -> None:
+        record = self.get(namespace, key)
+        commands: list[tuple[Any, ...]] = [("DEL", self._key(namespace, key))]
+        if record is not None:
+            for field, value in _index_values(namespace, record):
+                commands.append(("SREM", self._index_key(namespace, field, value), key))
+        self.client.pipeline(commands)
+
+    def find(self, namespace: str, field: str, value: str) -> list[Any]:
+        index_key = self._index_key(namespace, field, value)
+        members = [member.decode("utf-8") for member in self.client.execute("SMEMBERS", index_key) or []]
+        if not members:
+            return []
+        payloads = self.client.execute("MGET", *(self._key(namespace, member) for member in members))
+        stale = [member for member, payload in zip(members, payloads) if payload is None]
+        if stale:
+            self.client.execute("SREM", index_key, *stale)
+        return [_decode(namespace, payload) for payload in payloads if payload is not None]
+
+    def claim(self, key: str, *, purge_at: datetime | None = None) -> bool:
+        ttl_ms = _ttl_ms(purge_at)
+        command: tuple[Any, ...] = ("SET", f"{self.prefix}claim:{key}", "1", "NX")
+        if ttl_ms is not None:
+            command += ("PX", max(1, ttl_ms))
+        return self.client.execute(*command) == "OK"
+
+    def release(self, key: str) -> None:
+        self.client.execute("DEL", f"{self.prefix}claim:{key}")
+
+    def increment(self, key: str, *, purge_at: datetime) -> int:
+        counter_key = f"{self.prefix}counter:{key}"
+        ttl_ms = max(1, _ttl_ms(purge_at) or 1)
+        value, _ = self.client.pipeline([("INCR", counter_key), ("PEXPIRE", counter_key, ttl_ms)])
+        return int(value)
+
+    def counter(self, key: str) -> int:
+        raw = self.client.execute("GET", f"{self.prefix}counter:{key}")
+        return int(raw) if raw is not None else 0
+
+    def count(self, namespace: str) -> int:
+        cursor, total = "0", 0
+        while True:
+            cursor_raw, keys = self.client.execute("SCAN", cursor, "MATCH", self._key(namespace, "*"), "COUNT", 1000)
+            total += len(keys)
+            cursor = cursor_raw.decode("utf-8")
+            if cursor == "0":
+                return total
+
+    def purge_expired(self, now: datetime, limit: int) -> int:
+        # Records carry native TTLs; nothing to sweep.
+        return 0
+
+    def close(self) -> None:
+        self.client.close()
+
+
+class CachedAuthStateStore:
+    """
+    Read-through cache over a shared store for the per-request validation reads.
+
+    get() on the cached namespaces is served from a small LRU for ttl_seconds;
+    local writes invalidate immediately, writes from other workers become
+    visible within ttl_seconds. Reads that feed a write (login, password
+    reset, profile update) use get_uncached() instead.
+    """
+
+    def __init__(
+        self,
+        inner: AuthStateStore,
+        *,
+        namespaces: tuple[str, ...] = (NS_ACCESS_TOKENS, NS_SESSIONS, NS_USERS),
+        ttl_seconds: float = 2.0,
+        max_entries: int = 10_000,
+    ) -> None:
+        self.inner = inner
+        self.backend = inner.backend
+        self.namespaces = set(namespaces)
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max(1, max_entries)
+        self._entries: OrderedDict[tuple[str, str], tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, namespace: str, key: str) -> Any | None:
+        if namespace not in self.namespaces:
+            return self.inner.get(namespace, key)
+        cache_key = (namespace, key)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(cache_key)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(cache_key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+        record = self.inner.get(namespace, key)
+        if record is not None:
+            with self._lock:
+                self._entries[cache_key] = (now + self.ttl_seconds, record)
+                self._entries.move_to_end(cache_key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return record
+
+    def get_uncached(self, namespace: str, key: str) -> Any | None:
+        """get() straight from the shared store, for reads that a write depends on."""
+        self._invalidate(namespace, key)
+        return self.inner.get(namespace, key)
+
+    def put(self, namespace: str, key: str, record: Any, *, purge_at: datetime | None = None) -> None:
+        self._invalidate(namespace, key)
+        self.inner.put(namespace, key, record, purge_at=purge_at)
+
+    def delete(self, namespace: str, key: str) -> None:
+        self._invalidate(namespace, key)
+        self.inner.delete(namespace, key)
+
+    def find(self, namespace: str, field: str, value: str) -> list[Any]:
+        return self.inner.find(namespace, field, value)
+
+    def claim(self, key: str, *, purge_at: datetime | None = None) -> bool:
+        return self.inner.claim(key, purge_at=purge_at)
+
+    def release(self, key: str) -> None:
+        self.inner.release(key)
+
+    def increment(self, key: str, *, purge_at: datetime) -> int:
+        return self.inner.increment(key, purge_at=purge_at)
+
+    def counter(self, key: str) -> int:
+        return self.inner.counter(key)
+
+    def count(self, namespace: str) -> int:
+        return self.inner.count(namespace)
+
+    def purge_expired(self, now: datetime, limit: int) -> int:
+        return self.inner.purge_expired(now, limit)
+
+    def close(self) -> None:
+        self.inner.close()
+
+    def _invalidate(self, namespace: str, key: str) -> None:
+        with self._lock:
+            self._entries.pop((namespace, key), None)
+
+
+def build_auth_state_store_from_env(
+    get_env: Callable[[str, str | None], str | None] = os.environ.get,
+) -> AuthStateStore:
+    backend = (get_env("AUTH_STATE_BACKEND", "memory") or "memory").strip().lower()
+    if backend == "memory":
+        shards = int((get_env("AUTH_TOKEN_STORE_SHARDS", str(DEFAULT_SHARDS)) or str(DEFAULT_SHARDS)).strip())
+        return InMemoryAuthStateStore(shards)
+
+    inner: AuthStateStore
+    if backend == "sqlite":
+        path = (get_env("AUTH_STATE_SQLITE_PATH", None) or "/tmp/foodlens_auth_state.sqlite3").strip()
+        inner = SqliteAuthStateStore(path)
+    elif backend == "redis":
+        url = (get_env("AUTH_STATE_REDIS_URL", None) or "redis://127.0.0.1:6379/0").strip()
+        prefix = (get_env("AUTH_STATE_REDIS_PREFIX", None) or "foodlens:auth:").strip()
+        inner = RedisAuthStateStore(RespClient.from_url(url), prefix=prefix)
+    else:
+        raise ValueError(f"Unsupported AUTH_STATE_BACKEND: {backend}")
+
+    ttl_seconds = float((get_env("AUTH_STATE_CACHE_TTL_SECONDS", "2") or "2").strip())
+    if ttl_seconds <= 0:
+        return inner
+    max_entries = int((get_env("AUTH_STATE_CACHE_MAX_ENTRIES", "10000") or "10000").strip())
+    return CachedAuthStateStore(inner, ttl_seconds=ttl_seconds, max_entries=max_entries)
@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import hashlib
+import heapq
+import itertools
+import threading
+from datetime import datetime
+from typing import Generic, NamedTuple, TypeVar
+
+R = TypeVar("R")
+
+DEFAULT_SHARDS = 16
+
+
+class ShardedTokenStore(Generic[R]):
+    """
+    Token -> record map split into shards keyed by a hash of the token.
+
+    Writers take only their shard's lock. get() takes no lock at all: each shard
+    is a plain dict and a single dict lookup is atomic in CPython, so the
+    per-request validation path never contends with issuance or revocation.
+    """
+
+    def __init__(self, shards: int = DEFAULT_SHARDS):
+        self._shard_count = max(1, shards)
+        self._shards: list[dict[str, R]] = [{} for _ in range(self._shard_count)]
+        self._locks = [threading.Lock() for _ in range(self._shard_count)]
+
+    def _index(self, token: str) -> int:
+        digest = hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest()
+        return int.from_bytes(digest, "big") % self._shard_count
+
+    def get(self, token: str) -> R | None:
+        return self._shards[self._index(token)].get(token)
+
+    def put(self, token: str, record: R) -> None:
+        index = self._index(token)
+        with self._locks[index]:
+            self._shards[index][token] = record
+
+    def pop(self, token: str) -> R | None:
+        index = self._index(token)
+        with self._locks[index]:
+            return self._shards[index].pop(token, None)
+
+    def __len__(self) -> int:
+        return sum(len(shard) for shard in self._shards)
+
+
+class ExpiryEntry(NamedTuple):
+    expires_at: datetime
+    kind: str
+    key: str
+    ref: str
+
+
+class ExpiryIndex:
+    """Min-heap of (expires_at, kind, key, ref) consumed incrementally by pop_due()."""
+
+    def __init__(self) -> None:
+        self._heap: list[tuple[datetime, int, ExpiryEntry]] = []
+        self._sequence = itertools.count()
+        self._lock = threading.Lock()
+
+    def add(self, expires_at: datetime, kind: str, key: str, ref: str = "") -> None:
+        entry = ExpiryEntry(expires_at, kind, key, ref)
+        with self._lock:
+            heapq.heappush(self._heap, (expires_at, next(self._sequence), entry))
+
+    def pop_due(self, now: datetime, limit: int) -> list[ExpiryEntry]:
+        due: list[ExpiryEntry] = []
+        with self._lock:
+            while self._heap and len(due) < limit and self._heap[0][0] <= now:
+                due.append(heapq.heappop(self._heap)[2])
+        return due
+
+    def next_due(self) -> datetime | None:
+        with self._lock:
+            return self._heap[0][0] if self._heap else None
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._heap)
@@ -0,0 +1,227 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Final
+
+from backend.modules.analyst_core.allergen_matcher import (
+    LOCAL_SAFE_COACH_MESSAGE,
+    SAFETY_STATUS_RANK,
+    normalize_ingredient_text,
+)
+from backend.modules.analyst_core.allergen_utils import normalize_allergens, to_allergen_input_token
+
+JSONDict = dict[str, Any]
+AnalyzeIngredients = Callable[[list[str], str], JSONDict]
+
+DEFAULT_TTL_SECONDS: Final[float] = 7 * 24 * 60 * 60
+DEFAULT_MAX_ENTRIES: Final[int] = 5000
+FINGERPRINT_SEPARATOR: Final[str] = "\x1f"
+ANALYSIS_FAILED_KEY: Final[str] = "_allergen_analysis_failed"
+
+
+def ingredient_set_fingerprint(ingredients: list[str]) -> str:
+    """Order-insensitive hash of the normalized ingredient set."""
+    normalized = sorted({normalize_ingredient_text(str(item)) for item in ingredients} - {""})
+    return hashlib.sha256(FINGERPRINT_SEPARATOR.join(normalized).encode("utf-8")).hexdigest()
+
+
+def allergen_profile_key(allergens: list[str]) -> str:
+    """Canonical profile key: normalized allergens, sorted so input order does not matter."""
+    return ", ".join(sorted(set(allergens)))
+
+
+@dataclass(frozen=True)
+class AllergenVerdictEntry:
+    safety_status: str
+    coach_message: str
+    # normalized ingredient name -> (isAllergen, riskReason)
+    ingredients: dict[str, tuple[bool, str]]
+
+    @classmethod
+    def from_assessment(cls, assessment: JSONDict) -> "AllergenVerdictEntry":
+        ingredients: dict[str, tuple[bool, str]] = {}
+        for item in assessment.get("ingredients", []):
+            if not isinstance(item, dict):
+                continue
+            key = normalize_ingredient_text(str(item.get("name", "")))
+            if key and key not in ingredients:
+                ingredients[key] = (bool(item.get("isAllergen", False)), str(item.get("riskReason") or ""))
+        status = assessment.get("safetyStatus")
+        return cls(
+            safety_status=status if status in SAFETY_STATUS_RANK else "CAUTION",
+            coach_message=str(assessment.get("coachMessage") or ""),
+            ingredients=ingredients,
+        )
+
+    def to_assessment(self, ingredient_names: list[str]) -> JSONDict:
+        """Rebuild the assessment in the caller's ingredient order and spelling."""
+        ingredients = []
+        seen: set[str] = set()
+        for name in ingredient_names:
+            cleaned = str(name).strip()
+            if not cleaned or cleaned.lower() in seen:
+                continue
+            seen.add(cleaned.lower())
+            is_allergen, risk_reason = self.ingredients.get(normalize_ingredient_text(cleaned), (False, ""))
+            ingredients.append({"name": cleaned, "isAllergen": is_allergen, "riskReason": risk_reason})
+        return {
+            "safetyStatus": self.safety_status,
+            "coachMessage": self.coach_message,
+            "ingredients": ingredients,
+        }
+
+
+def combine_verdicts(entries: list[AllergenVerdictEntry]) -> AllergenVerdictEntry:
+    """Assemble a multi-allergen verdict from verdicts on disjoint allergen subsets."""
+    status = max((entry.safety_status for entry in entries), key=SAFETY_STATUS_RANK.__getitem__)
+    messages: list[str] = []
+    for entry in entries:
+        if entry.safety_status != "SAFE" and entry.coach_message and entry.coach_message not in messages:
+            messages.append(entry.coach_message)
+
+    ingredients: dict[str, tuple[bool, str]] = {}
+    for entry in entries:
+        for key, (is_allergen, risk_reason) in entry.ingredients.items():
+            prior_allergen, prior_reason = ingredients.get(key, (False, ""))
+            reasons = [reason for reason in (prior_reason, risk_reason) if reason]
+            ingredients[key] = (prior_allergen or is_allergen, "; ".join(dict.fromkeys(reasons)))
+
+    return AllergenVerdictEntry(
+        safety_status=status,
+        coach_message=" ".join(messages) if messages else LOCAL_SAFE_COACH_MESSAGE,
+        ingredients=ingredients,
+    )
+
+
+class BarcodeAllergenCache:
+    """
+    In-process LRU cache of allergen verdicts keyed by
+    (ingredient-set fingerprint, normalized allergen profile).
+    """
+
+    def __init__(
+        self,
+        *,
+        ttl_seconds: float = DEFAULT_TTL_SECONDS,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.ttl_seconds = max(1.0, ttl_seconds)
+        self.max_entries = max(1, max_entries)
+        self._clock = clock
+        self._entries: OrderedDict[tuple[str, str], tuple[float, AllergenVerdictEntry]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, fingerprint: str, profile_key: str) -> AllergenVerdictEntry | None:
+        key = (fingerprint, profile_key)
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is None:
+                return None
+            expires_at, entry = cached
+            if expires_at <= self._clock():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def put(self, fingerprint: str, profile_key: str, entry: AllergenVerdictEntry) -> None:
+        key = (fingerprint, profile_key)
+        with self._lock:
+            self._entries[key] = (self._clock() + self.ttl_seconds, entry)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def size(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+
+def lookup_cached_allergens(
+    cache: BarcodeAllergenCache,
+    ingredients: list[str],
+    allergy_info: str,
+) -> tuple[JSONDict | None, str]:
+    """
+    Answer from the cache alone: ("hit") exact profile or ("assembled") every
+    single-allergen verdict cached. Returns (None, "miss") otherwise.
+    """
+    allergens = normalize_allergens(allergy_info)
+    if not allergens or not ingredients:
+        return None, "bypass"
+    fingerprint = ingredient_set_fingerprint(ingredients)
+    profile_key = allergen_profile_key(allergens)
+    exact = cache.get(fingerprint, profile_key)
+    if exact is not None:
+        return exact.to_assessment(ingredients), "hit"
+
+    singles = [cache.get(fingerprint, allergen_profile_key([allergen])) for allergen in allergens]
+    if any(entry is None for entry in singles):
+        return None, "miss"
+    combined = combine_verdicts(singles)
+    cache.put(fingerprint, profile_key, combined)
+    return combined.to_assessment(ingredients), "assembled"
+
+
+def store_allergen_assessment(
+    cache: BarcodeAllergenCache,
+    ingredients: list[str],
+    allergy_info: str,
+    assessment: JSONDict,
+) -> bool:
+    """Cache a model-backed assessment for the full profile; failed analyses are skipped."""
+    allergens = normalize_allergens(allergy_info)
+    if not allergens or not ingredients or assessment.get(ANALYSIS_FAILED_KEY):
+        return False
+    cache.put(
+        ingredient_set_fingerprint(ingredients),
+        allergen_profile_key(allergens),
+        AllergenVerdictEntry.from_assessment(assessment),
+    )
+    return True
+
+
+def resolve_barcode_allergens(
+    cache: BarcodeAllergenCache,
+    ingredients: list[str],
+    allergy_info: str,
+    analyze: AnalyzeIngredients,
+) -> tuple[JSONDict, str]:
+    """
+    Return (assessment, cache_outcome) for a barcode ingredient list.
+
+    Outcomes:
+    - "hit": the exact profile was cached.
+    - "assembled": built from cached single-allergen verdicts, no model call.
+    - "partial": only allergens without a cached verdict were analyzed.
+    - "miss": the whole profile was analyzed.
+    - "bypass"/"error": nothing was cached.
+    """
+    cached, outcome = lookup_cached_allergens(cache, ingredients, allergy_info)
+    if cached is not None:
+        return cached, outcome
+    if outcome == "bypass":
+        return analyze(ingredients, allergy_info), "bypass"
+
+    allergens = normalize_allergens(allergy_info)
+    fingerprint = ingredient_set_fingerprint(ingredients)
+    singles = {allergen: cache.get(fingerprint, allergen_profile_key([allergen])) for allergen in allergens}
+    cached_parts = [entry for entry in singles.values() if entry is not None]
+    missing = [allergen for allergen, entry in singles.items() if entry is None]
+
+    missing_input = ", ".join(to_allergen_input_token(allergen) for allergen in missing)
+    fresh = analyze(ingredients, missing_input)
+    if fresh.get(ANALYSIS_FAILED_KEY):
+        return fresh, "error"
+
+    fresh_entry = AllergenVerdictEntry.from_assessment(fresh)
+    cache.put(fingerprint, allergen_profile_key(missing), fresh_entry)
+    if not cached_parts:
+        return fresh_entry.to_assessment(ingredients), "miss"
+
+    combined = combine_verdicts([*cached_parts, fresh_entry])
+    cache.put(fingerprint, allergen_profile_key(allergens), combined)
+    return combined.to_assessment(ingredients), "partial"
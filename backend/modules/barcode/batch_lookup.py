@@ -0,0 +1,150 @@
+import asyncio
+import logging
+import time
+from typing import Any, AsyncIterator, Callable, Final
+
+from backend.modules.analyst_core.allergen_matcher import AllergenScreeningResult, screen_ingredients
+from backend.modules.analyst_core.allergen_utils import normalize_allergens
+from backend.modules.analyst_core.prompts import BARCODE_BATCH_PRODUCTS_PER_REQUEST
+
+from .allergen_cache import (
+    ANALYSIS_FAILED_KEY,
+    BarcodeAllergenCache,
+    lookup_cached_allergens,
+    store_allergen_assessment,
+)
+from .product_cache import normalize_barcode
+
+logger = logging.getLogger("foodlens.barcode")
+
+JSONDict = dict[str, Any]
+AnalyzeScreeningsBatch = Callable[[dict[str, AllergenScreeningResult], str], dict[str, JSONDict]]
+
+DEFAULT_MAX_ITEMS: Final[int] = 50
+DEFAULT_CONCURRENCY: Final[int] = 8
+NOT_FOUND_MESSAGE: Final[str] = "Product not found in any database"
+LOOKUP_FAILED_MESSAGE: Final[str] = "Barcode lookup failed"
+ANALYSIS_FAILED_MESSAGE: Final[str] = "알러지 분석 중 오류가 발생했습니다. 성분표를 직접 확인해주세요."
+
+
+def dedupe_barcodes(barcodes: list[str]) -> list[str]:
+    """Strip blanks and duplicates (UPC-A/EAN-13 spellings included), keeping first-seen order."""
+    seen: set[str] = set()
+    unique: list[str] = []
+    for barcode in barcodes:
+        barcode = str(barcode or "").strip()
+        key = normalize_barcode(barcode) or barcode
+        if not barcode or key in seen:
+            continue
+        seen.add(key)
+        unique.append(barcode)
+    return unique
+
+
+def apply_allergen_assessment(product: JSONDict, assessment: JSONDict) -> JSONDict:
+    """Merge an allergen assessment into a lookup result, as /lookup/barcode does."""
+    assessment.pop(ANALYSIS_FAILED_KEY, None)
+    product["safetyStatus"] = assessment.get("safetyStatus", "SAFE")
+    product["coachMessage"] = assessment.get("coachMessage", "")
+    product["ingredients"] = assessment.get("ingredients", product["ingredients"])
+    return product
+
+
+def _found(barcode: str, product: JSONDict, allergen_source: str | None) -> JSONDict:
+    return {"barcode": barcode, "found": True, "allergen_source": allergen_source, "data": product}
+
+
+async def stream_barcode_batch(
+    barcodes: list[str],
+    allergy_info: str,
+    *,
+    barcode_service: Any,
+    analyze_batch: AnalyzeScreeningsBatch,
+    allergen_cache: BarcodeAllergenCache | None = None,
+    concurrency: int = DEFAULT_CONCURRENCY,
+) -> AsyncIterator[JSONDict]:
+    """
+    Resolve `barcodes` (already deduped) against one allergy profile and yield one
+    item per barcode as soon as it is final.
+
+    Lookups run concurrently, at most `concurrency` at a time. Items that need no
+    model call (not found, no ingredients, no profile, allergen cache hit, or fully
+    decided by local screening) are yielded as their lookup completes. Once every
+    lookup has finished, the rest go to `analyze_batch` with their screenings, in
+    concurrent chunks of BARCODE_BATCH_PRODUCTS_PER_REQUEST, and are yielded chunk by chunk.
+    """
+    profile = normalize_allergens(allergy_info) if allergy_info and allergy_info.lower() != "none" else []
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    started_at = time.perf_counter()
+
+    async def _lookup(barcode: str) -> tuple[str, JSONDict | None, Exception | None]:
+        async with semaphore:
+            try:
+                return barcode, await barcode_service.get_product_info(barcode), None
+            except Exception as e:
+                return barcode, None, e
+
+    tasks = [asyncio.create_task(_lookup(barcode)) for barcode in barcodes]
+    pending_analysis: dict[str, tuple[JSONDict, AllergenScreeningResult]] = {}
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            barcode, product, error = await next_done
+            if error is not None:
+                logger.warning("[BarcodeBatch] lookup failed barcode=%s error=%s", barcode, error)
+                yield {"barcode": barcode, "found": False, "message": LOOKUP_FAILED_MESSAGE}
+                continue
+            if not product:
+                yield {"barcode": barcode, "found": False, "message": NOT_FOUND_MESSAGE}
+                continue
+            ingredients = product.get("ingredients")
+            if not ingredients or not profile:
+                yield _found(barcode, product, None)
+                continue
+
+            if allergen_cache is not None:
+                cached, outcome = lookup_cached_allergens(allergen_cache, ingredients, allergy_info)
+                if cached is not None:
+                    yield _found(barcode, apply_allergen_assessment(product, cached), f"cache_{outcome}")
+                    continue
+
+            screening = screen_ingredients(ingredients, profile)
+            if not screening.ambiguous_names:
+                assessment = screening.to_assessment()
+                if allergen_cache is not None:
+                    store_allergen_assessment(allergen_cache, ingredients, allergy_info, assessment)
+                yield _found(barcode, apply_allergen_assessment(product, assessment), "local")
+                continue
+            pending_analysis[barcode] = (product, screening)
+
+        if not pending_analysis:
+            return
+        logger.info(
+            "[BarcodeBatch] combined allergen analysis products=%d lookups_ms=%d",
+            len(pending_analysis),
+            int((time.perf_counter() - started_at) * 1000),
+        )
+        pending = list(pending_analysis)
+
+        async def _analyze(chunk: list[str]) -> tuple[list[str], dict[str, JSONDict]]:
+            screenings = {barcode: pending_analysis[barcode][1] for barcode in chunk}
+            return chunk, await asyncio.to_thread(analyze_batch, screenings, allergy_info)
+
+        analysis_tasks = [
+            asyncio.create_task(_analyze(pending[start:start + BARCODE_BATCH_PRODUCTS_PER_REQUEST]))
+            for start in range(0, len(pending), BARCODE_BATCH_PRODUCTS_PER_REQUEST)
+        ]
+        tasks.extend(analysis_tasks)
+        for next_done in asyncio.as_completed(analysis_tasks):
+            chunk, assessments = await next_done
+            for barcode in chunk:
+                product, screening = pending_analysis[barcode]
+                assessment = assessments.get(barcode)
+                if assessment is None:
+                    assessment = {**screening.to_fallback_assessment(ANALYSIS_FAILED_MESSAGE), ANALYSIS_FAILED_KEY: True}
+                if allergen_cache is not None:
+                    store_allergen_assessment(allergen_cache, product["ingredients"], allergy_info, assessment)
+                yield _found(barcode, apply_allergen_assessment(product, assessment), "model")
+    finally:
+        # Client went away mid-stream: stop any lookups or analysis chunks still pending.
+        for task in tasks:
+            task.cancel()
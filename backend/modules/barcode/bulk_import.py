@@ -0,0 +1,165 @@
+import csv
+import gzip
+import io
+import json
+import time
+from dataclasses import dataclass
+from typing import Any, Final, Iterator, TextIO
+
+from .constants import NUTRITION_PATCH_KEYS
+from .local_store import LocalBarcodeStore
+from .normalizers import is_nutrition_missing, normalize_datago, normalize_off
+
+JSONDict = dict[str, Any]
+
+DATASET_C005: Final[str] = "c005"
+DATASET_C002: Final[str] = "c002"
+DATASET_I2790: Final[str] = "i2790"
+DATASET_OFF: Final[str] = "off"
+DATASETS: Final[tuple[str, ...]] = (DATASET_C005, DATASET_C002, DATASET_I2790, DATASET_OFF)
+REPORT_DATASETS: Final[tuple[str, ...]] = (DATASET_C002, DATASET_I2790)
+JSON_CHUNK_SIZE: Final[int] = 1 << 16
+
+
+@dataclass
+class ImportStats:
+    dataset: str
+    read: int = 0
+    written: int = 0
+    unchanged: int = 0
+    skipped: int = 0
+    elapsed_seconds: float = 0.0
+
+
+def open_dump(path: str) -> TextIO:
+    if path.endswith(".gz"):
+        return io.TextIOWrapper(gzip.open(path, "rb"), encoding="utf-8", newline="")
+    return open(path, "r", encoding="utf-8", newline="")
+
+
+def _iter_json_array(fp: TextIO) -> Iterator[JSONDict]:
+    """Stream objects out of a top-level JSON array without materializing the whole array."""
+    decoder = json.JSONDecoder()
+    buffer = ""
+    started = False
+    eof = False
+    while True:
+        stripped = buffer.lstrip().lstrip(",").lstrip()
+        if not started and stripped.startswith("["):
+            stripped = stripped[1:]
+            started = True
+        if stripped.startswith("]"):
+            return
+        if stripped:
+            try:
+                obj, end = decoder.raw_decode(stripped)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+            else:
+                buffer = stripped[end:]
+                if isinstance(obj, dict):
+                    yield obj
+                continue
+        if eof:
+            return
+        chunk = fp.read(JSON_CHUNK_SIZE)
+        eof = not chunk
+        buffer = stripped + chunk
+
+
+def iter_records(path: str) -> Iterator[JSONDict]:
+    """Yield one dict per record from a CSV, JSON Lines or JSON-array dump (optionally .gz)."""
+    name = path[:-3] if path.endswith(".gz") else path
+    with open_dump(path) as fp:
+        if name.endswith(".csv"):
+            yield from csv.DictReader(fp)
+        elif name.endswith((".jsonl", ".ndjson")):
+            for line in fp:
+                line = line.strip()
+                if line:
+                    yield json.loads(line)
+        elif name.endswith(".json"):
+            yield from _iter_json_array(fp)
+        else:
+            raise ValueError(f"Unsupported dump format: {path}")
+
+
+def _enrich_c005_row(store: LocalBarcodeStore, row: JSONDict) -> JSONDict:
+    """Apply previously imported C002 ingredients / I2790 nutrition, mirroring BarcodeService."""
+    report_no = str(row.get("PRDLST_REPORT_NO") or "").strip()
+    if not report_no:
+        return row
+    enrichment = store.get_report_enrichment(report_no)
+    raw_materials = enrichment.get(DATASET_C002, {})
+    if raw_materials.get("RAWMTRL_NM"):
+        row["RAWMTRL_NM"] = raw_materials["RAWMTRL_NM"]
+    nutrition = enrichment.get(DATASET_I2790)
+    if nutrition and is_nutrition_missing(row):
+        for key in NUTRITION_PATCH_KEYS:
+            if nutrition.get(key):
+                row[key] = nutrition[key]
+        row["enrichment_nutr"] = "I2790"
+    return row
+
+
+def _product_rows(store: LocalBarcodeStore, dataset: str, records: Iterator[JSONDict], stats: ImportStats):
+    for record in records:
+        stats.read += 1
+        if dataset == DATASET_OFF:
+            barcode = str(record.get("code") or "").strip()
+            if not barcode:
+                stats.skipped += 1
+                continue
+            yield barcode, "BARCODE_OFF", normalize_off(record)
+        else:
+            barcode = str(record.get("BAR_CD") or "").strip()
+            if not barcode:
+                stats.skipped += 1
+                continue
+            yield barcode, "BARCODE_DATAGO", normalize_datago(_enrich_c005_row(store, dict(record)))
+
+
+def _report_rows(dataset: str, records: Iterator[JSONDict], stats: ImportStats):
+    keys = ("RAWMTRL_NM",) if dataset == DATASET_C002 else tuple(NUTRITION_PATCH_KEYS)
+    for record in records:
+        stats.read += 1
+        report_no = str(record.get("PRDLST_REPORT_NO") or "").strip()
+        if not report_no:
+            stats.skipped += 1
+            continue
+        yield report_no, dataset, {key: record.get(key) for key in keys if record.get(key)}
+
+
+def _batched(rows, size: int):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def import_dump(store: LocalBarcodeStore, dataset: str, path: str, *, batch_size: int = 1000) -> ImportStats:
+    """
+    Stream `path` into `store`. Re-running with a newer full dump or a delta file
+    only rewrites changed products. Import C002/I2790 before C005 so C005 rows
+    pick up their enrichment.
+    """
+    if dataset not in DATASETS:
+        raise ValueError(f"Unknown dataset: {dataset}")
+    stats = ImportStats(dataset=dataset)
+    started_at = time.perf_counter()
+    records = iter_records(path)
+    if dataset in REPORT_DATASETS:
+        for batch in _batched(_report_rows(dataset, records, stats), batch_size):
+            stats.written += store.upsert_report_enrichment(batch)
+    else:
+        for batch in _batched(_product_rows(store, dataset, records, stats), batch_size):
+            written, unchanged = store.upsert_products(batch)
+            stats.written += written
+            stats.unchanged += unchanged
+    stats.elapsed_seconds = time.perf_counter() - started_at
+    return stats
@@ -2,6 +2,8 @@ import aiohttp
 import os
 from typing import Any, Final
 
+from ..http import DATAGO_UPSTREAM, BarcodeHttpConfig, SessionProvider, UpstreamLookupError, borrow_session
+
 JSONDict = dict[str, Any]
 
 
@@ -18,11 +20,18 @@ class DatagoClient:
     DEFAULT_START_INDEX: Final[int] = 1
     DEFAULT_END_INDEX: Final[int] = 1
     INFO_OK_CODE: Final[str] = "INFO-000"
+    INFO_NO_DATA_CODE: Final[str] = "INFO-200"
     BARCODE_SERVICE_ID: Final[str] = "C005"
     REPORT_SERVICE_ID: Final[str] = "I2790"
     RAW_MATERIAL_SERVICE_ID: Final[str] = "C002"
     
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        session_provider: SessionProvider | None = None,
+        timeout: aiohttp.ClientTimeout | None = None,
+    ) -> None:
+        self._session_provider = session_provider
+        self._timeout = timeout or BarcodeHttpConfig().client_timeout()
         self.api_key = os.getenv("DATAGO_API_KEY")
         if not self.api_key:
             print("WARNING: DATAGO_API_KEY not found in environment variables.")
@@ -35,22 +44,27 @@ class DatagoClient:
 
     @staticmethod
     def _extract_first_row(data: JSONDict, service_id: str) -> JSONDict | None:
+        """First row, None when the service reports no data; raises UpstreamLookupError on API errors."""
         if service_id not in data:
             if "RESULT" in data:
-                print(
-                    f"[Datago] {service_id} API Error: {data['RESULT'].get('CODE')} - {data['RESULT'].get('MSG')}"
+                result = data["RESULT"]
+                if result.get("CODE") == DatagoClient.INFO_NO_DATA_CODE:
+                    print(f"[Datago] {service_id} Info: {result.get('CODE')} - {result.get('MSG')}")
+                    return None
+                raise UpstreamLookupError(
+                    DATAGO_UPSTREAM, f"{service_id} API Error: {result.get('CODE')} - {result.get('MSG')}"
                 )
-            else:
-                print(f"[Datago] {service_id} Unexpected Response Format: {list(data.keys())}")
-            return None
+            raise UpstreamLookupError(DATAGO_UPSTREAM, f"{service_id} Unexpected Response Format: {list(data.keys())}")
 
         result = data[service_id].get("RESULT", {})
         result_code = result.get("CODE")
         result_msg = result.get("MSG")
 
-        if result_code != DatagoClient.INFO_OK_CODE:
+        if result_code == DatagoClient.INFO_NO_DATA_CODE:
             print(f"[Datago] {service_id} Info: {result_code} - {result_msg}")
             return None
+        if result_code != DatagoClient.INFO_OK_CODE:
+            raise UpstreamLookupError(DATAGO_UPSTREAM, f"{service_id} Info: {result_code} - {result_msg}")
 
         rows = data[service_id].get("row", [])
         if not rows:
@@ -60,16 +74,16 @@ class DatagoClient:
 
     async def _request_service(self, url: str, service_id: str, log_prefix: str) -> JSONDict | None:
         try:
-            async with aiohttp.ClientSession() as session:
+            async with borrow_session(self._session_provider, self._timeout) as session:
                 async with session.get(url) as response:
                     if response.status != 200:
-                        print(f"[Datago] {log_prefix}Error: Status {response.status}")
-                        return None
+                        raise UpstreamLookupError(DATAGO_UPSTREAM, f"{log_prefix}Error: Status {response.status}")
                     data = await response.json()
                     return self._extract_first_row(data, service_id)
+        except UpstreamLookupError:
+            raise
         except Exception as error:
-            print(f"[Datago] {log_prefix}Request Failed: {error}")
-            return None
+            raise UpstreamLookupError(DATAGO_UPSTREAM, f"{log_prefix}Request Failed: {error!r}") from error
 
     async def get_product_by_barcode(self, barcode: str) -> JSONDict | None:
         """
@@ -2,6 +2,8 @@
 import aiohttp
 from typing import Any, Final
 
+from ..http import OPENFOODFACTS_UPSTREAM, BarcodeHttpConfig, SessionProvider, UpstreamLookupError, borrow_session
+
 JSONDict = dict[str, Any]
 
 class OpenFoodFactsClient:
@@ -13,6 +15,14 @@ class OpenFoodFactsClient:
     USER_AGENT: Final[str] = "FoodLens - Android/iOS - Version 1.0 (contact@foodlens.app)"
     REQUEST_HEADERS: Final[dict[str, str]] = {"User-Agent": USER_AGENT}
 
+    def __init__(
+        self,
+        session_provider: SessionProvider | None = None,
+        timeout: aiohttp.ClientTimeout | None = None,
+    ) -> None:
+        self._session_provider = session_provider
+        self._timeout = timeout or BarcodeHttpConfig().client_timeout()
+
     @staticmethod
     def _extract_product(data: JSONDict, barcode: str) -> JSONDict | None:
         if data.get("status") == 1:
@@ -23,20 +33,25 @@ class OpenFoodFactsClient:
     async def get_product_by_barcode(self, barcode: str) -> JSONDict | None:
         """
         Fetches product info by barcode from Open Food Facts.
+        None means OFF does not know the barcode; failures raise UpstreamLookupError.
         """
         url = f"{self.BASE_URL}/{barcode}.json"
         
         try:
-            async with aiohttp.ClientSession() as session:
+            async with borrow_session(self._session_provider, self._timeout) as session:
                 # User-Agent is required by OFF policy
                 async with session.get(url, headers=self.REQUEST_HEADERS) as response:
+                    if response.status == 404:
+                        # v2 answers unknown barcodes with 404 + {"status": 0}.
+                        print(f"[OFF] Product {barcode} not found (HTTP 404)")
+                        return None
                     if response.status != 200:
-                         print(f"[OFF] API Error: Status {response.status}")
-                         return None
+                        raise UpstreamLookupError(OPENFOODFACTS_UPSTREAM, f"API Error: Status {response.status}")
                     
                     data = await response.json()
                     return self._extract_product(data, barcode)
                         
+        except UpstreamLookupError:
+            raise
         except Exception as error:
-            print(f"[OFF] Request Failed: {error}")
-            return None
+            raise UpstreamLookupError(OPENFOODFACTS_UPSTREAM, f"Request Failed: {error!r}") from error
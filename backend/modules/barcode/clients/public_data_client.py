@@ -3,6 +3,8 @@ import os
 import urllib.parse
 from typing import Any, Final
 
+from ..http import PUBLIC_DATA_UPSTREAM, BarcodeHttpConfig, SessionProvider, UpstreamLookupError, borrow_session
+
 JSONDict = dict[str, Any]
 
 class PublicDataClient:
@@ -18,7 +20,14 @@ class PublicDataClient:
     DEFAULT_SERVING_SIZE: Final[str] = "100g"
     DEFAULT_DATA_SOURCE: Final[str] = "FoodNutritionDB_Unified"
 
-    def __init__(self, api_key: str | None = None):
+    def __init__(
+        self,
+        api_key: str | None = None,
+        session_provider: SessionProvider | None = None,
+        timeout: aiohttp.ClientTimeout | None = None,
+    ):
+        self._session_provider = session_provider
+        self._timeout = timeout or BarcodeHttpConfig().client_timeout()
         raw_key = api_key or os.getenv("KOREAN_FDA_API_KEY")
         self.api_key = self._decode_api_key(raw_key)
 
@@ -55,6 +64,7 @@ class PublicDataClient:
     async def get_nutrition_by_name(self, food_name: str) -> JSONDict | None:
         """
         Search for nutrition info by food name using the unified 'Food Nutrition DB' service.
+        None means no match; failures raise UpstreamLookupError.
         """
         if not self.api_key or not food_name:
             return None
@@ -67,23 +77,23 @@ class PublicDataClient:
         print(f"[PublicData] Requesting (Unified Service) for: {clean_name}")
 
         try:
-            async with aiohttp.ClientSession() as session:
+            async with borrow_session(self._session_provider, self._timeout) as session:
                 # Manual URL construction to control serviceKey encoding exactly
                 full_url = self._build_request_url(clean_name)
                 
                 async with session.get(full_url) as response:
                     if response.status != 200:
-                        print(f"[PublicData] API Error: Status {response.status}")
-                        return None
+                        raise UpstreamLookupError(PUBLIC_DATA_UPSTREAM, f"API Error: Status {response.status}")
                     
                     data = await response.json(content_type=None)
                     
                     # Unified Service Response Structure: data['body']['items']
                     return self._extract_first_item(data, clean_name)
 
+        except UpstreamLookupError:
+            raise
         except Exception as error:
-            print(f"[PublicData] Request Failed: {error}")
-            return None
+            raise UpstreamLookupError(PUBLIC_DATA_UPSTREAM, f"Request Failed: {error!r}") from error
 
     def normalize_response(self, item: JSONDict) -> JSONDict:
         """
@@ -1,5 +1,11 @@
 NUTRITION_PATCH_KEYS = ["NUTR_CONT1", "NUTR_CONT2", "NUTR_CONT3", "NUTR_CONT4"]
 
+# GS1 company prefix assigned to Korea
+KOREAN_GS1_PREFIX = "880"
+
+# The speculative Public Data search is only started with this much of the request deadline left
+SPECULATIVE_LOOKUP_MIN_BUDGET_SECONDS = 2.0
+
 # Common categories that appear as ingredients in C002/C005 data
 INGREDIENT_BLACKLIST = {
     "기타가공품",
@@ -0,0 +1,119 @@
+import os
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import AsyncIterator, Callable, Final
+
+import aiohttp
+
+SessionProvider = Callable[[], aiohttp.ClientSession | None]
+
+DATAGO_UPSTREAM: Final[str] = "datago"
+OPENFOODFACTS_UPSTREAM: Final[str] = "openfoodfacts"
+PUBLIC_DATA_UPSTREAM: Final[str] = "public_data"
+
+
+class UpstreamLookupError(Exception):
+    """
+    The upstream could not answer: transport error, timeout, non-200 status or
+    an error payload. Distinct from a client returning None, which means the
+    upstream answered and has no such product.
+    """
+
+    def __init__(self, upstream: str, message: str) -> None:
+        self.upstream = upstream
+        super().__init__(f"{upstream}: {message}")
+
+
+def _env_float(env_getter, name: str, default: float) -> float:
+    raw = env_getter(name)
+    if raw is None or not str(raw).strip():
+        return default
+    try:
+        return float(raw)
+    except ValueError:
+        return default
+
+
+@dataclass(frozen=True)
+class BarcodeHttpConfig:
+    total_timeout_seconds: float = 8.0
+    connect_timeout_seconds: float = 3.0
+    read_timeout_seconds: float = 6.0
+    limit: int = 100
+    limit_per_host: int = 20
+    dns_cache_ttl_seconds: int = 300
+    keepalive_timeout_seconds: float = 30.0
+
+    @classmethod
+    def from_env(cls, env_getter=os.environ.get) -> "BarcodeHttpConfig":
+        defaults = cls()
+        return cls(
+            total_timeout_seconds=_env_float(env_getter, "BARCODE_HTTP_TOTAL_TIMEOUT_SECONDS", defaults.total_timeout_seconds),
+            connect_timeout_seconds=_env_float(env_getter, "BARCODE_HTTP_CONNECT_TIMEOUT_SECONDS", defaults.connect_timeout_seconds),
+            read_timeout_seconds=_env_float(env_getter, "BARCODE_HTTP_READ_TIMEOUT_SECONDS", defaults.read_timeout_seconds),
+            limit=max(1, int(_env_float(env_getter, "BARCODE_HTTP_POOL_LIMIT", defaults.limit))),
+            limit_per_host=max(1, int(_env_float(env_getter, "BARCODE_HTTP_POOL_LIMIT_PER_HOST", defaults.limit_per_host))),
+            dns_cache_ttl_seconds=max(0, int(_env_float(env_getter, "BARCODE_HTTP_DNS_TTL_SECONDS", defaults.dns_cache_ttl_seconds))),
+            keepalive_timeout_seconds=_env_float(env_getter, "BARCODE_HTTP_KEEPALIVE_SECONDS", defaults.keepalive_timeout_seconds),
+        )
+
+    def client_timeout(self) -> aiohttp.ClientTimeout:
+        return aiohttp.ClientTimeout(
+            total=self.total_timeout_seconds,
+            connect=self.connect_timeout_seconds,
+            sock_read=self.read_timeout_seconds,
+        )
+
+    def build_connector(self) -> aiohttp.TCPConnector:
+        return aiohttp.TCPConnector(
+            limit=self.limit,
+            limit_per_host=self.limit_per_host,
+            ttl_dns_cache=self.dns_cache_ttl_seconds,
+            keepalive_timeout=self.keepalive_timeout_seconds,
+        )
+
+
+class BarcodeSessionPool:
+    """
+    Long-lived aiohttp sessions, one per upstream, so repeated lookups reuse
+    DNS results and keep-alive connections. Must be started and closed on the
+    event loop that serves requests (app startup / shutdown).
+    """
+
+    def __init__(self, config: BarcodeHttpConfig | None = None) -> None:
+        self.config = config or BarcodeHttpConfig()
+        self._sessions: dict[str, aiohttp.ClientSession] = {}
+
+    async def start(self, upstream_headers: dict[str, dict[str, str]]) -> None:
+        for upstream, headers in upstream_headers.items():
+            if upstream in self._sessions and not self._sessions[upstream].closed:
+                continue
+            self._sessions[upstream] = aiohttp.ClientSession(
+                connector=self.config.build_connector(),
+                timeout=self.config.client_timeout(),
+                headers=headers or None,
+            )
+
+    def provider(self, upstream: str) -> SessionProvider:
+        return lambda: self._sessions.get(upstream)
+
+    async def close(self) -> None:
+        sessions, self._sessions = self._sessions, {}
+        for session in sessions.values():
+            if not session.closed:
+                await session.close()
+
+
+@asynccontextmanager
+async def borrow_session(
+    provider: SessionProvider | None,
+    timeout: aiohttp.ClientTimeout,
+    headers: dict[str, str] | None = None,
+) -> AsyncIterator[aiohttp.ClientSession]:
+    """Yield the shared session when one is running, else a short-lived one (scripts, tests)."""
+    shared = provider() if provider else None
+    if shared is not None and not shared.closed:
+        yield shared
+        return
+    async with aiohttp.ClientSession(timeout=timeout, headers=headers) as session:
+        yield session
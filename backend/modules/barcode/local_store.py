@@ -0,0 +1,122 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+from typing import Any, Iterable
+
+from .product_cache import normalize_barcode
+
+JSONDict = dict[str, Any]
+
+
+def _content_hash(payload: str) -> str:
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+class LocalBarcodeStore:
+    """
+    Read-mostly SQLite store built from bulk dataset dumps (see bulk_import).
+
+    products: normalized barcode -> normalized product (normalize_datago / normalize_off output)
+    report_enrichment: Data.go.kr report number -> C002 / I2790 fields used to enrich C005 rows
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS products (
+                    barcode TEXT PRIMARY KEY,
+                    source TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    content_hash TEXT NOT NULL
+                )
+                """
+            )
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS report_enrichment (
+                    report_no TEXT NOT NULL,
+                    dataset TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    PRIMARY KEY (report_no, dataset)
+                )
+                """
+            )
+
+    @classmethod
+    def from_env(cls, env_getter=os.environ.get) -> "LocalBarcodeStore | None":
+        path = (env_getter("BARCODE_LOCAL_STORE_PATH") or "").strip()
+        if not path or not os.path.exists(path):
+            return None
+        return cls(path)
+
+    def get(self, barcode: str) -> JSONDict | None:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT payload FROM products WHERE barcode = ?",
+                (normalize_barcode(barcode),),
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def get_report_enrichment(self, report_no: str) -> dict[str, JSONDict]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT dataset, payload FROM report_enrichment WHERE report_no = ?",
+                (report_no.strip(),),
+            ).fetchall()
+        return {dataset: json.loads(payload) for dataset, payload in rows}
+
+    def upsert_products(self, products: Iterable[tuple[str, str, JSONDict]]) -> tuple[int, int]:
+        """
+        Upsert (barcode, source, product) rows in one transaction.
+        Returns (written, unchanged) so delta imports can report how much actually changed.
+        """
+        written = unchanged = 0
+        with self._lock, self._conn:
+            for barcode, source, product in products:
+                key = normalize_barcode(barcode)
+                if not key:
+                    continue
+                payload = json.dumps(product, ensure_ascii=False, sort_keys=True)
+                digest = _content_hash(payload)
+                existing = self._conn.execute(
+                    "SELECT content_hash FROM products WHERE barcode = ?", (key,)
+                ).fetchone()
+                if existing and existing[0] == digest:
+                    unchanged += 1
+                    continue
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO products (barcode, source, payload, content_hash) VALUES (?, ?, ?, ?)",
+                    (key, source, payload, digest),
+                )
+                written += 1
+        return written, unchanged
+
+    def upsert_report_enrichment(self, rows: Iterable[tuple[str, str, JSONDict]]) -> int:
+        count = 0
+        with self._lock, self._conn:
+            for report_no, dataset, payload in rows:
+                if not report_no:
+                    continue
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO report_enrichment (report_no, dataset, payload) VALUES (?, ?, ?)",
+                    (report_no.strip(), dataset, json.dumps(payload, ensure_ascii=False)),
+                )
+                count += 1
+        return count
+
+    def count(self) -> int:
+        with self._lock:
+            return int(self._conn.execute("SELECT COUNT(*) FROM products").fetchone()[0])
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
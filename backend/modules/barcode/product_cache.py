@@ -0,0 +1,171 @@
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Final
+
+JSONDict = dict[str, Any]
+
+DEFAULT_FRESH_TTL_SECONDS: Final[float] = 30 * 24 * 60 * 60
+DEFAULT_STALE_TTL_SECONDS: Final[float] = 180 * 24 * 60 * 60
+DEFAULT_NEGATIVE_TTL_SECONDS: Final[float] = 60 * 60
+NON_DIGIT_PATTERN: Final[re.Pattern[str]] = re.compile(r"\D")
+
+
+def normalize_barcode(barcode: str) -> str:
+    """Digits only; 12-digit UPC-A is widened to its EAN-13 form so both spellings share a key."""
+    digits = NON_DIGIT_PATTERN.sub("", barcode or "")
+    if len(digits) == 12:
+        return "0" + digits
+    return digits
+
+
+@dataclass(frozen=True)
+class CachedProduct:
+    product: JSONDict | None
+    provenance: JSONDict
+    fetched_at: float
+    fresh: bool
+    stale: bool
+
+    @property
+    def found(self) -> bool:
+        return self.product is not None
+
+
+def build_provenance(product: JSONDict | None) -> JSONDict:
+    if product is None:
+        return {"source": None}
+    raw_data = product.get("raw_data") or {}
+    return {
+        "source": product.get("source"),
+        "enrichment_nutr": raw_data.get("enrichment_nutr") if isinstance(raw_data, dict) else None,
+    }
+
+
+class BarcodeProductCache:
+    """
+    SQLite-backed cache of normalized barcode lookups.
+
+    Positive entries are fresh for fresh_ttl and may be served stale (while a
+    refresh runs) until stale_ttl. "Not found in any DB" results are cached for
+    negative_ttl only, so newly registered products show up quickly.
+    """
+
+    def __init__(
+        self,
+        path: str = ":memory:",
+        *,
+        fresh_ttl_seconds: float = DEFAULT_FRESH_TTL_SECONDS,
+        stale_ttl_seconds: float = DEFAULT_STALE_TTL_SECONDS,
+        negative_ttl_seconds: float = DEFAULT_NEGATIVE_TTL_SECONDS,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.path = path
+        self.fresh_ttl_seconds = fresh_ttl_seconds
+        self.stale_ttl_seconds = max(stale_ttl_seconds, fresh_ttl_seconds)
+        self.negative_ttl_seconds = negative_ttl_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS barcode_products (
+                    barcode TEXT PRIMARY KEY,
+                    payload TEXT,
+                    provenance TEXT NOT NULL,
+                    fetched_at REAL NOT NULL
+                )
+                """
+            )
+
+    @classmethod
+    def from_env(cls, env_getter=os.environ.get) -> "BarcodeProductCache | None":
+        backend = (env_getter("BARCODE_PRODUCT_CACHE_BACKEND") or "sqlite").strip().lower()
+        if backend in ("none", "off", "disabled"):
+            return None
+
+        def _float(name: str, default: float) -> float:
+            raw = env_getter(name)
+            try:
+                return float(raw) if raw not in (None, "") else default
+            except ValueError:
+                return default
+
+        path = ":memory:" if backend == "memory" else (
+            env_getter("BARCODE_PRODUCT_CACHE_PATH") or "/tmp/foodlens_barcode_cache.sqlite3"
+        ).strip()
+        return cls(
+            path,
+            fresh_ttl_seconds=_float("BARCODE_PRODUCT_CACHE_TTL_SECONDS", DEFAULT_FRESH_TTL_SECONDS),
+            stale_ttl_seconds=_float("BARCODE_PRODUCT_CACHE_STALE_TTL_SECONDS", DEFAULT_STALE_TTL_SECONDS),
+            negative_ttl_seconds=_float("BARCODE_PRODUCT_CACHE_NEGATIVE_TTL_SECONDS", DEFAULT_NEGATIVE_TTL_SECONDS),
+        )
+
+    def get(self, barcode: str) -> CachedProduct | None:
+        """Return the usable entry for `barcode`, or None if absent or past its TTL."""
+        key = normalize_barcode(barcode)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT payload, provenance, fetched_at FROM barcode_products WHERE barcode = ?",
+                (key,),
+            ).fetchone()
+        if row is None:
+            return None
+
+        payload, provenance, fetched_at = row
+        age = self._clock() - fetched_at
+        if payload is None:
+            if age >= self.negative_ttl_seconds:
+                return None
+            return CachedProduct(None, json.loads(provenance), fetched_at, fresh=True, stale=False)
+        if age >= self.stale_ttl_seconds:
+            return None
+        fresh = age < self.fresh_ttl_seconds
+        return CachedProduct(json.loads(payload), json.loads(provenance), fetched_at, fresh=fresh, stale=not fresh)
+
+    def put(self, barcode: str, product: JSONDict | None) -> None:
+        """
+        Store a lookup result. A "not found" never replaces a positive entry
+        that is still servable; that entry ages out through its stale TTL.
+        """
+        key = normalize_barcode(barcode)
+        provenance = json.dumps(build_provenance(product), ensure_ascii=False)
+        now = self._clock()
+        with self._lock:
+            if product is not None:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO barcode_products (barcode, payload, provenance, fetched_at) VALUES (?, ?, ?, ?)",
+                    (key, json.dumps(product, ensure_ascii=False), provenance, now),
+                )
+                return
+            self._conn.execute(
+                """
+                INSERT INTO barcode_products (barcode, payload, provenance, fetched_at) VALUES (?, NULL, ?, ?)
+                ON CONFLICT(barcode) DO UPDATE SET
+                    payload = NULL, provenance = excluded.provenance, fetched_at = excluded.fetched_at
+                WHERE barcode_products.payload IS NULL OR barcode_products.fetched_at <= ?
+                """,
+                (key, provenance, now, now - self.stale_ttl_seconds),
+            )
+
+    def purge_expired(self) -> int:
+        now = self._clock()
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM barcode_products WHERE (payload IS NULL AND fetched_at <= ?) OR fetched_at <= ?",
+                (now - self.negative_ttl_seconds, now - self.stale_ttl_seconds),
+            )
+        return cursor.rowcount
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,56 @@
+from typing import Any, Final
+
+JSONDict = dict[str, Any]
+
+RAW_DATA_FIELD: Final[str] = "raw_data"
+FULL_PROJECTION: Final[str] = "full"
+REQUIRED_FIELDS: Final[tuple[str, ...]] = ("food_name",)
+# raw_data keys the app reads from a default (compact) response.
+COMPACT_RAW_DATA_FIELDS: Final[tuple[str, ...]] = ("image_url",)
+
+
+def parse_fields(fields: str | None) -> tuple[str, ...] | None:
+    """
+    Parse a `fields` projection spec.
+
+    - None / "" -> compact (every field, raw_data trimmed to COMPACT_RAW_DATA_FIELDS) -> returns ()
+    - "full" -> no projection (raw_data included) -> returns None
+    - "food_name,calories,raw_data.image_url" -> only those fields (food_name is always kept)
+    """
+    spec = (fields or "").strip()
+    if not spec:
+        return ()
+    if spec.lower() == FULL_PROJECTION:
+        return None
+    return tuple(dict.fromkeys(part.strip() for part in spec.split(",") if part.strip()))
+
+
+def project_product(product: JSONDict, fields: str | None = None) -> JSONDict:
+    """
+    Return the client-facing view of a normalized barcode product.
+
+    The full upstream record stays in `product` (and the server-side caches);
+    only the projection is serialized into the response.
+    """
+    selected = parse_fields(fields)
+    if selected is None:
+        return dict(product)
+    if not selected:
+        compact = {key: value for key, value in product.items() if key != RAW_DATA_FIELD}
+        raw_data = product.get(RAW_DATA_FIELD)
+        if isinstance(raw_data, dict):
+            compact[RAW_DATA_FIELD] = {key: raw_data[key] for key in COMPACT_RAW_DATA_FIELDS if key in raw_data}
+        return compact
+
+    projected = {key: product[key] for key in REQUIRED_FIELDS if key in product}
+    raw_keys: list[str] = []
+    for field in selected:
+        if field.startswith(RAW_DATA_FIELD + "."):
+            raw_keys.append(field[len(RAW_DATA_FIELD) + 1:])
+        elif field in product:
+            projected[field] = product[field]
+
+    raw_data = product.get(RAW_DATA_FIELD)
+    if raw_keys and isinstance(raw_data, dict) and RAW_DATA_FIELD not in projected:
+        projected[RAW_DATA_FIELD] = {key: raw_data[key] for key in raw_keys if key in raw_data}
+    return projected
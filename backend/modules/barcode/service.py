@@ -2,9 +2,24 @@
 from .clients.datago_client import DatagoClient
 from .clients.openfoodfacts_client import OpenFoodFactsClient
 from .clients.public_data_client import PublicDataClient
-from .constants import NUTRITION_PATCH_KEYS
+from .constants import KOREAN_GS1_PREFIX, NUTRITION_PATCH_KEYS, SPECULATIVE_LOOKUP_MIN_BUDGET_SECONDS
+from .http import (
+    DATAGO_UPSTREAM,
+    OPENFOODFACTS_UPSTREAM,
+    PUBLIC_DATA_UPSTREAM,
+    BarcodeHttpConfig,
+    BarcodeSessionPool,
+    UpstreamLookupError,
+)
 from .normalizers import is_nutrition_missing, normalize_datago, normalize_off
-from typing import Dict, Any, Optional
+from .local_store import LocalBarcodeStore
+from .product_cache import BarcodeProductCache, normalize_barcode
+from backend.modules.request_deadline import DeadlineExceeded, current_deadline, has_budget
+from typing import Any, Awaitable, Dict, Optional
+import asyncio
+import contextlib
+import copy
+import time
 
 class BarcodeService:
     """
@@ -12,79 +27,288 @@ class BarcodeService:
     Orchestrates multiple clients (Data.go.kr, OpenFoodFacts) and normalizes data.
     """
     
-    def __init__(self):
-        self.datago_client = DatagoClient()
-        self.off_client = OpenFoodFactsClient()
-        self.public_data_client = PublicDataClient()
+    def __init__(
+        self,
+        http_config: BarcodeHttpConfig | None = None,
+        product_cache: BarcodeProductCache | None = None,
+        local_store: LocalBarcodeStore | None = None,
+    ):
+        self.http_config = http_config or BarcodeHttpConfig.from_env()
+        self.product_cache = product_cache
+        self.local_store = local_store
+        self._inflight: Dict[str, "asyncio.Task[Optional[Dict[str, Any]]]"] = {}
+        self.session_pool = BarcodeSessionPool(self.http_config)
+        timeout = self.http_config.client_timeout()
+        self.datago_client = DatagoClient(self.session_pool.provider(DATAGO_UPSTREAM), timeout)
+        self.off_client = OpenFoodFactsClient(self.session_pool.provider(OPENFOODFACTS_UPSTREAM), timeout)
+        self.public_data_client = PublicDataClient(
+            session_provider=self.session_pool.provider(PUBLIC_DATA_UPSTREAM),
+            timeout=timeout,
+        )
+
+    async def start(self) -> None:
+        """Open the shared upstream sessions. Call once from app startup."""
+        await self.session_pool.start(
+            {
+                DATAGO_UPSTREAM: {},
+                OPENFOODFACTS_UPSTREAM: dict(OpenFoodFactsClient.REQUEST_HEADERS),
+                PUBLIC_DATA_UPSTREAM: {},
+            }
+        )
+
+    async def close(self) -> None:
+        """Cancel background refreshes and close the shared upstream sessions. Call from app shutdown."""
+        inflight, self._inflight = self._inflight, {}
+        for task in inflight.values():
+            await self._discard(task)
+        await self.session_pool.close()
+
+    @staticmethod
+    def _is_korean_barcode(barcode: str) -> bool:
+        """GS1 prefix 880 is assigned to Korea; those products are expected in Data.go.kr."""
+        return barcode.strip().startswith(KOREAN_GS1_PREFIX)
+
+    @staticmethod
+    async def _timed(step: str, timings: Dict[str, int], awaitable: Awaitable[Any]) -> Any:
+        started_at = time.perf_counter()
+        try:
+            return await awaitable
+        finally:
+            timings[step] = int((time.perf_counter() - started_at) * 1000)
+
+    @staticmethod
+    async def _discard(task: Optional["asyncio.Task[Any]"]) -> None:
+        if task is None:
+            return
+        if task.done():
+            if not task.cancelled():
+                task.exception()  # A failure nobody needs any more; retrieve it so it is not logged as lost.
+            return
+        task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await task
+
+    @staticmethod
+    async def _optional(step: str, awaitable: Awaitable[Any]) -> Any:
+        """Enrichment step: an upstream failure only means the product ships without it."""
+        try:
+            return await awaitable
+        except UpstreamLookupError as error:
+            print(f"[BarcodeTrace] {step} unavailable, continuing without it: {error}")
+            return None
+
+    @staticmethod
+    async def _within_deadline(awaitable: Awaitable[Any]) -> Any:
+        """Wait no longer than the request deadline; the awaitable is cancelled past it."""
+        deadline = current_deadline()
+        if deadline is None:
+            return await awaitable
+        deadline.check("barcode lookup")
+        try:
+            return await asyncio.wait_for(awaitable, timeout=deadline.remaining())
+        except asyncio.TimeoutError as error:
+            raise DeadlineExceeded("barcode lookup", cancelled=deadline.cancelled) from error
+
+    @staticmethod
+    def _format_timings(timings: Dict[str, int]) -> str:
+        return " ".join(f"{step}={elapsed}ms" for step, elapsed in timings.items())
 
     async def get_product_info(self, barcode: str) -> Optional[Dict[str, Any]]:
         """
-        Orchestration Logic:
-        1. Try Data.go.kr (Primary - Korean Products)
-        2. If failed/empty, Try OpenFoodFacts (Secondary - Global)
-        3. Normalize Output
+        Cached lookup:
+        - fresh hit (including a cached "not found") answers without any upstream call
+        - stale hit is served immediately while a background refresh runs
+        - miss queries upstream; concurrent misses for one barcode share a single lookup
+        - an upstream failure raises UpstreamLookupError and is never cached, so a
+          stale positive entry keeps being served until a refresh succeeds
+
+        The caller waits at most until the request deadline. A shared lookup
+        keeps running past it so its result still lands in the cache.
         """
-        
-        # 1. Try Data.go.kr
+        if self.product_cache is None:
+            return await self._within_deadline(self._lookup_upstream(barcode))
+
+        key = normalize_barcode(barcode)
+        cached = await asyncio.to_thread(self.product_cache.get, key)
+        if cached is not None:
+            print(
+                f"[BarcodeTrace] Cache {'stale' if cached.stale else 'hit'} for {key} "
+                f"(found={cached.found}, provenance={cached.provenance})"
+            )
+            if cached.stale:
+                self._refresh(barcode, key)
+            return cached.product
+
+        # Callers mutate the product (allergen merge), so waiters sharing one lookup each get a copy.
+        return copy.deepcopy(await self._within_deadline(asyncio.shield(self._refresh(barcode, key))))
+
+    def _refresh(self, barcode: str, key: str) -> "asyncio.Task[Optional[Dict[str, Any]]]":
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._lookup_and_store(barcode, key))
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._refresh_done(key, done))
+        return task
+
+    def _refresh_done(self, key: str, task: "asyncio.Task[Optional[Dict[str, Any]]]") -> None:
+        self._inflight.pop(key, None)
+        if not task.cancelled() and task.exception() is not None:
+            print(f"[BarcodeTrace] Refresh failed for {key}, cache left unchanged: {task.exception()}")
+
+    async def _lookup_and_store(self, barcode: str, key: str) -> Optional[Dict[str, Any]]:
+        result = await self._lookup_upstream(barcode)
+        if self.product_cache is not None:
+            await asyncio.to_thread(self.product_cache.put, key, result)
+        return result
+
+    async def _lookup_upstream(self, barcode: str) -> Optional[Dict[str, Any]]:
+        if self.local_store is not None:
+            local = await asyncio.to_thread(self.local_store.get, barcode)
+            if local:
+                print(f"[BarcodeTrace] ✓ Found in local bulk-import store: {local.get('food_name')}")
+                return local
+        return await self._lookup_network(barcode)
+
+    async def _lookup_network(self, barcode: str) -> Optional[Dict[str, Any]]:
+        """
+        Orchestration Logic (dependency graph):
+        1. C005 by barcode. For non-Korean (non-880) barcodes OpenFoodFacts is
+           started at the same time; C005 still wins when both find the product.
+        2. With a report number, C002 (ingredients) and I2790 (nutrition, only if
+           C005 lacks it) run concurrently. Public Data (name search) starts
+           speculatively alongside them and is used only if I2790 did not fill
+           the nutrition.
+        3. If C005 misses, use (or await) OpenFoodFacts.
+        4. Normalize Output
+
+        Returns None only when every queried source answered "not found". If no
+        source found the product and any of them failed, the UpstreamLookupError
+        is raised instead, so the miss is not cached as a negative.
+        """
+        started_at = time.perf_counter()
+        timings: Dict[str, int] = {}
         print(f"\n[BarcodeTrace] >>> Starting lookup for: {barcode}")
+
+        off_task: Optional[asyncio.Task[Any]] = None
+        if not self._is_korean_barcode(barcode):
+            print(f"[BarcodeTrace] Non-880 prefix: racing OpenFoodFacts against C005...")
+            off_task = asyncio.create_task(
+                self._timed("OFF", timings, self.off_client.get_product_by_barcode(barcode))
+            )
+
+        # 1. Try Data.go.kr
         print(f"[BarcodeTrace] Step 1: Querying Data.go.kr (C005)...")
-        korean_data = await self.datago_client.get_product_by_barcode(barcode)
-        
+        upstream_error: Optional[UpstreamLookupError] = None
+        try:
+            korean_data = await self._timed("C005", timings, self.datago_client.get_product_by_barcode(barcode))
+        except UpstreamLookupError as error:
+            print(f"[BarcodeTrace] ✗ C005 failed: {error}")
+            upstream_error = error
+            korean_data = None
+        except BaseException:
+            await self._discard(off_task)
+            raise
+
         if korean_data:
+            await self._discard(off_task)
             print(f"[BarcodeTrace] ✓ Found in Data.go.kr (C005)")
             print(f"[BarcodeTrace] Product Name: {korean_data.get('PRDLST_NM')}")
             
-            # Enrich with C002 (Ingredients) if available
             report_no = korean_data.get('PRDLST_REPORT_NO')
             if report_no:
-                # 1.1. Enrich Ingredients (C002)
-                print(f"[BarcodeTrace] Step 1.1: Enriching with C002 (Report No: {report_no})...")
-                raw_materials = await self.datago_client.get_food_item_raw_materials(report_no)
-                if raw_materials:
-                     raw_names = raw_materials.get('RAWMTRL_NM', '')
-                     if raw_names:
-                         print(f"[BarcodeTrace] ✓ C002 Ingredients Found!")
-                         korean_data['RAWMTRL_NM'] = raw_names
-                
-                # 1.2. Enrich Nutrition (I2790) if needed
-                if is_nutrition_missing(korean_data):
-                    print(f"[BarcodeTrace] Step 1.2: Nutrition missing in C005. Trying I2790...")
-                    nutrition_data = await self.datago_client.get_product_by_report_no(report_no)
-                    if nutrition_data:
-                        print(f"[BarcodeTrace] ✓ I2790 Nutrition Found! Patching data...")
-                        for key in NUTRITION_PATCH_KEYS:
-                            if nutrition_data.get(key):
-                                korean_data[key] = nutrition_data[key]
-                        korean_data['enrichment_nutr'] = "I2790"
-
-                # 1.3. Fallback to Public Data Portal (Name-based) if still missing
-                if is_nutrition_missing(korean_data):
-                    food_name = korean_data.get('PRDLST_NM')
-                    print(f"[BarcodeTrace] Step 1.3: Nutrition still missing. Trying Public Data Portal (Name: {food_name})...")
-                    if food_name:
-                        pd_nutrition = await self.public_data_client.get_nutrition_by_name(food_name)
-                        if pd_nutrition:
-                            print(f"[BarcodeTrace] ✓ Public Data Nutrition Found! Patching...")
-                            norm_pd = self.public_data_client.normalize_response(pd_nutrition)
-                            korean_data['NUTR_CONT1'] = norm_pd['calories']
-                            korean_data['NUTR_CONT2'] = norm_pd['carbs']
-                            korean_data['NUTR_CONT3'] = norm_pd['protein']
-                            korean_data['NUTR_CONT4'] = norm_pd['fat']
-                            korean_data['enrichment_nutr'] = "PublicData"
+                await self._enrich_korean_data(korean_data, report_no, timings)
 
             normalized = normalize_datago(korean_data)
+            timings["total"] = int((time.perf_counter() - started_at) * 1000)
             print(f"[BarcodeTrace] Final Result (KR): {normalized.get('food_name')} ({normalized.get('calories')} kcal)")
+            print(f"[BarcodeTrace] Timings: {self._format_timings(timings)}")
             return normalized
             
         # 2. Try Open Food Facts
         print(f"[BarcodeTrace] Step 2: Not found in KR DB. Trying OpenFoodFacts...")
-        off_data = await self.off_client.get_product_by_barcode(barcode)
+        try:
+            if off_task is None:
+                off_data = await self._timed("OFF", timings, self.off_client.get_product_by_barcode(barcode))
+            else:
+                off_data = await off_task
+        except UpstreamLookupError as error:
+            print(f"[BarcodeTrace] ✗ OpenFoodFacts failed: {error}")
+            upstream_error = upstream_error or error
+            off_data = None
+        timings["total"] = int((time.perf_counter() - started_at) * 1000)
         
         if off_data:
             print(f"[BarcodeTrace] ✓ Found in OpenFoodFacts")
             normalized = normalize_off(off_data)
             print(f"[BarcodeTrace] Final Result (OFF): {normalized.get('food_name')} ({normalized.get('calories')} kcal)")
+            print(f"[BarcodeTrace] Timings: {self._format_timings(timings)}")
             return normalized
             
+        print(f"[BarcodeTrace] Timings: {self._format_timings(timings)}")
+        if upstream_error is not None:
+            raise upstream_error
         print(f"[BarcodeTrace] ✗ Barcode {barcode} not found in any DB.")
         return None
+
+    async def _enrich_korean_data(self, korean_data: Dict[str, Any], report_no: str, timings: Dict[str, int]) -> None:
+        """Runs C002, I2790 and the speculative Public Data search concurrently and patches korean_data."""
+        nutrition_missing = is_nutrition_missing(korean_data)
+        food_name = korean_data.get('PRDLST_NM')
+        speculate = bool(nutrition_missing and food_name and has_budget(SPECULATIVE_LOOKUP_MIN_BUDGET_SECONDS))
+        print(
+            f"[BarcodeTrace] Step 1.1: Enriching with C002{' + I2790' if nutrition_missing else ''}"
+            f"{' + PublicData (speculative)' if speculate else ''} (Report No: {report_no})..."
+        )
+
+        raw_task = asyncio.create_task(
+            self._timed("C002", timings, self._optional("C002", self.datago_client.get_food_item_raw_materials(report_no)))
+        )
+        nutrition_task: Optional[asyncio.Task[Any]] = None
+        public_data_task: Optional[asyncio.Task[Any]] = None
+        if nutrition_missing:
+            nutrition_task = asyncio.create_task(
+                self._timed("I2790", timings, self._optional("I2790", self.datago_client.get_product_by_report_no(report_no)))
+            )
+            if speculate:
+                public_data_task = asyncio.create_task(
+                    self._timed(
+                        "PublicData",
+                        timings,
+                        self._optional("PublicData", self.public_data_client.get_nutrition_by_name(food_name)),
+                    )
+                )
+
+        try:
+            raw_materials = await raw_task
+            if raw_materials:
+                raw_names = raw_materials.get('RAWMTRL_NM', '')
+                if raw_names:
+                    print(f"[BarcodeTrace] ✓ C002 Ingredients Found!")
+                    korean_data['RAWMTRL_NM'] = raw_names
+
+            if nutrition_task is not None:
+                nutrition_data = await nutrition_task
+                if nutrition_data:
+                    print(f"[BarcodeTrace] ✓ I2790 Nutrition Found! Patching data...")
+                    for key in NUTRITION_PATCH_KEYS:
+                        if nutrition_data.get(key):
+                            korean_data[key] = nutrition_data[key]
+                    korean_data['enrichment_nutr'] = "I2790"
+
+            if public_data_task is not None:
+                if not is_nutrition_missing(korean_data):
+                    await self._discard(public_data_task)
+                    return
+                print(f"[BarcodeTrace] Step 1.3: Nutrition still missing. Using Public Data Portal (Name: {food_name})...")
+                pd_nutrition = await public_data_task
+                if pd_nutrition:
+                    print(f"[BarcodeTrace] ✓ Public Data Nutrition Found! Patching...")
+                    norm_pd = self.public_data_client.normalize_response(pd_nutrition)
+                    korean_data['NUTR_CONT1'] = norm_pd['calories']
+                    korean_data['NUTR_CONT2'] = norm_pd['carbs']
+                    korean_data['NUTR_CONT3'] = norm_pd['protein']
+                    korean_data['NUTR_CONT4'] = norm_pd['fat']
+                    korean_data['enrichment_nutr'] = "PublicData"
+        finally:
+            for task in (raw_task, nutrition_task, public_data_task):
+                await self._discard(task)
@@ -0,0 +1,70 @@
+"""
+Client IP resolution behind reverse proxies.
+
+On Render (and any load balancer) the TCP peer is the proxy, so keying rate
+limits on it puts every user in one bucket. X-Forwarded-For is only believed
+when the peer is a trusted proxy; otherwise any client could pick its own key
+by sending the header. Trust follows uvicorn's FORWARDED_ALLOW_IPS (comma list
+of IPs or CIDRs, "*" for any peer), so the app and the server agree on it.
+"""
+from __future__ import annotations
+
+import ipaddress
+from typing import Callable, Mapping
+
+TRUSTED_PROXIES_ENV = "FORWARDED_ALLOW_IPS"
+DEFAULT_TRUSTED_PROXIES = "127.0.0.1"
+FORWARDED_FOR_HEADER = "x-forwarded-for"
+UNKNOWN_CLIENT = "unknown"
+
+_Network = ipaddress.IPv4Network | ipaddress.IPv6Network
+
+
+class TrustedProxies:
+    def __init__(self, spec: str = DEFAULT_TRUSTED_PROXIES) -> None:
+        entries = [entry.strip() for entry in spec.split(",") if entry.strip()]
+        self.trust_all = "*" in entries
+        self._hosts: set[str] = set()
+        self._networks: list[_Network] = []
+        for entry in entries:
+            if entry == "*":
+                continue
+            try:
+                self._networks.append(ipaddress.ip_network(entry, strict=False))
+            except ValueError:
+                # Not an address (e.g. a unix socket path): match it literally.
+                self._hosts.add(entry)
+
+    @classmethod
+    def from_env(cls, env_getter: Callable[[str], str | None]) -> "TrustedProxies":
+        return cls(env_getter(TRUSTED_PROXIES_ENV) or DEFAULT_TRUSTED_PROXIES)
+
+    def is_trusted(self, host: str) -> bool:
+        if self.trust_all or host in self._hosts:
+            return True
+        try:
+            address = ipaddress.ip_address(host)
+        except ValueError:
+            return False
+        return any(address in network for network in self._networks)
+
+    def client_ip(self, peer: str | None, forwarded_for: str | None) -> str:
+        """
+        The first untrusted hop, reading X-Forwarded-For right to left from the
+        peer; each trusted proxy vouches for the hop it appended.
+        """
+        if not peer:
+            return UNKNOWN_CLIENT
+        if not forwarded_for or not self.is_trusted(peer):
+            return peer
+        hops = [hop.strip() for hop in forwarded_for.split(",") if hop.strip()]
+        for hop in reversed(hops):
+            if not self.is_trusted(hop):
+                return hop
+        return hops[0] if hops else peer
+
+    def from_scope(self, scope: Mapping[str, object], headers: Mapping[str, str]) -> str:
+        """client_ip for an ASGI scope; headers are lower-cased names."""
+        client = scope.get("client")
+        peer = client[0] if isinstance(client, (tuple, list)) and client else None
+        return self.client_ip(peer, headers.get(FORWARDED_FOR_HEADER))
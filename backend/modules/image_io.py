@@ -0,0 +1,35 @@
+"""Upload decoding helpers. Kept free of heavy imports so they can run in worker processes."""
+from io import BytesIO
+
+from PIL import Image, ImageOps
+
+UPLOAD_JPEG_QUALITY = 90
+
+
+def decode_upload_to_image(contents: bytes) -> Image.Image:
+    image = Image.open(BytesIO(contents))
+
+    # Normalize EXIF orientation so portrait/landscape captures are analyzed consistently.
+    # Some mobile captures store rotation metadata instead of rotating raw pixels.
+    try:
+        normalized = ImageOps.exif_transpose(image)
+    except Exception:
+        normalized = image
+
+    if normalized.mode not in ("RGB", "RGBA"):
+        normalized = normalized.convert("RGB")
+
+    return normalized
+
+
+def decode_upload_to_jpeg(contents: bytes, quality: int = UPLOAD_JPEG_QUALITY) -> bytes:
+    """
+    Decode + orientation-normalize an upload and re-encode it as the JPEG sent to Vertex.
+    Returns bytes (not a PIL image) so the result is cheap to ship back from a process pool.
+    """
+    image = decode_upload_to_image(contents)
+    if image.mode != "RGB":
+        image = image.convert("RGB")
+    buffer = BytesIO()
+    image.save(buffer, format="JPEG", quality=quality)
+    return buffer.getvalue()
@@ -10,6 +10,7 @@ import httpx
 from typing import Optional, Dict, Any
 from backend.modules.nutrition_core.constants import (
     API_CONNECT_TIMEOUT,
+    API_MIN_BUDGET_SECONDS,
     API_TIMEOUT_FAST,
     API_TIMEOUT_SLOW,
     FATSECRET_API_URL,
@@ -19,6 +20,7 @@ from backend.modules.nutrition_core.constants import (
     USDA_API_BASE,
 )
 from backend.modules.nutrition_core.names import normalize_food_name
+from backend.modules.request_deadline import check_deadline, has_budget, time_budget
 
 
 class NutritionLookup:
@@ -52,11 +54,15 @@ class NutritionLookup:
         
         Uses fuzzy matching via normalize_food_name() to try multiple
         name variants for improved matching success.
+        Upstream timeouts are capped by the request deadline, and no further
+        variant or upstream is tried once it is nearly spent.
         """
         # Get all name variants for fuzzy matching
         name_variants = normalize_food_name(food_name)
         
         for query in name_variants:
+            if not has_budget(API_MIN_BUDGET_SECONDS):
+                break
             result = self._search_food_single(query, food_origin)
             if self._has_calories(result):
                 return result
@@ -117,7 +123,7 @@ class NutritionLookup:
             }
             
             url = f"{KOREAN_FDA_API_BASE}/getFoodNtrCpntDbInq02"
-            response = httpx.get(url, params=params, timeout=API_TIMEOUT_FAST)
+            response = httpx.get(url, params=params, timeout=self._timeout(API_TIMEOUT_FAST))
             
             # If rate limit exceeded or error, print and return None to trigger fallback
             if response.status_code != 200:
@@ -165,7 +171,7 @@ class NutritionLookup:
                 FATSECRET_TOKEN_URL,
                 data={"grant_type": "client_credentials"},
                 auth=(self.fatsecret_id, self.fatsecret_secret),
-                timeout=API_TIMEOUT_FAST
+                timeout=self._timeout(API_TIMEOUT_FAST)
             )
             response.raise_for_status()
             token_data = response.json()
@@ -197,13 +203,13 @@ class NutritionLookup:
             
             headers = {"Authorization": f"Bearer {self.fatsecret_token}"}
             
-            response = httpx.get(FATSECRET_API_URL, params=search_params, headers=headers, timeout=API_TIMEOUT_FAST)
+            response = httpx.get(FATSECRET_API_URL, params=search_params, headers=headers, timeout=self._timeout(API_TIMEOUT_FAST))
             
             # If 401 Unauthorized, maybe token expired. Retry once.
             if response.status_code == 401:
                  self.fatsecret_token = self._get_fatsecret_token()
                  headers = {"Authorization": f"Bearer {self.fatsecret_token}"}
-                 response = httpx.get(FATSECRET_API_URL, params=search_params, headers=headers, timeout=API_TIMEOUT_FAST)
+                 response = httpx.get(FATSECRET_API_URL, params=search_params, headers=headers, timeout=self._timeout(API_TIMEOUT_FAST))
             
             response.raise_for_status()
             data = response.json()
@@ -231,7 +237,7 @@ class NutritionLookup:
                 "format": "json"
             }
             
-            detail_res = httpx.get(FATSECRET_API_URL, params=detail_params, headers=headers, timeout=API_TIMEOUT_FAST)
+            detail_res = httpx.get(FATSECRET_API_URL, params=detail_params, headers=headers, timeout=self._timeout(API_TIMEOUT_FAST))
             detail_res.raise_for_status()
             detail_data = detail_res.json()
             
@@ -298,7 +304,7 @@ class NutritionLookup:
                 "pageSize": 5
             }
             
-            response = httpx.get(f"{USDA_API_BASE}/foods/search", params=params, timeout=API_TIMEOUT_FAST)
+            response = httpx.get(f"{USDA_API_BASE}/foods/search", params=params, timeout=self._timeout(API_TIMEOUT_FAST))
             
             # Handle limits/errors
             if response.status_code != 200:
@@ -358,7 +364,7 @@ class NutritionLookup:
             
             headers = {"User-Agent": "FoodLens App - https://github.com/foodlens"}
             # Use shorter timeout for Open Food Facts (often slow/unreliable)
-            timeout = httpx.Timeout(API_TIMEOUT_SLOW, connect=API_CONNECT_TIMEOUT)
+            timeout = httpx.Timeout(self._timeout(API_TIMEOUT_SLOW), connect=time_budget(API_CONNECT_TIMEOUT))
             response = httpx.get(OPEN_FOOD_FACTS_API, params=params, headers=headers, timeout=timeout)
             response.raise_for_status()
             data = response.json()
@@ -408,12 +414,19 @@ class NutritionLookup:
             return None
     
     # ==================== Helpers ====================
+    def _timeout(self, seconds: float) -> float:
+        """Upstream timeout shrunk to the remaining request deadline."""
+        check_deadline("nutrition lookup")
+        return time_budget(seconds)
+
     def _has_calories(self, result: Optional[Dict[str, Any]]) -> bool:
         return bool(result and result.get("calories") is not None)
 
     def _try_search_chain(self, food_name: str, searchers) -> tuple[Optional[Dict[str, Any]], bool]:
         last_result = None
         for searcher in searchers:
+            if not has_budget(API_MIN_BUDGET_SECONDS):
+                break
             last_result = searcher(food_name)
             if self._has_calories(last_result):
                 return last_result, True
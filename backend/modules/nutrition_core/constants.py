@@ -8,6 +8,8 @@ FATSECRET_API_URL = "https://platform.fatsecret.com/rest/server.api"
 API_TIMEOUT_FAST = 3.0
 API_TIMEOUT_SLOW = 10.0
 API_CONNECT_TIMEOUT = 2.0
+# Below this much of the request deadline, no further upstream is tried.
+API_MIN_BUDGET_SECONDS = 0.5
 
 # Food name synonyms for fuzzy matching
 FOOD_SYNONYMS = {
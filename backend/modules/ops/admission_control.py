@@ -0,0 +1,322 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import logging
+import math
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from enum import IntEnum
+from typing import Any, Callable
+
+from backend.modules.client_ip import TrustedProxies
+from backend.modules.request_deadline import Deadline, client_timeout_seconds, deadline_scope
+from backend.modules.runtime_guardrails import EndpointErrorPolicy, ErrorCode, new_request_id
+
+logger = logging.getLogger("foodlens.admission")
+
+RATE_LIMITED_POLICY = EndpointErrorPolicy(
+    code=ErrorCode.RATE_LIMITED,
+    status_code=429,
+    user_message="Too many requests. Please retry shortly.",
+)
+OVERLOADED_POLICY = EndpointErrorPolicy(
+    code=ErrorCode.SERVICE_OVERLOADED,
+    status_code=503,
+    user_message="Server is busy. Please retry shortly.",
+)
+
+
+class RoutePriority(IntEnum):
+    CHEAP = 0
+    EXPENSIVE = 1
+
+
+@dataclass(frozen=True)
+class RoutePolicy:
+    """Limits for every path under prefix. Each route class gets its own slot pool."""
+
+    prefix: str
+    priority: RoutePriority
+    rate_per_minute: float
+    burst: int
+    max_concurrency: int
+    default_timeout_seconds: float
+    expected_service_seconds: float
+    # Largest X-Client-Timeout-Ms honoured; None lets the header only shorten the default.
+    max_timeout_seconds: float | None = None
+
+
+@dataclass(frozen=True)
+class AdmissionConfig:
+    enabled: bool
+    routes: tuple[RoutePolicy, ...]
+    trusted_proxies: TrustedProxies = field(default_factory=TrustedProxies)
+
+    @classmethod
+    def from_env(cls, env_getter) -> "AdmissionConfig":
+        def _env_float(name: str, default: float) -> float:
+            raw = env_getter(name)
+            if raw is None:
+                return default
+            try:
+                return float(raw)
+            except ValueError:
+                return default
+
+        # Barcode lookups and auth are cheap and latency-sensitive; analysis is
+        # Gemini-bound (3 concurrent model calls per process) and can wait or shed.
+        # Default deadlines match the app's own timeouts (BARCODE_LOOKUP_TIMEOUT_MS
+        # 30 s, ANALYSIS_TIMEOUT_MS 180 s) so the server never gives up first.
+        cheap = {
+            "priority": RoutePriority.CHEAP,
+            "rate_per_minute": _env_float("ADMISSION_CHEAP_RATE_PER_MINUTE", 300.0),
+            "burst": int(_env_float("ADMISSION_CHEAP_BURST", 60)),
+            "max_concurrency": int(_env_float("ADMISSION_CHEAP_MAX_CONCURRENCY", 64)),
+            "default_timeout_seconds": _env_float("ADMISSION_CHEAP_TIMEOUT_SECONDS", 30.0),
+            "max_timeout_seconds": _env_float("ADMISSION_CHEAP_MAX_TIMEOUT_SECONDS", 60.0),
+            "expected_service_seconds": 0.2,
+        }
+        expensive = {
+            "priority": RoutePriority.EXPENSIVE,
+            "rate_per_minute": _env_float("ADMISSION_ANALYZE_RATE_PER_MINUTE", 30.0),
+            "burst": int(_env_float("ADMISSION_ANALYZE_BURST", 10)),
+            "max_concurrency": int(_env_float("ADMISSION_ANALYZE_MAX_CONCURRENCY", 4)),
+            "default_timeout_seconds": _env_float("ADMISSION_ANALYZE_TIMEOUT_SECONDS", 180.0),
+            "max_timeout_seconds": _env_float("ADMISSION_ANALYZE_MAX_TIMEOUT_SECONDS", 300.0),
+            "expected_service_seconds": _env_float("ADMISSION_ANALYZE_EXPECTED_SECONDS", 8.0),
+        }
+        return cls(
+            enabled=(env_getter("ADMISSION_CONTROL_ENABLED") or "1").strip() == "1",
+            routes=(
+                RoutePolicy(prefix="/lookup", **cheap),
+                RoutePolicy(prefix="/auth", **cheap),
+                RoutePolicy(prefix="/me", **cheap),
+                RoutePolicy(prefix="/analyze", **expensive),
+            ),
+            trusted_proxies=TrustedProxies.from_env(env_getter),
+        )
+
+    def match(self, path: str) -> RoutePolicy | None:
+        best: RoutePolicy | None = None
+        for route in self.routes:
+            if (path == route.prefix or path.startswith(route.prefix + "/")) and (
+                best is None or len(route.prefix) > len(best.prefix)
+            ):
+                best = route
+        return best
+
+
+class TokenBucketLimiter:
+    """
+    Token buckets by key, refilled continuously. Only touched from the event
+    loop, so no locking; the least recently used buckets are evicted beyond
+    max_keys (an evicted bucket comes back full, i.e. the lenient direction).
+    """
+
+    def __init__(self, *, max_keys: int = 100_000, clock: Callable[[], float] = time.monotonic) -> None:
+        self.max_keys = max(1, max_keys)
+        self._clock = clock
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+
+    def try_take(self, key: str, *, rate_per_minute: float, burst: int) -> float:
+        """Take one token; returns 0.0 when allowed, else seconds until a token is available."""
+        if rate_per_minute <= 0:
+            return 0.0
+        now = self._clock()
+        capacity = float(max(1, burst))
+        refill_per_second = rate_per_minute / 60.0
+        tokens, updated_at = self._buckets.get(key, (capacity, now))
+        tokens = min(capacity, tokens + (now - updated_at) * refill_per_second)
+        if tokens >= 1.0:
+            self._buckets[key] = (tokens - 1.0, now)
+            self._buckets.move_to_end(key)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+            return 0.0
+        self._buckets[key] = (tokens, now)
+        self._buckets.move_to_end(key)
+        return (1.0 - tokens) / refill_per_second
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+
+class _SlotPool:
+    """
+    max_concurrency slots for one route class, with a FIFO of waiters.
+
+    A released slot is handed straight to the oldest live waiter. Service time
+    is tracked as an EWMA so the queue wait a new request would see can be
+    estimated before it joins the queue.
+    """
+
+    def __init__(self, *, capacity: int, expected_service_seconds: float) -> None:
+        self.capacity = max(1, capacity)
+        self.in_flight = 0
+        self.service_seconds_ewma = max(0.001, expected_service_seconds)
+        self._waiters: deque[asyncio.Future[None]] = deque()
+        self.admitted = 0
+        self.shed = 0
+
+    @property
+    def waiting(self) -> int:
+        return sum(1 for waiter in self._waiters if not waiter.done())
+
+    def estimated_wait_seconds(self) -> float:
+        if self.in_flight < self.capacity and not self.waiting:
+            return 0.0
+        # Everyone ahead, plus this request's own turn, drains capacity at a time.
+        return (self.waiting + 1) * self.service_seconds_ewma / self.capacity
+
+    async def acquire(self, timeout_seconds: float) -> bool:
+        if self.in_flight < self.capacity and not self.waiting:
+            self.in_flight += 1
+            return True
+        waiter: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(waiter, timeout=max(0.0, timeout_seconds))
+        except asyncio.TimeoutError:
+            return False
+        except BaseException:
+            # Cancelled (client went away) after a slot was already handed over: give it back.
+            if waiter.done() and not waiter.cancelled():
+                self._hand_over()
+            raise
+        return True
+
+    def release(self, service_seconds: float) -> None:
+        self.service_seconds_ewma += 0.2 * (max(0.0, service_seconds) - self.service_seconds_ewma)
+        self._hand_over()
+
+    def _hand_over(self) -> None:
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.in_flight -= 1
+
+
+class AdmissionControlMiddleware:
+    """
+    ASGI middleware: per-route token buckets per client IP and per bearer
+    credential, then admission into the route class's slot pool. The client IP
+    comes from X-Forwarded-For only when the peer is a trusted proxy.
+
+    A request is shed with 503 + Retry-After when the estimated queue wait
+    already exceeds its timeout (X-Client-Timeout-Ms up to the route maximum,
+    else the route default),
+    or when it times out waiting. Cheap and expensive routes use separate
+    pools, so barcode lookups never queue behind label OCR.
+
+    Admitted requests run under a request deadline measured from arrival, so
+    time spent queued here comes out of the budget the handlers see.
+    """
+
+    def __init__(self, app: Any, *, config: AdmissionConfig, limiter: TokenBucketLimiter | None = None) -> None:
+        self.app = app
+        self.config = config
+        self.limiter = limiter or TokenBucketLimiter()
+        self._pools: dict[str, _SlotPool] = {}
+        self.rate_limited = 0
+
+    async def __call__(self, scope: dict[str, Any], receive: Any, send: Any) -> None:
+        if scope["type"] != "http" or not self.config.enabled:
+            await self.app(scope, receive, send)
+            return
+        route = self.config.match(scope.get("path", ""))
+        if route is None:
+            await self.app(scope, receive, send)
+            return
+
+        arrived_at = time.monotonic()
+        headers = {name.decode("latin-1").lower(): value.decode("latin-1") for name, value in scope.get("headers", [])}
+        request_id = headers.get("x-request-id") or new_request_id()
+        keys = [f"ip:{self.config.trusted_proxies.from_scope(scope, headers)}"]
+        authorization = headers.get("authorization")
+        if authorization:
+            keys.append("user:" + hashlib.sha256(authorization.encode("utf-8")).hexdigest()[:24])
+
+        for key in keys:
+            retry_after = self.limiter.try_take(
+                f"{route.prefix}:{key}",
+                rate_per_minute=route.rate_per_minute,
+                burst=route.burst,
+            )
+            if retry_after > 0:
+                self.rate_limited += 1
+                await self._reject(send, RATE_LIMITED_POLICY, request_id, retry_after)
+                return
+
+        pool = self._pool(route)
+        timeout_seconds = client_timeout_seconds(headers, route.default_timeout_seconds, route.max_timeout_seconds)
+        estimated_wait = pool.estimated_wait_seconds()
+        if estimated_wait > timeout_seconds or not await pool.acquire(timeout_seconds):
+            pool.shed += 1
+            logger.warning(
+                "[Admission] shed request_id=%s route=%s in_flight=%s waiting=%s est_wait_s=%.2f timeout_s=%.2f",
+                request_id,
+                route.prefix,
+                pool.in_flight,
+                pool.waiting,
+                estimated_wait,
+                timeout_seconds,
+            )
+            await self._reject(send, OVERLOADED_POLICY, request_id, max(estimated_wait, pool.service_seconds_ewma))
+            return
+
+        pool.admitted += 1
+        started_at = time.monotonic()
+        try:
+            with deadline_scope(Deadline(arrived_at + timeout_seconds)):
+                await self.app(scope, receive, send)
+        finally:
+            pool.release(time.monotonic() - started_at)
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "rate_limited": self.rate_limited,
+            "buckets": len(self.limiter),
+            "pools": {
+                prefix: {
+                    "in_flight": pool.in_flight,
+                    "waiting": pool.waiting,
+                    "admitted": pool.admitted,
+                    "shed": pool.shed,
+                    "service_ms_ewma": round(pool.service_seconds_ewma * 1000, 1),
+                }
+                for prefix, pool in self._pools.items()
+            },
+        }
+
+    def _pool(self, route: RoutePolicy) -> _SlotPool:
+        # Routes sharing a priority class share one pool.
+        pool_key = route.priority.name.lower()
+        pool = self._pools.get(pool_key)
+        if pool is None:
+            pool = _SlotPool(capacity=route.max_concurrency, expected_service_seconds=route.expected_service_seconds)
+            self._pools[pool_key] = pool
+        return pool
+
+    @staticmethod
+    async def _reject(send: Any, policy: EndpointErrorPolicy, request_id: str, retry_after_seconds: float) -> None:
+        body = json.dumps(
+            {"detail": {"message": policy.user_message, "code": policy.code, "request_id": request_id}}
+        ).encode("utf-8")
+        await send(
+            {
+                "type": "http.response.start",
+                "status": policy.status_code,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode("ascii")),
+                    (b"retry-after", str(max(1, math.ceil(retry_after_seconds))).encode("ascii")),
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": body})
+
@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+import numpy as np
+from PIL import Image
+
+from backend.modules.quality.label_quality_gate import connected_components, downsample_gray, find_edges
+
+DETECT_MAX_SIDE = 640
+CELL_SIZE = 8
+# Stricter than the gate's STRONG_EDGE_THRESHOLD: print strokes, not packaging texture.
+TEXT_EDGE_THRESHOLD = 64
+MIN_CELL_EDGE_DENSITY = 0.08
+CLOSING_RADIUS = 2
+# Detection is "unsure" (full frame is kept) outside these bounds.
+MIN_REGION_AREA_RATIO = 0.03
+MAX_REGION_AREA_RATIO = 0.80
+MIN_REGION_FILL_RATIO = 0.5
+MAX_RUNNER_UP_RATIO = 0.5
+
+
+@dataclass(frozen=True)
+class LabelRegion:
+    # (left, upper, right, lower) in source-image pixels, padding included.
+    box: tuple[int, int, int, int]
+    area_ratio: float
+    fill_ratio: float
+
+
+def _shift_any(mask: np.ndarray, radius: int) -> np.ndarray:
+    """True where any cell of the surrounding (2r+1)^2 square is True; cells past the edge count as False."""
+    height, width = mask.shape
+    padded = np.pad(mask, radius)
+    out = np.zeros_like(mask)
+    for dy in range(2 * radius + 1):
+        for dx in range(2 * radius + 1):
+            out |= padded[dy : dy + height, dx : dx + width]
+    return out
+
+
+def _close(mask: np.ndarray, radius: int) -> np.ndarray:
+    """Morphological closing (dilate then erode) with a square structuring element."""
+    if radius <= 0:
+        return mask
+    padded = np.pad(mask, radius)
+    dilated = _shift_any(padded, radius)
+    eroded = ~_shift_any(~dilated, radius)
+    return eroded[radius:-radius, radius:-radius]
+
+
+def detect_label_region(
+    image: Image.Image,
+    *,
+    max_side: int = DETECT_MAX_SIDE,
+    padding_ratio: float = 0.04,
+) -> LabelRegion | None:
+    """
+    CPU-only text-region detector for label photos.
+
+    Strong-edge density is pooled into CELL_SIZE cells on a downsample, closed
+    morphologically so text lines merge into one blob, and the largest blob is
+    returned as a padded crop box. Returns None when detection is unsure so the
+    caller keeps the full frame.
+    """
+    gray = np.asarray(downsample_gray(image, max_side), dtype=np.uint8)
+    height, width = gray.shape
+    rows, cols = height // CELL_SIZE, width // CELL_SIZE
+    if rows < 4 or cols < 4:
+        return None
+
+    strong = find_edges(gray) >= TEXT_EDGE_THRESHOLD
+    strong[[0, -1], :] = False
+    strong[:, [0, -1]] = False
+    cells = strong[: rows * CELL_SIZE, : cols * CELL_SIZE].reshape(rows, CELL_SIZE, cols, CELL_SIZE)
+    text_cells = _close(cells.mean(axis=(1, 3)) >= MIN_CELL_EDGE_DENSITY, CLOSING_RADIUS)
+
+    components = connected_components(text_cells)
+    if not components:
+        return None
+    size, (row0, col0, row1, col1) = components[0]
+    if len(components) > 1 and components[1][0] >= MAX_RUNNER_UP_RATIO * size:
+        return None
+
+    box_cells = (row1 - row0) * (col1 - col0)
+    area_ratio = box_cells / (rows * cols)
+    fill_ratio = size / box_cells
+    if not (MIN_REGION_AREA_RATIO <= area_ratio <= MAX_REGION_AREA_RATIO) or fill_ratio < MIN_REGION_FILL_RATIO:
+        return None
+
+    scale_x = image.size[0] / width
+    scale_y = image.size[1] / height
+    left, upper = col0 * CELL_SIZE * scale_x, row0 * CELL_SIZE * scale_y
+    right, lower = col1 * CELL_SIZE * scale_x, row1 * CELL_SIZE * scale_y
+    pad_x = (right - left) * padding_ratio + CELL_SIZE * scale_x
+    pad_y = (lower - upper) * padding_ratio + CELL_SIZE * scale_y
+    box = (
+        max(0, int(left - pad_x)),
+        max(0, int(upper - pad_y)),
+        min(image.size[0], int(right + pad_x + 0.5)),
+        min(image.size[1], int(lower + pad_y + 0.5)),
+    )
+    return LabelRegion(box=box, area_ratio=area_ratio, fill_ratio=fill_ratio)
+
+
+def crop_to_label_region(image: Image.Image, **kwargs) -> tuple[Image.Image, LabelRegion | None]:
+    """Crop to the detected label region, or return the frame unchanged when unsure."""
+    region = detect_label_region(image, **kwargs)
+    if region is None:
+        return image, None
+    return image.crop(region.box), region
@@ -0,0 +1,126 @@
+"""
+Per-request deadline carried in a context variable.
+
+The deadline is set once per request (client header within the route's maximum,
+else the route default) and read
+by every stage below it. asyncio.to_thread copies the context, so code running
+under run_in_threadpool sees the same deadline without threading it through
+call signatures. Outside a request (scripts, tests) there is no deadline and
+every helper falls back to the stage's own limits.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Iterator, Mapping
+
+CLIENT_TIMEOUT_HEADER = "x-client-timeout-ms"
+
+
+class DeadlineExceeded(TimeoutError):
+    """Raised at a stage boundary once the deadline passed or the client went away."""
+
+    def __init__(self, stage: str, *, cancelled: bool = False) -> None:
+        self.stage = stage
+        self.cancelled = cancelled
+        reason = "client disconnected" if cancelled else "deadline exceeded"
+        super().__init__(f"{reason} before {stage}")
+
+
+class Deadline:
+    """Monotonic expiry plus a cancel flag that worker threads can observe."""
+
+    def __init__(self, expires_at: float, *, clock: Callable[[], float] = time.monotonic) -> None:
+        self.expires_at = expires_at
+        self._clock = clock
+        self._cancelled = threading.Event()
+
+    @classmethod
+    def after(cls, seconds: float, *, clock: Callable[[], float] = time.monotonic) -> "Deadline":
+        return cls(clock() + max(0.0, seconds), clock=clock)
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def cancel(self) -> None:
+        self._cancelled.set()
+
+    def remaining(self) -> float:
+        if self._cancelled.is_set():
+            return 0.0
+        return max(0.0, self.expires_at - self._clock())
+
+    def expired(self) -> bool:
+        return self.remaining() <= 0.0
+
+    def check(self, stage: str) -> None:
+        if self.expired():
+            raise DeadlineExceeded(stage, cancelled=self.cancelled)
+
+    def sleep(self, seconds: float) -> bool:
+        """Sleep up to seconds, waking early on cancel. False when the deadline ran out."""
+        budget = min(max(0.0, seconds), self.remaining())
+        if self._cancelled.wait(budget):
+            return False
+        return budget >= seconds
+
+
+_current_deadline: ContextVar[Deadline | None] = ContextVar("request_deadline", default=None)
+
+
+def current_deadline() -> Deadline | None:
+    return _current_deadline.get()
+
+
+@contextmanager
+def deadline_scope(deadline: Deadline | None) -> Iterator[Deadline | None]:
+    token = _current_deadline.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _current_deadline.reset(token)
+
+
+def time_budget(cap_seconds: float) -> float:
+    """A stage's own limit, shrunk to whatever is left of the request deadline."""
+    deadline = _current_deadline.get()
+    if deadline is None:
+        return cap_seconds
+    return min(cap_seconds, deadline.remaining())
+
+
+def has_budget(min_seconds: float) -> bool:
+    """True when optional work needing at least min_seconds still fits."""
+    deadline = _current_deadline.get()
+    return deadline is None or deadline.remaining() >= min_seconds
+
+
+def check_deadline(stage: str) -> None:
+    deadline = _current_deadline.get()
+    if deadline is not None:
+        deadline.check(stage)
+
+
+def client_timeout_seconds(
+    headers: Mapping[str, str],
+    default_seconds: float,
+    max_seconds: float | None = None,
+) -> float:
+    """
+    Client's own timeout from X-Client-Timeout-Ms, which may shorten the route
+    default or extend it up to max_seconds (None: the default is the ceiling).
+    """
+    ceiling = default_seconds if max_seconds is None else max(default_seconds, max_seconds)
+    raw = headers.get(CLIENT_TIMEOUT_HEADER)
+    if raw is None:
+        return default_seconds
+    try:
+        seconds = float(raw) / 1000.0
+    except ValueError:
+        return default_seconds
+    if seconds != seconds:  # NaN
+        return default_seconds
+    return max(0.0, min(ceiling, seconds))
@@ -1,13 +1,17 @@
 from __future__ import annotations
 
 import asyncio
+import contextlib
 import logging
+import math
 from dataclasses import dataclass
 from enum import StrEnum
 from typing import Any, Awaitable, Callable
 from uuid import uuid4
 
-from fastapi import HTTPException
+from fastapi import HTTPException, Request
+
+from backend.modules.request_deadline import Deadline, DeadlineExceeded, current_deadline, deadline_scope
 
 
 logger = logging.getLogger("foodlens.runtime")
@@ -20,6 +24,11 @@ class ErrorCode(StrEnum):
     ANALYZE_LABEL_FAILED = "ANALYZE_LABEL_FAILED"
     ANALYZE_SMART_FAILED = "ANALYZE_SMART_FAILED"
     BARCODE_LOOKUP_FAILED = "BARCODE_LOOKUP_FAILED"
+    INVALID_REQUEST = "INVALID_REQUEST"
+    RATE_LIMITED = "RATE_LIMITED"
+    SERVICE_OVERLOADED = "SERVICE_OVERLOADED"
+    DEADLINE_EXCEEDED = "DEADLINE_EXCEEDED"
+    CLIENT_DISCONNECTED = "CLIENT_DISCONNECTED"
 
 
 @dataclass(frozen=True)
@@ -29,6 +38,20 @@ class EndpointErrorPolicy:
     user_message: str = "Internal server error"
 
 
+DEADLINE_EXCEEDED_POLICY = EndpointErrorPolicy(
+    code=ErrorCode.DEADLINE_EXCEEDED,
+    status_code=504,
+    user_message="Request deadline exceeded",
+)
+# 499 (nginx's "client closed request"): nobody reads it, but access logs tell it apart from a 5xx.
+CLIENT_DISCONNECTED_POLICY = EndpointErrorPolicy(
+    code=ErrorCode.CLIENT_DISCONNECTED,
+    status_code=499,
+    user_message="Client closed request",
+)
+DISCONNECT_POLL_SECONDS = 0.25
+
+
 def new_request_id() -> str:
     return uuid4().hex[:12]
 
@@ -64,15 +87,60 @@ async def run_in_threadpool(func: Callable[..., Any], *args: Any, **kwargs: Any)
     return await asyncio.to_thread(func, *args, **kwargs)
 
 
+async def _run_until_disconnect(request: Request, operation: Callable[[], Awaitable[Any]]) -> Any:
+    """
+    Run operation while polling for client disconnect. On disconnect the
+    request deadline is cancelled, so threadpool stages stop at their next
+    check, and the operation task itself is cancelled.
+    """
+    deadline = current_deadline() or Deadline(math.inf)
+    with deadline_scope(deadline):
+        task = asyncio.ensure_future(operation())
+    try:
+        while True:
+            done, _ = await asyncio.wait({task}, timeout=DISCONNECT_POLL_SECONDS)
+            if done:
+                return task.result()
+            if await request.is_disconnected():
+                raise DeadlineExceeded("response", cancelled=True)
+    finally:
+        if not task.done():
+            deadline.cancel()
+            task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
+
+
 async def run_with_error_policy(
     endpoint: str,
     policy: EndpointErrorPolicy,
     operation: Callable[[], Awaitable[Any]],
+    *,
+    request: Request | None = None,
 ) -> Any:
+    """
+    Run an endpoint operation, mapping failures to policy. With request, the
+    operation is abandoned as soon as the client disconnects.
+    """
     request_id = new_request_id()
     try:
-        return await operation()
+        if request is None:
+            return await operation()
+        return await _run_until_disconnect(request, operation)
     except HTTPException:
         raise
+    except DeadlineExceeded as error:
+        deadline_policy = CLIENT_DISCONNECTED_POLICY if error.cancelled else DEADLINE_EXCEEDED_POLICY
+        logger.warning(
+            "endpoint=%s request_id=%s code=%s error=%s",
+            endpoint,
+            request_id,
+            deadline_policy.code,
+            error,
+        )
+        raise HTTPException(
+            status_code=deadline_policy.status_code,
+            detail=f"{deadline_policy.user_message} (code={deadline_policy.code}, request_id={request_id})",
+        ) from error
     except Exception as error:
         raise to_http_exception(endpoint, request_id, error, policy) from error
@@ -4,11 +4,13 @@ from typing import Tuple
 
 import sentry_sdk
 from dotenv import load_dotenv
-from PIL import Image, ImageOps
 
 from backend.modules.analyst_runtime.food_analyst import FoodAnalyst
+from backend.modules.barcode.local_store import LocalBarcodeStore
+from backend.modules.barcode.product_cache import BarcodeProductCache
 from backend.modules.barcode.service import BarcodeService
 from backend.modules.analyst_runtime.router import SmartRouter
+from backend.modules.image_io import decode_upload_to_image  # noqa: F401
 
 
 def _init_sentry() -> None:
@@ -51,7 +53,10 @@ def initialize_services() -> Tuple[FoodAnalyst, BarcodeService, SmartRouter]:
         print("[Startup] Initializing FoodAnalyst...")
         analyst = FoodAnalyst()
         print("[Startup] ✓ FoodAnalyst initialized.")
-        barcode_service = BarcodeService()
+        barcode_service = BarcodeService(
+            product_cache=BarcodeProductCache.from_env(),
+            local_store=LocalBarcodeStore.from_env(),
+        )
         print("[Startup] ✓ BarcodeService initialized.")
         smart_router = SmartRouter(analyst)
         print("[Startup] ✓ SmartRouter initialized.")
@@ -60,21 +65,3 @@ def initialize_services() -> Tuple[FoodAnalyst, BarcodeService, SmartRouter]:
         print(f"[Startup] ✗ FAILED to initialize services: {error}")
         traceback.print_exc()
         raise
-
-
-def decode_upload_to_image(contents: bytes) -> Image.Image:
-    from io import BytesIO
-
-    image = Image.open(BytesIO(contents))
-
-    # Normalize EXIF orientation so portrait/landscape captures are analyzed consistently.
-    # Some mobile captures store rotation metadata instead of rotating raw pixels.
-    try:
-        normalized = ImageOps.exif_transpose(image)
-    except Exception:
-        normalized = image
-
-    if normalized.mode not in ("RGB", "RGBA"):
-        normalized = normalized.convert("RGB")
-
-    return normalized
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+
+from backend.modules.auth import AuthServiceError, InMemoryAuthSessionService, KdfWorkerPool
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark event-loop lag during a burst of email logins.")
+    parser.add_argument("--logins", type=int, default=16, help="Concurrent logins in the burst")
+    parser.add_argument("--workers", type=int, default=2, help="KDF worker threads")
+    parser.add_argument("--iterations", type=int, default=390_000, help="PBKDF2 iterations")
+    parser.add_argument("--tick-ms", type=float, default=5.0, help="Lag probe interval")
+    return parser.parse_args()
+
+
+async def _probe_lag(stop: asyncio.Event, tick_ms: float, samples: list[float]) -> None:
+    interval = tick_ms / 1000
+    while not stop.is_set():
+        expected = time.perf_counter() + interval
+        await asyncio.sleep(interval)
+        samples.append(max(0.0, (time.perf_counter() - expected) * 1000))
+
+
+async def _burst(service: InMemoryAuthSessionService, logins: int, offload: bool, tick_ms: float) -> dict[str, float]:
+    async def _login() -> None:
+        kwargs = {"email": "bench@example.com", "password": "Passw0rd!", "device_id": None}
+        try:
+            if offload:
+                await asyncio.to_thread(service.login_email, **kwargs)
+            else:
+                # Pre-change behaviour: the handler called the service inline on the loop.
+                service.login_email(**kwargs)
+                await asyncio.sleep(0)
+        except AuthServiceError:
+            pass
+
+    stop = asyncio.Event()
+    samples: list[float] = []
+    probe = asyncio.create_task(_probe_lag(stop, tick_ms, samples))
+    await asyncio.sleep(tick_ms / 1000 * 3)
+    started_at = time.perf_counter()
+    await asyncio.gather(*(_login() for _ in range(logins)))
+    elapsed = time.perf_counter() - started_at
+    stop.set()
+    await probe
+    samples.sort()
+    return {
+        "elapsed_s": elapsed,
+        "lag_p50_ms": samples[len(samples) // 2] if samples else 0.0,
+        "lag_p99_ms": samples[min(len(samples) - 1, int(len(samples) * 0.99))] if samples else 0.0,
+        "lag_max_ms": samples[-1] if samples else 0.0,
+    }
+
+
+def main() -> int:
+    args = parse_args()
+    service = InMemoryAuthSessionService(
+        password_iterations=args.iterations,
+        email_verification_required=False,
+        kdf_pool=KdfWorkerPool(max_workers=args.workers, max_pending=max(args.logins, args.workers)),
+    )
+    service.signup_email(
+        email="bench@example.com",
+        password="Passw0rd!",
+        display_name=None,
+        locale="ko-KR",
+        device_id=None,
+    )
+    for label, offload in (("inline", False), ("kdf-pool", True)):
+        stats = asyncio.run(_burst(service, args.logins, offload, args.tick_ms))
+        print(
+            f"{label:<9} logins={args.logins} elapsed_s={stats['elapsed_s']:.2f} "
+            f"loop_lag_p50_ms={stats['lag_p50_ms']:.1f} p99_ms={stats['lag_p99_ms']:.1f} max_ms={stats['lag_max_ms']:.1f}"
+        )
+    print(f"kdf pool {service.kdf_pool.snapshot()}")
+    service.kdf_pool.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import resource
+import tempfile
+import time
+
+from backend.modules.barcode.bulk_import import DATASET_OFF, import_dump
+from backend.modules.barcode.local_store import LocalBarcodeStore
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark streaming OFF JSONL import: full load, delta load, memory.")
+    parser.add_argument("--rows", type=int, default=200_000, help="Synthetic products in the full dump")
+    parser.add_argument("--delta-ratio", type=float, default=0.05, help="Share of products changed in the delta dump")
+    return parser.parse_args()
+
+
+def _product(index: int, revision: int) -> dict:
+    return {
+        "code": f"{3000000000000 + index}",
+        "product_name": f"Product {index} r{revision}",
+        "ingredients_text": "sugar, cocoa butter, milk powder, hazelnuts",
+        "nutriments": {"energy-kcal_100g": 500 + revision, "fat_100g": 30, "proteins_100g": 6},
+        "image_url": f"https://images.example/{index}.jpg",
+    }
+
+
+def _write_dump(path: str, indices, revision: int) -> int:
+    with open(path, "w", encoding="utf-8") as fp:
+        for index in indices:
+            fp.write(json.dumps(_product(index, revision)) + "\n")
+    return os.path.getsize(path)
+
+
+def _max_rss_mb() -> float:
+    # ru_maxrss is KiB on Linux; the high-water mark includes SQLite's page cache.
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def main() -> int:
+    args = parse_args()
+    with tempfile.TemporaryDirectory() as tmp:
+        full_path = os.path.join(tmp, "off_full.jsonl")
+        delta_path = os.path.join(tmp, "off_delta.jsonl")
+        full_bytes = _write_dump(full_path, range(args.rows), revision=0)
+        delta_rows = max(1, int(args.rows * args.delta_ratio))
+        delta_bytes = _write_dump(delta_path, range(0, args.rows, max(1, args.rows // delta_rows)), revision=1)
+        store = LocalBarcodeStore(os.path.join(tmp, "store.sqlite3"))
+        print(f"baseline max_rss_mb={_max_rss_mb():.1f}")
+
+        for label, path, size in (
+            ("full", full_path, full_bytes),
+            ("full-rerun", full_path, full_bytes),
+            ("delta", delta_path, delta_bytes),
+        ):
+            stats = import_dump(store, DATASET_OFF, path)
+            print(
+                f"{label:<10} dump_mb={size / 1e6:>7.1f} read={stats.read:>8} written={stats.written:>8} "
+                f"unchanged={stats.unchanged:>8} rows_per_s={stats.read / max(stats.elapsed_seconds, 1e-9):>9.0f} "
+                f"max_rss_mb={_max_rss_mb():>6.1f}"
+            )
+
+        started_at = time.perf_counter()
+        for index in range(1000):
+            store.get(f"{3000000000000 + index}")
+        print(f"point lookup avg_ms={(time.perf_counter() - started_at):.3f}")
+        store.close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import argparse
+import io
+import time
+from pathlib import Path
+
+from PIL import Image, ImageDraw, ImageFilter
+
+from backend.modules.quality.label_region import crop_to_label_region
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Measure label auto-crop payload size, latency and (optionally) OCR output.")
+    parser.add_argument("--images", default="", help="Directory of label photos; synthetic scenes are used when empty")
+    parser.add_argument(
+        "--live",
+        action="store_true",
+        help="Also run analyze_label_json with and without the crop (needs Vertex AI credentials)",
+    )
+    return parser.parse_args()
+
+
+def _synthetic_scenes() -> list[tuple[str, Image.Image]]:
+    scenes = []
+    for name, size, label_box in (
+        ("small-table-12mp", (4000, 3000), (2200, 900, 3000, 2100)),
+        ("half-frame-12mp", (4000, 3000), (600, 300, 2600, 2700)),
+        ("full-frame-2mp", (1200, 1600), (0, 0, 1200, 1600)),
+    ):
+        scene = Image.effect_noise((size[0] // 4, size[1] // 4), 30).convert("RGB").resize(size)
+        scene = scene.filter(ImageFilter.GaussianBlur(6))
+        left, upper, right, lower = label_box
+        label = Image.new("RGB", (right - left, lower - upper), (235, 235, 230))
+        draw = ImageDraw.Draw(label)
+        for y in range(20, label.size[1] - 20, 28):
+            for x in range(20, label.size[0] - 40, 22):
+                draw.rectangle((x, y, x + 12, y + 14), outline=(20, 20, 20), width=2)
+        scene.paste(label, (left, upper))
+        scenes.append((name, scene))
+    return scenes
+
+
+def _load_images(directory: str) -> list[tuple[str, Image.Image]]:
+    paths = sorted(p for p in Path(directory).iterdir() if p.suffix.lower() in {".jpg", ".jpeg", ".png", ".webp"})
+    return [(path.name, Image.open(path).convert("RGB")) for path in paths]
+
+
+def _jpeg_bytes(image: Image.Image) -> int:
+    buf = io.BytesIO()
+    image.save(buf, format="JPEG")
+    return buf.tell()
+
+
+def _run_live(image: Image.Image) -> tuple[int, str, int]:
+    from backend.modules.analyst_runtime.food_analyst import FoodAnalyst
+
+    analyst = FoodAnalyst()
+    started_at = time.perf_counter()
+    # This script does the crop itself, so both runs must skip the analyst's own autocrop.
+    result = analyst.analyze_label_json(image, "None", "KR", "ko-KR", assess_enabled=False, autocrop=False)
+    elapsed_ms = int((time.perf_counter() - started_at) * 1000)
+    return len(result.get("ingredients", [])), str(result.get("foodName", "")), elapsed_ms
+
+
+def main() -> int:
+    args = parse_args()
+    images = _load_images(args.images) if args.images else _synthetic_scenes()
+    total_full = total_cropped = 0
+    print(f"{'image':<24} {'full_kb':>8} {'crop_kb':>8} {'detect_ms':>9}  region")
+    for name, image in images:
+        started_at = time.perf_counter()
+        cropped, region = crop_to_label_region(image)
+        detect_ms = (time.perf_counter() - started_at) * 1000
+        full_bytes, cropped_bytes = _jpeg_bytes(image), _jpeg_bytes(cropped)
+        total_full += full_bytes
+        total_cropped += cropped_bytes
+        print(
+            f"{name:<24} {full_bytes / 1024:>8.0f} {cropped_bytes / 1024:>8.0f} {detect_ms:>9.1f}"
+            f"  {region.box if region else 'full-frame'}"
+        )
+        if args.live:
+            full_count, full_name, full_ms = _run_live(image)
+            crop_count, crop_name, crop_ms = _run_live(cropped)
+            print(
+                f"{'':<24} live: ingredients {full_count}->{crop_count} "
+                f"foodName {full_name!r}->{crop_name!r} latency_ms {full_ms}->{crop_ms}"
+            )
+    if total_full:
+        print(f"payload total: {total_full / 1024:.0f} KB -> {total_cropped / 1024:.0f} KB ({total_cropped / total_full:.0%})")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import argparse
+import math
+import time
+
+from PIL import Image, ImageDraw, ImageFilter, ImageStat
+
+from backend.modules.quality.label_quality_gate import LabelQualityMetrics, evaluate_label_image_quality
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark the label quality gate against the PIL reference.")
+    parser.add_argument(
+        "--megapixels",
+        default="1,4,12,24,48",
+        help="Comma-separated input sizes (MP) to benchmark",
+    )
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per size")
+    return parser.parse_args()
+
+
+def reference_metrics(image: Image.Image) -> LabelQualityMetrics:
+    """Original full-resolution PIL implementation, kept for parity checks."""
+    gray = image.convert("L")
+    edge = gray.filter(ImageFilter.FIND_EDGES)
+    edge_stat = ImageStat.Stat(edge)
+    gray_stat = ImageStat.Stat(gray)
+    edge_hist = edge.histogram()
+    total_pixels = max(1, int(sum(edge_hist)))
+    gray_hist = gray.histogram()
+    return LabelQualityMetrics(
+        blur_score=float(edge_stat.var[0]),
+        contrast_score=float(gray_stat.stddev[0]),
+        text_density_score=int(sum(edge_hist[25:])) / total_pixels,
+        glare_ratio=int(sum(gray_hist[245:])) / total_pixels,
+    )
+
+
+def build_label_photo(megapixels: float) -> Image.Image:
+    width = int(math.sqrt(megapixels * 1_000_000 * 3 / 4))
+    height = int(width * 4 / 3)
+    img = Image.new("RGB", (width, height), (228, 226, 220))
+    draw = ImageDraw.Draw(img)
+    line_gap = max(12, height // 60)
+    stroke = max(1, width // 600)
+    for y in range(line_gap, height - line_gap, line_gap):
+        for x in range(width // 20, width - width // 20, max(8, width // 80)):
+            draw.rectangle((x, y, x + max(4, width // 160), y + line_gap // 2), outline=(25, 25, 25), width=stroke)
+    return img.filter(ImageFilter.GaussianBlur(radius=max(0.5, width / 3000)))
+
+
+def _best_ms(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started_at = time.perf_counter()
+        fn()
+        best = min(best, (time.perf_counter() - started_at) * 1000)
+    return best
+
+
+def main() -> int:
+    args = parse_args()
+    sizes = [float(part) for part in args.megapixels.split(",") if part.strip()]
+    print(f"{'MP':>5} {'ref_ms':>9} {'new_ms':>9} {'speedup':>8}  blur(ref/new)  contrast  text_density  glare  verdict")
+    for megapixels in sizes:
+        image = build_label_photo(megapixels)
+        reference = reference_metrics(image)
+        current = evaluate_label_image_quality(image)
+        ref_ms = _best_ms(lambda: reference_metrics(image), args.repeat)
+        new_ms = _best_ms(lambda: evaluate_label_image_quality(image), args.repeat)
+        ref_passed = (
+            reference.blur_score >= 15.0
+            and reference.contrast_score >= 25.0
+            and reference.text_density_score >= 0.01
+            and reference.glare_ratio <= 0.95
+        )
+        print(
+            f"{megapixels:>5.0f} {ref_ms:>9.1f} {new_ms:>9.1f} {ref_ms / max(new_ms, 1e-6):>7.1f}x"
+            f"  {reference.blur_score:.0f}/{current.metrics.blur_score:.0f}"
+            f"  {reference.contrast_score:.1f}/{current.metrics.contrast_score:.1f}"
+            f"  {reference.text_density_score:.3f}/{current.metrics.text_density_score:.3f}"
+            f"  {reference.glare_ratio:.3f}/{current.metrics.glare_ratio:.3f}"
+            f"  {'same' if ref_passed == current.passed else 'DIFF'}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
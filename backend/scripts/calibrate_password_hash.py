@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import argparse
+
+from backend.modules.auth.password_hashing import (
+    SCHEME_ARGON2,
+    SCHEME_PBKDF2,
+    SCHEME_SCRYPT,
+    Argon2Hasher,
+    Pbkdf2Hasher,
+    ScryptHasher,
+    calibrate,
+    is_argon2_available,
+)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Pick password hash parameters that reach a target per-hash latency on this CPU."
+    )
+    parser.add_argument("--scheme", choices=[SCHEME_SCRYPT, SCHEME_PBKDF2, SCHEME_ARGON2], default=SCHEME_SCRYPT)
+    parser.add_argument("--target-ms", type=float, default=250.0, help="Target median latency per hash")
+    parser.add_argument("--samples", type=int, default=3, help="Hashes timed per candidate")
+    parser.add_argument("--max-memory-mib", type=int, default=256, help="Upper bound on per-hash memory")
+    return parser.parse_args()
+
+
+def _env_lines(hasher) -> list[str]:
+    if isinstance(hasher, ScryptHasher):
+        return [
+            f"AUTH_PASSWORD_SCHEME={SCHEME_SCRYPT}",
+            f"AUTH_SCRYPT_N={hasher.n}",
+            f"AUTH_SCRYPT_R={hasher.r}",
+            f"AUTH_SCRYPT_P={hasher.p}",
+        ]
+    if isinstance(hasher, Pbkdf2Hasher):
+        return [f"AUTH_PASSWORD_SCHEME={SCHEME_PBKDF2}", f"AUTH_PASSWORD_ITERATIONS={hasher.iterations}"]
+    assert isinstance(hasher, Argon2Hasher)
+    return [
+        f"AUTH_PASSWORD_SCHEME={SCHEME_ARGON2}",
+        f"AUTH_ARGON2_TIME_COST={hasher.time_cost}",
+        f"AUTH_ARGON2_MEMORY_KIB={hasher.memory_cost_kib}",
+        f"AUTH_ARGON2_PARALLELISM={hasher.parallelism}",
+    ]
+
+
+def main() -> int:
+    args = parse_args()
+    if args.scheme == SCHEME_ARGON2 and not is_argon2_available():
+        print("argon2-cffi is not installed; pip install argon2-cffi or choose another scheme.")
+        return 1
+    hasher, measured_ms = calibrate(
+        args.scheme,
+        target_ms=args.target_ms,
+        samples=args.samples,
+        max_memory_mib=args.max_memory_mib,
+    )
+    print(f"# {hasher.describe()} median_ms={measured_ms:.1f} target_ms={args.target_ms:.1f}")
+    if measured_ms < args.target_ms:
+        print("# memory cap reached before the target latency; consider raising --max-memory-mib")
+    for line in _env_lines(hasher):
+        print(line)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
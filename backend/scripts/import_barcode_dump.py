@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import argparse
+import os
+
+from backend.modules.barcode.bulk_import import DATASETS, import_dump
+from backend.modules.barcode.local_store import LocalBarcodeStore
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Stream a barcode dataset dump into the local barcode store.")
+    parser.add_argument("--dataset", required=True, choices=DATASETS, help="Dump type (import c002/i2790 before c005)")
+    parser.add_argument("--path", required=True, help="Dump file (.csv, .jsonl/.ndjson, .json array; optionally .gz)")
+    parser.add_argument(
+        "--store",
+        default=os.environ.get("BARCODE_LOCAL_STORE_PATH", "/tmp/foodlens_barcode_local.sqlite3"),
+        help="SQLite store path (the server reads BARCODE_LOCAL_STORE_PATH)",
+    )
+    parser.add_argument("--batch-size", type=int, default=1000, help="Rows per transaction")
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    store = LocalBarcodeStore(args.store)
+    try:
+        stats = import_dump(store, args.dataset, args.path, batch_size=max(1, args.batch_size))
+    finally:
+        store.close()
+    print(
+        f"[BARCODE-IMPORT] dataset={stats.dataset} read={stats.read} written={stats.written} "
+        f"unchanged={stats.unchanged} skipped={stats.skipped} elapsed_s={stats.elapsed_seconds:.1f}"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,14 +1,18 @@
 from fastapi import FastAPI, UploadFile, File, Form, HTTPException, Request
-from fastapi.responses import RedirectResponse
+from fastapi.responses import RedirectResponse, Response, StreamingResponse
 # Build Trigger: 2026-02-10 12:40 (After Pipeline Credits Increase)
+import asyncio
 import base64
+import json
 import logging
+import multiprocessing
 import os
 import time
+from concurrent.futures import ProcessPoolExecutor
 from urllib.parse import urlencode
 from typing import Any
-import requests
 from pydantic import BaseModel
+from starlette.concurrency import iterate_in_threadpool
 
 from backend.modules.server_bootstrap import (
     decode_upload_to_image,
@@ -17,7 +21,25 @@ from backend.modules.server_bootstrap import (
     log_environment_debug,
 )
 from backend.modules.analyst_core.prompts import LABEL_2PASS_PROMPT_VERSION
+from backend.modules.analyst_core.postprocess import SharedNutritionLookup
 from backend.modules.analyst_core.response_utils import get_safe_fallback_response
+from backend.modules.analyst_runtime.food_batch import (
+    DEFAULT_IMAGES_PER_CALL as ANALYZE_BATCH_DEFAULT_IMAGES_PER_CALL,
+    DEFAULT_MAX_IMAGES as ANALYZE_BATCH_DEFAULT_MAX_IMAGES,
+    stream_food_batch,
+)
+from backend.modules.barcode.allergen_cache import BarcodeAllergenCache, resolve_barcode_allergens
+from backend.modules.barcode.batch_lookup import (
+    DEFAULT_CONCURRENCY as BARCODE_BATCH_DEFAULT_CONCURRENCY,
+    DEFAULT_MAX_ITEMS as BARCODE_BATCH_DEFAULT_MAX_ITEMS,
+    apply_allergen_assessment,
+    dedupe_barcodes,
+    stream_barcode_batch,
+)
+from backend.modules.barcode.projection import project_product
+from backend.modules.image_io import decode_upload_to_jpeg
+from backend.modules.client_ip import FORWARDED_FOR_HEADER, TrustedProxies
+from backend.modules.ops.admission_control import AdmissionConfig, AdmissionControlMiddleware
 from backend.modules.ops.cost_guardrail import (
     CostGuardrailAction,
     CostGuardrailService,
@@ -49,21 +71,26 @@ from backend.modules.ops.rollout_control import (
     load_kpi_input_from_env,
 )
 from backend.modules.quality.label_quality_gate import evaluate_label_image_quality
+from backend.modules.request_deadline import DeadlineExceeded
 from backend.modules.runtime_guardrails import (
     EndpointErrorPolicy,
     ErrorCode,
+    log_exception,
     raise_service_unavailable,
     run_in_threadpool,
     run_with_error_policy,
 )
 from backend.modules.contracts.analysis_response import AnalysisResponseContract
 from backend.modules.contracts.barcode_response import BarcodeLookupResponseContract
-from backend.modules.auth import AuthServiceError, InMemoryAuthSessionService
+from backend.modules.auth import AuthServiceError, InMemoryAuthSessionService, PerKeyConcurrencyLimiter
+from backend.modules.auth.oauth_client import GoogleIdTokenVerifier, OAuthProviderClient
 
 load_environment()
 log_environment_debug()
 
 app = FastAPI()
+# Per-route token buckets and load shedding in front of every handler.
+app.add_middleware(AdmissionControlMiddleware, config=AdmissionConfig.from_env(os.environ.get))
 
 logger = logging.getLogger("foodlens.api")
 if not logging.getLogger().handlers:
@@ -109,13 +136,43 @@ def _is_label_rollout_auto_enabled() -> bool:
     return os.environ.get("LABEL_ROLLOUT_AUTO_ENABLED", "0").strip() == "1"
 
 
+def _is_label_quality_tiled_enabled() -> bool:
+    return os.environ.get("LABEL_QUALITY_TILED_ENABLED", "0").strip() == "1"
+
+
 def _is_label_429_returns_503_enabled() -> bool:
     return os.environ.get("LABEL_429_RETURNS_503_ENABLED", "0").strip() == "1"
 
 
+async def _sweep_expired_auth_state(auth_service: InMemoryAuthSessionService, *, interval_seconds: float) -> None:
+    batch_size = 1000
+    while True:
+        await asyncio.sleep(interval_seconds)
+        try:
+            purged = batch_size
+            while purged == batch_size:
+                purged = await run_in_threadpool(auth_service.purge_expired, limit=batch_size)
+                if purged:
+                    logger.info("[Auth] purged expired auth records count=%s", purged)
+        except Exception:  # pragma: no cover - keep sweeping after unexpected errors
+            logger.exception("[Auth] expiry sweep failed")
+
+
 @app.on_event("startup")
 async def _startup() -> None:
     app.state.auth_service = InMemoryAuthSessionService.from_env(os.environ.get)
+    app.state.auth_service.start()
+    app.state.login_concurrency_limiter = PerKeyConcurrencyLimiter(
+        max(1, _env_int("AUTH_LOGIN_MAX_CONCURRENT_PER_IP", 2))
+    )
+    app.state.oauth_provider_client = OAuthProviderClient.from_env(os.environ.get)
+    app.state.google_id_token_verifier = GoogleIdTokenVerifier(app.state.oauth_provider_client)
+    app.state.auth_expiry_sweeper = asyncio.create_task(
+        _sweep_expired_auth_state(
+            app.state.auth_service,
+            interval_seconds=max(1.0, _env_float("AUTH_EXPIRY_SWEEP_INTERVAL_SECONDS", 30.0)),
+        )
+    )
 
     if _is_openapi_export_mode():
         app.state.analyst = None
@@ -127,7 +184,19 @@ async def _startup() -> None:
     analyst, barcode_service, smart_router = initialize_services()
     app.state.analyst = analyst
     app.state.barcode_service = barcode_service
+    await barcode_service.start()
     app.state.smart_router = smart_router
+    decode_workers = _env_int("ANALYZE_DECODE_WORKERS", min(4, os.cpu_count() or 1))
+    # spawn: forking a process that already runs the event loop and aiohttp/Vertex threads is unsafe.
+    app.state.image_decode_pool = (
+        ProcessPoolExecutor(max_workers=decode_workers, mp_context=multiprocessing.get_context("spawn"))
+        if decode_workers > 0
+        else None
+    )
+    app.state.barcode_allergen_cache = BarcodeAllergenCache(
+        ttl_seconds=_env_float("BARCODE_ALLERGEN_CACHE_TTL_SECONDS", 7 * 24 * 60 * 60),
+        max_entries=_env_int("BARCODE_ALLERGEN_CACHE_MAX_ENTRIES", 5000),
+    )
     app.state.label_cost_guardrail = CostGuardrailService(
         InMemoryMonthlyUsageStorage(),
         monthly_budget_usd=_env_float("LABEL_MONTHLY_BUDGET_USD", 10.0),
@@ -177,6 +246,25 @@ async def _startup() -> None:
     app.state.deletion_queue_consumer = DeletionQueueConsumer(deletion_storage, NoOpDeletionHandler())
 
 
+@app.on_event("shutdown")
+async def _shutdown() -> None:
+    barcode_service = getattr(app.state, "barcode_service", None)
+    if barcode_service is not None and hasattr(barcode_service, "close"):
+        await barcode_service.close()
+    image_decode_pool = getattr(app.state, "image_decode_pool", None)
+    if image_decode_pool is not None:
+        image_decode_pool.shutdown(wait=False, cancel_futures=True)
+    auth_expiry_sweeper = getattr(app.state, "auth_expiry_sweeper", None)
+    if auth_expiry_sweeper is not None:
+        auth_expiry_sweeper.cancel()
+    auth_service = getattr(app.state, "auth_service", None)
+    if auth_service is not None:
+        auth_service.close()
+    oauth_provider_client = getattr(app.state, "oauth_provider_client", None)
+    if oauth_provider_client is not None:
+        await oauth_provider_client.close()
+
+
 def _service(name: str) -> Any:
     service = getattr(app.state, name, None)
     if service is None:
@@ -414,7 +502,48 @@ def _provider_timeout_seconds() -> float:
     return parsed if parsed > 0 else DEFAULT_AUTH_PROVIDER_TIMEOUT_SECONDS
 
 
-def _verify_kakao_identity(*, request: Request, code: str) -> tuple[str, str | None]:
+def _provider_rejected_error() -> AuthServiceError:
+    return AuthServiceError(
+        code="AUTH_PROVIDER_REJECTED",
+        message="Provider login failed.",
+        status_code=400,
+    )
+
+
+async def _exchange_provider_code(
+    *,
+    token_url: str,
+    token_request_data: dict[str, str],
+    deadline: float,
+) -> dict[str, Any]:
+    oauth_client = _service("oauth_provider_client")
+    token_response = await oauth_client.post_form(token_url, data=token_request_data, deadline=deadline)
+    token_payload = token_response.payload
+    if token_response.status_code >= 400:
+        provider_error = str(token_payload.get("error", "")).strip().lower()
+        if provider_error in {"invalid_grant", "invalid_request"}:
+            raise AuthServiceError(
+                code="AUTH_PROVIDER_INVALID_CODE",
+                message="Missing or invalid authorization code.",
+                status_code=400,
+            )
+        raise _provider_rejected_error()
+    return token_payload
+
+
+async def _fetch_provider_profile(*, url: str, access_token: str, deadline: float) -> dict[str, Any]:
+    oauth_client = _service("oauth_provider_client")
+    profile_response = await oauth_client.get_json(
+        url,
+        headers={"Authorization": f"Bearer {access_token}"},
+        deadline=deadline,
+    )
+    if profile_response.status_code >= 400:
+        raise _provider_rejected_error()
+    return profile_response.payload
+
+
+async def _verify_kakao_identity(*, request: Request, code: str) -> tuple[str, str | None]:
     client_id = os.environ.get("AUTH_KAKAO_CLIENT_ID", "").strip()
     if not client_id:
         raise AuthServiceError(
@@ -433,99 +562,25 @@ def _verify_kakao_identity(*, request: Request, code: str) -> tuple[str, str | N
     if client_secret:
         token_request_data["client_secret"] = client_secret
 
-    timeout_seconds = _provider_timeout_seconds()
-    try:
-        token_response = requests.post(
-            "https://kauth.kakao.com/oauth/token",
-            data=token_request_data,
-            timeout=timeout_seconds,
-        )
-    except requests.Timeout as error:
-        raise AuthServiceError(
-            code="AUTH_PROVIDER_TIMEOUT",
-            message="Provider request timed out.",
-            status_code=504,
-        ) from error
-    except requests.RequestException as error:
-        raise AuthServiceError(
-            code="AUTH_PROVIDER_UNAVAILABLE",
-            message="Provider request failed.",
-            status_code=502,
-        ) from error
-
-    try:
-        token_payload = token_response.json()
-    except ValueError as error:
-        raise AuthServiceError(
-            code="AUTH_PROVIDER_REJECTED",
-            message="Provider login failed.",
-            status_code=400,
-        ) from error
-
-    if token_response.status_code >= 400:
-        provider_error = str(token_payload.get("error", "")).strip().lower()
-        if provider_error in {"invalid_grant", "invalid_request"}:
-            raise AuthServiceError(
-                code="AUTH_PROVIDER_INVALID_CODE",
-                message="Missing or invalid authorization code.",
-                status_code=400,
-            )
-        raise AuthServiceError(
-            code="AUTH_PROVIDER_REJECTED",
-            message="Provider login failed.",
-            status_code=400,
-        )
-
+    # One deadline for the whole verification, not per hop.
+    deadline = time.monotonic() + _provider_timeout_seconds()
+    token_payload = await _exchange_provider_code(
+        token_url="https://kauth.kakao.com/oauth/token",
+        token_request_data=token_request_data,
+        deadline=deadline,
+    )
     access_token = str(token_payload.get("access_token", "")).strip()
     if not access_token:
-        raise AuthServiceError(
-            code="AUTH_PROVIDER_REJECTED",
-            message="Provider login failed.",
-            status_code=400,
-        )
-
-    try:
-        profile_response = requests.get(
-            "https://kapi.kakao.com/v2/user/me",
-            headers={"Authorization": f"Bearer {access_token}"},
-            timeout=timeout_seconds,
-        )
-    except requests.Timeout as error:
-        raise AuthServiceError(
-            code="AUTH_PROVIDER_TIMEOUT",
-            message="Provider request timed out.",
-            status_code=504,
-        ) from error
-    except requests.RequestException as error:
-        raise AuthServiceError(
-            code="AUTH_PROVIDER_UNAVAILABLE",
-            message="Provider request failed.",
-            status_code=502,
-        ) from error
-
-    try:
-        profile_payload = profile_response.json()
-    except ValueError as error:
-        raise AuthServiceError(
-            code="AUTH_PROVIDER_REJECTED",
-            message="Provider login failed.",
-            status_code=400,
-        ) from error
-
-    if profile_response.status_code >= 400:
-        raise AuthServiceError(
-            code="AUTH_PROVIDER_REJECTED",
-            message="Provider login failed.",
-            status_code=400,
-        )
+        raise _provider_rejected_error()
 
+    profile_payload = await _fetch_provider_profile(
+        url="https://kapi.kakao.com/v2/user/me",
+        access_token=access_token,
+        deadline=deadline,
+    )
     provider_user_id = str(profile_payload.get("id", "")).strip()
     if not provider_user_id:
-        raise AuthServiceError(
-            code="AUTH_PROVIDER_REJECTED",
-            message="Provider login failed.",
-            status_code=400,
-        )
+        raise _provider_rejected_error()
 
     email: str | None = None
     kakao_account = profile_payload.get("kakao_account")
@@ -537,7 +592,7 @@ def _verify_kakao_identity(*, request: Request, code: str) -> tuple[str, str | N
     return provider_user_id, email
 
 
-def _verify_google_identity(*, request: Request, code: str) -> tuple[str, str | None]:
+async def _verify_google_identity(*, request: Request, code: str) -> tuple[str, str | None]:
     client_id = os.environ.get("AUTH_GOOGLE_CLIENT_ID", "").strip()
     if not client_id:
         raise AuthServiceError(
@@ -556,99 +611,31 @@ def _verify_google_identity(*, request: Request, code: str) -> tuple[str, str |
     if client_secret:
         token_request_data["client_secret"] = client_secret
 
-    timeout_seconds = _provider_timeout_seconds()
-    try:
-        token_response = requests.post(
-            "https://oauth2.googleapis.com/token",
-            data=token_request_data,
-            timeout=timeout_seconds,
-        )
-    except requests.Timeout as error:
-        raise AuthServiceError(
-            code="AUTH_PROVIDER_TIMEOUT",
-            message="Provider request timed out.",
-            status_code=504,
-        ) from error
-    except requests.RequestException as error:
-        raise AuthServiceError(
-            code="AUTH_PROVIDER_UNAVAILABLE",
-            message="Provider request failed.",
-            status_code=502,
-        ) from error
-
-    try:
-        token_payload = token_response.json()
-    except ValueError as error:
-        raise AuthServiceError(
-            code="AUTH_PROVIDER_REJECTED",
-            message="Provider login failed.",
-            status_code=400,
-        ) from error
-
-    if token_response.status_code >= 400:
-        provider_error = str(token_payload.get("error", "")).strip().lower()
-        if provider_error in {"invalid_grant", "invalid_request"}:
-            raise AuthServiceError(
-                code="AUTH_PROVIDER_INVALID_CODE",
-                message="Missing or invalid authorization code.",
-                status_code=400,
-            )
-        raise AuthServiceError(
-            code="AUTH_PROVIDER_REJECTED",
-            message="Provider login failed.",
-            status_code=400,
-        )
-
-    access_token = str(token_payload.get("access_token", "")).strip()
-    if not access_token:
-        raise AuthServiceError(
-            code="AUTH_PROVIDER_REJECTED",
-            message="Provider login failed.",
-            status_code=400,
-        )
-
-    try:
-        profile_response = requests.get(
-            "https://openidconnect.googleapis.com/v1/userinfo",
-            headers={"Authorization": f"Bearer {access_token}"},
-            timeout=timeout_seconds,
-        )
-    except requests.Timeout as error:
-        raise AuthServiceError(
-            code="AUTH_PROVIDER_TIMEOUT",
-            message="Provider request timed out.",
-            status_code=504,
-        ) from error
-    except requests.RequestException as error:
-        raise AuthServiceError(
-            code="AUTH_PROVIDER_UNAVAILABLE",
-            message="Provider request failed.",
-            status_code=502,
-        ) from error
-
-    try:
-        profile_payload = profile_response.json()
-    except ValueError as error:
-        raise AuthServiceError(
-            code="AUTH_PROVIDER_REJECTED",
-            message="Provider login failed.",
-            status_code=400,
-        ) from error
+    deadline = time.monotonic() + _provider_timeout_seconds()
+    token_payload = await _exchange_provider_code(
+        token_url="https://oauth2.googleapis.com/token",
+        token_request_data=token_request_data,
+        deadline=deadline,
+    )
 
-    if profile_response.status_code >= 400:
-        raise AuthServiceError(
-            code="AUTH_PROVIDER_REJECTED",
-            message="Provider login failed.",
-            status_code=400,
+    id_token = str(token_payload.get("id_token", "")).strip()
+    if id_token:
+        # openid scope: the signed id_token already carries sub/email, no userinfo round trip.
+        verifier = _service("google_id_token_verifier")
+        profile_payload = await verifier.verify(id_token, audience=client_id, deadline=deadline)
+    else:
+        access_token = str(token_payload.get("access_token", "")).strip()
+        if not access_token:
+            raise _provider_rejected_error()
+        profile_payload = await _fetch_provider_profile(
+            url="https://openidconnect.googleapis.com/v1/userinfo",
+            access_token=access_token,
+            deadline=deadline,
         )
 
     provider_user_id = str(profile_payload.get("sub", "")).strip()
     if not provider_user_id:
-        raise AuthServiceError(
-            code="AUTH_PROVIDER_REJECTED",
-            message="Provider login failed.",
-            status_code=400,
-        )
+        raise _provider_rejected_error()
 
     email: str | None = None
     raw_email_verified = profile_payload.get("email_verified")
@@ -722,6 +709,13 @@ class RefreshRequest(BaseModel):
     refresh_token: str
 
 
+class BarcodeBatchLookupRequest(BaseModel):
+    barcodes: list[str]
+    allergy_info: str = "None"
+    locale: str | None = None
+    fields: str | None = None
+
+
 class LogoutRequest(BaseModel):
     refresh_token: str | None = None
 
@@ -744,6 +738,7 @@ def _auth_error_to_http_exception(error: AuthServiceError, request_id: str) -> H
             "code": error.code,
             "request_id": request_id,
         },
+        headers={"Retry-After": str(error.retry_after_seconds)} if error.retry_after_seconds else None,
     )
 
 
@@ -763,6 +758,29 @@ def _log_auth_failure(
     )
 
 
+# Same trust list uvicorn's proxy_headers applies (FORWARDED_ALLOW_IPS).
+TRUSTED_PROXIES = TrustedProxies.from_env(os.environ.get)
+
+
+def _client_ip(request: Request) -> str:
+    peer = request.client.host if request.client else None
+    return TRUSTED_PROXIES.client_ip(peer, request.headers.get(FORWARDED_FOR_HEADER))
+
+
+def _log_kdf_pool_pressure(request_id: str, auth_service: InMemoryAuthSessionService) -> None:
+    stats = auth_service.kdf_pool.snapshot()
+    if stats["queued"] > 0 or stats["rejected"] > 0:
+        logger.info(
+            "[Auth] kdf pool request_id=%s queued=%s running=%s rejected=%s wait_ms_avg=%s wait_ms_max=%s",
+            request_id,
+            stats["queued"],
+            stats["running"],
+            stats["rejected"],
+            stats["wait_ms_avg"],
+            stats["wait_ms_max"],
+        )
+
+
 def _extract_bearer_token(request: Request) -> str | None:
     header = request.headers.get("Authorization")
     if not header:
@@ -774,7 +792,7 @@ def _extract_bearer_token(request: Request) -> str | None:
     return token or None
 
 
-def _resolve_authenticated_user(request: Request, request_id: str):
+async def _resolve_authenticated_user(request: Request, request_id: str):
     auth_service = _service("auth_service")
     access_token = _extract_bearer_token(request)
     if not access_token:
@@ -794,7 +812,8 @@ def _resolve_authenticated_user(request: Request, request_id: str):
         )
 
     try:
-        return auth_service.authenticate_access_token(access_token=access_token)
+        # Claims only: handlers need user_id, and signed tokens then verify without a store read.
+        return await run_in_threadpool(auth_service.verify_access_token, access_token=access_token)
     except AuthServiceError as error:
         _log_auth_failure(
             request_id=request_id,
@@ -854,8 +873,26 @@ async def auth_email_signup(payload: EmailSignupRequest, request: Request):
 async def auth_email_login(payload: EmailLoginRequest, request: Request):
     request_id = _request_id(request)
     auth_service = _service("auth_service")
+    limiter = _service("login_concurrency_limiter")
+    client_ip = _client_ip(request)
+    if not limiter.try_acquire(client_ip):
+        _log_auth_failure(
+            request_id=request_id,
+            user_id=None,
+            provider="email",
+            code="AUTH_LOGIN_CONCURRENCY_LIMITED",
+        )
+        raise HTTPException(
+            status_code=429,
+            detail={
+                "message": "Too many concurrent login attempts.",
+                "code": "AUTH_LOGIN_CONCURRENCY_LIMITED",
+                "request_id": request_id,
+            },
+        )
     try:
-        result = auth_service.login_email(
+        result = await run_in_threadpool(
+            auth_service.login_email,
             email=payload.email,
             password=payload.password,
             device_id=payload.device_id,
@@ -870,6 +907,9 @@ async def auth_email_login(payload: EmailLoginRequest, request: Request):
             code=error.code,
         )
         raise _auth_error_to_http_exception(error, request_id) from error
+    finally:
+        limiter.release(client_ip)
+        _log_kdf_pool_pressure(request_id, auth_service)
 
 
 @app.post("/auth/email/verify")
@@ -877,10 +917,12 @@ async def auth_email_verify(payload: EmailVerifyRequest, request: Request):
     request_id = _request_id(request)
     auth_service = _service("auth_service")
     try:
-        result = auth_service.verify_email(
+        result = await run_in_threadpool(
+            auth_service.verify_email,
             email=payload.email,
             code=payload.code,
             device_id=payload.device_id,
+            client_ip=_client_ip(request),
         )
         result["request_id"] = request_id
         return result
@@ -920,10 +962,12 @@ async def auth_email_password_reset_confirm(payload: PasswordResetConfirmRequest
     request_id = _request_id(request)
     auth_service = _service("auth_service")
     try:
-        result = auth_service.confirm_password_reset(
+        result = await run_in_threadpool(
+            auth_service.confirm_password_reset,
             email=payload.email,
             code=payload.code,
             new_password=payload.new_password,
+            client_ip=_client_ip(request),
         )
         result["request_id"] = request_id
         return result
@@ -1193,11 +1237,12 @@ async def auth_google(payload: OAuthProviderRequest, request: Request):
         provider_user_id = payload.provider_user_id
         email = payload.email
         if _is_google_code_verification_enabled() and payload.code and not payload.error:
-            provider_user_id, verified_email = _verify_google_identity(request=request, code=payload.code)
+            provider_user_id, verified_email = await _verify_google_identity(request=request, code=payload.code)
             if verified_email:
                 email = verified_email
 
-        result = auth_service.oauth_login(
+        result = await run_in_threadpool(
+            auth_service.oauth_login,
             provider="google",
             code=payload.code,
             state=payload.state,
@@ -1227,11 +1272,12 @@ async def auth_kakao(payload: OAuthProviderRequest, request: Request):
         provider_user_id = payload.provider_user_id
         email = payload.email
         if _is_kakao_code_verification_enabled() and payload.code and not payload.error:
-            provider_user_id, verified_email = _verify_kakao_identity(request=request, code=payload.code)
+            provider_user_id, verified_email = await _verify_kakao_identity(request=request, code=payload.code)
             if verified_email:
                 email = verified_email
 
-        result = auth_service.oauth_login(
+        result = await run_in_threadpool(
+            auth_service.oauth_login,
             provider="kakao",
             code=payload.code,
             state=payload.state,
@@ -1258,7 +1304,7 @@ async def auth_refresh(payload: RefreshRequest, request: Request):
     request_id = _request_id(request)
     auth_service = _service("auth_service")
     try:
-        result = auth_service.refresh(refresh_token=payload.refresh_token)
+        result = await run_in_threadpool(auth_service.refresh, refresh_token=payload.refresh_token)
         result["request_id"] = request_id
         return result
     except AuthServiceError as error:
@@ -1276,7 +1322,8 @@ async def auth_logout(payload: LogoutRequest, request: Request):
     request_id = _request_id(request)
     auth_service = _service("auth_service")
     try:
-        revoked_count = auth_service.logout(
+        revoked_count = await run_in_threadpool(
+            auth_service.logout,
             access_token=_extract_bearer_token(request),
             refresh_token=payload.refresh_token,
         )
@@ -1299,9 +1346,9 @@ async def auth_logout(payload: LogoutRequest, request: Request):
 async def get_me_profile(request: Request):
     request_id = _request_id(request)
     auth_service = _service("auth_service")
-    user = _resolve_authenticated_user(request, request_id)
+    user = await _resolve_authenticated_user(request, request_id)
     try:
-        profile = auth_service.get_profile(user_id=user.user_id)
+        profile = await run_in_threadpool(auth_service.get_profile, user_id=user.user_id)
         return {"profile": profile, "request_id": request_id}
     except AuthServiceError as error:
         _log_auth_failure(
@@ -1317,9 +1364,10 @@ async def get_me_profile(request: Request):
 async def put_me_profile(payload: ProfileUpdateRequest, request: Request):
     request_id = _request_id(request)
     auth_service = _service("auth_service")
-    user = _resolve_authenticated_user(request, request_id)
+    user = await _resolve_authenticated_user(request, request_id)
     try:
-        profile = auth_service.update_profile(
+        profile = await run_in_threadpool(
+            auth_service.update_profile,
             user_id=user.user_id,
             display_name=payload.display_name,
             locale=payload.locale,
@@ -1337,6 +1385,7 @@ async def put_me_profile(payload: ProfileUpdateRequest, request: Request):
 
 @app.post("/analyze", response_model=AnalysisResponseContract)
 async def analyze_food(
+    request: Request,
     file: UploadFile = File(...), 
     allergy_info: str = Form("None"),
     iso_country_code: str = Form("US"),
@@ -1359,8 +1408,162 @@ async def analyze_food(
         endpoint="/analyze",
         policy=EndpointErrorPolicy(code=ErrorCode.ANALYZE_FAILED, status_code=500, user_message="Analyze failed"),
         operation=_operation,
+        request=request,
+    )
+
+def _format_stream_event(event: str, data: Any, *, sse: bool) -> str:
+    payload = json.dumps(data, ensure_ascii=False)
+    if sse:
+        return f"event: {event}\ndata: {payload}\n\n"
+    return json.dumps({"event": event, "data": data}, ensure_ascii=False) + "\n"
+
+
+@app.post("/analyze/stream")
+async def analyze_food_stream(
+    request: Request,
+    file: UploadFile = File(...),
+    allergy_info: str = Form("None"),
+    iso_country_code: str = Form("US"),
+    locale: str | None = Form(None),
+):
+    """
+    Streaming /analyze. Server-sent events by default; chunked NDJSON when the client
+    sends `Accept: application/x-ndjson`. Events: summary, ingredient, nutrition,
+    totals, final (validated against AnalysisResponseContract), or error.
+    """
+    request_id = request.headers.get("X-Request-Id") or os.urandom(4).hex()
+    sse = "application/x-ndjson" not in request.headers.get("accept", "")
+    analyst = _service("analyst")
+    contents = await file.read()
+    try:
+        image = await run_in_threadpool(decode_upload_to_image, contents)
+    except Exception as e:
+        raise HTTPException(
+            status_code=400,
+            detail={"message": "Image decode failed", "code": ErrorCode.IMAGE_DECODE_FAILED, "request_id": request_id},
+        ) from e
+    prompt_country_code = resolve_prompt_country_code(iso_country_code, locale)
+
+    async def _events():
+        started_at = time.perf_counter()
+        first_event_ms = None
+        try:
+            async for item in iterate_in_threadpool(
+                analyst.analyze_food_stream(image, allergy_info, prompt_country_code)
+            ):
+                data = item["data"]
+                if item["event"] == "final":
+                    data = AnalysisResponseContract.model_validate(data).model_dump(mode="json")
+                if first_event_ms is None:
+                    first_event_ms = int((time.perf_counter() - started_at) * 1000)
+                yield _format_stream_event(item["event"], data, sse=sse)
+        except Exception as e:
+            log_exception("/analyze/stream", request_id, e, ErrorCode.ANALYZE_FAILED)
+            yield _format_stream_event(
+                "error",
+                {"message": "Analyze failed", "code": ErrorCode.ANALYZE_FAILED, "request_id": request_id},
+                sse=sse,
+            )
+        logger.info(
+            "[Server] Analyze stream complete request_id=%s first_event_ms=%s elapsed_ms=%d",
+            request_id,
+            first_event_ms,
+            int((time.perf_counter() - started_at) * 1000),
+        )
+
+    return StreamingResponse(
+        _events(),
+        media_type="text/event-stream" if sse else "application/x-ndjson",
+        headers={"X-Request-Id": request_id, "Cache-Control": "no-cache"},
     )
 
+
+async def _decode_upload_to_jpeg(contents: bytes) -> bytes:
+    pool = getattr(app.state, "image_decode_pool", None)
+    if pool is None:
+        return await run_in_threadpool(decode_upload_to_jpeg, contents)
+    return await asyncio.get_running_loop().run_in_executor(pool, decode_upload_to_jpeg, contents)
+
+
+@app.post("/analyze/batch")
+async def analyze_food_batch(
+    request: Request,
+    files: list[UploadFile] = File(...),
+    allergy_info: str = Form("None"),
+    iso_country_code: str = Form("US"),
+    locale: str | None = Form(None),
+):
+    """
+    Analyze several food photos for one user in shared Gemini requests.
+    Streams NDJSON, one line per photo ({"index", "filename", "result"} or
+    {"index", "filename", "error"}) in completion order.
+    """
+    request_id = request.headers.get("X-Request-Id") or os.urandom(4).hex()
+    max_images = max(1, _env_int("ANALYZE_BATCH_MAX_IMAGES", ANALYZE_BATCH_DEFAULT_MAX_IMAGES))
+    if not files or len(files) > max_images:
+        raise HTTPException(
+            status_code=422,
+            detail={
+                "message": f"Provide between 1 and {max_images} images",
+                "code": ErrorCode.INVALID_REQUEST,
+                "request_id": request_id,
+            },
+        )
+
+    async def _operation():
+        analyst = _service("analyst")
+        contents = [await file.read() for file in files]
+        filenames = [file.filename for file in files]
+        decoded = await asyncio.gather(*(_decode_upload_to_jpeg(item) for item in contents), return_exceptions=True)
+        images = {index: jpeg for index, jpeg in enumerate(decoded) if isinstance(jpeg, bytes)}
+        prompt_country_code = resolve_prompt_country_code(iso_country_code, locale)
+        nutrition_lookup = SharedNutritionLookup()
+        logger.info(
+            "[Server] Analyze batch request request_id=%s images=%d decoded=%d",
+            request_id,
+            len(files),
+            len(images),
+        )
+
+        def _generate(jpeg_images: list[bytes], max_output_tokens: int) -> list[dict]:
+            return analyst.generate_food_batch_json(jpeg_images, allergy_info, prompt_country_code, max_output_tokens)
+
+        def _finalize(result: dict) -> dict:
+            result = analyst.finalize_food_result(result, nutrition_lookup)
+            return AnalysisResponseContract.model_validate(result).model_dump(mode="json")
+
+        async def _ndjson():
+            started_at = time.perf_counter()
+            for index, outcome in enumerate(decoded):
+                if isinstance(outcome, BaseException):
+                    logger.warning("[Server] Analyze batch decode failed request_id=%s index=%d error=%s", request_id, index, outcome)
+                    item = {"index": index, "filename": filenames[index], "error": ErrorCode.IMAGE_DECODE_FAILED}
+                    yield json.dumps(item, ensure_ascii=False) + "\n"
+            async for item in stream_food_batch(
+                images,
+                generate=_generate,
+                finalize=_finalize,
+                images_per_call=_env_int("ANALYZE_BATCH_IMAGES_PER_CALL", ANALYZE_BATCH_DEFAULT_IMAGES_PER_CALL),
+            ):
+                yield json.dumps({**item, "filename": filenames[item["index"]]}, ensure_ascii=False) + "\n"
+            logger.info(
+                "[Server] Analyze batch complete request_id=%s elapsed_ms=%d nutrition_lookups=%d nutrition_shared=%d",
+                request_id,
+                int((time.perf_counter() - started_at) * 1000),
+                nutrition_lookup.lookups,
+                nutrition_lookup.hits,
+            )
+
+        return StreamingResponse(_ndjson(), media_type="application/x-ndjson", headers={"X-Request-Id": request_id})
+
+    return await run_with_error_policy(
+        endpoint="/analyze/batch",
+        policy=EndpointErrorPolicy(code=ErrorCode.ANALYZE_FAILED, status_code=500, user_message="Analyze failed"),
+        operation=_operation,
+        request=request,
+    )
+
+
 @app.post("/analyze/label", response_model=AnalysisResponseContract)
 async def analyze_label(
     request: Request,
@@ -1391,9 +1594,13 @@ async def analyze_label(
         image = await run_in_threadpool(decode_upload_to_image, contents)
         preprocess_elapsed_ms = int((time.perf_counter() - preprocess_started_at) * 1000)
 
-        quality = evaluate_label_image_quality(image)
+        quality = await run_in_threadpool(
+            evaluate_label_image_quality,
+            image,
+            tiled=_is_label_quality_tiled_enabled(),
+        )
         logger.info(
-            "[Server] Label quality gate request_id=%s passed=%s failed_checks=%s metrics={blur:%.2f,contrast:%.2f,text_density:%.4f,glare:%.4f}",
+            "[Server] Label quality gate request_id=%s passed=%s failed_checks=%s metrics={blur:%.2f,contrast:%.2f,text_density:%.4f,glare:%.4f} crop_box=%s",
             request_id,
             quality.passed,
             quality.failed_checks,
@@ -1401,6 +1608,7 @@ async def analyze_label(
             quality.metrics.contrast_score,
             quality.metrics.text_density_score,
             quality.metrics.glare_ratio,
+            quality.crop_box,
         )
 
         if not quality.passed:
@@ -1423,6 +1631,10 @@ async def analyze_label(
             )
             return fallback
 
+        if quality.crop_box:
+            # Upload only the text-dense region scored by the tiled gate.
+            image = image.crop(quality.crop_box)
+
         kpi_input = load_kpi_input_from_env()
         kpi_gate_passed = evaluate_kpi_gate(kpi_input, kpi_thresholds)
         if rollout_controller and rollout_auto_manager:
@@ -1495,6 +1707,8 @@ async def analyze_label(
             prompt_country_code,
             locale,
             assess_enabled,
+            # The tiled gate already cropped to its region; crop once, not twice.
+            autocrop=quality.crop_box is None,
         )
         label_error_type = result.pop("_label_error_type", None) if isinstance(result, dict) else None
         label_chargeable = bool(result.pop("_label_chargeable", True)) if isinstance(result, dict) else True
@@ -1556,10 +1770,12 @@ async def analyze_label(
             user_message="Label analysis failed",
         ),
         operation=_operation,
+        request=request,
     )
 
 @app.post("/analyze/smart", response_model=AnalysisResponseContract)
 async def analyze_smart(
+    request: Request,
     file: UploadFile = File(...),
     allergy_info: str = Form("None"),
     iso_country_code: str = Form("US"),
@@ -1591,7 +1807,26 @@ async def analyze_smart(
             user_message="Smart analysis failed",
         ),
         operation=_operation,
+        request=request,
+    )
+
+def _barcode_lookup_response(body: dict[str, Any], request_id: str) -> Response:
+    """Validate + serialize through the contract ourselves so payload size and cost can be reported."""
+    serialize_started_at = time.perf_counter()
+    content = BarcodeLookupResponseContract.model_validate(body).model_dump_json().encode("utf-8")
+    serialize_ms = (time.perf_counter() - serialize_started_at) * 1000
+    logger.info(
+        "[Server] Lookup response request_id=%s response_bytes=%d serialize_ms=%.2f",
+        request_id,
+        len(content),
+        serialize_ms,
     )
+    return Response(
+        content=content,
+        media_type="application/json",
+        headers={"Server-Timing": f"serialize;dur={serialize_ms:.2f}"},
+    )
+
 
 @app.post("/lookup/barcode", response_model=BarcodeLookupResponseContract)
 async def lookup_barcode(
@@ -1599,11 +1834,14 @@ async def lookup_barcode(
     barcode: str = Form(...),
     allergy_info: str = Form("None"),
     locale: str | None = Form(None),
+    fields: str | None = Form(None),
 ):
     """
     Lookup product by barcode.
     Full SoC Implementation: Controller -> Service -> Infrastructure (DataGo/OFF)
     If ingredients are found and user has allergies, run Gemini allergen analysis.
+    `fields` projects the product: omitted = compact (raw_data trimmed to image_url), "full" = everything,
+    or a comma list such as "food_name,calories,raw_data.image_url".
     """
     request_id = request.headers.get("X-Request-Id") or os.urandom(4).hex()
     started_at = time.perf_counter()
@@ -1642,32 +1880,55 @@ async def lookup_barcode(
             )
             analyst = _service("analyst")
             analysis_started_at = time.perf_counter()
-            allergen_result = await run_in_threadpool(
-                analyst.analyze_barcode_ingredients,
-                result["ingredients"],
-                allergy_info,
-            )
+            allergen_cache = getattr(app.state, "barcode_allergen_cache", None)
+            if allergen_cache is not None:
+                allergen_result, cache_outcome = await run_in_threadpool(
+                    resolve_barcode_allergens,
+                    allergen_cache,
+                    result["ingredients"],
+                    allergy_info,
+                    analyst.analyze_barcode_ingredients,
+                )
+            else:
+                allergen_result = await run_in_threadpool(
+                    analyst.analyze_barcode_ingredients,
+                    result["ingredients"],
+                    allergy_info,
+                )
+                cache_outcome = "disabled"
             logger.info(
-                "[Server] Allergen analysis done request_id=%s elapsed_ms=%d",
+                "[Server] Allergen analysis done request_id=%s elapsed_ms=%d cache=%s",
                 request_id,
                 int((time.perf_counter() - analysis_started_at) * 1000),
+                cache_outcome,
             )
             
-            # Merge allergen analysis into result
-            result["safetyStatus"] = allergen_result.get("safetyStatus", "SAFE")
-            result["coachMessage"] = allergen_result.get("coachMessage", "")
-            
-            # Replace simple string list with enriched ingredient objects
-            result["ingredients"] = allergen_result.get("ingredients", result["ingredients"])
+            # Merge allergen analysis into result (enriched ingredient objects replace the string list)
+            apply_allergen_assessment(result, allergen_result)
         logger.info(
             "[Server] Lookup complete request_id=%s elapsed_ms=%d found=true",
             request_id,
             int((time.perf_counter() - started_at) * 1000),
         )
-        return {"found": True, "data": result}
+        return _barcode_lookup_response({"found": True, "data": project_product(result, fields)}, request_id)
         
     except HTTPException:
         raise
+    except DeadlineExceeded as e:
+        logger.warning(
+            "[Server] Barcode Lookup deadline request_id=%s code=%s error=%s",
+            request_id,
+            ErrorCode.DEADLINE_EXCEEDED,
+            e,
+        )
+        raise HTTPException(
+            status_code=504,
+            detail={
+                "message": "Barcode lookup timed out",
+                "code": ErrorCode.DEADLINE_EXCEEDED,
+                "request_id": request_id,
+            },
+        ) from e
     except Exception as e:
         logger.exception(
             "[Server] Barcode Lookup Error request_id=%s code=%s error=%s",
@@ -1684,6 +1945,65 @@ async def lookup_barcode(
             },
         ) from e
 
+@app.post("/lookup/barcode/batch")
+async def lookup_barcode_batch(request: Request, payload: BarcodeBatchLookupRequest):
+    """
+    Batch barcode lookup against one allergy profile.
+    Streams NDJSON, one line per unique barcode in completion order; allergen analysis
+    for every product that needs Gemini is sent as one combined request.
+    """
+    request_id = request.headers.get("X-Request-Id") or os.urandom(4).hex()
+    barcodes = dedupe_barcodes(payload.barcodes)
+    max_items = max(1, _env_int("BARCODE_BATCH_MAX_ITEMS", BARCODE_BATCH_DEFAULT_MAX_ITEMS))
+    if not barcodes or len(barcodes) > max_items:
+        raise HTTPException(
+            status_code=422,
+            detail={
+                "message": f"Provide between 1 and {max_items} unique barcodes",
+                "code": ErrorCode.INVALID_REQUEST,
+                "request_id": request_id,
+            },
+        )
+    barcode_service = _service("barcode_service")
+    analyst = _service("analyst")
+    logger.info(
+        "[Server] Batch lookup request request_id=%s unique=%d requested=%d allergy_info=%s locale=%s",
+        request_id,
+        len(barcodes),
+        len(payload.barcodes),
+        payload.allergy_info,
+        payload.locale,
+    )
+
+    async def _ndjson():
+        started_at = time.perf_counter()
+        found = 0
+        response_bytes = 0
+        async for item in stream_barcode_batch(
+            barcodes,
+            payload.allergy_info,
+            barcode_service=barcode_service,
+            analyze_batch=analyst.analyze_barcode_screenings_batch,
+            allergen_cache=getattr(app.state, "barcode_allergen_cache", None),
+            concurrency=_env_int("BARCODE_BATCH_CONCURRENCY", BARCODE_BATCH_DEFAULT_CONCURRENCY),
+        ):
+            found += int(item["found"])
+            if item.get("data") is not None:
+                item["data"] = project_product(item["data"], payload.fields)
+            line = (json.dumps(item, ensure_ascii=False) + "\n").encode("utf-8")
+            response_bytes += len(line)
+            yield line
+        logger.info(
+            "[Server] Batch lookup complete request_id=%s elapsed_ms=%d items=%d found=%d response_bytes=%d",
+            request_id,
+            int((time.perf_counter() - started_at) * 1000),
+            len(barcodes),
+            found,
+            response_bytes,
+        )
+
+    return StreamingResponse(_ndjson(), media_type="application/x-ndjson", headers={"X-Request-Id": request_id})
+
 if __name__ == "__main__":
     import uvicorn
 
@@ -0,0 +1,203 @@
+import asyncio
+import dataclasses
+import os
+import unittest
+
+import httpx
+from fastapi import FastAPI
+
+from backend.modules.client_ip import TrustedProxies
+from backend.modules.ops.admission_control import (
+    AdmissionConfig,
+    AdmissionControlMiddleware,
+    RoutePolicy,
+    RoutePriority,
+    TokenBucketLimiter,
+)
+
+os.environ["OPENAPI_EXPORT_ONLY"] = "1"
+from backend.server import app as server_app  # noqa: E402
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _config(*, cheap_rate: float = 0.0) -> AdmissionConfig:
+    return AdmissionConfig(
+        enabled=True,
+        routes=(
+            RoutePolicy(
+                prefix="/lookup",
+                priority=RoutePriority.CHEAP,
+                rate_per_minute=cheap_rate,
+                burst=2,
+                max_concurrency=8,
+                default_timeout_seconds=5.0,
+                expected_service_seconds=0.01,
+            ),
+            RoutePolicy(
+                prefix="/analyze",
+                priority=RoutePriority.EXPENSIVE,
+                rate_per_minute=0.0,
+                burst=2,
+                max_concurrency=1,
+                default_timeout_seconds=5.0,
+                expected_service_seconds=1.0,
+            ),
+        ),
+    )
+
+
+def _app(config: AdmissionConfig, release: asyncio.Event) -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(AdmissionControlMiddleware, config=config)
+
+    @app.post("/analyze/label")
+    async def label():
+        await release.wait()
+        return {"ok": True}
+
+    @app.post("/lookup/barcode")
+    async def barcode():
+        return {"ok": True}
+
+    return app
+
+
+class TokenBucketLimiterTests(unittest.TestCase):
+    def test_burst_then_refill(self):
+        clock = _Clock()
+        limiter = TokenBucketLimiter(clock=clock)
+        self.assertEqual([limiter.try_take("ip:a", rate_per_minute=60, burst=2) for _ in range(2)], [0.0, 0.0])
+        self.assertAlmostEqual(limiter.try_take("ip:a", rate_per_minute=60, burst=2), 1.0)
+        self.assertEqual(limiter.try_take("ip:b", rate_per_minute=60, burst=2), 0.0)
+
+        clock.now += 1.0
+        self.assertEqual(limiter.try_take("ip:a", rate_per_minute=60, burst=2), 0.0)
+
+    def test_evicts_least_recently_used_keys(self):
+        limiter = TokenBucketLimiter(max_keys=2, clock=_Clock())
+        for key in ("a", "b", "c"):
+            limiter.try_take(key, rate_per_minute=60, burst=1)
+        self.assertEqual(len(limiter), 2)
+        self.assertEqual(limiter.try_take("a", rate_per_minute=60, burst=1), 0.0)
+
+
+class AdmissionControlMiddlewareTests(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.release = asyncio.Event()
+
+    def _client(self, app, *, client=("10.0.0.1", 1234)) -> httpx.AsyncClient:
+        transport = httpx.ASGITransport(app=app, client=client)
+        return httpx.AsyncClient(transport=transport, base_url="http://test")
+
+    async def test_rate_limits_per_ip_and_per_credential(self):
+        self.release.set()
+        app = _app(_config(cheap_rate=6), self.release)
+        async with self._client(app) as client:
+            statuses = [(await client.post("/lookup/barcode")).status_code for _ in range(3)]
+            self.assertEqual(statuses, [200, 200, 429])
+            limited = await client.post("/lookup/barcode")
+            self.assertEqual(limited.json()["detail"]["code"], "RATE_LIMITED")
+            self.assertGreaterEqual(int(limited.headers["Retry-After"]), 1)
+
+        # Each IP has its own bucket, but one credential is limited across IPs.
+        headers = {"Authorization": "Bearer same-user"}
+        statuses = []
+        for index in range(3):
+            async with self._client(app, client=(f"10.0.1.{index}", 1)) as client:
+                statuses.append((await client.post("/lookup/barcode", headers=headers)).status_code)
+        self.assertEqual(statuses, [200, 200, 429])
+
+    async def test_forwarded_clients_behind_a_trusted_proxy_get_their_own_buckets(self):
+        self.release.set()
+        config = dataclasses.replace(_config(cheap_rate=6), trusted_proxies=TrustedProxies("10.0.0.0/8"))
+        app = _app(config, self.release)
+        async with self._client(app) as client:
+            for user in ("198.51.100.1", "198.51.100.2"):
+                headers = {"X-Forwarded-For": user}
+                statuses = [(await client.post("/lookup/barcode", headers=headers)).status_code for _ in range(3)]
+                self.assertEqual(statuses, [200, 200, 429])
+
+        # A direct client cannot pick a fresh bucket by forging the header.
+        async with self._client(app, client=("203.0.113.9", 1)) as client:
+            statuses = [
+                (await client.post("/lookup/barcode", headers={"X-Forwarded-For": f"192.0.2.{index}"})).status_code
+                for index in range(3)
+            ]
+        self.assertEqual(statuses, [200, 200, 429])
+
+    async def test_sheds_when_estimated_wait_exceeds_client_timeout(self):
+        async with self._client(_app(_config(), self.release)) as client:
+            running = asyncio.create_task(client.post("/analyze/label"))
+            await asyncio.sleep(0.05)
+
+            shed = await client.post("/analyze/label", headers={"X-Client-Timeout-Ms": "500"})
+            self.assertEqual(shed.status_code, 503)
+            self.assertEqual(shed.json()["detail"]["code"], "SERVICE_OVERLOADED")
+            self.assertIn("Retry-After", shed.headers)
+
+            # Cheap routes have their own pool and are not stuck behind analysis.
+            self.assertEqual((await client.post("/lookup/barcode")).status_code, 200)
+
+            self.release.set()
+            self.assertEqual((await running).status_code, 200)
+
+    async def test_queued_request_is_admitted_when_a_slot_frees(self):
+        async with self._client(_app(_config(), self.release)) as client:
+            first = asyncio.create_task(client.post("/analyze/label"))
+            await asyncio.sleep(0.05)
+            second = asyncio.create_task(client.post("/analyze/label", headers={"X-Client-Timeout-Ms": "3000"}))
+            await asyncio.sleep(0.05)
+            self.release.set()
+            self.assertEqual([(await first).status_code, (await second).status_code], [200, 200])
+
+    async def test_waiter_that_times_out_is_shed(self):
+        async with self._client(_app(_config(), self.release)) as client:
+            running = asyncio.create_task(client.post("/analyze/label"))
+            await asyncio.sleep(0.05)
+            # Fits the 1 s estimate, but the slot does not free within 1.5 s.
+            waited = await client.post("/analyze/label", headers={"X-Client-Timeout-Ms": "1500"})
+            self.assertEqual(waited.status_code, 503)
+            self.release.set()
+            self.assertEqual((await running).status_code, 200)
+
+
+class TrustedProxiesTests(unittest.TestCase):
+    def test_forwarded_for_is_read_only_from_trusted_peers(self):
+        proxies = TrustedProxies("127.0.0.1, 10.0.0.0/8")
+        self.assertEqual(proxies.client_ip("10.1.2.3", "198.51.100.7"), "198.51.100.7")
+        self.assertEqual(proxies.client_ip("203.0.113.9", "198.51.100.7"), "203.0.113.9")
+        self.assertEqual(proxies.client_ip("10.1.2.3", "6.6.6.6, 198.51.100.7, 10.0.0.2"), "198.51.100.7")
+        self.assertEqual(proxies.client_ip("10.1.2.3", None), "10.1.2.3")
+        self.assertEqual(proxies.client_ip(None, "198.51.100.7"), "unknown")
+
+    def test_defaults_match_uvicorn(self):
+        self.assertFalse(TrustedProxies.from_env({}.get).is_trusted("10.0.0.1"))
+        self.assertTrue(TrustedProxies.from_env({"FORWARDED_ALLOW_IPS": "*"}.get).is_trusted("10.0.0.1"))
+
+
+class ServerAdmissionWiringTests(unittest.TestCase):
+    def test_server_installs_admission_middleware(self):
+        self.assertIn(AdmissionControlMiddleware, [middleware.cls for middleware in server_app.user_middleware])
+
+    def test_default_routes_give_barcode_its_own_class(self):
+        config = AdmissionConfig.from_env({}.get)
+        self.assertEqual(config.match("/lookup/barcode/batch").priority, RoutePriority.CHEAP)
+        self.assertEqual(config.match("/analyze/label").priority, RoutePriority.EXPENSIVE)
+        self.assertIsNone(config.match("/"))
+        self.assertIsNone(config.match("/analyzer"))
+
+    def test_default_deadlines_cover_the_app_timeouts(self):
+        config = AdmissionConfig.from_env({}.get)
+        self.assertGreaterEqual(config.match("/lookup/barcode").default_timeout_seconds, 30.0)
+        self.assertGreaterEqual(config.match("/analyze").default_timeout_seconds, 180.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
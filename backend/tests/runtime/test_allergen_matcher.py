@@ -0,0 +1,88 @@
+import unittest
+from unittest.mock import patch
+
+from backend.modules.analyst_core.allergen_matcher import AllergenVerdict, screen_ingredients
+from backend.modules.analyst_runtime.food_analyst import FoodAnalyst
+
+
+class _MockResponse:
+    def __init__(self, text: str):
+        self.text = text
+
+
+def _verdicts(ingredients: list[str], profile: list[str]) -> dict[str, AllergenVerdict]:
+    return {item.name: item.verdict for item in screen_ingredients(ingredients, profile).items}
+
+
+class AllergenMatcherTests(unittest.TestCase):
+    def test_classifies_hit_clear_and_ambiguous(self):
+        verdicts = _verdicts(["밀가루", "우유", "설탕", "혼합제제"], ["Wheat/Gluten"])
+        self.assertEqual(verdicts["밀가루"], AllergenVerdict.HIT)
+        self.assertEqual(verdicts["설탕"], AllergenVerdict.CLEAR)
+        self.assertEqual(verdicts["우유"], AllergenVerdict.CLEAR)
+        self.assertEqual(verdicts["혼합제제"], AllergenVerdict.AMBIGUOUS)
+
+    def test_look_alike_terms_do_not_hit(self):
+        verdicts = _verdicts(["메밀", "eggplant", "밀크초콜릿", "gluten free oats"], ["Wheat/Gluten", "Egg"])
+        self.assertEqual(verdicts["메밀"], AllergenVerdict.CLEAR)
+        self.assertEqual(verdicts["eggplant"], AllergenVerdict.AMBIGUOUS)
+        self.assertEqual(verdicts["밀크초콜릿"], AllergenVerdict.AMBIGUOUS)
+        self.assertEqual(verdicts["gluten free oats"], AllergenVerdict.AMBIGUOUS)
+
+    def test_broad_profile_covers_specific_members(self):
+        self.assertEqual(_verdicts(["아몬드"], ["Tree Nut"])["아몬드"], AllergenVerdict.HIT)
+        verdicts = _verdicts(["아몬드", "호두"], ["Tree Nut (Almond)"])
+        self.assertEqual(verdicts["아몬드"], AllergenVerdict.HIT)
+        self.assertEqual(verdicts["호두"], AllergenVerdict.AMBIGUOUS)
+
+    def test_unknown_profile_allergen_never_clears(self):
+        self.assertEqual(_verdicts(["설탕"], ["Kiwi"])["설탕"], AllergenVerdict.AMBIGUOUS)
+
+    def test_merge_keeps_local_hits_over_model_safe(self):
+        screening = screen_ingredients(["밀가루", "혼합제제"], ["Wheat/Gluten"])
+        merged = screening.merge_model_assessment(
+            {
+                "safetyStatus": "SAFE",
+                "coachMessage": "ok",
+                "ingredients": [{"name": "혼합제제", "isAllergen": False, "riskReason": ""}],
+            }
+        )
+        self.assertEqual(merged["safetyStatus"], "DANGER")
+        self.assertEqual([item["name"] for item in merged["ingredients"]], ["밀가루", "혼합제제"])
+        self.assertTrue(merged["ingredients"][0]["isAllergen"])
+
+
+class BarcodeAllergenScreeningTests(unittest.TestCase):
+    def _build_analyst(self) -> FoodAnalyst:
+        with (
+            patch.object(FoodAnalyst, "_configure_vertex_ai", return_value=None),
+            patch("backend.modules.analyst_runtime.food_analyst.GenerativeModel", return_value=object()),
+        ):
+            return FoodAnalyst()
+
+    def test_skips_gemini_when_nothing_is_ambiguous(self):
+        analyst = self._build_analyst()
+        with patch("backend.modules.analyst_runtime.food_analyst.generate_with_semaphore") as mock_generate:
+            result = analyst.analyze_barcode_ingredients(["밀가루", "설탕", "정제수"], "wheat")
+
+        mock_generate.assert_not_called()
+        self.assertEqual(result["safetyStatus"], "DANGER")
+        self.assertEqual([item["isAllergen"] for item in result["ingredients"]], [True, False, False])
+
+    def test_sends_only_ambiguous_remainder_to_gemini(self):
+        analyst = self._build_analyst()
+        with patch("backend.modules.analyst_runtime.food_analyst.generate_with_semaphore") as mock_generate:
+            mock_generate.return_value = _MockResponse(
+                '{"safetyStatus":"CAUTION","coachMessage":"확인 필요","ingredients":[{"name":"혼합제제","isAllergen":false,"riskReason":"vague"}]}'
+            )
+            result = analyst.analyze_barcode_ingredients(["설탕", "혼합제제"], "milk")
+
+        prompt = mock_generate.call_args.kwargs["contents"][0]
+        self.assertIn('"혼합제제"', prompt)
+        self.assertNotIn('"설탕"', prompt)
+        self.assertEqual(result["safetyStatus"], "CAUTION")
+        self.assertEqual(len(result["ingredients"]), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,125 @@
+import io
+import json
+import os
+import threading
+import unittest
+from unittest.mock import patch
+
+from fastapi.testclient import TestClient
+from PIL import Image
+
+from backend.modules.analyst_runtime.food_analyst import FoodAnalyst
+
+
+os.environ["OPENAPI_EXPORT_ONLY"] = "1"
+from backend.server import app  # noqa: E402
+
+
+RESPONSE = {
+    "foodName": "Bibimbap",
+    "foodName_en": "Bibimbap",
+    "foodName_ko": "비빔밥",
+    "foodOrigin": "korean",
+    "safetyStatus": "CAUTION",
+    "confidence": 95,
+    "ingredients": [
+        {"name": "rice", "bbox": [1, 2, 3, 4], "isAllergen": False},
+        {"name": "egg", "bbox": [5, 6, 7, 8], "isAllergen": True},
+    ],
+    "raw_result": "Contains egg.",
+}
+
+
+def _chunks(text: str, size: int = 9):
+    return [text[index:index + size] for index in range(0, len(text), size)]
+
+
+class FoodAnalystStreamTests(unittest.TestCase):
+    def test_stream_events_and_final_result_reuse_lookups(self):
+        analyst = FoodAnalyst.__new__(FoodAnalyst)
+        analyst.model = object()
+        analyst.model_name = "gemini-test"
+        lookups = []
+
+        def _lookup(name, origin="unknown"):
+            lookups.append((name, origin))
+            return {"calories": 100.0, "protein": 1.0, "dataSource": "Test"}
+
+        with (
+            patch(
+                "backend.modules.analyst_runtime.food_analyst.stream_with_semaphore",
+                return_value=iter(_chunks(json.dumps(RESPONSE, ensure_ascii=False))),
+            ),
+            patch("backend.modules.analyst_core.postprocess.lookup_nutrition", _lookup),
+        ):
+            events = list(analyst.analyze_food_stream(Image.new("RGB", (8, 8)), "Egg", "KR"))
+
+        names = [event["event"] for event in events]
+        self.assertEqual(names[0], "summary")
+        self.assertEqual(events[0]["data"]["safetyStatus"], "CAUTION")
+        self.assertEqual(names.count("ingredient"), 2)
+        self.assertEqual(names.count("nutrition"), 2)
+        self.assertEqual(names[-2:], ["totals", "final"])
+        final = events[-1]["data"]
+        self.assertEqual(final["nutrition"]["calories"], 200.0)
+        self.assertEqual(final["used_model"], "gemini-test")
+        self.assertEqual(sorted(lookups), [("egg", "korean"), ("rice", "korean")])
+
+    def test_streams_share_one_lookup_pool(self):
+        analyst = FoodAnalyst.__new__(FoodAnalyst)
+        analyst.model = object()
+        analyst.model_name = "gemini-test"
+        threads = set()
+
+        def _lookup(name, origin="unknown"):
+            threads.add(threading.current_thread().name)
+            return {"calories": 100.0, "dataSource": "Test"}
+
+        with patch("backend.modules.analyst_core.postprocess.lookup_nutrition", _lookup):
+            for _ in range(2):
+                with patch(
+                    "backend.modules.analyst_runtime.food_analyst.stream_with_semaphore",
+                    return_value=iter(_chunks(json.dumps(RESPONSE, ensure_ascii=False))),
+                ):
+                    list(analyst.analyze_food_stream(Image.new("RGB", (8, 8)), "Egg", "KR"))
+
+        self.assertTrue(threads)
+        self.assertTrue(all(name.startswith("nutrition") for name in threads))
+        self.assertEqual(FoodAnalyst._nutrition_lookup_pool.submit(int, "1").result(), 1)
+
+
+class _StreamingAnalyst:
+    def analyze_food_stream(self, image, allergy_info, iso_country_code):
+        yield {"event": "summary", "data": {"foodName": "Bibimbap", "safetyStatus": "SAFE"}}
+        yield {"event": "final", "data": {**RESPONSE, "safetyStatus": "SAFE", "unexpected": "dropped"}}
+
+
+class AnalyzeStreamEndpointTests(unittest.TestCase):
+    def _post(self, headers=None):
+        buffer = io.BytesIO()
+        Image.new("RGB", (8, 8)).save(buffer, format="PNG")
+        with TestClient(app) as client:
+            app.state.analyst = _StreamingAnalyst()
+            return client.post(
+                "/analyze/stream",
+                files={"file": ("meal.png", buffer.getvalue(), "image/png")},
+                headers=headers or {},
+            )
+
+    def test_sse_events_with_contract_validated_final(self):
+        response = self._post()
+        self.assertTrue(response.headers["content-type"].startswith("text/event-stream"))
+        blocks = [block for block in response.text.split("\n\n") if block]
+        self.assertEqual(blocks[0].splitlines()[0], "event: summary")
+        final = json.loads(blocks[-1].splitlines()[1][len("data: "):])
+        self.assertEqual(final["foodName"], "Bibimbap")
+        self.assertNotIn("unexpected", final)
+
+    def test_ndjson_when_requested(self):
+        response = self._post({"Accept": "application/x-ndjson"})
+        events = [json.loads(line)["event"] for line in response.text.splitlines()]
+        self.assertEqual(events, ["summary", "final"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,171 @@
+import hashlib
+import os
+import time
+import unittest
+from unittest.mock import patch
+
+from fastapi.testclient import TestClient
+
+from backend.modules.auth import AuthServiceError, InMemoryAuthSessionService
+from backend.modules.auth.attempt_limiter import AttemptRateLimitedError, SlidingWindowAttemptLimiter
+from backend.modules.auth.password_hashing import PasswordHashPolicy, ScryptHasher
+from backend.modules.auth.storage import NS_EMAIL_VERIFICATIONS, InMemoryAuthStateStore
+from backend.modules.client_ip import TrustedProxies
+
+os.environ["OPENAPI_EXPORT_ONLY"] = "1"
+from backend.server import app  # noqa: E402
+
+
+class _Clock:
+    def __init__(self, now: float):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _service(**kwargs) -> InMemoryAuthSessionService:
+    return InMemoryAuthSessionService(
+        email_verification_required=True,
+        email_verification_debug_code_enabled=True,
+        password_hash_policy=PasswordHashPolicy(ScryptHasher(n=2**10)),
+        **kwargs,
+    )
+
+
+def _signup(service: InMemoryAuthSessionService, email: str = "attempts@example.com") -> dict:
+    return service.signup_email(
+        email=email,
+        password="Passw0rd!",
+        display_name=None,
+        locale="ko-KR",
+        device_id=None,
+    )
+
+
+class SlidingWindowAttemptLimiterTests(unittest.TestCase):
+    def setUp(self):
+        # Counters expire on the wall clock, so windows start at a real (future) minute.
+        self.window_start = (int(time.time()) // 60 + 5) * 60
+        self.clock = _Clock(self.window_start + 20.0)
+        self.limiter = SlidingWindowAttemptLimiter(
+            InMemoryAuthStateStore(),
+            limits={"ip": 3, "email": 0},
+            window_seconds=60,
+            clock=self.clock,
+        )
+
+    def test_rejects_over_budget_and_reports_retry_after(self):
+        for _ in range(3):
+            self.limiter.hit("ip", "10.0.0.1")
+        with self.assertRaises(AttemptRateLimitedError) as context:
+            self.limiter.hit("ip", "10.0.0.1")
+        self.assertEqual((context.exception.scope, context.exception.retry_after_seconds), ("ip", 40))
+
+        # Other keys and disabled scopes are unaffected.
+        self.limiter.hit("ip", "10.0.0.2")
+        for _ in range(10):
+            self.limiter.hit("email", "digest")
+        self.assertEqual(self.limiter.snapshot(), {"allowed": 4, "rejected": 1, "rejected_by_scope": {"ip": 1}})
+
+    def test_previous_window_still_counts_across_the_edge(self):
+        self.clock.now = self.window_start + 30.0
+        for _ in range(3):
+            self.limiter.hit("ip", "10.0.0.1")
+
+        # 15 s into the next window, 3/4 of the previous window is still inside the slide.
+        self.clock.now = self.window_start + 75.0
+        with self.assertRaises(AttemptRateLimitedError):
+            self.limiter.hit("ip", "10.0.0.1")
+
+        # A window later the burst only weighs half and the budget is back.
+        self.clock.now = self.window_start + 150.0
+        self.limiter.hit("ip", "10.0.0.1")
+
+
+class CodeAttemptAdmissionTests(unittest.TestCase):
+    def test_flood_is_rejected_before_code_hashing(self):
+        service = _service(code_attempts_per_email=3)
+        _signup(service)
+        with patch.object(service, "_hash_email_verification_code", wraps=service._hash_email_verification_code) as hashed:
+            for _ in range(3):
+                with self.assertRaises(AuthServiceError) as context:
+                    service.verify_email(email="attempts@example.com", code="000000", device_id=None)
+                self.assertEqual(context.exception.code, "AUTH_EMAIL_VERIFICATION_INVALID")
+            for _ in range(20):
+                with self.assertRaises(AuthServiceError) as context:
+                    service.verify_email(email="attempts@example.com", code="000000", device_id=None)
+                self.assertEqual((context.exception.code, context.exception.status_code), ("AUTH_RATE_LIMITED", 429))
+        self.assertEqual(hashed.call_count, 3)
+        self.assertEqual(service.attempt_limiter.snapshot()["rejected_by_scope"]["email"], 20)
+
+    def test_client_ip_budget_spans_emails(self):
+        service = _service(code_attempts_per_ip=2)
+        for index in range(3):
+            with self.assertRaises(AuthServiceError) as context:
+                service.confirm_password_reset(
+                    email=f"user{index}@example.com",
+                    code="000000",
+                    new_password="Passw0rd!",
+                    client_ip="203.0.113.9",
+                )
+        self.assertEqual(context.exception.code, "AUTH_RATE_LIMITED")
+        self.assertIsNotNone(context.exception.retry_after_seconds)
+
+    def test_code_digests_are_keyed(self):
+        key = b"k" * 32
+        first = _service(code_digest_key=key)
+        challenge = _signup(first)
+        record = first._store.get(NS_EMAIL_VERIFICATIONS, challenge["user"]["id"])
+        plain = hashlib.sha256(f"{record.user_id}:{challenge['verification_debug_code']}".encode()).hexdigest()
+        self.assertNotEqual(record.code_hash, plain)
+
+        # Services sharing the key (workers on one store) verify each other's codes.
+        second = _service(code_digest_key=key, state_store=first._store)
+        bundle = second.verify_email(
+            email="attempts@example.com",
+            code=challenge["verification_debug_code"],
+            device_id=None,
+        )
+        self.assertIn("access_token", bundle)
+
+    def test_shared_backend_requires_digest_key(self):
+        env = {"AUTH_STATE_BACKEND": "sqlite", "AUTH_STATE_SQLITE_PATH": ":memory:"}
+        with self.assertRaises(ValueError):
+            InMemoryAuthSessionService.from_env(env.get)
+        service = InMemoryAuthSessionService.from_env({**env, "AUTH_CODE_DIGEST_KEY": "c2VjcmV0LWtleQ"}.get)
+        service.close()
+
+
+class CodeAttemptEndpointTests(unittest.TestCase):
+    def test_rate_limited_response_carries_retry_after(self):
+        with (
+            patch.dict(os.environ, {"AUTH_CODE_ATTEMPTS_PER_IP": "2"}, clear=False),
+            TestClient(app) as client,
+        ):
+            statuses = [
+                client.post("/auth/email/verify", json={"email": "nobody@example.com", "code": "000000"})
+                for _ in range(3)
+            ]
+        self.assertEqual([response.status_code for response in statuses], [404, 404, 429])
+        self.assertEqual(statuses[-1].json()["detail"]["code"], "AUTH_RATE_LIMITED")
+        self.assertGreater(int(statuses[-1].headers["Retry-After"]), 0)
+
+    def test_ip_budget_follows_the_forwarded_client(self):
+        body = {"email": "nobody@example.com", "code": "000000"}
+        with (
+            patch.dict(os.environ, {"AUTH_CODE_ATTEMPTS_PER_IP": "2"}, clear=False),
+            patch("backend.server.TRUSTED_PROXIES", TrustedProxies("testclient")),
+            TestClient(app) as client,
+        ):
+            first = [
+                client.post("/auth/email/verify", json=body, headers={"X-Forwarded-For": "198.51.100.1"}).status_code
+                for _ in range(3)
+            ]
+            other = client.post("/auth/email/verify", json=body, headers={"X-Forwarded-For": "198.51.100.2"})
+        self.assertEqual(first, [404, 404, 429])
+        self.assertEqual(other.status_code, 404)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -39,8 +39,8 @@ class AuthEmailDeliveryTests(unittest.TestCase):
             )
 
         self.assertEqual(context.exception.code, "AUTH_EMAIL_VERIFICATION_DELIVERY_FAILED")
-        self.assertNotIn("delivery@example.com", service._user_id_by_email)
-        self.assertEqual(len(service._users_by_id), 0)
+        self.assertIsNone(service._find_user_by_email("delivery@example.com"))
+        self.assertEqual(service._store.count("users"), 0)
 
         service._email_verification_sender = LoggingEmailVerificationSender()  # type: ignore[attr-defined]
         retry_result = service.signup_email(
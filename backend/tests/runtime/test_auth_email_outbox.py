@@ -0,0 +1,276 @@
+import os
+import socketserver
+import tempfile
+import threading
+import time
+import unittest
+
+from backend.modules.auth import InMemoryAuthSessionService
+from backend.modules.auth.email_outbox import (
+    EmailOutbox,
+    InMemoryEmailOutboxStorage,
+    SmtpConnection,
+    SqliteEmailOutboxStorage,
+)
+from backend.modules.auth.email_sender import (
+    SmtpEmailVerificationSender,
+    SmtpOutboxEmailSender,
+    build_email_verification_sender_from_env,
+)
+from backend.modules.auth.password_hashing import PasswordHashPolicy, ScryptHasher
+
+
+class _SmtpStandIn(socketserver.ThreadingTCPServer):
+    """Tiny SMTP server: records connections, logins and messages; can inject failures."""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), _SmtpHandler)
+        self.connections = 0
+        self.logins = 0
+        self.messages: list[str] = []
+        self.mail_from_replies: list[bytes] = []
+        self.drop_after_each_message = False
+        self.lock = threading.Lock()
+
+
+class _SmtpHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        server = self.server
+        with server.lock:
+            server.connections += 1
+        self._reply(b"220 stand-in ESMTP")
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            verb = line.strip().split(b" ", 1)[0].upper()
+            if verb in {b"EHLO", b"HELO"}:
+                self._reply(b"250-stand-in\r\n250-AUTH PLAIN\r\n250 8BITMIME")
+            elif verb == b"AUTH":
+                with server.lock:
+                    server.logins += 1
+                self._reply(b"235 2.7.0 Authentication successful")
+            elif verb == b"MAIL":
+                with server.lock:
+                    reply = server.mail_from_replies.pop(0) if server.mail_from_replies else b"250 OK"
+                self._reply(reply)
+            elif verb == b"RCPT":
+                self._reply(b"550 no such user" if b"reject@" in line else b"250 OK")
+            elif verb == b"DATA":
+                self._reply(b"354 go ahead")
+                body = []
+                while True:
+                    data_line = self.rfile.readline()
+                    if data_line in {b".\r\n", b""}:
+                        break
+                    body.append(data_line.decode("utf-8", "replace"))
+                with server.lock:
+                    server.messages.append("".join(body))
+                self._reply(b"250 queued")
+                if server.drop_after_each_message:
+                    return
+            elif verb == b"QUIT":
+                self._reply(b"221 bye")
+                return
+            else:  # NOOP, RSET
+                self._reply(b"250 OK")
+
+    def _reply(self, payload: bytes) -> None:
+        self.wfile.write(payload + b"\r\n")
+
+
+class _Clock:
+    def __init__(self):
+        self.now = time.time()
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class EmailOutboxDeliveryTests(unittest.TestCase):
+    def setUp(self):
+        self.server = _SmtpStandIn()
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        self.smtp = SmtpEmailVerificationSender(
+            host="127.0.0.1",
+            port=self.server.server_address[1],
+            from_email="no-reply@foodlens.test",
+            username="mailer",
+            password="secret",
+            use_starttls=False,
+            timeout_seconds=2.0,
+        )
+        self.clock = _Clock()
+
+    def _outbox(self, storage=None, **kwargs) -> EmailOutbox:
+        outbox = EmailOutbox(
+            storage or InMemoryEmailOutboxStorage(),
+            SmtpConnection(self.smtp.open_connection),
+            clock=self.clock,
+            **kwargs,
+        )
+        self.addCleanup(outbox.connection.close)
+        return outbox
+
+    def _enqueue(self, outbox: EmailOutbox, to_email: str = "user@example.com", expires_in_seconds: int = 600) -> None:
+        message = self.smtp.build_verification_message(email=to_email, code="123456", expires_in_seconds=expires_in_seconds)
+        outbox.enqueue(
+            event_name="verification email",
+            user_id="usr_1",
+            to_email=to_email,
+            message=message,
+            expires_in_seconds=expires_in_seconds,
+        )
+
+    def test_batch_reuses_one_authenticated_connection(self):
+        outbox = self._outbox()
+        outbox.start = lambda: None  # drive delivery synchronously
+        for index in range(5):
+            self._enqueue(outbox, f"user{index}@example.com")
+
+        self.assertEqual(outbox.run_once(), 5)
+        self.assertEqual((self.server.connections, self.server.logins, len(self.server.messages)), (1, 1, 5))
+        snapshot = outbox.snapshot()
+        self.assertEqual((snapshot["sent"], snapshot["pending"], snapshot["connections_opened"]), (5, 0, 1))
+        self.assertIn("123456", self.server.messages[0])
+
+    def test_transient_failure_backs_off_then_delivers(self):
+        outbox = self._outbox(base_backoff_seconds=10)
+        outbox.start = lambda: None
+        self.server.mail_from_replies.append(b"451 try again later")
+        self._enqueue(outbox)
+
+        outbox.run_once()
+        self.assertEqual(outbox.snapshot()["retried"], 1)
+        self.assertEqual(outbox.run_once(), 0)  # still backing off
+
+        self.clock.now += 10
+        outbox.run_once()
+        snapshot = outbox.snapshot()
+        self.assertEqual((snapshot["sent"], snapshot["pending"]), (1, 0))
+        self.assertEqual(len(self.server.messages), 1)
+
+    def test_permanent_rejection_and_expired_codes_are_dropped(self):
+        outbox = self._outbox()
+        outbox.start = lambda: None
+        self._enqueue(outbox, "reject@example.com")
+        self._enqueue(outbox, "late@example.com", expires_in_seconds=60)
+        self.clock.now += 61
+
+        outbox.run_once()
+        snapshot = outbox.snapshot()
+        self.assertEqual((snapshot["failed"], snapshot["expired"], snapshot["pending"]), (1, 1, 0))
+        self.assertEqual(self.server.messages, [])
+
+    def test_reconnects_after_server_drops_connection(self):
+        self.server.drop_after_each_message = True
+        outbox = self._outbox()
+        outbox.start = lambda: None
+        for index in range(3):
+            self._enqueue(outbox, f"user{index}@example.com")
+
+        outbox.run_once()
+        self.clock.now += 60
+        outbox.run_once()
+        self.assertEqual(len(self.server.messages), 3)
+        self.assertEqual(outbox.snapshot()["pending"], 0)
+        self.assertGreaterEqual(self.server.connections, 3)
+
+    def test_sqlite_outbox_survives_restart(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "outbox.sqlite3")
+            first = self._outbox(SqliteEmailOutboxStorage(path))
+            first.start = lambda: None
+            self._enqueue(first)
+            first.storage.close()
+
+            restarted = self._outbox(SqliteEmailOutboxStorage(path))
+            self.assertEqual(restarted.run_once(), 1)
+            self.assertEqual(len(self.server.messages), 1)
+            self.assertEqual(restarted.storage.pending_count(), 0)
+            restarted.storage.close()
+
+    def test_sqlite_outbox_purges_messages_it_gives_up_on(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            storage = SqliteEmailOutboxStorage(os.path.join(tmpdir, "outbox.sqlite3"))
+            self.addCleanup(storage.close)
+            outbox = self._outbox(storage)
+            outbox.start = lambda: None
+            self._enqueue(outbox, "reject@example.com")
+
+            outbox.run_once()
+            self.assertEqual(outbox.snapshot()["failed"], 1)
+            # The body held a plaintext code; no row may outlive delivery.
+            self.assertEqual(storage._conn.execute("SELECT COUNT(*) FROM email_outbox").fetchone()[0], 0)
+
+    def test_signup_returns_before_delivery_and_worker_sends_in_background(self):
+        outbox = self._outbox()
+        sender = SmtpOutboxEmailSender(smtp=self.smtp, outbox=outbox)
+        self.addCleanup(sender.close)
+        service = InMemoryAuthSessionService(
+            email_verification_required=True,
+            email_verification_sender=sender,
+            password_hash_policy=PasswordHashPolicy(ScryptHasher(n=2**10)),
+        )
+
+        result = service.signup_email(
+            email="queued@example.com",
+            password="Passw0rd!",
+            display_name=None,
+            locale="ko-KR",
+            device_id=None,
+        )
+        self.assertTrue(result["verification_required"])
+
+        deadline = time.monotonic() + 5
+        while not self.server.messages and time.monotonic() < deadline:
+            time.sleep(0.02)
+        self.assertEqual(len(self.server.messages), 1)
+        self.assertIn("To: queued@example.com", self.server.messages[0])
+
+    def test_undeliverable_verification_rolls_back_the_signup(self):
+        outbox = self._outbox()
+        outbox.start = lambda: None
+        sender = SmtpOutboxEmailSender(smtp=self.smtp, outbox=outbox)
+        service = InMemoryAuthSessionService(
+            email_verification_required=True,
+            email_verification_sender=sender,
+            password_hash_policy=PasswordHashPolicy(ScryptHasher(n=2**10)),
+        )
+        signup = dict(
+            email="reject@example.com",
+            password="Passw0rd!",
+            display_name=None,
+            locale="ko-KR",
+            device_id=None,
+        )
+        service.signup_email(**signup)
+
+        outbox.run_once()
+        self.assertEqual(outbox.snapshot()["failed"], 1)
+        # The code never arrived, so the email is free for a fresh signup.
+        self.assertTrue(service.signup_email(**signup)["verification_required"])
+
+
+class OutboxSenderFromEnvTests(unittest.TestCase):
+    def test_smtp_mode_uses_outbox_only_when_enabled(self):
+        env = {
+            "AUTH_EMAIL_VERIFICATION_DELIVERY_MODE": "smtp",
+            "AUTH_EMAIL_SMTP_HOST": "smtp.example.com",
+            "AUTH_EMAIL_SENDER_FROM": "no-reply@example.com",
+        }
+        sender, mode = build_email_verification_sender_from_env(get_env=env.get)
+        self.assertEqual(mode, "smtp")
+        self.assertIsInstance(sender, SmtpEmailVerificationSender)
+
+        sender, _ = build_email_verification_sender_from_env(get_env={**env, "AUTH_EMAIL_OUTBOX_ENABLED": "1"}.get)
+        self.assertIsInstance(sender, SmtpOutboxEmailSender)
+
+
+if __name__ == "__main__":
+    unittest.main()
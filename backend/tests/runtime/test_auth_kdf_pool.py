@@ -0,0 +1,147 @@
+import os
+import threading
+import time
+import unittest
+from unittest.mock import patch
+
+from fastapi.testclient import TestClient
+
+from backend.modules.auth import AuthServiceError, InMemoryAuthSessionService, KdfWorkerPool, PerKeyConcurrencyLimiter
+from backend.modules.auth.password_kdf import KdfPoolSaturatedError
+from backend.modules.client_ip import TrustedProxies
+
+
+os.environ["OPENAPI_EXPORT_ONLY"] = "1"
+from backend.server import app  # noqa: E402
+
+
+class KdfWorkerPoolTests(unittest.TestCase):
+    def test_rejects_beyond_max_pending_and_reports_queue_depth(self):
+        pool = KdfWorkerPool(max_workers=1, max_pending=2)
+        release = threading.Event()
+        threads = [threading.Thread(target=pool.run, args=(release.wait,), daemon=True) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        self.addCleanup(release.set)
+        deadline = time.monotonic() + 5
+        # Both calls are admitted before the worker picks one up; wait for that too.
+        while (pool.snapshot()["running"], pool.snapshot()["queued"]) != (1, 1) and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        snapshot = pool.snapshot()
+        self.assertEqual((snapshot["running"], snapshot["queued"]), (1, 1))
+        with self.assertRaises(KdfPoolSaturatedError):
+            pool.run(len, "x")
+
+        release.set()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(pool.run(len, "abc"), 3)
+        snapshot = pool.snapshot()
+        self.assertEqual((snapshot["completed"], snapshot["rejected"], snapshot["queued"]), (3, 1, 0))
+        pool.shutdown()
+
+    def test_per_key_limiter(self):
+        limiter = PerKeyConcurrencyLimiter(1)
+        self.assertTrue(limiter.try_acquire("1.2.3.4"))
+        self.assertFalse(limiter.try_acquire("1.2.3.4"))
+        self.assertTrue(limiter.try_acquire("5.6.7.8"))
+        limiter.release("1.2.3.4")
+        self.assertEqual(limiter.in_flight("1.2.3.4"), 0)
+
+
+class AuthServiceKdfTests(unittest.TestCase):
+    def setUp(self):
+        self.service = InMemoryAuthSessionService(email_verification_required=False, password_iterations=120_000)
+        self.bundle = self.service.signup_email(
+            email="kdf@example.com",
+            password="Passw0rd!",
+            display_name=None,
+            locale="ko-KR",
+            device_id=None,
+        )
+
+    def test_login_hashes_outside_service_lock(self):
+        hashing = threading.Event()
+        release = threading.Event()
+        policy = self.service.password_hash_policy
+        original = policy.verify
+
+        def _slow_verify(*args):
+            hashing.set()
+            release.wait(5)
+            return original(*args)
+
+        policy.verify = _slow_verify
+        results = []
+        login = threading.Thread(
+            target=lambda: results.append(
+                self.service.login_email(email="kdf@example.com", password="Passw0rd!", device_id=None)
+            )
+        )
+        login.start()
+        self.assertTrue(hashing.wait(5))
+
+        # The lock is free while the KDF runs: other auth calls are not stalled.
+        user_id = self.bundle["user"]["id"]
+        self.assertEqual(self.service.get_profile(user_id=user_id)["user_id"], user_id)
+        release.set()
+        login.join()
+        self.assertIn("access_token", results[0])
+
+    def test_saturated_pool_returns_busy_and_keeps_reset_code(self):
+        self.service.password_reset_debug_code_enabled = True
+        code = self.service.request_password_reset(email="kdf@example.com")["reset_debug_code"]
+
+        def _saturated(fn, *args):
+            raise KdfPoolSaturatedError("full")
+
+        run = self.service.kdf_pool.run
+        self.service.kdf_pool.run = _saturated
+        with self.assertRaises(AuthServiceError) as busy:
+            self.service.confirm_password_reset(email="kdf@example.com", code=code, new_password="N3wPassw0rd!")
+        self.assertEqual((busy.exception.code, busy.exception.status_code), ("AUTH_BUSY", 503))
+
+        self.service.kdf_pool.run = run
+        result = self.service.confirm_password_reset(email="kdf@example.com", code=code, new_password="N3wPassw0rd!")
+        self.assertTrue(result["password_reset"])
+
+
+class LoginConcurrencyEndpointTests(unittest.TestCase):
+    def test_login_over_per_ip_cap_is_rejected(self):
+        with TestClient(app) as client:
+            limiter = PerKeyConcurrencyLimiter(1)
+            app.state.login_concurrency_limiter = limiter
+            self.assertTrue(limiter.try_acquire("testclient"))
+            response = client.post(
+                "/auth/email/login",
+                json={"email": "nobody@example.com", "password": "Passw0rd!"},
+            )
+            self.assertEqual(response.status_code, 429)
+            self.assertEqual(response.json()["detail"]["code"], "AUTH_LOGIN_CONCURRENCY_LIMITED")
+
+            limiter.release("testclient")
+            response = client.post(
+                "/auth/email/login",
+                json={"email": "nobody@example.com", "password": "Passw0rd!"},
+            )
+            self.assertEqual(response.status_code, 401)
+            self.assertEqual(limiter.in_flight("testclient"), 0)
+
+    def test_login_cap_is_per_forwarded_client_behind_a_trusted_proxy(self):
+        with (
+            patch("backend.server.TRUSTED_PROXIES", TrustedProxies("testclient")),
+            TestClient(app) as client,
+        ):
+            limiter = PerKeyConcurrencyLimiter(1)
+            app.state.login_concurrency_limiter = limiter
+            self.assertTrue(limiter.try_acquire("198.51.100.1"))
+            body = {"email": "nobody@example.com", "password": "Passw0rd!"}
+            busy = client.post("/auth/email/login", json=body, headers={"X-Forwarded-For": "198.51.100.1"})
+            other = client.post("/auth/email/login", json=body, headers={"X-Forwarded-For": "198.51.100.2"})
+        self.assertEqual((busy.status_code, other.status_code), (429, 401))
+        self.assertEqual(limiter.in_flight("testclient"), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
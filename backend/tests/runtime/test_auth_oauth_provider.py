@@ -0,0 +1,182 @@
+import asyncio
+import base64
+import json
+import os
+import time
+import unittest
+from unittest.mock import AsyncMock, patch
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.asymmetric import padding, rsa
+from fastapi.testclient import TestClient
+
+from backend.modules.auth import AuthServiceError
+from backend.modules.auth.oauth_client import (
+    GOOGLE_JWKS_URL,
+    GoogleIdTokenVerifier,
+    OAuthProviderClient,
+    ProviderResponse,
+)
+
+os.environ["OPENAPI_EXPORT_ONLY"] = "1"
+from backend.server import app  # noqa: E402
+
+CLIENT_ID = "google-client-id-test"
+SIGNING_KEY = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+
+
+def _b64(raw: bytes) -> str:
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def _jwks(kid: str = "key-1") -> dict:
+    numbers = SIGNING_KEY.public_key().public_numbers()
+    return {
+        "keys": [
+            {
+                "kty": "RSA",
+                "kid": kid,
+                "alg": "RS256",
+                "n": _b64(numbers.n.to_bytes((numbers.n.bit_length() + 7) // 8, "big")),
+                "e": _b64(numbers.e.to_bytes(3, "big")),
+            }
+        ]
+    }
+
+
+def _id_token(kid: str = "key-1", **overrides) -> str:
+    claims = {
+        "iss": "https://accounts.google.com",
+        "aud": CLIENT_ID,
+        "sub": "google-sub-1",
+        "email": "idtoken@example.com",
+        "email_verified": True,
+        "exp": int(time.time()) + 600,
+    }
+    claims.update(overrides)
+    header = _b64(json.dumps({"alg": "RS256", "kid": kid}).encode())
+    body = _b64(json.dumps(claims).encode())
+    signature = SIGNING_KEY.sign(f"{header}.{body}".encode(), padding.PKCS1v15(), hashes.SHA256())
+    return f"{header}.{body}.{_b64(signature)}"
+
+
+def _jwks_response(kid: str = "key-1", max_age: int = 3600) -> ProviderResponse:
+    return ProviderResponse(200, _jwks(kid), {"Cache-Control": f"public, max-age={max_age}"})
+
+
+class GoogleIdTokenVerifierTests(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.client = OAuthProviderClient()
+        self.client.get_json = AsyncMock(return_value=_jwks_response())
+        self.verifier = GoogleIdTokenVerifier(self.client)
+        self.deadline = time.monotonic() + 5
+
+    async def test_verifies_locally_and_caches_jwks(self):
+        for _ in range(3):
+            claims = await self.verifier.verify(_id_token(), audience=CLIENT_ID, deadline=self.deadline)
+        self.assertEqual(claims["sub"], "google-sub-1")
+        self.client.get_json.assert_awaited_once()
+        self.assertEqual(self.client.get_json.await_args.args[0], GOOGLE_JWKS_URL)
+
+    async def test_rejects_bad_audience_expiry_and_signature(self):
+        header, body, _ = _id_token().split(".")
+        forged = f"{header}.{body}.{_b64(b'x' * 256)}"
+        for token in (_id_token(aud="someone-else"), _id_token(exp=int(time.time()) - 3600), forged):
+            with self.assertRaises(AuthServiceError) as context:
+                await self.verifier.verify(token, audience=CLIENT_ID, deadline=self.deadline)
+            self.assertEqual(context.exception.code, "AUTH_PROVIDER_REJECTED")
+
+    async def test_unknown_kid_refreshes_once_per_interval(self):
+        await self.verifier.verify(_id_token(), audience=CLIENT_ID, deadline=self.deadline)
+
+        # Rotated key: the miss forces a refetch that finds it.
+        self.verifier.jwks._fetched_at -= self.verifier.jwks.min_refresh_interval_seconds
+        self.client.get_json.return_value = _jwks_response("key-2")
+        claims = await self.verifier.verify(_id_token("key-2"), audience=CLIENT_ID, deadline=self.deadline)
+        self.assertEqual(claims["sub"], "google-sub-1")
+        self.assertEqual(self.client.get_json.await_count, 2)
+
+        # Unknown kids right after a fetch are rejected without another request.
+        for _ in range(3):
+            with self.assertRaises(AuthServiceError):
+                await self.verifier.verify(_id_token("forged"), audience=CLIENT_ID, deadline=self.deadline)
+        self.assertEqual(self.client.get_json.await_count, 2)
+
+
+class OAuthProviderClientTests(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.peers: set = set()
+
+        async def token(request: web.Request) -> web.Response:
+            self.peers.add(request.transport.get_extra_info("peername"))
+            form = await request.post()
+            return web.json_response({"access_token": f"tok-{form['code']}"})
+
+        async def slow(_request: web.Request) -> web.Response:
+            await asyncio.sleep(1)
+            return web.json_response({})
+
+        server_app = web.Application()
+        server_app.router.add_post("/token", token)
+        server_app.router.add_get("/slow", slow)
+        self.server = TestServer(server_app)
+        await self.server.start_server()
+        self.client = OAuthProviderClient()
+
+    async def asyncTearDown(self):
+        await self.client.close()
+        await self.server.close()
+
+    async def test_reuses_pooled_connection(self):
+        for code in ("a", "b", "c"):
+            response = await self.client.post_form(
+                str(self.server.make_url("/token")),
+                data={"code": code},
+                deadline=time.monotonic() + 2,
+            )
+            self.assertEqual(response.payload["access_token"], f"tok-{code}")
+        self.assertEqual(len(self.peers), 1)
+
+    async def test_deadline_maps_to_provider_timeout(self):
+        with self.assertRaises(AuthServiceError) as context:
+            await self.client.get_json(str(self.server.make_url("/slow")), deadline=time.monotonic() + 0.1)
+        self.assertEqual((context.exception.code, context.exception.status_code), ("AUTH_PROVIDER_TIMEOUT", 504))
+
+        with self.assertRaises(AuthServiceError) as context:
+            await self.client.get_json(str(self.server.make_url("/slow")), deadline=time.monotonic() - 1)
+        self.assertEqual(context.exception.code, "AUTH_PROVIDER_TIMEOUT")
+
+
+class GoogleIdTokenEndpointTests(unittest.TestCase):
+    def test_google_login_uses_id_token_instead_of_userinfo(self):
+        token_response = ProviderResponse(200, {"access_token": "google-access", "id_token": _id_token()}, {})
+        with (
+            patch.dict(
+                os.environ,
+                {
+                    "AUTH_GOOGLE_CODE_VERIFY_ENABLED": "1",
+                    "AUTH_GOOGLE_CLIENT_ID": CLIENT_ID,
+                    "AUTH_APP_ALLOWED_REDIRECT_URIS": "foodlens://oauth/google-callback",
+                },
+                clear=False,
+            ),
+            patch.object(OAuthProviderClient, "post_form", AsyncMock(return_value=token_response)),
+            patch.object(OAuthProviderClient, "get_json", AsyncMock(return_value=_jwks_response())) as mocked_get,
+            TestClient(app) as client,
+        ):
+            for state in ("state-1", "state-2"):
+                response = client.post(
+                    "/auth/google",
+                    json={"code": "google-code", "state": state, "redirect_uri": "foodlens://oauth/google-callback"},
+                )
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(response.json()["user"]["email"], "idtoken@example.com")
+
+            # Only the JWKS fetch, once; no userinfo call per login.
+            self.assertEqual([call.args[0] for call in mocked_get.await_args_list], [GOOGLE_JWKS_URL])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+import base64
+import hashlib
+import unittest
+
+from backend.modules.auth import InMemoryAuthSessionService
+from backend.modules.auth.password_hashing import (
+    PasswordHashPolicy,
+    Pbkdf2Hasher,
+    ScryptHasher,
+    calibrate,
+    is_argon2_available,
+)
+
+
+FAST_SCRYPT = ScryptHasher(n=2**10)
+
+
+class PasswordHashPolicyTests(unittest.TestCase):
+    def test_scrypt_round_trip_and_parameter_change_requests_rehash(self):
+        policy = PasswordHashPolicy(FAST_SCRYPT)
+        encoded = policy.hash("Passw0rd!")
+
+        self.assertTrue(encoded.startswith("scrypt$n=1024,r=8,p=1$"))
+        self.assertEqual(policy.verify("Passw0rd!", encoded), (True, False))
+        self.assertEqual(policy.verify("wrong", encoded), (False, False))
+
+        stronger = PasswordHashPolicy(ScryptHasher(n=2**11))
+        self.assertEqual(stronger.verify("Passw0rd!", encoded), (True, True))
+
+    def test_pbkdf2_hash_verifies_under_scrypt_policy_and_needs_rehash(self):
+        encoded = Pbkdf2Hasher(iterations=120_000).hash("Passw0rd!")
+        self.assertEqual(PasswordHashPolicy(FAST_SCRYPT).verify("Passw0rd!", encoded), (True, True))
+
+    def test_unknown_or_malformed_hash_is_rejected(self):
+        policy = PasswordHashPolicy(FAST_SCRYPT)
+        self.assertEqual(policy.verify("x", "bcrypt$12$abc$def"), (False, False))
+        self.assertEqual(policy.verify("x", "scrypt$n=oops$abc$def"), (False, False))
+        self.assertEqual(policy.verify("x", "legacy-digest", None), (False, False))
+
+    def test_argon2_scheme_falls_back_to_scrypt_when_not_installed(self):
+        env = {"AUTH_PASSWORD_SCHEME": "argon2", "AUTH_SCRYPT_N": "2048"}
+        policy = PasswordHashPolicy.from_env(lambda name, default=None: env.get(name, default))
+        if is_argon2_available():
+            self.assertEqual(policy.current.scheme, "argon2id")
+        else:
+            self.assertEqual(policy.current.describe(), {"scheme": "scrypt", "n": 2048, "r": 8, "p": 1})
+
+    def test_calibrate_reaches_target_or_floor(self):
+        hasher, measured_ms = calibrate("pbkdf2", target_ms=1.0, samples=1)
+        self.assertEqual(hasher.iterations, 120_000)
+        self.assertGreater(measured_ms, 0)
+
+
+class LoginRehashTests(unittest.TestCase):
+    def test_legacy_pbkdf2_record_is_upgraded_on_login(self):
+        service = InMemoryAuthSessionService(
+            email_verification_required=False,
+            password_iterations=120_000,
+            password_hash_policy=PasswordHashPolicy(FAST_SCRYPT, legacy_pbkdf2_iterations=120_000),
+        )
+        bundle = service.signup_email(
+            email="legacy@example.com",
+            password="Passw0rd!",
+            display_name=None,
+            locale="ko-KR",
+            device_id=None,
+        )
+        user = service._store.get("users", bundle["user"]["id"])
+        # Record as written before hashes were versioned: bare PBKDF2 digest + salt column.
+        user.password_salt = "c2FsdHNhbHRzYWx0"
+        digest = hashlib.pbkdf2_hmac("sha256", b"Passw0rd!", user.password_salt.encode("utf-8"), 120_000)
+        user.password_hash = base64.urlsafe_b64encode(digest).decode("ascii").rstrip("=")
+
+        service.login_email(email="legacy@example.com", password="Passw0rd!", device_id=None)
+
+        self.assertIsNone(user.password_salt)
+        self.assertTrue(user.password_hash.startswith("scrypt$n=1024,"))
+        upgraded = user.password_hash
+        service.login_email(email="legacy@example.com", password="Passw0rd!", device_id=None)
+        self.assertEqual(user.password_hash, upgraded)
+
+
+if __name__ == "__main__":
+    unittest.main()
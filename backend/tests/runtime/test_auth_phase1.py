@@ -4,7 +4,7 @@ import threading
 import types
 import unittest
 from urllib.parse import parse_qs, urlparse
-from unittest.mock import Mock, patch
+from unittest.mock import AsyncMock, patch
 
 from fastapi.testclient import TestClient
 
@@ -17,6 +17,7 @@ os.environ["AUTH_PASSWORD_RESET_DEBUG_CODE_ENABLED"] = "1"
 sys.modules.setdefault("sentry_sdk", types.SimpleNamespace(init=lambda **_kwargs: None))
 from backend.server import app  # noqa: E402
 from backend.modules.auth import AuthServiceError  # noqa: E402
+from backend.modules.auth.oauth_client import OAuthProviderClient, ProviderResponse  # noqa: E402
 
 
 def _auth_headers(access_token: str) -> dict[str, str]:
@@ -351,19 +352,23 @@ class AuthPhase1RuntimeTests(unittest.TestCase):
             self.assertEqual(redirect_mismatch.json()["detail"]["code"], "AUTH_REDIRECT_URI_MISMATCH")
 
     def test_kakao_oauth_live_verification_uses_client_secret(self):
-        mocked_token_response = Mock()
-        mocked_token_response.status_code = 200
-        mocked_token_response.json.return_value = {
-            "access_token": "kakao-access-token",
-            "token_type": "bearer",
-        }
-
-        mocked_profile_response = Mock()
-        mocked_profile_response.status_code = 200
-        mocked_profile_response.json.return_value = {
-            "id": "kakao-user-123",
-            "kakao_account": {"email": "verified-kakao@example.com"},
-        }
+        mocked_token_response = ProviderResponse(
+            status_code=200,
+            payload={
+                "access_token": "kakao-access-token",
+                "token_type": "bearer",
+            },
+            headers={},
+        )
+
+        mocked_profile_response = ProviderResponse(
+            status_code=200,
+            payload={
+                "id": "kakao-user-123",
+                "kakao_account": {"email": "verified-kakao@example.com"},
+            },
+            headers={},
+        )
 
         with (
             patch.dict(
@@ -376,8 +381,8 @@ class AuthPhase1RuntimeTests(unittest.TestCase):
                 },
                 clear=False,
             ),
-            patch("backend.server.requests.post", return_value=mocked_token_response) as mocked_post,
-            patch("backend.server.requests.get", return_value=mocked_profile_response) as mocked_get,
+            patch.object(OAuthProviderClient, "post_form", AsyncMock(return_value=mocked_token_response)) as mocked_post,
+            patch.object(OAuthProviderClient, "get_json", AsyncMock(return_value=mocked_profile_response)) as mocked_get,
             TestClient(app) as client,
         ):
             kakao_success = client.post(
@@ -408,9 +413,11 @@ class AuthPhase1RuntimeTests(unittest.TestCase):
             self.assertEqual(profile_call_kwargs["headers"]["Authorization"], "Bearer kakao-access-token")
 
     def test_kakao_oauth_live_verification_invalid_grant_maps_error(self):
-        mocked_token_response = Mock()
-        mocked_token_response.status_code = 400
-        mocked_token_response.json.return_value = {"error": "invalid_grant"}
+        mocked_token_response = ProviderResponse(
+            status_code=400,
+            payload={"error": "invalid_grant"},
+            headers={},
+        )
 
         with (
             patch.dict(
@@ -422,8 +429,8 @@ class AuthPhase1RuntimeTests(unittest.TestCase):
                 },
                 clear=False,
             ),
-            patch("backend.server.requests.post", return_value=mocked_token_response),
-            patch("backend.server.requests.get") as mocked_get,
+            patch.object(OAuthProviderClient, "post_form", AsyncMock(return_value=mocked_token_response)),
+            patch.object(OAuthProviderClient, "get_json", AsyncMock()) as mocked_get,
             TestClient(app) as client,
         ):
             kakao_invalid = client.post(
@@ -440,20 +447,24 @@ class AuthPhase1RuntimeTests(unittest.TestCase):
             mocked_get.assert_not_called()
 
     def test_google_oauth_live_verification_uses_client_secret(self):
-        mocked_token_response = Mock()
-        mocked_token_response.status_code = 200
-        mocked_token_response.json.return_value = {
-            "access_token": "google-access-token",
-            "token_type": "Bearer",
-        }
-
-        mocked_profile_response = Mock()
-        mocked_profile_response.status_code = 200
-        mocked_profile_response.json.return_value = {
-            "sub": "google-user-123",
-            "email": "verified-google@example.com",
-            "email_verified": True,
-        }
+        mocked_token_response = ProviderResponse(
+            status_code=200,
+            payload={
+                "access_token": "google-access-token",
+                "token_type": "Bearer",
+            },
+            headers={},
+        )
+
+        mocked_profile_response = ProviderResponse(
+            status_code=200,
+            payload={
+                "sub": "google-user-123",
+                "email": "verified-google@example.com",
+                "email_verified": True,
+            },
+            headers={},
+        )
 
         with (
             patch.dict(
@@ -466,8 +477,8 @@ class AuthPhase1RuntimeTests(unittest.TestCase):
                 },
                 clear=False,
             ),
-            patch("backend.server.requests.post", return_value=mocked_token_response) as mocked_post,
-            patch("backend.server.requests.get", return_value=mocked_profile_response) as mocked_get,
+            patch.object(OAuthProviderClient, "post_form", AsyncMock(return_value=mocked_token_response)) as mocked_post,
+            patch.object(OAuthProviderClient, "get_json", AsyncMock(return_value=mocked_profile_response)) as mocked_get,
             TestClient(app) as client,
         ):
             google_success = client.post(
@@ -498,9 +509,11 @@ class AuthPhase1RuntimeTests(unittest.TestCase):
             self.assertEqual(profile_call_kwargs["headers"]["Authorization"], "Bearer google-access-token")
 
     def test_google_oauth_live_verification_invalid_grant_maps_error(self):
-        mocked_token_response = Mock()
-        mocked_token_response.status_code = 400
-        mocked_token_response.json.return_value = {"error": "invalid_grant"}
+        mocked_token_response = ProviderResponse(
+            status_code=400,
+            payload={"error": "invalid_grant"},
+            headers={},
+        )
 
         with (
             patch.dict(
@@ -512,8 +525,8 @@ class AuthPhase1RuntimeTests(unittest.TestCase):
                 },
                 clear=False,
             ),
-            patch("backend.server.requests.post", return_value=mocked_token_response),
-            patch("backend.server.requests.get") as mocked_get,
+            patch.object(OAuthProviderClient, "post_form", AsyncMock(return_value=mocked_token_response)),
+            patch.object(OAuthProviderClient, "get_json", AsyncMock()) as mocked_get,
             TestClient(app) as client,
         ):
             google_invalid = client.post(
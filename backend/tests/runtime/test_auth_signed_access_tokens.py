@@ -0,0 +1,160 @@
+import base64
+import unittest
+from datetime import datetime, timedelta, timezone
+
+from backend.modules.auth import AuthServiceError, InMemoryAuthSessionService, SignedAccessTokenCodec
+from backend.modules.auth.access_tokens import AccessTokenError, AccessTokenExpiredError
+from backend.modules.auth.password_hashing import PasswordHashPolicy, ScryptHasher
+from backend.modules.auth.storage import InMemoryAuthStateStore
+
+KEY_A = b"a" * 32
+KEY_B = b"b" * 32
+
+
+class _CountingStore(InMemoryAuthStateStore):
+    def __init__(self):
+        super().__init__()
+        self.reads = 0
+
+    def get(self, namespace, key):
+        self.reads += 1
+        return super().get(namespace, key)
+
+    def find(self, namespace, field, value):
+        self.reads += 1
+        return super().find(namespace, field, value)
+
+
+def _service(store=None, **kwargs) -> InMemoryAuthSessionService:
+    return InMemoryAuthSessionService(
+        email_verification_required=False,
+        password_hash_policy=PasswordHashPolicy(ScryptHasher(n=2**10)),
+        state_store=store,
+        access_token_codec=SignedAccessTokenCodec({"k1": KEY_A}),
+        **kwargs,
+    )
+
+
+def _signup(service: InMemoryAuthSessionService) -> dict:
+    return service.signup_email(
+        email="signed@example.com",
+        password="Passw0rd!",
+        display_name=None,
+        locale="ko-KR",
+        device_id=None,
+    )
+
+
+class SignedAccessTokenCodecTests(unittest.TestCase):
+    def setUp(self):
+        self.now = datetime.now(timezone.utc)
+        self.codec = SignedAccessTokenCodec({"k1": KEY_A})
+
+    def _issue(self, codec, ttl=900):
+        return codec.issue(
+            user_id="usr_1",
+            session_id="sess_1",
+            issued_at=self.now,
+            expires_at=self.now + timedelta(seconds=ttl),
+        )[0]
+
+    def test_round_trip_and_tamper(self):
+        token = self._issue(self.codec)
+        claims = self.codec.decode(token, now=self.now)
+        self.assertEqual((claims.user_id, claims.session_id), ("usr_1", "sess_1"))
+
+        header, body, signature = token.split(".")
+        with self.assertRaises(AccessTokenError):
+            self.codec.decode(f"{header}.{body}.{signature[:-2]}AA", now=self.now)
+        with self.assertRaises(AccessTokenError):
+            self.codec.decode("not-a-token", now=self.now)
+
+    def test_expired_token_keeps_claims(self):
+        token = self._issue(self.codec, ttl=60)
+        with self.assertRaises(AccessTokenExpiredError) as context:
+            self.codec.decode(token, now=self.now + timedelta(seconds=61))
+        self.assertEqual(context.exception.claims.user_id, "usr_1")
+
+    def test_key_rotation(self):
+        old_token = self._issue(self.codec)
+        rotated = SignedAccessTokenCodec({"k2": KEY_B, "k1": KEY_A})
+        self.assertEqual(rotated.decode(old_token, now=self.now).session_id, "sess_1")
+        self.assertIn('"kid":"k2"', _header_json(self._issue(rotated)))
+        with self.assertRaises(AccessTokenError):
+            SignedAccessTokenCodec({"k2": KEY_B}).decode(old_token, now=self.now)
+
+    def test_from_env_requires_strong_keys(self):
+        key = SignedAccessTokenCodec.generate_key()
+        codec = SignedAccessTokenCodec.from_env({"AUTH_ACCESS_TOKEN_SIGNING_KEYS": f"k9:{key}"}.get)
+        self.assertEqual(codec.active_kid, "k9")
+        with self.assertRaises(ValueError):
+            SignedAccessTokenCodec.from_env({}.get)
+        with self.assertRaises(ValueError):
+            SignedAccessTokenCodec({"short": b"x" * 8})
+
+
+def _header_json(token: str) -> str:
+    header = token.split(".")[0]
+    return base64.urlsafe_b64decode(header + "=" * (-len(header) % 4)).decode()
+
+
+class SignedAccessTokenServiceTests(unittest.TestCase):
+    def test_verification_does_not_read_the_store(self):
+        store = _CountingStore()
+        service = _service(store)
+        bundle = _signup(service)
+        self.assertEqual(store.count("access_tokens"), 0)
+
+        service.verify_access_token(access_token=bundle["access_token"])
+        reads = store.reads
+        for _ in range(20):
+            claims = service.verify_access_token(access_token=bundle["access_token"])
+        self.assertEqual(store.reads, reads)
+        self.assertEqual(claims.user_id, bundle["user"]["id"])
+        self.assertEqual(service.authenticate_access_token(access_token=bundle["access_token"]).email, "signed@example.com")
+
+    def test_logout_revokes_signed_token_immediately(self):
+        service = _service()
+        bundle = _signup(service)
+        self.assertEqual(service.logout(access_token=bundle["access_token"], refresh_token=None), 1)
+        with self.assertRaises(AuthServiceError) as context:
+            service.verify_access_token(access_token=bundle["access_token"])
+        self.assertEqual(context.exception.code, "AUTH_SESSION_REVOKED")
+
+    def test_revocation_reaches_other_workers_after_sync(self):
+        store = InMemoryAuthStateStore()
+        first = _service(store, revocation_sync_interval_seconds=3600)
+        second = _service(store, revocation_sync_interval_seconds=3600)
+        bundle = _signup(first)
+        second.verify_access_token(access_token=bundle["access_token"])
+
+        # Reuse on the first worker revokes the family there.
+        first.refresh(refresh_token=bundle["refresh_token"])
+        with self.assertRaises(AuthServiceError):
+            first.refresh(refresh_token=bundle["refresh_token"])
+
+        # The second worker still trusts the token until its next sync.
+        second.verify_access_token(access_token=bundle["access_token"])
+        second.revocation_sync_interval_seconds = 0
+        with self.assertRaises(AuthServiceError) as context:
+            second.verify_access_token(access_token=bundle["access_token"])
+        self.assertEqual(context.exception.code, "AUTH_SESSION_REVOKED")
+
+    def test_opaque_tokens_still_verify_after_switching(self):
+        store = InMemoryAuthStateStore()
+        opaque = InMemoryAuthSessionService(
+            email_verification_required=False,
+            password_hash_policy=PasswordHashPolicy(ScryptHasher(n=2**10)),
+            state_store=store,
+        )
+        bundle = _signup(opaque)
+        signed = _service(store)
+        self.assertEqual(signed.verify_access_token(access_token=bundle["access_token"]).user_id, bundle["user"]["id"])
+
+    def test_from_env_rejects_unknown_format(self):
+        with self.assertRaises(ValueError):
+            InMemoryAuthSessionService.from_env({"AUTH_ACCESS_TOKEN_FORMAT": "paseto"}.get)
+
+
+if __name__ == "__main__":
+    unittest.main()
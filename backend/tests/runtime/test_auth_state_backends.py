@@ -0,0 +1,334 @@
+import fnmatch
+import os
+import socketserver
+import tempfile
+import threading
+import time
+import unittest
+from datetime import datetime, timedelta, timezone
+
+from backend.modules.auth import AuthServiceError, InMemoryAuthSessionService
+from backend.modules.auth.password_hashing import PasswordHashPolicy, ScryptHasher
+from backend.modules.auth.storage import (
+    CachedAuthStateStore,
+    InMemoryAuthStateStore,
+    RedisAuthStateStore,
+    RespClient,
+    SqliteAuthStateStore,
+    build_auth_state_store_from_env,
+)
+
+
+class _RespStandIn(socketserver.ThreadingTCPServer):
+    """Just enough of the Redis protocol for RedisAuthStateStore, backed by dicts."""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), _RespHandler)
+        self.data: dict[bytes, object] = {}
+        self.expires: dict[bytes, float] = {}
+        self.lock = threading.Lock()
+
+    def live(self, key: bytes):
+        deadline = self.expires.get(key)
+        if deadline is not None and deadline <= time.monotonic():
+            self.data.pop(key, None)
+            self.expires.pop(key, None)
+        return self.data.get(key)
+
+
+class _RespHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            args = []
+            for _ in range(int(line[1:-2])):
+                length = int(self.rfile.readline()[1:-2])
+                args.append(self.rfile.read(length + 2)[:-2])
+            with self.server.lock:
+                reply = self._dispatch(args[0].upper().decode(), args[1:])
+            self.wfile.write(self._encode(reply))
+
+    def _dispatch(self, command, args):
+        server = self.server
+        if command == "PING":
+            return "PONG"
+        if command == "GET":
+            return server.live(args[0])
+        if command == "MGET":
+            return [server.live(key) for key in args]
+        if command == "SET":
+            key, value, options = args[0], args[1], [option.upper() for option in args[2:]]
+            if b"NX" in options and server.live(key) is not None:
+                return None
+            server.data[key] = value
+            server.expires.pop(key, None)
+            if b"PX" in options:
+                server.expires[key] = time.monotonic() + int(options[options.index(b"PX") + 1]) / 1000
+            return "OK"
+        if command == "DEL":
+            removed = sum(1 for key in args if server.live(key) is not None)
+            for key in args:
+                server.data.pop(key, None)
+                server.expires.pop(key, None)
+            return removed
+        if command == "SADD":
+            members = server.live(args[0]) or set()
+            server.data[args[0]] = members | set(args[1:])
+            return len(args) - 1
+        if command == "SREM":
+            members = server.live(args[0]) or set()
+            server.data[args[0]] = members - set(args[1:])
+            return len(args) - 1
+        if command == "SMEMBERS":
+            return sorted(server.live(args[0]) or set())
+        if command == "PEXPIRE":
+            if server.live(args[0]) is None:
+                return 0
+            server.expires[args[0]] = time.monotonic() + int(args[1]) / 1000
+            return 1
+        if command == "PERSIST":
+            return 1 if server.live(args[0]) is not None and server.expires.pop(args[0], None) else 0
+        if command == "PTTL":
+            if server.live(args[0]) is None:
+                return -2
+            deadline = server.expires.get(args[0])
+            return -1 if deadline is None else int((deadline - time.monotonic()) * 1000)
+        if command == "INCR":
+            value = int(server.live(args[0]) or 0) + 1
+            server.data[args[0]] = str(value).encode()
+            return value
+        if command == "SCAN":
+            pattern = args[args.index(b"MATCH") + 1].decode()
+            keys = [key for key in list(server.data) if server.live(key) is not None]
+            return [b"0", [key for key in keys if fnmatch.fnmatchcase(key.decode(), pattern)]]
+        return RuntimeError(f"unknown command {command}")
+
+    def _encode(self, reply) -> bytes:
+        if reply is None:
+            return b"$-1\r\n"
+        if isinstance(reply, RuntimeError):
+            return f"-ERR {reply}\r\n".encode()
+        if isinstance(reply, str):
+            return f"+{reply}\r\n".encode()
+        if isinstance(reply, int):
+            return f":{reply}\r\n".encode()
+        if isinstance(reply, bytes):
+            return b"$%d\r\n%s\r\n" % (len(reply), reply)
+        return b"*%d\r\n" % len(reply) + b"".join(self._encode(item) for item in reply)
+
+
+def _service(store, **overrides) -> InMemoryAuthSessionService:
+    return InMemoryAuthSessionService(
+        email_verification_required=False,
+        password_hash_policy=PasswordHashPolicy(ScryptHasher(n=2**10)),
+        state_store=store,
+        **overrides,
+    )
+
+
+def _signup(service: InMemoryAuthSessionService) -> dict:
+    return service.signup_email(
+        email="state@example.com",
+        password="Passw0rd!",
+        display_name=None,
+        locale="ko-KR",
+        device_id=None,
+    )
+
+
+class _BackendContract:
+    def make_store(self):
+        raise NotImplementedError
+
+    def test_full_session_lifecycle(self):
+        service = _service(self.make_store())
+        bundle = _signup(service)
+        self.assertEqual(service.authenticate_access_token(access_token=bundle["access_token"]).email, "state@example.com")
+
+        rotated = service.refresh(refresh_token=bundle["refresh_token"])
+        with self.assertRaises(AuthServiceError) as context:
+            service.refresh(refresh_token=bundle["refresh_token"])
+        self.assertEqual(context.exception.code, "AUTH_REFRESH_REUSED")
+        with self.assertRaises(AuthServiceError) as context:
+            service.authenticate_access_token(access_token=rotated["access_token"])
+        self.assertEqual(context.exception.code, "AUTH_TOKEN_INVALID")
+
+        login = service.login_email(email="state@example.com", password="Passw0rd!", device_id=None)
+        self.assertEqual(service.logout(access_token=login["access_token"], refresh_token=None), 1)
+        with self.assertRaises(AuthServiceError):
+            service.authenticate_access_token(access_token=login["access_token"])
+
+    def test_password_reset_revokes_sessions_outliving_a_revoked_one(self):
+        service = _service(self.make_store(), password_reset_debug_code_enabled=True)
+        service.expired_token_retention_seconds = 0
+        service.refresh_ttl_seconds = 0.5
+        older = _signup(service)
+        service.refresh_ttl_seconds = 3600
+        newer = service.login_email(email="state@example.com", password="Passw0rd!", device_id=None)
+        # Re-writing the short-lived session must not shorten how long the newer one stays findable.
+        service.logout(access_token=older["access_token"], refresh_token=None)
+        time.sleep(0.8)
+
+        code = service.request_password_reset(email="state@example.com")["reset_debug_code"]
+        service.confirm_password_reset(email="state@example.com", code=code, new_password="N3wPassw0rd!")
+        with self.assertRaises(AuthServiceError):
+            service.authenticate_access_token(access_token=newer["access_token"])
+
+    def test_duplicate_email_is_rejected(self):
+        service = _service(self.make_store())
+        _signup(service)
+        with self.assertRaises(AuthServiceError) as context:
+            _signup(service)
+        self.assertEqual(context.exception.code, "AUTH_EMAIL_ALREADY_EXISTS")
+
+    def test_two_services_share_state(self):
+        first, second = self.make_shared_pair()
+        bundle = _signup(first)
+        self.assertEqual(second.authenticate_access_token(access_token=bundle["access_token"]).email, "state@example.com")
+
+        # Reuse is detected even when the two rotations land on different workers.
+        first.refresh(refresh_token=bundle["refresh_token"])
+        with self.assertRaises(AuthServiceError) as context:
+            second.refresh(refresh_token=bundle["refresh_token"])
+        self.assertEqual(context.exception.code, "AUTH_REFRESH_REUSED")
+
+
+    def test_counters_increment_and_expire(self):
+        store = self.make_store()
+        purge_at = datetime.now(timezone.utc) + timedelta(seconds=60)
+        self.assertEqual([store.increment("attempts:k", purge_at=purge_at) for _ in range(3)], [1, 2, 3])
+        self.assertEqual((store.counter("attempts:k"), store.counter("attempts:other")), (3, 0))
+
+        expired_at = datetime.now(timezone.utc) + timedelta(milliseconds=50)
+        store.increment("attempts:short", purge_at=expired_at)
+        time.sleep(0.1)
+        self.assertEqual(store.counter("attempts:short"), 0)
+        self.assertEqual(store.increment("attempts:short", purge_at=purge_at), 1)
+
+
+class InMemoryBackendTests(_BackendContract, unittest.TestCase):
+    def make_store(self):
+        return InMemoryAuthStateStore()
+
+    def make_shared_pair(self):
+        store = InMemoryAuthStateStore()
+        return _service(store), _service(store)
+
+
+class SqliteBackendTests(_BackendContract, unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.path = os.path.join(self.tmpdir.name, "auth.sqlite3")
+
+    def make_store(self):
+        store = SqliteAuthStateStore(self.path)
+        self.addCleanup(store.close)
+        return store
+
+    def make_shared_pair(self):
+        return _service(self.make_store()), _service(self.make_store())
+
+    def test_sessions_survive_restart(self):
+        bundle = _signup(_service(self.make_store()))
+        restarted = _service(self.make_store())
+        self.assertEqual(restarted.authenticate_access_token(access_token=bundle["access_token"]).email, "state@example.com")
+        self.assertIsNotNone(restarted.refresh(refresh_token=bundle["refresh_token"])["access_token"])
+
+    def test_purge_removes_expired_rows(self):
+        store = self.make_store()
+        service = _service(store)
+        service.expired_token_retention_seconds = 0
+        bundle = _signup(service)
+        now = datetime.now(timezone.utc)
+        self.assertEqual(service.purge_expired(now=now + timedelta(seconds=service.access_ttl_seconds + 5)), 1)
+        self.assertEqual(store.count("access_tokens"), 0)
+        self.assertEqual(store.count("sessions"), 1)
+
+
+class RedisProtocolBackendTests(_BackendContract, unittest.TestCase):
+    def setUp(self):
+        self.server = _RespStandIn()
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        self.url = "redis://127.0.0.1:%d/0" % self.server.server_address[1]
+
+    def make_store(self):
+        store = RedisAuthStateStore(RespClient.from_url(self.url), prefix="test:auth:")
+        self.addCleanup(store.close)
+        return store
+
+    def make_shared_pair(self):
+        return _service(self.make_store()), _service(self.make_store())
+
+    def test_records_carry_native_ttl(self):
+        store = self.make_store()
+        _signup(_service(store))
+        ttl_keys = {key.decode() for key in self.server.expires}
+        self.assertTrue(any(key.startswith("test:auth:access_tokens:") for key in ttl_keys))
+        self.assertFalse(any(key.startswith("test:auth:users:") for key in ttl_keys))
+
+
+class CachedStoreTests(unittest.TestCase):
+    def test_validation_reads_are_served_from_cache(self):
+        store = CachedAuthStateStore(InMemoryAuthStateStore(), ttl_seconds=60)
+        service = _service(store)
+        bundle = _signup(service)
+        for _ in range(5):
+            service.authenticate_access_token(access_token=bundle["access_token"])
+        # Three namespaces (token, session, user) miss once, then hit.
+        self.assertEqual(store.misses, 3)
+        self.assertEqual(store.hits, 12)
+
+    def test_local_revocation_invalidates_cache(self):
+        store = CachedAuthStateStore(InMemoryAuthStateStore(), ttl_seconds=60)
+        service = _service(store)
+        bundle = _signup(service)
+        service.authenticate_access_token(access_token=bundle["access_token"])
+        service.logout(access_token=bundle["access_token"], refresh_token=None)
+        with self.assertRaises(AuthServiceError):
+            service.authenticate_access_token(access_token=bundle["access_token"])
+
+    def test_writes_are_based_on_uncached_user_reads(self):
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        shared = SqliteAuthStateStore(os.path.join(tmpdir.name, "auth.sqlite3"))
+        self.addCleanup(shared.close)
+        worker_a = _service(CachedAuthStateStore(shared, ttl_seconds=60))
+        worker_b = InMemoryAuthSessionService(
+            email_verification_required=False,
+            password_reset_debug_code_enabled=True,
+            password_hash_policy=PasswordHashPolicy(ScryptHasher(n=2**10)),
+            state_store=CachedAuthStateStore(shared, ttl_seconds=60),
+        )
+        bundle = _signup(worker_a)
+        worker_a.authenticate_access_token(access_token=bundle["access_token"])  # caches the user on A
+
+        code = worker_b.request_password_reset(email="state@example.com")["reset_debug_code"]
+        worker_b.confirm_password_reset(email="state@example.com", code=code, new_password="N3wPassw0rd!")
+        # A's profile write must not put back the cached pre-reset password hash.
+        worker_a.update_profile(user_id=bundle["user"]["id"], display_name="A", locale=None, timezone_name=None)
+
+        self.assertIn("access_token", worker_a.login_email(email="state@example.com", password="N3wPassw0rd!", device_id=None))
+        with self.assertRaises(AuthServiceError):
+            worker_b.login_email(email="state@example.com", password="Passw0rd!", device_id=None)
+
+    def test_builder_wraps_shared_backends_only(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            env = {"AUTH_STATE_BACKEND": "sqlite", "AUTH_STATE_SQLITE_PATH": os.path.join(tmpdir, "a.sqlite3")}
+            store = build_auth_state_store_from_env(env.get)
+            self.assertIsInstance(store, CachedAuthStateStore)
+            store.close()
+        self.assertIsInstance(build_auth_state_store_from_env({}.get), InMemoryAuthStateStore)
+        with self.assertRaises(ValueError):
+            build_auth_state_store_from_env({"AUTH_STATE_BACKEND": "mongo"}.get)
+
+
+if __name__ == "__main__":
+    unittest.main()
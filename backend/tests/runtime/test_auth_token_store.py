@@ -0,0 +1,95 @@
+import threading
+import unittest
+from datetime import datetime, timedelta, timezone
+
+from backend.modules.auth import InMemoryAuthSessionService
+from backend.modules.auth.password_hashing import PasswordHashPolicy, ScryptHasher
+from backend.modules.auth.service import _token_key
+from backend.modules.auth.token_store import ExpiryIndex, ShardedTokenStore
+
+
+def _service(**kwargs) -> InMemoryAuthSessionService:
+    return InMemoryAuthSessionService(
+        email_verification_required=False,
+        password_hash_policy=PasswordHashPolicy(ScryptHasher(n=2**10)),
+        **kwargs,
+    )
+
+
+def _signup(service: InMemoryAuthSessionService, email: str = "store@example.com") -> dict:
+    return service.signup_email(email=email, password="Passw0rd!", display_name=None, locale="ko-KR", device_id=None)
+
+
+class ShardedTokenStoreTests(unittest.TestCase):
+    def test_put_get_pop_across_shards(self):
+        store = ShardedTokenStore(shards=4)
+        for index in range(40):
+            store.put(f"tok_{index}", index)
+        self.assertEqual(len(store), 40)
+        self.assertEqual(store.get("tok_7"), 7)
+        self.assertEqual(store.pop("tok_7"), 7)
+        self.assertIsNone(store.pop("tok_7"))
+        self.assertIsNone(store.get("tok_7"))
+        self.assertEqual(len(store), 39)
+
+    def test_expiry_index_pops_due_entries_in_order_with_limit(self):
+        index = ExpiryIndex()
+        base = datetime(2026, 1, 1, tzinfo=timezone.utc)
+        index.add(base + timedelta(seconds=30), "access", "c")
+        index.add(base + timedelta(seconds=10), "access", "a")
+        index.add(base + timedelta(seconds=20), "refresh", "b")
+
+        self.assertEqual([entry.key for entry in index.pop_due(base + timedelta(seconds=25), limit=1)], ["a"])
+        self.assertEqual([entry.key for entry in index.pop_due(base + timedelta(seconds=25), limit=10)], ["b"])
+        self.assertEqual(index.next_due(), base + timedelta(seconds=30))
+
+
+class AuthServiceExpiryTests(unittest.TestCase):
+    def test_purge_evicts_expired_tokens_and_tokenless_sessions(self):
+        service = _service(expired_token_retention_seconds=60)
+        bundle = _signup(service)
+        now = datetime.now(timezone.utc)
+
+        # Expired but inside the retention window: still reports AUTH_TOKEN_EXPIRED.
+        self.assertEqual(service.purge_expired(now=now + timedelta(seconds=service.access_ttl_seconds + 30)), 0)
+        self.assertEqual(service.purge_expired(now=now + timedelta(seconds=service.access_ttl_seconds + 120)), 1)
+        self.assertIsNone(service._store.get("access_tokens", _token_key(bundle["access_token"])))
+        self.assertEqual(service._store.count("sessions"), 1)
+
+        # The refresh token and the session it kept alive go together.
+        self.assertEqual(service.purge_expired(now=now + timedelta(seconds=service.refresh_ttl_seconds + 120)), 2)
+        self.assertEqual((service._store.count("refresh_tokens"), service._store.count("sessions")), (0, 0))
+        self.assertEqual(service._store.find("sessions", "user_id", bundle["user"]["id"]), [])
+
+    def test_stale_expiry_entry_keeps_reissued_reset_code(self):
+        service = _service()
+        bundle = _signup(service)
+        user_id = bundle["user"]["id"]
+        service.request_password_reset(email="store@example.com")
+        first = service._store.get("password_resets", user_id)
+        service.password_reset_code_ttl_seconds = 1200
+        service.request_password_reset(email="store@example.com")
+        current = service._store.get("password_resets", user_id)
+
+        # The first reset's entry is due; the reissued record must survive it.
+        self.assertEqual(service.purge_expired(now=first.expires_at), 0)
+        self.assertIs(service._store.get("password_resets", user_id), current)
+
+        service.purge_expired(now=current.expires_at)
+        self.assertIsNone(service._store.get("password_resets", user_id))
+
+    def test_access_token_validation_does_not_wait_for_service_lock(self):
+        service = _service()
+        bundle = _signup(service)
+        result = []
+        with service._lock:
+            reader = threading.Thread(
+                target=lambda: result.append(service.authenticate_access_token(access_token=bundle["access_token"]))
+            )
+            reader.start()
+            reader.join(timeout=5)
+        self.assertEqual(result[0].email, "store@example.com")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,102 @@
+import unittest
+
+from backend.modules.barcode.allergen_cache import (
+    BarcodeAllergenCache,
+    ingredient_set_fingerprint,
+    resolve_barcode_allergens,
+)
+
+
+INGREDIENTS = ["혼합제제", "설탕", "전지분유"]
+
+
+class _FakeAnalyze:
+    def __init__(self, fail: bool = False):
+        self.calls: list[str] = []
+        self.fail = fail
+
+    def __call__(self, ingredients, allergy_info):
+        self.calls.append(allergy_info)
+        if self.fail:
+            return {
+                "safetyStatus": "CAUTION",
+                "coachMessage": "error",
+                "ingredients": [{"name": name, "isAllergen": False, "riskReason": ""} for name in ingredients],
+                "_allergen_analysis_failed": True,
+            }
+        flagged = {"전지분유"} if "milk" in allergy_info else set()
+        if "peanut" in allergy_info:
+            flagged.add("혼합제제")
+        return {
+            "safetyStatus": "DANGER" if flagged else "SAFE",
+            "coachMessage": f"flagged:{allergy_info}" if flagged else "ok",
+            "ingredients": [
+                {"name": name, "isAllergen": name in flagged, "riskReason": allergy_info if name in flagged else ""}
+                for name in ingredients
+            ],
+        }
+
+
+class BarcodeAllergenCacheTests(unittest.TestCase):
+    def test_fingerprint_ignores_order_and_percentages(self):
+        self.assertEqual(
+            ingredient_set_fingerprint(["설탕", "전지분유 12%"]),
+            ingredient_set_fingerprint(["전지분유", "설탕"]),
+        )
+
+    def test_exact_profile_hit_skips_model(self):
+        cache = BarcodeAllergenCache()
+        analyze = _FakeAnalyze()
+        first, outcome = resolve_barcode_allergens(cache, INGREDIENTS, "milk", analyze)
+        self.assertEqual(outcome, "miss")
+
+        second, outcome = resolve_barcode_allergens(cache, list(reversed(INGREDIENTS)), "Milk", analyze)
+        self.assertEqual(outcome, "hit")
+        self.assertEqual(len(analyze.calls), 1)
+        self.assertEqual(second["safetyStatus"], "DANGER")
+        self.assertEqual([item["name"] for item in second["ingredients"]], list(reversed(INGREDIENTS)))
+
+    def test_multi_allergen_profile_assembled_from_single_verdicts(self):
+        cache = BarcodeAllergenCache()
+        analyze = _FakeAnalyze()
+        resolve_barcode_allergens(cache, INGREDIENTS, "peanut", analyze)
+        resolve_barcode_allergens(cache, INGREDIENTS, "milk", analyze)
+
+        result, outcome = resolve_barcode_allergens(cache, INGREDIENTS, "milk, peanut", analyze)
+        self.assertEqual(outcome, "assembled")
+        self.assertEqual(len(analyze.calls), 2)
+        self.assertEqual(result["safetyStatus"], "DANGER")
+        flagged = {item["name"] for item in result["ingredients"] if item["isAllergen"]}
+        self.assertEqual(flagged, {"혼합제제", "전지분유"})
+
+    def test_partial_profile_only_analyzes_missing_allergens(self):
+        cache = BarcodeAllergenCache()
+        analyze = _FakeAnalyze()
+        resolve_barcode_allergens(cache, INGREDIENTS, "milk", analyze)
+
+        result, outcome = resolve_barcode_allergens(cache, INGREDIENTS, "milk, peanut", analyze)
+        self.assertEqual(outcome, "partial")
+        self.assertEqual(analyze.calls[-1], "peanut")
+        flagged = {item["name"] for item in result["ingredients"] if item["isAllergen"]}
+        self.assertEqual(flagged, {"혼합제제", "전지분유"})
+
+    def test_failed_analysis_is_not_cached(self):
+        cache = BarcodeAllergenCache()
+        analyze = _FakeAnalyze(fail=True)
+        _, outcome = resolve_barcode_allergens(cache, INGREDIENTS, "milk", analyze)
+        self.assertEqual(outcome, "error")
+        self.assertEqual(cache.size(), 0)
+
+    def test_expired_entries_are_dropped(self):
+        now = [0.0]
+        cache = BarcodeAllergenCache(ttl_seconds=10, clock=lambda: now[0])
+        analyze = _FakeAnalyze()
+        resolve_barcode_allergens(cache, INGREDIENTS, "milk", analyze)
+        now[0] = 11.0
+        _, outcome = resolve_barcode_allergens(cache, INGREDIENTS, "milk", analyze)
+        self.assertEqual(outcome, "miss")
+        self.assertEqual(len(analyze.calls), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
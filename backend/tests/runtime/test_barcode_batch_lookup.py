@@ -0,0 +1,166 @@
+import json
+import os
+import unittest
+from unittest.mock import patch
+
+from fastapi.testclient import TestClient
+
+from backend.modules.analyst_runtime.food_analyst import FoodAnalyst
+from backend.modules.barcode.allergen_cache import BarcodeAllergenCache
+from backend.modules.barcode.batch_lookup import dedupe_barcodes
+
+
+os.environ["OPENAPI_EXPORT_ONLY"] = "1"
+from backend.server import app  # noqa: E402
+
+
+PRODUCTS = {
+    "8801111111111": {"food_name": "우유과자", "ingredients": ["우유", "설탕"]},
+    "8802222222222": {"food_name": "향료과자", "ingredients": ["천연향료", "설탕"]},
+    "8803333333333": {"food_name": "혼합과자", "ingredients": ["혼합제제", "밀가루"]},
+    "8804444444444": {"food_name": "성분없음", "ingredients": []},
+}
+
+
+class _FakeBarcodeService:
+    def __init__(self):
+        self.calls = []
+
+    async def get_product_info(self, barcode):
+        self.calls.append(barcode)
+        product = PRODUCTS.get(barcode)
+        return {**product, "ingredients": list(product["ingredients"])} if product else None
+
+
+class _FakeAnalyst:
+    def __init__(self):
+        self.batches = []
+
+    def analyze_barcode_screenings_batch(self, screenings, allergy_info):
+        self.batches.append((dict(screenings), allergy_info))
+        return {
+            product_id: screening.merge_model_assessment({
+                "safetyStatus": "CAUTION",
+                "coachMessage": "확인 필요",
+                "ingredients": [
+                    {"name": name, "isAllergen": False, "riskReason": "안전"} for name in screening.ambiguous_names
+                ],
+            })
+            for product_id, screening in screenings.items()
+        }
+
+
+class _Response:
+    def __init__(self, text):
+        self.text = text
+
+
+class BarcodeBatchLookupEndpointTests(unittest.TestCase):
+    def _post(self, body):
+        with TestClient(app) as client:
+            app.state.barcode_service = self.service
+            app.state.analyst = self.analyst
+            app.state.barcode_allergen_cache = self.cache
+            response = client.post("/lookup/barcode/batch", json=body)
+        return response
+
+    def setUp(self):
+        self.service = _FakeBarcodeService()
+        self.analyst = _FakeAnalyst()
+        self.cache = BarcodeAllergenCache()
+
+    def test_dedupes_and_sends_only_ambiguous_products_in_one_call(self):
+        response = self._post({
+            "barcodes": ["8801111111111", "8802222222222", "8801111111111", "8803333333333", "8804444444444", "0000000000000"],
+            "allergy_info": "우유",
+        })
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers["content-type"], "application/x-ndjson")
+        items = {item["barcode"]: item for item in map(json.loads, response.text.splitlines())}
+        self.assertEqual(len(items), 5)
+        self.assertEqual(sorted(self.service.calls), sorted(items))
+        self.assertEqual(len(self.analyst.batches), 1)
+        self.assertEqual(set(self.analyst.batches[0][0]), {"8802222222222", "8803333333333"})
+
+        self.assertEqual(items["8801111111111"]["allergen_source"], "local")
+        self.assertEqual(items["8801111111111"]["data"]["safetyStatus"], "DANGER")
+        self.assertEqual(items["8802222222222"]["allergen_source"], "model")
+        self.assertEqual(items["8802222222222"]["data"]["safetyStatus"], "CAUTION")
+        self.assertIsNone(items["8804444444444"]["allergen_source"])
+        self.assertFalse(items["0000000000000"]["found"])
+
+    def test_second_batch_is_served_from_allergen_cache(self):
+        body = {"barcodes": ["8802222222222", "8803333333333"], "allergy_info": "우유"}
+        self._post(body)
+        response = self._post(body)
+
+        items = [json.loads(line) for line in response.text.splitlines()]
+        self.assertEqual(len(self.analyst.batches), 1)
+        self.assertEqual({item["allergen_source"] for item in items}, {"cache_hit"})
+
+    def test_rejects_oversized_batch(self):
+        with patch.dict(os.environ, {"BARCODE_BATCH_MAX_ITEMS": "2"}):
+            response = self._post({"barcodes": ["1", "2", "3"], "allergy_info": "우유"})
+        self.assertEqual(response.status_code, 422)
+        self.assertEqual(response.json()["detail"]["code"], "INVALID_REQUEST")
+        self.assertEqual(self.service.calls, [])
+
+    def test_large_batch_is_analyzed_in_chunks(self):
+        for index in range(12):
+            PRODUCTS[f"88090000000{index:02d}"] = {"food_name": f"과자{index}", "ingredients": ["천연향료"]}
+        try:
+            response = self._post({"barcodes": [f"88090000000{index:02d}" for index in range(12)], "allergy_info": "우유"})
+        finally:
+            for index in range(12):
+                PRODUCTS.pop(f"88090000000{index:02d}")
+
+        items = [json.loads(line) for line in response.text.splitlines()]
+        self.assertEqual(sorted(len(batch) for batch, _ in self.analyst.batches), [2, 10])
+        self.assertEqual({item["allergen_source"] for item in items}, {"model"})
+
+    def test_dedupe_treats_upc_and_ean_spellings_as_one(self):
+        self.assertEqual(dedupe_barcodes([" 012345678905", "0012345678905", "", "8801"]), ["012345678905", "8801"])
+
+
+class FoodAnalystBatchTests(unittest.TestCase):
+    def test_missing_product_in_model_response_fails_safe(self):
+        analyst = FoodAnalyst.__new__(FoodAnalyst)
+        analyst.model = object()
+        payload = json.dumps({"products": [
+            {"id": "a", "safetyStatus": "SAFE", "coachMessage": "ok",
+             "ingredients": [{"name": "천연향료", "isAllergen": False, "riskReason": "안전"}]},
+        ]})
+        with patch(
+            "backend.modules.analyst_runtime.food_analyst.generate_with_semaphore",
+            return_value=_Response(payload),
+        ) as generate:
+            results = analyst.analyze_barcode_ingredients_batch(
+                {"a": ["천연향료"], "b": ["혼합제제"], "c": ["우유"]},
+                "우유",
+            )
+
+        self.assertEqual(generate.call_count, 1)
+        self.assertEqual(results["a"]["safetyStatus"], "SAFE")
+        self.assertTrue(results["b"]["_allergen_analysis_failed"])
+        self.assertEqual(results["c"]["safetyStatus"], "DANGER")
+
+    def test_truncated_response_keeps_completed_products(self):
+        analyst = FoodAnalyst.__new__(FoodAnalyst)
+        analyst.model = object()
+        complete = {"id": "a", "safetyStatus": "SAFE", "coachMessage": "ok",
+                    "ingredients": [{"name": "천연향료", "isAllergen": False, "riskReason": "안전"}]}
+        payload = '{"products": [' + json.dumps(complete, ensure_ascii=False) + ', {"id": "b", "safetyStat'
+        with patch(
+            "backend.modules.analyst_runtime.food_analyst.generate_with_semaphore",
+            return_value=_Response(payload),
+        ):
+            results = analyst.analyze_barcode_ingredients_batch({"a": ["천연향료"], "b": ["혼합제제"]}, "우유")
+
+        self.assertEqual(results["a"]["safetyStatus"], "SAFE")
+        self.assertNotIn("_allergen_analysis_failed", results["a"])
+        self.assertTrue(results["b"]["_allergen_analysis_failed"])
+
+
+if __name__ == "__main__":
+    unittest.main()
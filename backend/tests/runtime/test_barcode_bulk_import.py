@@ -0,0 +1,97 @@
+import csv
+import gzip
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from backend.modules.barcode import bulk_import
+from backend.modules.barcode.bulk_import import import_dump, iter_records
+from backend.modules.barcode.local_store import LocalBarcodeStore
+from backend.modules.barcode.service import BarcodeService
+
+
+def _write_csv(path: str, rows: list[dict]) -> None:
+    with open(path, "w", encoding="utf-8", newline="") as fp:
+        writer = csv.DictWriter(fp, fieldnames=list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+class _UnreachableDatago:
+    async def get_product_by_barcode(self, barcode):
+        raise AssertionError("network lookup should not run for locally imported barcodes")
+
+
+class BarcodeBulkImportTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.store = LocalBarcodeStore(os.path.join(self.tmp.name, "store.sqlite3"))
+
+    def tearDown(self):
+        self.store.close()
+        self.tmp.cleanup()
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.tmp.name, name)
+
+    def test_json_array_is_streamed_across_chunk_boundaries(self):
+        path = self._path("off.json")
+        products = [{"code": str(index), "product_name": "x" * 50} for index in range(200)]
+        with open(path, "w", encoding="utf-8") as fp:
+            json.dump(products, fp, indent=1)
+
+        with patch.object(bulk_import, "JSON_CHUNK_SIZE", 64):
+            self.assertEqual(list(iter_records(path)), products)
+
+    def test_c005_rows_pick_up_imported_c002_and_i2790(self):
+        _write_csv(self._path("c002.csv"), [{"PRDLST_REPORT_NO": "R1", "RAWMTRL_NM": "밀가루,설탕"}])
+        _write_csv(self._path("i2790.csv"), [{"PRDLST_REPORT_NO": "R1", "NUTR_CONT1": "480", "NUTR_CONT2": "60", "NUTR_CONT3": "", "NUTR_CONT4": ""}])
+        _write_csv(self._path("c005.csv"), [
+            {"BAR_CD": "8801234567890", "PRDLST_NM": "라면", "PRDLST_REPORT_NO": "R1", "NUTR_CONT1": ""},
+            {"BAR_CD": "", "PRDLST_NM": "no barcode", "PRDLST_REPORT_NO": "R2", "NUTR_CONT1": ""},
+        ])
+
+        import_dump(self.store, "c002", self._path("c002.csv"))
+        import_dump(self.store, "i2790", self._path("i2790.csv"))
+        stats = import_dump(self.store, "c005", self._path("c005.csv"))
+
+        self.assertEqual((stats.read, stats.written, stats.skipped), (2, 1, 1))
+        product = self.store.get("8801234567890")
+        self.assertEqual(product["ingredients"], ["밀가루", "설탕"])
+        self.assertEqual(product["calories"], 480.0)
+        self.assertEqual(product["raw_data"]["enrichment_nutr"], "I2790")
+
+    def test_delta_import_only_rewrites_changed_products(self):
+        full = self._path("off.jsonl.gz")
+        with gzip.open(full, "wt", encoding="utf-8") as fp:
+            for index in range(10):
+                fp.write(json.dumps({"code": f"30000000000{index:02d}", "product_name": f"P{index}"}) + "\n")
+        first = import_dump(self.store, "off", full, batch_size=3)
+        self.assertEqual(first.written, 10)
+
+        delta = self._path("off_delta.jsonl")
+        with open(delta, "w", encoding="utf-8") as fp:
+            fp.write(json.dumps({"code": "3000000000000", "product_name": "P0"}) + "\n")
+            fp.write(json.dumps({"code": "3000000000001", "product_name": "P1 renamed"}) + "\n")
+        second = import_dump(self.store, "off", delta)
+
+        self.assertEqual((second.written, second.unchanged), (1, 1))
+        self.assertEqual(self.store.get("3000000000001")["food_name"], "P1 renamed")
+        self.assertEqual(self.store.count(), 10)
+
+
+class BarcodeServiceLocalStoreTests(unittest.IsolatedAsyncioTestCase):
+    async def test_local_store_answers_before_network(self):
+        store = LocalBarcodeStore(":memory:")
+        store.upsert_products([("8801234567890", "BARCODE_DATAGO", {"food_name": "라면", "source": "BARCODE_DATAGO"})])
+        service = BarcodeService(local_store=store)
+        service.datago_client = _UnreachableDatago()
+
+        result = await service.get_product_info("8801234567890")
+        self.assertEqual(result["food_name"], "라면")
+
+
+if __name__ == "__main__":
+    unittest.main()
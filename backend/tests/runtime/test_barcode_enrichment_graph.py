@@ -0,0 +1,149 @@
+import asyncio
+import time
+import unittest
+
+from backend.modules.barcode.http import UpstreamLookupError
+from backend.modules.barcode.service import BarcodeService
+
+STEP_DELAY = 0.05
+
+
+class _FakeDatago:
+    def __init__(self, c005: dict | None, i2790: dict | None = None, failing: bool = False):
+        self.c005 = c005
+        self.i2790 = i2790
+        self.failing = failing
+        self.calls: list[str] = []
+
+    async def get_product_by_barcode(self, barcode):
+        self.calls.append("C005")
+        await asyncio.sleep(STEP_DELAY)
+        if self.failing:
+            raise UpstreamLookupError("C005", "HTTP 500")
+        return dict(self.c005) if self.c005 else None
+
+    async def get_food_item_raw_materials(self, report_no):
+        self.calls.append("C002")
+        await asyncio.sleep(STEP_DELAY)
+        return {"RAWMTRL_NM": "밀가루,설탕"}
+
+    async def get_product_by_report_no(self, report_no):
+        self.calls.append("I2790")
+        await asyncio.sleep(STEP_DELAY)
+        if self.i2790 is UpstreamLookupError:
+            raise UpstreamLookupError("I2790", "HTTP 500")
+        return self.i2790
+
+
+class _FakePublicData:
+    def __init__(self):
+        self.started = False
+        self.cancelled = False
+
+    async def get_nutrition_by_name(self, food_name):
+        self.started = True
+        try:
+            await asyncio.sleep(STEP_DELAY)
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        return {"AMT_NUM1": "321", "AMT_NUM6": "1", "AMT_NUM3": "2", "AMT_NUM4": "3"}
+
+    def normalize_response(self, item):
+        return {"calories": float(item["AMT_NUM1"]), "carbs": 1.0, "protein": 2.0, "fat": 3.0}
+
+
+class _FakeOff:
+    def __init__(self, product: dict | None):
+        self.product = product
+        self.calls = 0
+
+    async def get_product_by_barcode(self, barcode):
+        self.calls += 1
+        await asyncio.sleep(STEP_DELAY)
+        return self.product
+
+
+def _service(datago, off=None, public_data=None) -> BarcodeService:
+    service = BarcodeService()
+    service.datago_client = datago
+    service.off_client = off or _FakeOff(None)
+    service.public_data_client = public_data or _FakePublicData()
+    return service
+
+
+KOREAN_PRODUCT = {"PRDLST_NM": "라면", "PRDLST_REPORT_NO": "2020001", "NUTR_CONT1": ""}
+
+
+class BarcodeEnrichmentGraphTests(unittest.IsolatedAsyncioTestCase):
+    async def test_c002_i2790_and_public_data_run_concurrently(self):
+        public_data = _FakePublicData()
+        service = _service(_FakeDatago(KOREAN_PRODUCT, i2790=None), public_data=public_data)
+
+        started_at = time.perf_counter()
+        result = await service.get_product_info("8801234567890")
+        elapsed = time.perf_counter() - started_at
+
+        self.assertLess(elapsed, STEP_DELAY * 3)
+        self.assertEqual(result["calories"], 321.0)
+        self.assertEqual(result["ingredients"], ["밀가루", "설탕"])
+        self.assertEqual(result["raw_data"]["enrichment_nutr"], "PublicData")
+
+    async def test_i2790_nutrition_wins_over_speculative_public_data(self):
+        public_data = _FakePublicData()
+        datago = _FakeDatago(KOREAN_PRODUCT, i2790={"NUTR_CONT1": "500"})
+        result = await _service(datago, public_data=public_data).get_product_info("8801234567890")
+
+        self.assertEqual(result["calories"], 500.0)
+        self.assertEqual(result["raw_data"]["enrichment_nutr"], "I2790")
+        self.assertTrue(public_data.started)
+
+    async def test_nutrition_present_skips_i2790_and_public_data(self):
+        public_data = _FakePublicData()
+        datago = _FakeDatago({**KOREAN_PRODUCT, "NUTR_CONT1": "200"})
+        await _service(datago, public_data=public_data).get_product_info("8801234567890")
+
+        self.assertEqual(datago.calls, ["C005", "C002"])
+        self.assertFalse(public_data.started)
+
+    async def test_korean_prefix_queries_off_only_after_c005_miss(self):
+        off = _FakeOff({"product_name": "Imported"})
+        datago = _FakeDatago(None)
+        result = await _service(datago, off=off).get_product_info("8809999999999")
+        self.assertEqual(result["source"], "BARCODE_OFF")
+        self.assertEqual(off.calls, 1)
+
+    async def test_foreign_prefix_races_off_against_c005(self):
+        off = _FakeOff({"product_name": "Chocolate"})
+        started_at = time.perf_counter()
+        result = await _service(_FakeDatago(None), off=off).get_product_info("3017620422003")
+        elapsed = time.perf_counter() - started_at
+
+        self.assertEqual(result["food_name"], "Chocolate")
+        self.assertLess(elapsed, STEP_DELAY * 2)
+
+    async def test_c005_hit_wins_over_raced_off(self):
+        off = _FakeOff({"product_name": "Chocolate"})
+        datago = _FakeDatago({**KOREAN_PRODUCT, "NUTR_CONT1": "200"})
+        result = await _service(datago, off=off).get_product_info("3017620422003")
+        self.assertEqual(result["source"], "BARCODE_DATAGO")
+
+    async def test_failed_enrichment_still_returns_the_product(self):
+        datago = _FakeDatago(KOREAN_PRODUCT, i2790=UpstreamLookupError)
+        result = await _service(datago).get_product_info("8801234567890")
+        self.assertEqual(result["food_name"], "라면")
+        self.assertEqual(result["raw_data"]["enrichment_nutr"], "PublicData")
+
+    async def test_c005_failure_is_raised_when_off_misses_too(self):
+        service = _service(_FakeDatago(None, failing=True))
+        with self.assertRaises(UpstreamLookupError):
+            await service.get_product_info("8801234567890")
+
+    async def test_c005_failure_falls_back_to_off(self):
+        off = _FakeOff({"product_name": "Chocolate"})
+        result = await _service(_FakeDatago(None, failing=True), off=off).get_product_info("3017620422003")
+        self.assertEqual(result["source"], "BARCODE_OFF")
+
+
+if __name__ == "__main__":
+    unittest.main()
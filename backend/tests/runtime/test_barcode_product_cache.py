@@ -0,0 +1,163 @@
+import asyncio
+import os
+import tempfile
+import time
+import unittest
+
+from backend.modules.barcode.http import UpstreamLookupError
+from backend.modules.barcode.product_cache import BarcodeProductCache, normalize_barcode
+from backend.modules.barcode.service import BarcodeService
+
+PRODUCT = {
+    "food_name": "라면",
+    "calories": 500.0,
+    "ingredients": ["밀가루"],
+    "source": "BARCODE_DATAGO",
+    "raw_data": {"PRDLST_NM": "라면", "enrichment_nutr": "I2790"},
+}
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+class _CountingService(BarcodeService):
+    def __init__(self, cache, product):
+        super().__init__(product_cache=cache)
+        self.product = product
+        self.failing = False
+        self.upstream_calls = 0
+
+    async def _lookup_upstream(self, barcode):
+        self.upstream_calls += 1
+        await asyncio.sleep(0.01)
+        if self.failing:
+            raise UpstreamLookupError("C005", "HTTP 503")
+        return dict(self.product) if self.product else None
+
+
+class BarcodeProductCacheTests(unittest.TestCase):
+    def test_normalize_barcode_unifies_upc_and_ean(self):
+        self.assertEqual(normalize_barcode(" 012345678905 "), "0012345678905")
+        self.assertEqual(normalize_barcode("0012345678905"), "0012345678905")
+        self.assertEqual(normalize_barcode("880-1234-567890"), "8801234567890")
+
+    def test_entries_persist_across_instances_with_provenance(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "cache.sqlite3")
+            BarcodeProductCache(path).put("8801234567890", PRODUCT)
+            reopened = BarcodeProductCache(path)
+            cached = reopened.get("8801234567890")
+
+        self.assertTrue(cached.fresh)
+        self.assertEqual(cached.product, PRODUCT)
+        self.assertEqual(cached.provenance, {"source": "BARCODE_DATAGO", "enrichment_nutr": "I2790"})
+
+    def test_ttl_windows_for_positive_and_negative_entries(self):
+        clock = _Clock()
+        cache = BarcodeProductCache(fresh_ttl_seconds=100, stale_ttl_seconds=1000, negative_ttl_seconds=10, clock=clock)
+        cache.put("1", PRODUCT)
+        cache.put("2", None)
+
+        clock.now += 5
+        self.assertTrue(cache.get("1").fresh)
+        self.assertFalse(cache.get("2").found)
+
+        clock.now += 10
+        self.assertIsNone(cache.get("2"))
+        clock.now += 100
+        self.assertTrue(cache.get("1").stale)
+
+        clock.now += 1000
+        self.assertIsNone(cache.get("1"))
+        self.assertEqual(cache.purge_expired(), 2)
+
+    def test_not_found_never_replaces_a_servable_positive_entry(self):
+        clock = _Clock()
+        cache = BarcodeProductCache(fresh_ttl_seconds=10, stale_ttl_seconds=100, clock=clock)
+        cache.put("1", PRODUCT)
+        clock.now += 50
+        cache.put("1", None)
+        self.assertEqual(cache.get("1").product, PRODUCT)
+
+        clock.now += 60
+        cache.put("1", None)
+        self.assertFalse(cache.get("1").found)
+
+    def test_repeat_lookup_is_fast(self):
+        cache = BarcodeProductCache()
+        cache.put("8801234567890", PRODUCT)
+        started_at = time.perf_counter()
+        for _ in range(100):
+            cache.get("8801234567890")
+        self.assertLess((time.perf_counter() - started_at) / 100, 0.005)
+
+
+class BarcodeServiceCacheTests(unittest.IsolatedAsyncioTestCase):
+    async def test_hit_skips_upstream_and_returns_independent_copies(self):
+        service = _CountingService(BarcodeProductCache(), PRODUCT)
+        first = await service.get_product_info("8801234567890")
+        first["ingredients"] = [{"name": "mutated"}]
+        second = await service.get_product_info("8801234567890")
+
+        self.assertEqual(service.upstream_calls, 1)
+        self.assertEqual(second["ingredients"], ["밀가루"])
+
+    async def test_not_found_is_negative_cached(self):
+        service = _CountingService(BarcodeProductCache(), None)
+        self.assertIsNone(await service.get_product_info("123"))
+        self.assertIsNone(await service.get_product_info("123"))
+        self.assertEqual(service.upstream_calls, 1)
+
+    async def test_upstream_failure_is_not_negative_cached(self):
+        service = _CountingService(BarcodeProductCache(), PRODUCT)
+        service.failing = True
+        with self.assertRaises(UpstreamLookupError):
+            await service.get_product_info("8801234567890")
+
+        service.failing = False
+        self.assertEqual((await service.get_product_info("8801234567890"))["food_name"], "라면")
+        self.assertEqual(service.upstream_calls, 2)
+
+    async def test_concurrent_misses_share_one_lookup(self):
+        service = _CountingService(BarcodeProductCache(), PRODUCT)
+        results = await asyncio.gather(*(service.get_product_info("8801234567890") for _ in range(5)))
+        self.assertEqual(service.upstream_calls, 1)
+        self.assertEqual(len({id(result) for result in results}), 5)
+
+    async def test_stale_entry_served_while_refreshing(self):
+        clock = _Clock()
+        cache = BarcodeProductCache(fresh_ttl_seconds=10, stale_ttl_seconds=100, clock=clock)
+        cache.put("8801234567890", {**PRODUCT, "calories": 1.0})
+        clock.now += 20
+        service = _CountingService(cache, PRODUCT)
+
+        stale = await service.get_product_info("8801234567890")
+        self.assertEqual(stale["calories"], 1.0)
+        await asyncio.gather(*service._inflight.values())
+
+        self.assertEqual(service.upstream_calls, 1)
+        self.assertEqual(cache.get("8801234567890").product["calories"], 500.0)
+
+    async def test_outage_during_refresh_keeps_serving_the_stale_entry(self):
+        clock = _Clock()
+        cache = BarcodeProductCache(fresh_ttl_seconds=10, stale_ttl_seconds=100, clock=clock)
+        cache.put("8801234567890", PRODUCT)
+        clock.now += 20
+        service = _CountingService(cache, PRODUCT)
+        service.failing = True
+
+        await service.get_product_info("8801234567890")
+        await asyncio.gather(*service._inflight.values(), return_exceptions=True)
+
+        self.assertEqual(service.upstream_calls, 1)
+        self.assertEqual(cache.get("8801234567890").product, PRODUCT)
+        self.assertEqual((await service.get_product_info("8801234567890"))["food_name"], "라면")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,67 @@
+import os
+import unittest
+
+from fastapi.testclient import TestClient
+
+from backend.modules.barcode.normalizers import normalize_off
+from backend.modules.barcode.projection import project_product
+
+
+os.environ["OPENAPI_EXPORT_ONLY"] = "1"
+from backend.server import app  # noqa: E402
+
+
+OFF_RECORD = {
+    "product_name": "Choco Bar",
+    "image_url": "https://images.example/choco.jpg",
+    "ingredients_text": "sugar, cocoa butter",
+    "nutriments": {"energy-kcal_100g": 540, "fat_100g": 31},
+    "ingredients_analysis_tags": ["en:palm-oil-free"] * 500,
+}
+
+
+class _FakeBarcodeService:
+    async def get_product_info(self, barcode):
+        return normalize_off(dict(OFF_RECORD))
+
+
+class BarcodeProjectionTests(unittest.TestCase):
+    def setUp(self):
+        self.product = normalize_off(dict(OFF_RECORD))
+
+    def test_default_projection_is_compact(self):
+        projected = project_product(self.product)
+        self.assertEqual(projected["raw_data"], {"image_url": "https://images.example/choco.jpg"})
+        self.assertEqual(projected["calories"], 540)
+        self.assertIn("raw_data", self.product)
+
+    def test_full_and_field_list_projections(self):
+        self.assertEqual(project_product(self.product, "full"), self.product)
+        projected = project_product(self.product, "calories, raw_data.image_url, raw_data.missing")
+        self.assertEqual(projected, {
+            "food_name": "Choco Bar",
+            "calories": 540,
+            "raw_data": {"image_url": "https://images.example/choco.jpg"},
+        })
+
+
+class BarcodeLookupProjectionEndpointTests(unittest.TestCase):
+    def _lookup(self, **form):
+        with TestClient(app) as client:
+            app.state.barcode_service = _FakeBarcodeService()
+            app.state.analyst = object()
+            return client.post("/lookup/barcode", data={"barcode": "3000000000000", **form})
+
+    def test_compact_response_by_default_with_serialize_timing(self):
+        compact = self._lookup()
+        full = self._lookup(fields="full")
+
+        self.assertEqual(compact.status_code, 200)
+        self.assertEqual(compact.json()["data"]["raw_data"], {"image_url": "https://images.example/choco.jpg"})
+        self.assertTrue(compact.headers["server-timing"].startswith("serialize;dur="))
+        self.assertEqual(full.json()["data"]["raw_data"]["product_name"], "Choco Bar")
+        self.assertLess(len(compact.content) * 10, len(full.content))
+
+
+if __name__ == "__main__":
+    unittest.main()
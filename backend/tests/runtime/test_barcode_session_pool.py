@@ -0,0 +1,60 @@
+import unittest
+from unittest.mock import patch
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from backend.modules.barcode.clients.openfoodfacts_client import OpenFoodFactsClient
+from backend.modules.barcode.http import BarcodeHttpConfig
+from backend.modules.barcode.service import BarcodeService
+
+
+class BarcodeSessionPoolTests(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.peers: set = set()
+        self.user_agents: list[str] = []
+
+        async def product(request: web.Request) -> web.Response:
+            self.peers.add(request.transport.get_extra_info("peername"))
+            self.user_agents.append(request.headers.get("User-Agent", ""))
+            return web.json_response({"status": 1, "product": {"product_name": request.match_info["code"]}})
+
+        app = web.Application()
+        app.router.add_get("/api/v2/product/{code}.json", product)
+        self.server = TestServer(app)
+        await self.server.start_server()
+
+    async def asyncTearDown(self):
+        await self.server.close()
+
+    async def test_started_service_reuses_one_keepalive_connection(self):
+        service = BarcodeService(BarcodeHttpConfig(total_timeout_seconds=2.0))
+        await service.start()
+        try:
+            with patch.object(OpenFoodFactsClient, "BASE_URL", str(self.server.make_url("/api/v2/product"))):
+                for code in ("1", "2", "3"):
+                    product = await service.off_client.get_product_by_barcode(code)
+                    self.assertEqual(product["product_name"], code)
+        finally:
+            await service.close()
+
+        self.assertEqual(len(self.peers), 1)
+        self.assertTrue(all(agent == OpenFoodFactsClient.USER_AGENT for agent in self.user_agents))
+        self.assertEqual(service.session_pool._sessions, {})
+
+    async def test_client_without_pool_falls_back_to_short_lived_session(self):
+        client = OpenFoodFactsClient()
+        with patch.object(OpenFoodFactsClient, "BASE_URL", str(self.server.make_url("/api/v2/product"))):
+            product = await client.get_product_by_barcode("42")
+        self.assertEqual(product["product_name"], "42")
+
+    def test_config_reads_env_overrides(self):
+        env = {"BARCODE_HTTP_TOTAL_TIMEOUT_SECONDS": "4.5", "BARCODE_HTTP_POOL_LIMIT_PER_HOST": "7"}
+        config = BarcodeHttpConfig.from_env(env.get)
+        self.assertEqual(config.client_timeout().total, 4.5)
+        self.assertEqual(config.limit_per_host, 7)
+        self.assertEqual(config.connect_timeout_seconds, BarcodeHttpConfig().connect_timeout_seconds)
+
+
+if __name__ == "__main__":
+    unittest.main()
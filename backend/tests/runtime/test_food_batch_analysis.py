@@ -0,0 +1,165 @@
+import io
+import json
+import os
+import threading
+import time
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+from unittest.mock import patch
+
+from fastapi.testclient import TestClient
+from PIL import Image
+
+from backend.modules.analyst_core.postprocess import SharedNutritionLookup, enrich_with_nutrition
+from backend.modules.analyst_runtime.food_analyst import FoodAnalyst
+from backend.modules.analyst_runtime.food_batch import output_tokens_for, plan_batch_calls
+from backend.modules.image_io import decode_upload_to_jpeg
+
+
+os.environ["OPENAPI_EXPORT_ONLY"] = "1"
+from backend.server import app  # noqa: E402
+
+
+def _png_bytes(color=(200, 40, 40)) -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGB", (64, 48), color).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+class _FakeBatchAnalyst:
+    model_name = "gemini-test"
+
+    def __init__(self):
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def generate_food_batch_json(self, jpeg_images, allergy_info, iso_country, max_output_tokens):
+        with self._lock:
+            self.calls.append((len(jpeg_images), max_output_tokens))
+        return [
+            {
+                "foodName": "Bibimbap",
+                "safetyStatus": "SAFE",
+                "ingredients": [{"name": "rice", "bbox": [0, 0, 1, 1], "isAllergen": False}],
+            }
+            for _ in jpeg_images
+        ]
+
+    def finalize_food_result(self, result, nutrition_lookup=None):
+        result = enrich_with_nutrition(result, nutrition_lookup)
+        result["used_model"] = self.model_name
+        return result
+
+
+class FoodBatchPlanningTests(unittest.TestCase):
+    def test_plan_uses_fewest_even_calls(self):
+        self.assertEqual(plan_batch_calls([0, 1, 2, 3, 4], 4), [[0, 1, 2], [3, 4]])
+        self.assertEqual(plan_batch_calls([0, 1, 2], 4), [[0, 1, 2]])
+        self.assertEqual(plan_batch_calls([], 4), [])
+        self.assertEqual(output_tokens_for(2), 4096)
+        self.assertEqual(output_tokens_for(10), 8192)
+
+    def test_shared_lookup_resolves_each_ingredient_once(self):
+        calls = []
+
+        def _slow_lookup(name, origin):
+            calls.append(name)
+            time.sleep(0.05)
+            return {"calories": 100.0, "dataSource": "Test"}
+
+        shared = SharedNutritionLookup(_slow_lookup)
+        threads = [threading.Thread(target=shared, args=("Rice", "korean")) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        first = shared("rice", "korean")
+        first["calories"] = 0
+
+        self.assertEqual(calls, ["Rice"])
+        self.assertEqual(shared("RICE", "korean")["calories"], 100.0)
+        self.assertEqual((shared.lookups, shared.hits), (1, 5))
+
+    def test_decode_runs_in_process_pool(self):
+        with ProcessPoolExecutor(max_workers=1) as pool:
+            jpeg = pool.submit(decode_upload_to_jpeg, _png_bytes()).result(timeout=30)
+        self.assertEqual(Image.open(io.BytesIO(jpeg)).format, "JPEG")
+
+
+class _Response:
+    def __init__(self, payload):
+        self.text = json.dumps(payload)
+        self.candidates = [type("Candidate", (), {"finish_reason": "STOP"})()]
+
+
+class FoodAnalystBatchGenerationTests(unittest.TestCase):
+    def test_results_are_mapped_by_image_index_with_fallback_for_missing(self):
+        analyst = FoodAnalyst.__new__(FoodAnalyst)
+        analyst.model = object()
+        analyst.model_name = "gemini-test"
+        payload = {"results": [
+            {"imageIndex": 1, "foodName": "Kimchi", "safetyStatus": "SAFE", "ingredients": []},
+            {"imageIndex": 0, "foodName": "Rice", "safetyStatus": "SAFE", "ingredients": []},
+        ]}
+        jpeg = decode_upload_to_jpeg(_png_bytes())
+        with patch(
+            "backend.modules.analyst_runtime.food_analyst.generate_with_retry_and_fallback",
+            return_value=_Response(payload),
+        ) as generate:
+            results = analyst.generate_food_batch_json([jpeg, jpeg, jpeg], "None", "KR", 6144)
+
+        self.assertEqual(generate.call_count, 1)
+        self.assertEqual(generate.call_args.kwargs["generation_config"]["max_output_tokens"], 6144)
+        self.assertEqual([result["foodName"] for result in results], ["Rice", "Kimchi", "분석 오류"])
+
+
+class AnalyzeBatchEndpointTests(unittest.TestCase):
+    def test_streams_one_line_per_image_with_shared_calls(self):
+        analyst = _FakeBatchAnalyst()
+        lookups = []
+
+        def _lookup(name, origin="unknown"):
+            lookups.append(name)
+            return {"calories": 130.0, "dataSource": "Test"}
+
+        files = [("files", (f"meal{index}.png", _png_bytes(), "image/png")) for index in range(4)]
+        files.insert(2, ("files", ("broken.jpg", b"not an image", "image/jpeg")))
+        with (
+            patch.dict(os.environ, {"ANALYZE_BATCH_IMAGES_PER_CALL": "2"}),
+            patch("backend.modules.analyst_core.postprocess.lookup_nutrition", _lookup),
+            TestClient(app) as client,
+        ):
+            app.state.analyst = analyst
+            response = client.post("/analyze/batch", files=files, data={"allergy_info": "None"})
+
+        self.assertEqual(response.status_code, 200)
+        items = {item["index"]: item for item in map(json.loads, response.text.splitlines())}
+        self.assertEqual(sorted(items), [0, 1, 2, 3, 4])
+        self.assertEqual(items[2]["error"], "IMAGE_DECODE_FAILED")
+        self.assertEqual(items[4]["filename"], "meal3.png")
+        self.assertEqual(items[0]["result"]["nutrition"]["calories"], 130.0)
+        self.assertEqual(sorted(analyst.calls), [(2, 4096), (2, 4096)])
+        self.assertEqual(lookups, ["rice"])
+
+    def test_rejects_too_many_images(self):
+        files = [("files", (f"meal{index}.png", b"x", "image/png")) for index in range(3)]
+        with patch.dict(os.environ, {"ANALYZE_BATCH_MAX_IMAGES": "2"}), TestClient(app) as client:
+            app.state.analyst = _FakeBatchAnalyst()
+            response = client.post("/analyze/batch", files=files)
+        self.assertEqual(response.status_code, 422)
+        self.assertEqual(response.json()["detail"]["code"], "INVALID_REQUEST")
+
+    def test_setup_failure_is_mapped_by_error_policy(self):
+        files = [("files", ("meal.png", _png_bytes(), "image/png"))]
+        with (
+            patch("backend.server.resolve_prompt_country_code", side_effect=RuntimeError("boom")),
+            TestClient(app) as client,
+        ):
+            app.state.analyst = _FakeBatchAnalyst()
+            response = client.post("/analyze/batch", files=files)
+        self.assertEqual(response.status_code, 500)
+        self.assertIn("ANALYZE_FAILED", response.json()["detail"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,114 @@
+import json
+import unittest
+from unittest.mock import patch
+
+from PIL import Image
+
+from backend.modules.analyst_core.response_utils import expand_compact_food_response, parse_ai_response
+from backend.modules.analyst_core.schemas import build_compact_food_response_schema
+from backend.modules.analyst_runtime.food_analyst import FoodAnalyst
+from backend.modules.analyst_runtime.token_budget import AdaptiveTokenBudget
+
+
+COMPACT = {
+    "n": "Bibimbap",
+    "s": "CAUTION",
+    "cf": 95,
+    "i": [{"n": "egg", "b": [1, 2, 3, 4], "a": True}],
+    "r": "Contains egg.",
+}
+
+
+class _Response:
+    def __init__(self, payload, finish_reason="STOP", output_tokens=300):
+        self.text = json.dumps(payload)
+        self.candidates = [type("Candidate", (), {"finish_reason": finish_reason})()]
+        self.usage_metadata = type("Usage", (), {"candidates_token_count": output_tokens})()
+
+
+class AdaptiveTokenBudgetTests(unittest.TestCase):
+    def test_uses_ceiling_until_enough_samples(self):
+        budget = AdaptiveTokenBudget(floor=256, ceiling=4096, min_samples=3)
+        budget.observe(400)
+        budget.observe(None)
+        self.assertEqual(budget.current(), 4096)
+
+    def test_percentile_with_headroom_clamped_to_bounds(self):
+        budget = AdaptiveTokenBudget(floor=256, ceiling=4096, percentile=0.99, headroom=1.5, min_samples=3)
+        for tokens in (300, 400, 800):
+            budget.observe(tokens)
+        self.assertEqual(budget.current(), 1200)
+        budget.observe(5000)
+        self.assertEqual(budget.current(), 4096)
+
+        small = AdaptiveTokenBudget(floor=256, ceiling=4096, min_samples=1)
+        small.observe(10)
+        self.assertEqual(small.current(), 256)
+
+
+class CompactResponseTests(unittest.TestCase):
+    def test_expand_maps_short_keys_back_to_contract_names(self):
+        result = expand_compact_food_response(COMPACT)
+        self.assertEqual(result["foodName"], "Bibimbap")
+        self.assertEqual(result["confidence"], 95)
+        self.assertEqual(result["ingredients"], [{"name": "egg", "bbox": [1, 2, 3, 4], "isAllergen": True}])
+
+    def test_truncated_compact_output_keeps_model_values(self):
+        text = json.dumps(COMPACT)
+        result = expand_compact_food_response(parse_ai_response(text[: text.index('"r"')]))
+        self.assertTrue(result["_truncated"])
+        self.assertEqual(result["foodName"], "Bibimbap")
+        self.assertEqual(result["ingredients"][0]["name"], "egg")
+
+    def test_schema_caps_ingredients_and_can_drop_bbox(self):
+        schema = build_compact_food_response_schema(include_bbox=False, max_ingredients=5)
+        ingredients = schema["properties"]["i"]
+        self.assertEqual(ingredients["max_items"], 5)
+        self.assertNotIn("b", ingredients["items"]["properties"])
+
+
+class AnalyzeFoodBudgetTests(unittest.TestCase):
+    def _analyst(self, budget):
+        analyst = FoodAnalyst.__new__(FoodAnalyst)
+        analyst.model = object()
+        analyst.model_name = "gemini-test"
+        analyst.food_compact_response_enabled = True
+        analyst.food_token_budget = budget
+        return analyst
+
+    def _analyze(self, analyst, responses):
+        with (
+            patch(
+                "backend.modules.analyst_runtime.food_analyst.generate_with_retry_and_fallback",
+                side_effect=responses,
+            ) as generate,
+            patch("backend.modules.analyst_core.postprocess.lookup_nutrition", return_value=None),
+        ):
+            result = analyst.analyze_food_json(Image.new("RGB", (8, 8)), "Egg", "KR")
+        budgets = [call.kwargs["generation_config"]["max_output_tokens"] for call in generate.call_args_list]
+        return result, budgets
+
+    def test_retries_at_ceiling_only_when_truncated(self):
+        budget = AdaptiveTokenBudget(floor=256, ceiling=4096, headroom=1.0, min_samples=1)
+        budget.observe(500)
+        analyst = self._analyst(budget)
+
+        result, budgets = self._analyze(analyst, [_Response(COMPACT, "MAX_TOKENS", 500), _Response(COMPACT, output_tokens=900)])
+
+        self.assertEqual(budgets, [500, 4096])
+        self.assertEqual(result["foodName"], "Bibimbap")
+        stats = result["_generation_stats"]
+        self.assertEqual((stats["retried"], stats["output_tokens"], stats["max_output_tokens"]), (True, 900, 4096))
+        self.assertEqual(budget.snapshot()["samples"], 2)
+
+        _, budgets = self._analyze(analyst, [_Response(COMPACT, output_tokens=400)])
+        self.assertEqual(budgets, [900])
+
+    def test_fixed_budget_without_adaptive_tuning(self):
+        result, budgets = self._analyze(self._analyst(None), [_Response(COMPACT, "MAX_TOKENS", 4096)])
+        self.assertEqual(budgets, [4096])
+        self.assertTrue(result["_generation_stats"]["truncated"])
+
+
+if __name__ == "__main__":
+    unittest.main()
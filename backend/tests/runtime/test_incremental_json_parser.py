@@ -0,0 +1,71 @@
+import json
+import unittest
+
+from backend.modules.analyst_core.response_utils import IncrementalJsonParser, parse_ai_response
+
+
+RESPONSE = {
+    "foodName": "Bibim\"bap}",
+    "safetyStatus": "CAUTION",
+    "confidence": 95,
+    "ingredients": [
+        {"name": "rice", "bbox": [1, 2, 3, 4], "isAllergen": False},
+        {"name": "egg ]", "bbox": [5, 6, 7, 8], "isAllergen": True},
+    ],
+    "tags": ["a,b", 1, None, [2, 3]],
+    "translationCard": {"language": "Korean", "text": "계란 알러지"},
+}
+
+
+def _feed(parser: IncrementalJsonParser, text: str, size: int) -> list:
+    events = []
+    for start in range(0, len(text), size):
+        events.extend(parser.feed(text[start:start + size]))
+    return events
+
+
+class IncrementalJsonParserTests(unittest.TestCase):
+    def test_same_result_for_any_chunking(self):
+        text = json.dumps(RESPONSE, ensure_ascii=False, indent=2)
+        for size in (1, 5, 64, len(text)):
+            parser = IncrementalJsonParser()
+            _feed(parser, text, size)
+            self.assertTrue(parser.complete, size)
+            self.assertEqual(parser.fields, RESPONSE, size)
+
+    def test_events_arrive_in_document_order(self):
+        parser = IncrementalJsonParser()
+        events = _feed(parser, "```json\n" + json.dumps(RESPONSE, ensure_ascii=False), 7)
+
+        self.assertEqual(events[0], ("field", "foodName", RESPONSE["foodName"], None))
+        items = [(event.key, event.index, event.value) for event in events if event.kind == "item"]
+        self.assertEqual(items[1], ("ingredients", 1, RESPONSE["ingredients"][1]))
+        self.assertEqual([value for key, _, value in items if key == "tags"], RESPONSE["tags"])
+        kinds = [(event.kind, event.key) for event in events]
+        self.assertLess(kinds.index(("item", "ingredients")), kinds.index(("field", "ingredients")))
+
+    def test_number_split_across_chunks_waits_for_separator(self):
+        parser = IncrementalJsonParser()
+        self.assertEqual(parser.feed('{"confidence": 9'), [])
+        self.assertEqual(parser.feed("5}"), [("field", "confidence", 95, None)])
+
+    def test_truncated_output_salvages_completed_ingredients(self):
+        text = json.dumps(RESPONSE, ensure_ascii=False)
+        truncated = text[: text.index('"egg ]"') + 4]
+
+        result = parse_ai_response(truncated)
+
+        self.assertTrue(result["_truncated"])
+        self.assertEqual(result["foodName"], RESPONSE["foodName"])
+        self.assertEqual(result["confidence"], 95)
+        self.assertEqual(result["ingredients"], RESPONSE["ingredients"][:1])
+        self.assertNotIn("translationCard", result)
+
+    def test_truncation_before_any_field_still_falls_back(self):
+        result = parse_ai_response('{"foodName": "Bibim')
+        self.assertEqual(result["foodName"], "분석 오류")
+        self.assertNotIn("_truncated", result)
+
+
+if __name__ == "__main__":
+    unittest.main()
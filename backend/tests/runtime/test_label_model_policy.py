@@ -55,7 +55,7 @@ class LabelModelPolicyTests(unittest.TestCase):
         ):
             mock_model_cls.return_value = object()
             mock_generate.side_effect = [
-                _MockResponse('{"foodName":"Cereal","safetyStatus":"SAFE","ingredients":[{"name":"밀","isAllergen":false}],"nutrition":{"calories":100},"raw_result":"ok"}'),
+                _MockResponse('{"foodName":"Cereal","safetyStatus":"SAFE","ingredients":[{"name":"혼합제제","isAllergen":false}],"nutrition":{"calories":100},"raw_result":"ok"}'),
                 Exception("assess failed"),
             ]
 
@@ -68,7 +68,7 @@ class LabelModelPolicyTests(unittest.TestCase):
                     return_value={
                         "foodName": "Cereal",
                         "safetyStatus": "SAFE",
-                        "ingredients": [{"name": "밀", "isAllergen": False}],
+                        "ingredients": [{"name": "혼합제제", "isAllergen": False}],
                         "nutrition": {"calories": 100},
                         "raw_result": "ok",
                     },
@@ -1,10 +1,12 @@
 import io
 import os
 import unittest
-from PIL import Image, ImageDraw
+
+import numpy as np
+from PIL import Image, ImageDraw, ImageFilter, ImageStat
 from fastapi.testclient import TestClient
 
-from backend.modules.quality.label_quality_gate import evaluate_label_image_quality
+from backend.modules.quality.label_quality_gate import MAX_ANALYSIS_SIDE, evaluate_label_image_quality
 
 
 os.environ["OPENAPI_EXPORT_ONLY"] = "1"
@@ -39,6 +41,12 @@ def _build_high_quality_image() -> Image.Image:
     return img
 
 
+def _sharp_label_on_blurry_background() -> Image.Image:
+    background = Image.effect_noise((1600, 1200), 40).convert("RGB").filter(ImageFilter.GaussianBlur(12))
+    background.paste(_build_high_quality_image().resize((400, 600)), (900, 300))
+    return background
+
+
 class LabelQualityGateTests(unittest.TestCase):
     def test_quality_gate_rejects_blank_image(self):
         blank = Image.new("RGB", (300, 300), (255, 255, 255))
@@ -52,6 +60,61 @@ class LabelQualityGateTests(unittest.TestCase):
         self.assertTrue(result.passed)
         self.assertEqual(result.failed_checks, [])
 
+    def test_metrics_match_pil_reference_below_downsample_limit(self):
+        image = _build_high_quality_image()
+        gray = image.convert("L")
+        edge = gray.filter(ImageFilter.FIND_EDGES)
+        edge_hist = edge.histogram()
+        total = sum(edge_hist)
+
+        metrics = evaluate_label_image_quality(image).metrics
+        self.assertAlmostEqual(metrics.blur_score, ImageStat.Stat(edge).var[0], places=4)
+        self.assertAlmostEqual(metrics.contrast_score, ImageStat.Stat(gray).stddev[0], places=4)
+        self.assertAlmostEqual(metrics.text_density_score, sum(edge_hist[25:]) / total)
+        self.assertAlmostEqual(metrics.glare_ratio, sum(gray.histogram()[245:]) / total)
+
+    def test_large_input_is_downsampled_with_same_verdict(self):
+        large = _build_high_quality_image().resize((MAX_ANALYSIS_SIDE * 2, MAX_ANALYSIS_SIDE * 3), Image.NEAREST)
+        self.assertTrue(evaluate_label_image_quality(large).passed)
+        blank = Image.new("RGB", (MAX_ANALYSIS_SIDE * 3, MAX_ANALYSIS_SIDE * 2), (255, 255, 255))
+        self.assertFalse(evaluate_label_image_quality(blank).passed)
+
+    def test_tiled_mode_scores_label_region_and_returns_crop_box(self):
+        image = _sharp_label_on_blurry_background()
+        whole_frame = evaluate_label_image_quality(image)
+        tiled = evaluate_label_image_quality(image, tiled=True)
+
+        self.assertIsNone(whole_frame.crop_box)
+        self.assertTrue(tiled.passed)
+        self.assertGreater(tiled.metrics.text_density_score, whole_frame.metrics.text_density_score)
+        left, upper, right, lower = tiled.crop_box
+        self.assertLessEqual(left, 900)
+        self.assertLessEqual(upper, 300)
+        self.assertGreaterEqual(right, 1300)
+        self.assertGreaterEqual(lower, 900)
+        self.assertLess((right - left) * (lower - upper), 1600 * 1200 / 2)
+
+    def test_tiled_mode_rejects_glare_over_label_region(self):
+        image = _build_high_quality_image()
+        ImageDraw.Draw(image).rectangle((0, 230, 599, 680), fill=(255, 255, 255))
+        self.assertTrue(evaluate_label_image_quality(image).passed)
+        result = evaluate_label_image_quality(image, tiled=True)
+        self.assertFalse(result.passed)
+        self.assertIn("glare", result.failed_checks)
+
+    def test_tiled_mode_counts_low_contrast_tiles_toward_early_reject(self):
+        # Text-dense to the edge detector, but washed out: every region tile is flat.
+        checker = (np.indices((400, 400)).sum(axis=0) % 2 * 12 + 120).astype(np.uint8)
+        result = evaluate_label_image_quality(Image.fromarray(checker).convert("RGB"), tiled=True)
+        self.assertFalse(result.passed)
+        self.assertEqual(result.failed_checks, ["contrast"])
+        self.assertEqual(result.crop_box, (0, 0, 400, 400))
+
+    def test_tiled_mode_rejects_blank_image_without_crop(self):
+        result = evaluate_label_image_quality(Image.new("RGB", (300, 300), (255, 255, 255)), tiled=True)
+        self.assertFalse(result.passed)
+        self.assertIsNone(result.crop_box)
+
     def test_endpoint_skips_gemini_when_quality_fails(self):
         spy = _SpyAnalyst()
         with TestClient(app) as client:
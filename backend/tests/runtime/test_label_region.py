@@ -0,0 +1,89 @@
+import os
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+from PIL import Image, ImageDraw, ImageFilter
+
+from backend.modules.analyst_runtime.food_analyst import FoodAnalyst
+from backend.modules.quality.label_region import _close, _shift_any, crop_to_label_region, detect_label_region
+
+
+def _label(size: tuple[int, int]) -> Image.Image:
+    label = Image.new("RGB", size, (235, 235, 230))
+    draw = ImageDraw.Draw(label)
+    for y in range(20, size[1] - 20, 28):
+        for x in range(20, size[0] - 40, 22):
+            draw.rectangle((x, y, x + 12, y + 14), outline=(20, 20, 20), width=2)
+    return label
+
+
+def _product_shot() -> Image.Image:
+    scene = Image.effect_noise((500, 375), 30).convert("RGB").resize((2000, 1500))
+    scene = scene.filter(ImageFilter.GaussianBlur(6))
+    scene.paste(_label((400, 600)), (1100, 450))
+    return scene
+
+
+class _MockResponse:
+    def __init__(self, text: str):
+        self.text = text
+
+
+class LabelRegionTests(unittest.TestCase):
+    def test_detects_small_label_inside_product_shot(self):
+        region = detect_label_region(_product_shot())
+        self.assertIsNotNone(region)
+        left, upper, right, lower = region.box
+        self.assertLessEqual(left, 1100)
+        self.assertLessEqual(upper, 450)
+        self.assertGreaterEqual(right, 1500)
+        self.assertGreaterEqual(lower, 1050)
+        self.assertLess((right - left) * (lower - upper), 2000 * 1500 * 0.2)
+
+    def test_falls_back_to_full_frame_when_unsure(self):
+        blank = Image.new("RGB", (800, 600), (255, 255, 255))
+        image, region = crop_to_label_region(blank)
+        self.assertIsNone(region)
+        self.assertIs(image, blank)
+
+        full_frame_label = _label((900, 1200))
+        self.assertIsNone(detect_label_region(full_frame_label))
+
+    def test_dilation_does_not_wrap_around_image_edges(self):
+        mask = np.zeros((6, 6), dtype=bool)
+        mask[:, 0] = True
+        self.assertFalse(_shift_any(mask, 1)[:, -1].any())
+        self.assertFalse(_close(mask, 2)[:, 1:].any())
+
+    def _analyze_with_autocrop(self, **kwargs) -> list[Image.Image]:
+        with (
+            patch.object(FoodAnalyst, "_configure_vertex_ai", return_value=None),
+            patch("backend.modules.analyst_runtime.food_analyst.GenerativeModel"),
+            patch("backend.modules.analyst_runtime.food_analyst.generate_with_429_backoff") as mock_generate,
+            patch.dict(os.environ, {"LABEL_AUTOCROP_ENABLED": "1"}, clear=False),
+        ):
+            mock_generate.return_value = _MockResponse('{"safetyStatus":"SAFE","ingredients":[]}')
+            analyst = FoodAnalyst()
+            uploaded: list[Image.Image] = []
+            with (
+                patch.object(analyst, "_prepare_vertex_image", side_effect=lambda image: uploaded.append(image)),
+                patch.object(analyst, "_parse_ai_response", return_value={"safetyStatus": "SAFE", "ingredients": []}),
+                patch.object(analyst, "_sanitize_response", side_effect=lambda result: result),
+            ):
+                result = analyst.analyze_label_json(_product_shot(), "None", "KR", **kwargs)
+        self.assertIn("crop_ms", result["_label_timings"])
+        return uploaded
+
+    def test_analyst_uploads_cropped_region_when_enabled(self):
+        uploaded = self._analyze_with_autocrop()
+        self.assertEqual(len(uploaded), 1)
+        self.assertLess(uploaded[0].size[0] * uploaded[0].size[1], 2000 * 1500 * 0.2)
+
+    def test_analyst_does_not_crop_twice(self):
+        uploaded = self._analyze_with_autocrop(autocrop=False)
+        self.assertEqual(uploaded[0].size, (2000, 1500))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,229 @@
+import asyncio
+import threading
+import time
+import unittest
+from unittest.mock import Mock, patch
+
+import httpx
+from fastapi import FastAPI, HTTPException
+from google.api_core.exceptions import ResourceExhausted
+
+from backend.modules.analyst_core.postprocess import enrich_with_nutrition
+from backend.modules.analyst_runtime import generation
+from backend.modules.barcode.product_cache import BarcodeProductCache
+from backend.modules.barcode.service import BarcodeService
+from backend.modules.nutrition import NutritionLookup
+from backend.modules.ops.admission_control import AdmissionConfig, AdmissionControlMiddleware
+from backend.modules.request_deadline import (
+    Deadline,
+    DeadlineExceeded,
+    current_deadline,
+    deadline_scope,
+    has_budget,
+    time_budget,
+)
+from backend.modules.runtime_guardrails import (
+    EndpointErrorPolicy,
+    ErrorCode,
+    run_in_threadpool,
+    run_with_error_policy,
+)
+
+POLICY = EndpointErrorPolicy(code=ErrorCode.ANALYZE_FAILED, user_message="Analyze failed")
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class _Request:
+    def __init__(self):
+        self.disconnected = False
+
+    async def is_disconnected(self) -> bool:
+        return self.disconnected
+
+
+class DeadlineTests(unittest.TestCase):
+    def test_budget_helpers_follow_the_scope(self):
+        clock = _Clock()
+        deadline = Deadline.after(5.0, clock=clock)
+        self.assertEqual((time_budget(60.0), has_budget(100.0)), (60.0, True))
+        with deadline_scope(deadline):
+            self.assertEqual(time_budget(60.0), 5.0)
+            self.assertFalse(has_budget(6.0))
+            clock.now += 5.0
+            with self.assertRaises(DeadlineExceeded) as context:
+                deadline.check("generation")
+            self.assertFalse(context.exception.cancelled)
+        self.assertIsNone(current_deadline())
+
+    def test_cancel_wakes_sleepers(self):
+        deadline = Deadline.after(30.0)
+        threading.Timer(0.05, deadline.cancel).start()
+        started_at = time.monotonic()
+        self.assertFalse(deadline.sleep(10.0))
+        self.assertLess(time.monotonic() - started_at, 5.0)
+        self.assertEqual(deadline.remaining(), 0.0)
+
+
+class GenerationDeadlineTests(unittest.TestCase):
+    def _generate(self, primary):
+        return generation.generate_with_retry_and_fallback(
+            primary_model=primary,
+            primary_model_name="primary",
+            fallback_model_name="fallback",
+            contents=["prompt"],
+            generation_config={},
+            safety_settings={},
+            semaphore=threading.BoundedSemaphore(3),
+            retry_stats={"total_retries": 0},
+        )
+
+    def test_fallback_model_is_skipped_when_budget_is_short(self):
+        primary = Mock()
+        primary.generate_content.side_effect = ValueError("primary failed")
+        with (
+            patch.object(generation.random, "uniform", return_value=0.0),
+            patch.object(generation, "GenerativeModel") as fallback_cls,
+            deadline_scope(Deadline.after(1.0)),
+        ):
+            with self.assertRaises(ValueError):
+                self._generate(primary)
+        fallback_cls.assert_not_called()
+
+    def test_retry_window_is_sized_from_the_remaining_budget(self):
+        primary = Mock()
+        primary.generate_content.side_effect = ValueError("primary failed")
+        fallback = Mock()
+        fallback.generate_content.return_value = {"ok": True}
+        with (
+            patch.object(generation.random, "uniform", return_value=0.0),
+            patch.object(generation, "GenerativeModel", return_value=fallback),
+            patch.object(generation, "build_retry_policy", wraps=generation.build_retry_policy) as build,
+            deadline_scope(Deadline.after(10.0)),
+        ):
+            self.assertEqual(self._generate(primary), {"ok": True})
+        self.assertTrue(all(0 < call.args[1] <= 10.0 for call in build.call_args_list))
+
+    def test_429_backoff_stops_when_the_sleep_would_outlast_the_deadline(self):
+        model = Mock()
+        model.generate_content.side_effect = [ResourceExhausted("429"), {"ok": True}]
+        with (
+            patch.object(generation.time, "sleep") as sleep,
+            deadline_scope(Deadline.after(2.0)),
+        ):
+            with self.assertRaises(ResourceExhausted):
+                generation.generate_with_429_backoff(
+                    model=model,
+                    contents=["prompt"],
+                    generation_config={},
+                    safety_settings={},
+                    semaphore=threading.BoundedSemaphore(3),
+                )
+        sleep.assert_not_called()
+        self.assertEqual(model.generate_content.call_count, 1)
+
+
+class NutritionDeadlineTests(unittest.TestCase):
+    def test_enrichment_is_skipped_when_time_is_short(self):
+        lookup = Mock(return_value={"calories": 100.0, "dataSource": "USDA"})
+        result = {"foodName": "Bibimbap", "ingredients": [{"name": "rice"}, {"name": "egg"}]}
+        with deadline_scope(Deadline.after(0.5)):
+            enriched = enrich_with_nutrition(result, lookup)
+        lookup.assert_not_called()
+        self.assertEqual([item["name"] for item in enriched["ingredients"]], ["rice", "egg"])
+        self.assertNotIn("nutrition", enriched)
+
+    def test_upstream_timeouts_shrink_to_the_deadline(self):
+        lookup = NutritionLookup()
+        with deadline_scope(Deadline.after(1.0)):
+            self.assertLessEqual(lookup._timeout(3.0), 1.0)
+        with deadline_scope(Deadline.after(0.0)), patch.object(lookup, "_search_food_single") as single:
+            with self.assertRaises(DeadlineExceeded):
+                lookup._timeout(3.0)
+            self.assertIsNone(lookup.search_food("rice")["calories"])
+        single.assert_not_called()
+
+
+class _SlowService(BarcodeService):
+    def __init__(self):
+        super().__init__(product_cache=BarcodeProductCache())
+        self.finished = asyncio.Event()
+
+    async def _lookup_upstream(self, barcode):
+        await asyncio.sleep(0.2)
+        self.finished.set()
+        return {"food_name": "라면"}
+
+
+class BarcodeDeadlineTests(unittest.IsolatedAsyncioTestCase):
+    async def test_caller_gives_up_but_shared_lookup_fills_the_cache(self):
+        service = _SlowService()
+        with deadline_scope(Deadline.after(0.05)):
+            with self.assertRaises(DeadlineExceeded):
+                await service.get_product_info("8801234567890")
+        await asyncio.wait_for(service.finished.wait(), timeout=2.0)
+        await asyncio.sleep(0.05)
+        self.assertEqual((await service.get_product_info("8801234567890"))["food_name"], "라면")
+
+
+class ErrorPolicyDeadlineTests(unittest.IsolatedAsyncioTestCase):
+    async def test_disconnect_cancels_the_deadline_seen_by_worker_threads(self):
+        request = _Request()
+        stopped = threading.Event()
+
+        def _work():
+            deadline = current_deadline()
+            while deadline.sleep(0.01):
+                pass
+            if deadline.cancelled:
+                stopped.set()
+
+        async def _operation():
+            return await run_in_threadpool(_work)
+
+        asyncio.get_running_loop().call_later(0.1, setattr, request, "disconnected", True)
+        with self.assertRaises(HTTPException) as context:
+            await run_with_error_policy("/analyze", POLICY, _operation, request=request)
+        self.assertEqual(context.exception.status_code, 499)
+        self.assertIn(ErrorCode.CLIENT_DISCONNECTED, context.exception.detail)
+        self.assertTrue(await asyncio.to_thread(stopped.wait, 2.0))
+
+    async def test_expired_deadline_maps_to_504(self):
+        async def _operation():
+            await run_in_threadpool(current_deadline().check, "generation")
+
+        with deadline_scope(Deadline.after(0.0)):
+            with self.assertRaises(HTTPException) as context:
+                await run_with_error_policy("/analyze", POLICY, _operation, request=_Request())
+        self.assertEqual(context.exception.status_code, 504)
+        self.assertIn(ErrorCode.DEADLINE_EXCEEDED, context.exception.detail)
+
+    async def test_admission_sets_deadline_from_client_header(self):
+        app = FastAPI()
+        app.add_middleware(AdmissionControlMiddleware, config=AdmissionConfig.from_env({}.get))
+
+        @app.post("/analyze")
+        async def analyze():
+            return {"remaining": await run_in_threadpool(lambda: current_deadline().remaining())}
+
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            shorter = await client.post("/analyze", headers={"X-Client-Timeout-Ms": "1500"})
+            default = await client.post("/analyze")
+            longer = await client.post("/analyze", headers={"X-Client-Timeout-Ms": "240000"})
+            capped = await client.post("/analyze", headers={"X-Client-Timeout-Ms": "86400000"})
+        self.assertLessEqual(shorter.json()["remaining"], 1.5)
+        # Never below the app's own ANALYSIS_TIMEOUT_MS (180 s).
+        self.assertGreater(default.json()["remaining"], 179.0)
+        self.assertGreater(longer.json()["remaining"], 239.0)
+        self.assertLessEqual(capped.json()["remaining"], 300.0)
+
+
+if __name__ == "__main__":
+    unittest.main()